@@ -0,0 +1,180 @@
+"""
+Shared helpers for the performance scripts in this directory.
+
+Each script boots Django against a throwaway test database, seeds catalogue
+rows and times a callable. Run them from backend/, e.g.:
+
+    python benchmarks/bench_design_serialization.py --designs 60
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bluewardrobe.settings')
+
+
+def setup_django():
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def bench_database():
+    """Create a disposable test database for the duration of the block."""
+    setup_django()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def log_pipe_stdout():
+    """
+    Route stdout into a real file while timing, the way gunicorn's
+    capture_output pipes print() calls into its log stream.
+    """
+    with tempfile.TemporaryFile(mode='w+') as sink:
+        previous = sys.stdout
+        sys.stdout = sink
+        try:
+            yield sink
+        finally:
+            sys.stdout = previous
+
+
+def seed_catalogue(*, designs=40, images_per_design=4, sizes_per_design=5, reviews_per_design=3):
+    """Insert a realistic catalogue: one collection, N designs with images, sizes and reviews."""
+    from store.models import Collection, Design, DesignImage, DesignReview, SizeMeasurement
+
+    collection = Collection.objects.create(code='BENCH-001', title='Benchmark Collection')
+    created = []
+    for index in range(designs):
+        design = Design.objects.create(
+            collection=collection,
+            sku=f'BENCH-{index:04d}',
+            title=f'Benchmark Dress {index}',
+            description='Silk organza with hand-finished seams. ' * 4,
+            price=Decimal('185000.00') + index,
+            discount_price=Decimal('150000.00') if index % 3 == 0 else None,
+            video=f'designs/videos/bench-{index}.mp4' if index % 2 == 0 else None,
+        )
+        DesignImage.objects.bulk_create([
+            DesignImage(
+                design=design,
+                image=f'designs/images/bench-{index}-{n}.jpg',
+                alt_text=f'View {n}',
+                order=n,
+            )
+            for n in range(images_per_design)
+        ])
+        SizeMeasurement.objects.bulk_create([
+            SizeMeasurement(
+                design=design,
+                size=8 + 2 * n,
+                bust=Decimal('32.0') + n,
+                waist=Decimal('25.0') + n,
+                hips=Decimal('35.0') + n,
+                stock=(index + n) % 7,
+            )
+            for n in range(sizes_per_design)
+        ])
+        DesignReview.objects.bulk_create([
+            DesignReview(
+                design=design,
+                name=f'Reviewer {n}',
+                email=f'reviewer{n}-{index}@example.com',
+                rating=1 + (index + n) % 5,
+                comment='Beautiful fit and finish.',
+            )
+            for n in range(reviews_per_design)
+        ])
+        created.append(design)
+    return created
+
+
+def seed_blog(*, posts=20, media_per_post=3, likes_per_post=5, comments_per_post=4):
+    """Insert published blog posts with media items, likes and comments."""
+    from store.models import BlogComment, BlogPost, BlogPostLike, BlogPostMedia
+
+    created = []
+    for index in range(posts):
+        post = BlogPost.objects.create(
+            title=f'Benchmark Journal {index}',
+            excerpt='Notes from the atelier. ' * 3,
+            content='A long read about silk, lace and fittings. ' * 40,
+            cover_image=f'blog/covers/bench-{index}.jpg' if index % 2 == 0 else None,
+        )
+        BlogPostMedia.objects.bulk_create([
+            BlogPostMedia(
+                post=post,
+                file=f'blog/media/bench-{index}-{n}.{"mp4" if n == 0 and index % 3 == 0 else "jpg"}',
+                media_type='video' if n == 0 and index % 3 == 0 else 'image',
+                alt_text=f'Plate {n}',
+                order=n,
+            )
+            for n in range(media_per_post)
+        ])
+        BlogPostLike.objects.bulk_create([
+            BlogPostLike(post=post, visitor_id=f'bench-{index}-{n}') for n in range(likes_per_post)
+        ])
+        BlogComment.objects.bulk_create([
+            BlogComment(
+                post=post,
+                author_name=f'Reader {n}',
+                author_email=f'reader{n}@example.com',
+                body='Beautiful work.',
+                is_approved=n % 4 != 3,
+            )
+            for n in range(comments_per_post)
+        ])
+        created.append(post)
+    return created
+
+
+def time_callable(fn, *, iterations=20, warmup=2):
+    """Run ``fn`` repeatedly and return latency statistics in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99_index = min(len(samples) - 1, max(0, int(round(len(samples) * 0.99)) - 1))
+    mean = statistics.fmean(samples)
+    return {
+        'iterations': iterations,
+        'mean_ms': mean,
+        'p50_ms': statistics.median(samples),
+        'p99_ms': samples[p99_index],
+        'per_second': 1000.0 / mean if mean else float('inf'),
+    }
+
+
+def report(label, stats, *, stream=None):
+    out = stream or sys.__stdout__
+    out.write(
+        f"{label:<48} mean={stats['mean_ms']:8.2f}ms  p50={stats['p50_ms']:8.2f}ms  "
+        f"p99={stats['p99_ms']:8.2f}ms  {stats['per_second']:8.1f}/s\n"
+    )
+    out.flush()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Throughput of the public design catalogue: the full DesignSerializer and
+the DesignListSerializer cards on their own, and the full GET /api/designs/
+request through Django + DRF, with the JSON size of each representation.
+
+    python benchmarks/bench_design_serialization.py --designs 60 --iterations 30
+"""
+import argparse
+
+from _harness import bench_database, log_pipe_stdout, report, seed_catalogue, time_callable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--designs', type=int, default=40)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with bench_database():
+        from django.test import Client
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from rest_framework.renderers import JSONRenderer
+
+        from store.currency_utils import get_fx_for_serializer_context
+        from store.models import Design
+        from store.serializers import DesignListSerializer, DesignSerializer
+        from store.views import DesignViewSet
+
+        seed_catalogue(designs=args.designs)
+        factory = APIRequestFactory()
+        request = Request(factory.get('/api/designs/'))
+        queryset = DesignViewSet.queryset
+        client = Client(HTTP_HOST='localhost')
+
+        def serialize():
+            context = {'request': request, 'fx': get_fx_for_serializer_context()}
+            return DesignSerializer(queryset.all(), many=True, context=context).data
+
+        def serialize_cards():
+            context = {'request': request, 'fx': get_fx_for_serializer_context()}
+            cards = DesignListSerializer.prepare(Design.objects.select_related('collection'))
+            return DesignListSerializer(cards, many=True, context=context).data
+
+        def full_request():
+            response = client.get('/api/designs/')
+            assert response.status_code == 200, response.status_code
+            return response
+
+        with log_pipe_stdout():
+            serializer_stats = time_callable(serialize, iterations=args.iterations)
+            cards_stats = time_callable(serialize_cards, iterations=args.iterations)
+            request_stats = time_callable(full_request, iterations=args.iterations)
+            full_bytes = len(JSONRenderer().render(serialize()))
+            card_bytes = len(JSONRenderer().render(serialize_cards()))
+
+        report(f'DesignSerializer x{args.designs}', serializer_stats)
+        report(f'DesignListSerializer x{args.designs}', cards_stats)
+        report(f'GET /api/designs/ ({args.designs} designs)', request_stats)
+        print(f'JSON: full {full_bytes} bytes, cards {card_bytes} bytes')
+
+
+if __name__ == '__main__':
+    main()
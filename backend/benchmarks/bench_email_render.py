@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Render time per transactional email (store.email_utils): the order
+confirmation and owner notification for an order with several lines, with
+the brand looked up every time (a SiteAsset query and storage URL, as before
+it was cached) and with the cached brand the senders now use.
+
+    python benchmarks/bench_email_render.py --items 6 --iterations 500
+"""
+import argparse
+from decimal import Decimal
+
+from _harness import bench_database, report, time_callable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=6, help='line items per order')
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    with bench_database():
+        from django.core.cache import cache
+
+        from store.email_utils import (
+            invalidate_email_brand,
+            order_confirmation_customer_html,
+            order_email_kwargs,
+            order_notification_owner_html,
+        )
+        from store.models import Collection, Customer, Design, Order, OrderItem, SiteAsset
+
+        SiteAsset.objects.create(name='logo_primary', file='assets/logo.png')
+        collection = Collection.objects.create(code='BENCH-EMAIL', title='Bench')
+        customer = Customer.objects.create(email='ada@example.com', first_name='Ada', last_name='Obi', phone='0800')
+        order = Order.objects.create(
+            customer=customer, total_amount=Decimal('412500.00'), currency='USD', delivery_type='international',
+            international_region='UK', country='United Kingdom', delivery_address='12 Marina Road\nLondon',
+            delivery_fee=Decimal('25000'), subtotal=Decimal('387500.00'), total_ngn_equivalent=Decimal('6200000'),
+            payment_provider='paystack', paystack_reference='bench-ref',
+        )
+        for n in range(args.items):
+            design = Design.objects.create(collection=collection, sku=f'BENCH-E-{n}', title=f'Silk Gown {n}', price=185000)
+            OrderItem.objects.create(order=order, design=design, size=10, quantity=1 + n % 2, unit_price=Decimal('185000'))
+        order = Order.objects.select_related('customer').prefetch_related('items__design').get(pk=order.pk)
+        customer_kwargs, owner_kwargs = order_email_kwargs(order)
+
+        def render_both():
+            order_confirmation_customer_html(**customer_kwargs)
+            order_notification_owner_html(**owner_kwargs)
+
+        def uncached():
+            invalidate_email_brand()
+            render_both()
+
+        report('both emails, brand looked up each time', time_callable(uncached, iterations=args.iterations))
+        cache.clear()
+        report('both emails, cached brand', time_callable(render_both, iterations=args.iterations))
+
+
+if __name__ == '__main__':
+    main()
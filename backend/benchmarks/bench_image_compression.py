@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Time and peak memory of shrinking oversized camera photos below the Cloudinary
+10MB image limit: the previous in-memory quality ladder versus the spooled,
+binary-searched encoder in bluewardrobe.storage. No network access is needed.
+
+Each (encoder, image) pair runs in a fresh subprocess so ru_maxrss reflects
+that run alone.
+
+    python benchmarks/bench_image_compression.py --megapixels 12 24 48
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from _harness import setup_django
+
+
+def legacy_compress(data, target_bytes):
+    """The pre-streaming algorithm: whole upload in RAM, fixed quality ladder."""
+    from PIL import Image, ImageOps
+
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    working = image
+    for quality in [85, 75, 65, 55, 45, 35]:
+        buf = io.BytesIO()
+        working.save(buf, format='JPEG', optimize=True, progressive=True, quality=quality)
+        compressed = buf.getvalue()
+        if len(compressed) <= target_bytes:
+            return compressed
+    for _ in range(3):
+        w, h = working.size
+        working = working.resize((max(1, int(w * 0.85)), max(1, int(h * 0.85))), Image.LANCZOS)
+        buf = io.BytesIO()
+        working.save(buf, format='JPEG', optimize=True, progressive=True, quality=45)
+        compressed = buf.getvalue()
+        if len(compressed) <= target_bytes:
+            return compressed
+    return compressed
+
+
+def make_sample(path, megapixels):
+    """A noisy gradient: compresses like a detailed photo, not like a flat fill."""
+    from PIL import Image
+
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 64)
+    image = Image.merge('RGB', (gradient, noise, Image.blend(gradient, noise, 0.5)))
+    image.save(path, format='JPEG', quality=95)
+
+
+def run_one(encoder, path):
+    setup_django()
+    from bluewardrobe.storage import TARGET_COMPRESSED_IMAGE_BYTES, _compress_image_for_cloudinary
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    if encoder == 'legacy':
+        with open(path, 'rb') as handle:
+            size = len(legacy_compress(handle.read(), TARGET_COMPRESSED_IMAGE_BYTES))
+    else:
+        with open(path, 'rb') as handle:
+            out, size = _compress_image_for_cloudinary(handle)
+            out.close()
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'seconds': elapsed, 'peak_mb': (peak_kb - baseline_kb) / 1024, 'bytes': size}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megapixels', type=int, nargs='+', default=[12, 24, 48])
+    parser.add_argument('--run-one', nargs=2, metavar=('ENCODER', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        run_one(*args.run_one)
+        return
+
+    setup_django()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for megapixels in args.megapixels:
+            path = os.path.join(temp_dir, f'sample-{megapixels}mp.jpg')
+            make_sample(path, megapixels)
+            source_mb = os.path.getsize(path) / (1024 * 1024)
+            for encoder in ('legacy', 'streaming'):
+                output = subprocess.run(
+                    [sys.executable, __file__, '--run-one', encoder, path],
+                    check=True, capture_output=True, text=True,
+                ).stdout.strip().splitlines()[-1]
+                result = json.loads(output)
+                sys.__stdout__.write(
+                    f"{megapixels:>3}MP ({source_mb:5.1f}MB) {encoder:<10} "
+                    f"time={result['seconds']:6.2f}s  extra_rss={result['peak_mb']:7.1f}MB  "
+                    f"out={result['bytes'] / (1024 * 1024):5.2f}MB\n"
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Cost of resolving Cloudinary delivery URLs directly versus through the
+memoized resolver in bluewardrobe.media_urls. No network access is needed:
+URL building is local, only a cloud name has to be configured.
+
+    python benchmarks/bench_media_urls.py --names 400 --rounds 10
+"""
+import argparse
+
+from _harness import report, setup_django, time_callable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--names', type=int, default=400, help='distinct images per "page"')
+    parser.add_argument('--rounds', type=int, default=10, help='page renders per timed sample')
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    import cloudinary
+    from django.db.models.fields.files import FieldFile
+
+    from bluewardrobe.media_urls import clear_media_url_cache, media_url, media_url_cache_info
+    from bluewardrobe.storage import LargeMediaCloudinaryStorage
+    from store.models import DesignImage
+
+    cloudinary.config(cloud_name='bench-cloud', api_key='key', api_secret='secret')
+    storage = LargeMediaCloudinaryStorage()
+    field = DesignImage._meta.get_field('image')
+    files = [
+        FieldFile(None, field, f'media/designs/images/look-{n}.jpg')
+        for n in range(args.names)
+    ]
+    for file in files:
+        file.storage = storage
+
+    def direct():
+        for _ in range(args.rounds):
+            for file in files:
+                storage.url(file.name)
+
+    def memoized():
+        for _ in range(args.rounds):
+            for file in files:
+                media_url(file)
+
+    clear_media_url_cache()
+    report(f'storage.url x{args.names * args.rounds}', time_callable(direct, iterations=args.iterations))
+    report(f'media_url x{args.names * args.rounds}', time_callable(memoized, iterations=args.iterations))
+    print(media_url_cache_info())
+
+
+if __name__ == '__main__':
+    main()
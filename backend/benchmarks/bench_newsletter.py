@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Newsletter campaign throughput against the local fake Resend endpoint
+(bluewardrobe.fake_resend) with per-request latency: one request per
+subscriber, as a plain loop would send them, versus the batched sender at
+several concurrency levels.
+
+    python benchmarks/bench_newsletter.py --subscribers 2000 --latency-ms 120
+"""
+import argparse
+import sys
+import time
+
+from _harness import bench_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--subscribers', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=float, default=120.0, help='per-request server latency')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--per-request-sample', type=int, default=50, help='requests timed for the per-subscriber baseline')
+    args = parser.parse_args()
+
+    with bench_database():
+        import requests
+        from django.test.utils import override_settings
+
+        from bluewardrobe.fake_resend import FakeResendServer
+        from store import newsletter
+        from store.models import CampaignRecipient, NewsletterCampaign, Subscriber
+
+        Subscriber.objects.bulk_create([Subscriber(email=f'reader{n}@example.com') for n in range(args.subscribers)])
+
+        def row(label, seconds):
+            sys.__stdout__.write(f'{label:<32} {seconds:8.2f}s  {args.subscribers / seconds:9.1f} emails/s\n')
+
+        with FakeResendServer(latency=args.latency_ms / 1000) as server:
+            with override_settings(RESEND_API_URL=server.url, RESEND_API_KEY=server.api_key):
+                session = requests.Session()
+                start = time.perf_counter()
+                for n in range(args.per_request_sample):
+                    session.post(
+                        f'{server.url}/emails/batch',
+                        json=[{'from': 'bench@example.com', 'to': [f'reader{n}@example.com'], 'subject': 'Hi', 'html': '<p>Hi</p>'}],
+                        headers={'Authorization': f'Bearer {server.api_key}'},
+                    )
+                per_request = (time.perf_counter() - start) / args.per_request_sample
+                row('one request per subscriber*', per_request * args.subscribers)
+
+                for concurrency in args.concurrency:
+                    campaign = newsletter.queue_campaign(NewsletterCampaign.objects.create(
+                        subject='Bench', headline='Bench', body='Hello from the atelier.',
+                    ))
+                    start = time.perf_counter()
+                    newsletter.send_campaign(campaign, concurrency=concurrency, requests_per_second=1000)
+                    row(f'batched x{concurrency}', time.perf_counter() - start)
+                    assert newsletter.recipient_counts(campaign)[CampaignRecipient.STATUS_SENT] == args.subscribers
+        sys.__stdout__.write(f'* extrapolated from {args.per_request_sample} requests\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+DRF serializers + JSONRenderer against the FAST_READ_LISTS path (row
+serializers + ORJSONRenderer, see store.fast_lists) on GET /api/designs/,
+/api/collections/ and /api/blog/: serialize-and-render on its own and the
+full request, with requests per second and p99 latency for each. Before
+timing, it checks that both paths return byte-identical bodies, and exits
+non-zero if they do not.
+
+    python benchmarks/bench_read_endpoints.py --designs 120 --posts 30 --iterations 30
+"""
+import argparse
+import sys
+
+from _harness import bench_database, log_pipe_stdout, report, seed_blog, seed_catalogue, time_callable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--designs', type=int, default=60)
+    parser.add_argument('--posts', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with bench_database():
+        from django.test import Client, override_settings
+        from rest_framework.renderers import JSONRenderer
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+
+        from bluewardrobe.renderers import ORJSONRenderer
+        from store.content_serializers import BlogPostListSerializer
+        from store.content_views import BlogPostViewSet
+        from store.currency_utils import get_fx_for_serializer_context
+        from store.fast_lists import BlogPostRows, CollectionRows, DesignCardRows
+        from store.models import Collection, Design
+        from store.serializers import CollectionSerializer, DesignListSerializer
+        from store.views import CollectionViewSet
+
+        seed_catalogue(designs=args.designs)
+        seed_blog(posts=args.posts)
+        request = Request(APIRequestFactory().get('/api/'))
+        client = Client(HTTP_HOST='localhost')
+
+        def context():
+            return {'request': request, 'fx': get_fx_for_serializer_context()}
+
+        def designs():
+            return DesignListSerializer.prepare(Design.objects.select_related('collection'))
+
+        def collections():
+            return CollectionViewSet(request=request, action='list').get_queryset()
+
+        endpoints = [
+            (
+                '/api/designs/',
+                lambda: DesignListSerializer(designs(), many=True, context=context()).data,
+                lambda: DesignCardRows(context()).serialize(designs()),
+            ),
+            (
+                '/api/collections/',
+                lambda: CollectionSerializer(collections(), many=True, context=context()).data,
+                lambda: CollectionRows(context()).serialize(collections()),
+            ),
+            (
+                '/api/blog/',
+                lambda: BlogPostListSerializer(BlogPostViewSet.queryset.all(), many=True, context=context()).data,
+                lambda: BlogPostRows(context()).serialize(BlogPostViewSet.queryset.all()),
+            ),
+        ]
+
+        def get(path):
+            response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+            return response.content
+
+        mismatched = []
+        for path, drf_data, row_data in endpoints:
+            with override_settings(FAST_READ_LISTS=False):
+                drf_body = get(path)
+            with override_settings(FAST_READ_LISTS=True):
+                fast_body = get(path)
+            identical = (
+                drf_body == fast_body
+                and JSONRenderer().render(drf_data()) == ORJSONRenderer().render(row_data())
+            )
+            print(f'{path}: {len(fast_body)} bytes, {"identical" if identical else "DIFFERENT"}')
+            if not identical:
+                mismatched.append(path)
+        if mismatched:
+            print('Fast path output differs for: ' + ', '.join(mismatched))
+            sys.exit(1)
+
+        rows = []
+        for path, drf_data, row_data in endpoints:
+            with log_pipe_stdout():
+                drf_render = time_callable(
+                    lambda drf_data=drf_data: JSONRenderer().render(drf_data()), iterations=args.iterations,
+                )
+                fast_render = time_callable(
+                    lambda row_data=row_data: ORJSONRenderer().render(row_data()), iterations=args.iterations,
+                )
+                with override_settings(FAST_READ_LISTS=False):
+                    drf_request = time_callable(lambda path=path: get(path), iterations=args.iterations)
+                with override_settings(FAST_READ_LISTS=True):
+                    fast_request = time_callable(lambda path=path: get(path), iterations=args.iterations)
+            rows += [
+                (f'{path} serialize+render DRF', drf_render),
+                (f'{path} serialize+render fast', fast_render),
+                (f'GET {path} DRF', drf_request),
+                (f'GET {path} fast', fast_request),
+            ]
+        print(f'{Design.objects.count()} designs in {Collection.objects.count()} collection(s), {args.posts} posts')
+        for label, stats in rows:
+            report(label, stats)
+
+
+if __name__ == '__main__':
+    main()
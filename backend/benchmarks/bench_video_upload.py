@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""
+Throughput of chunked video uploads against the local fake Cloudinary endpoint
+(bluewardrobe.fake_cloudinary), which throttles each connection to simulate a
+real uplink: the SDK's serial upload_large versus the pooled parallel uploader
+at several concurrency levels.
+
+    python benchmarks/bench_video_upload.py --megabytes 60 --link-mbps 80
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+from _harness import setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--megabytes', type=int, default=60)
+    parser.add_argument('--link-mbps', type=float, default=80.0, help='per-connection bandwidth, megabits/s')
+    parser.add_argument('--latency-ms', type=float, default=40.0, help='per-request server latency')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    setup_django()
+    import cloudinary
+    import cloudinary.uploader
+
+    from bluewardrobe.chunked_upload import ChunkManifest, upload_chunked
+    from bluewardrobe.fake_cloudinary import FakeCloudinaryServer
+    from bluewardrobe.storage import CLOUDINARY_CHUNK_SIZE
+
+    payload = os.urandom(args.megabytes * 1024 * 1024)
+    options = {'resource_type': 'video', 'public_id': 'media/bench/film.mp4', 'timeout': 600}
+    server = FakeCloudinaryServer(
+        latency=args.latency_ms / 1000,
+        bytes_per_second=args.link_mbps * 1_000_000 / 8,
+    )
+
+    def row(label, seconds):
+        sys.__stdout__.write(
+            f'{label:<28} {seconds:7.2f}s  {args.megabytes / seconds:7.2f} MB/s\n'
+        )
+
+    with server:
+        cloudinary.config(upload_prefix=server.url, cloud_name='bench', api_key='key', api_secret='secret')
+
+        start = time.perf_counter()
+        cloudinary.uploader.upload_large(io.BytesIO(payload), chunk_size=CLOUDINARY_CHUNK_SIZE, **options)
+        row('sdk upload_large (serial)', time.perf_counter() - start)
+        assert server.completed['media/bench/film.mp4'] == payload
+
+        for concurrency in args.concurrency:
+            server.completed.clear()
+            manifest = ChunkManifest.load(None, len(payload), CLOUDINARY_CHUNK_SIZE)
+            report = upload_chunked(io.BytesIO(payload), options, manifest=manifest, concurrency=concurrency)
+            row(f'upload_chunked x{concurrency}', report.seconds)
+            assert server.completed['media/bench/film.mp4'] == payload
+
+
+if __name__ == '__main__':
+    main()
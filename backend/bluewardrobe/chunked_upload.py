@@ -0,0 +1,247 @@
+"""
+Parallel, resumable chunked uploads to the Cloudinary Upload API.
+
+Cloudinary assembles a large upload from chunks that share an
+X-Unique-Upload-Id header, each carrying its Content-Range. The SDK's
+upload_large sends them one at a time; here every chunk except the last is
+sent concurrently over one shared, pooled HTTP session, and the final chunk
+(whose response is the upload result) goes once the rest have landed.
+
+A ChunkManifest records which chunks were accepted. A failed pass leaves it
+holding exactly the missing ranges, so a retry, in this process or a later
+one when the manifest is written to disk, sends only those.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import cloudinary
+import cloudinary.utils
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 6 * 1024 * 1024
+DEFAULT_CONCURRENCY = 4
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class ChunkUploadError(Exception):
+    pass
+
+
+def configured_concurrency() -> int:
+    # Read lazily: settings.py imports the storages (and so this module) while loading.
+    return max(1, int(getattr(settings, 'CLOUDINARY_UPLOAD_CONCURRENCY', DEFAULT_CONCURRENCY)))
+
+
+def shared_session() -> requests.Session:
+    """One keep-alive pool for every chunk upload in the process."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=configured_concurrency() * 2)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+@dataclass
+class ChunkManifest:
+    upload_id: str
+    total: int
+    chunk_size: int
+    done: set[int] = field(default_factory=set)
+    public_id: Optional[str] = None
+    path: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: Optional[str], total: int, chunk_size: int) -> 'ChunkManifest':
+        """Resume from ``path`` when it describes the same file layout, else start fresh."""
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as handle:
+                    data = json.load(handle)
+                if data['total'] == total and data['chunk_size'] == chunk_size:
+                    return cls(
+                        upload_id=data['upload_id'],
+                        total=total,
+                        chunk_size=chunk_size,
+                        done=set(data.get('done', [])),
+                        public_id=data.get('public_id'),
+                        path=path,
+                    )
+                logger.info('Discarding chunk manifest %s: file layout changed', path)
+            except (OSError, ValueError, KeyError):
+                logger.warning('Unreadable chunk manifest %s, starting over', path, exc_info=True)
+        return cls(cloudinary.utils.random_public_id(), total, chunk_size, path=path)
+
+    @property
+    def offsets(self) -> list[int]:
+        return list(range(0, self.total, self.chunk_size))
+
+    @property
+    def last_offset(self) -> int:
+        return self.offsets[-1]
+
+    def missing(self) -> list[int]:
+        return [offset for offset in self.offsets if offset not in self.done]
+
+    @property
+    def bytes_done(self) -> int:
+        return sum(min(self.chunk_size, self.total - offset) for offset in self.done)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            json.dump({
+                'upload_id': self.upload_id,
+                'total': self.total,
+                'chunk_size': self.chunk_size,
+                'done': sorted(self.done),
+                'public_id': self.public_id,
+            }, handle)
+        os.replace(temp_path, self.path)
+
+    def discard(self) -> None:
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+@dataclass
+class UploadReport:
+    result: dict[str, Any]
+    bytes_sent: int
+    seconds: float
+
+    @property
+    def public_id(self) -> str:
+        return self.result['public_id']
+
+    @property
+    def megabytes_per_second(self) -> float:
+        if not self.seconds:
+            return 0.0
+        return self.bytes_sent / (1024 * 1024) / self.seconds
+
+
+def _signed_fields(options: dict[str, Any]) -> list[tuple[str, Any]]:
+    params = cloudinary.utils.cleanup_params(cloudinary.utils.build_upload_params(**options))
+    params = cloudinary.utils.sign_request(params, options)
+    fields = []
+    for key, value in params.items():
+        if isinstance(value, list):
+            fields.extend((f'{key}[]', item) for item in value)
+        elif value:
+            fields.append((key, value))
+    return fields
+
+
+def upload_chunked(
+    fileobj,
+    options: dict[str, Any],
+    *,
+    manifest: ChunkManifest,
+    concurrency: Optional[int] = None,
+    on_progress: Optional[Callable[[ChunkManifest], None]] = None,
+    session: Optional[requests.Session] = None,
+) -> UploadReport:
+    """
+    Send the chunks ``manifest`` is missing and return the final upload result.
+    Raises ChunkUploadError after the pass if any chunk failed; the manifest
+    then lists only what still has to be sent. ``on_progress`` runs on the
+    calling thread after each accepted chunk.
+    """
+    if manifest.public_id:
+        return UploadReport({'public_id': manifest.public_id}, 0, 0.0)
+    if not manifest.total:
+        raise ChunkUploadError('Refusing to upload an empty file')
+
+    session = session or shared_session()
+    concurrency = concurrency or configured_concurrency()
+    url = cloudinary.utils.cloudinary_api_url('upload', **options)
+    filename = os.path.basename(options.get('public_id') or 'upload')
+    timeout = options.get('timeout', 300)
+    read_lock = threading.Lock()
+    state_lock = threading.Lock()
+    sent = [0]
+
+    def send(offset):
+        with read_lock:
+            fileobj.seek(offset)
+            chunk = fileobj.read(manifest.chunk_size)
+        headers = {
+            'User-Agent': cloudinary.get_user_agent(),
+            'Content-Range': f'bytes {offset}-{offset + len(chunk) - 1}/{manifest.total}',
+            'X-Unique-Upload-Id': manifest.upload_id,
+        }
+        response = session.post(
+            url,
+            data=_signed_fields(options),
+            files={'file': (filename, chunk)},
+            headers=headers,
+            timeout=timeout,
+        )
+        try:
+            result = response.json()
+        except ValueError:
+            raise ChunkUploadError(f'HTTP {response.status_code} for bytes {offset}+: {response.text[:200]!r}')
+        if response.status_code >= 400 or 'error' in result:
+            message = result.get('error', {}).get('message', response.status_code)
+            raise ChunkUploadError(f'Chunk at {offset} rejected: {message}')
+        with state_lock:
+            manifest.done.add(offset)
+            sent[0] += len(chunk)
+            manifest.save()
+        return result
+
+    def report_progress():
+        # Called on the submitting thread only: callbacks may use its database
+        # connection, which pool threads would otherwise each open and leak.
+        if on_progress:
+            on_progress(manifest)
+
+    started = time.perf_counter()
+    body = [offset for offset in manifest.missing() if offset != manifest.last_offset]
+    errors = []
+    if body:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(body)))) as pool:
+            for future in as_completed([pool.submit(send, offset) for offset in body]):
+                try:
+                    future.result()
+                except Exception as exc:
+                    errors.append(exc)
+                else:
+                    report_progress()
+    if errors:
+        raise ChunkUploadError(
+            f'{len(errors)} chunk(s) failed, {len(manifest.missing())} left to send: {errors[0]}'
+        ) from errors[0]
+
+    # The last chunk completes the upload; resend it if its response was lost.
+    result = send(manifest.last_offset)
+    report_progress()
+    if result.get('done') is False or 'public_id' not in result:
+        manifest.done.discard(manifest.last_offset)
+        raise ChunkUploadError(f'Upload {manifest.upload_id} incomplete after final chunk: {result}')
+    manifest.public_id = result['public_id']
+    manifest.save()
+    return UploadReport(result, sent[0], time.perf_counter() - started)
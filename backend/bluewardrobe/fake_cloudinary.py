@@ -0,0 +1,137 @@
+"""
+A local stand-in for the Cloudinary Upload API's chunked upload endpoint.
+
+Accepts POST /v1_1/<cloud>/<resource_type>/upload with Content-Range and
+X-Unique-Upload-Id headers, stitches the chunks of each upload together and
+answers like Cloudinary: partial responses say ``done: false`` and the
+response that completes the file carries the final result. Used by the tests and benchmarks/bench_video_upload.py:
+
+    with FakeCloudinaryServer() as server:
+        cloudinary.config(upload_prefix=server.url, cloud_name='demo', api_key='k', api_secret='s')
+        ...
+
+``fail_offsets`` makes the first request for each listed chunk offset fail
+with HTTP 500; ``latency`` and ``bytes_per_second`` simulate a slow link per
+connection so concurrency is measurable.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+
+class _Upload:
+    def __init__(self, total):
+        self.total = total
+        self.chunks: dict[int, bytes] = {}
+
+    @property
+    def received(self):
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+    def assemble(self):
+        return b''.join(self.chunks[offset] for offset in sorted(self.chunks))
+
+
+class FakeCloudinaryServer:
+    def __init__(self, *, fail_offsets=(), latency=0.0, bytes_per_second=None):
+        self.fail_offsets = set(fail_offsets)
+        self.latency = latency
+        self.bytes_per_second = bytes_per_second
+        self.uploads: dict[str, _Upload] = {}
+        self.completed: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                message = BytesParser(policy=HTTP).parsebytes(
+                    f'Content-Type: {self.headers["Content-Type"]}\r\n\r\n'.encode() + raw
+                )
+                fields, chunk = {}, b''
+                for part in message.iter_parts():
+                    name = part.get_param('name', header='content-disposition')
+                    if name == 'file':
+                        chunk = part.get_payload(decode=True)
+                    else:
+                        fields[name] = part.get_content()
+
+                content_range = self.headers.get('Content-Range', '')
+                upload_id = self.headers.get('X-Unique-Upload-Id', '')
+                match = _RANGE.match(content_range)
+                with server.lock:
+                    server.requests.append((upload_id, content_range))
+                    offset = int(match.group(1)) if match else 0
+                    should_fail = offset in server.fail_offsets
+                    server.fail_offsets.discard(offset)
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.bytes_per_second:
+                    time.sleep(len(chunk) / server.bytes_per_second)
+                if should_fail:
+                    return self._reply(500, {'error': {'message': f'Injected failure at {offset}'}})
+                if 'signature' not in fields:
+                    return self._reply(401, {'error': {'message': 'Missing signature'}})
+
+                public_id = fields.get('public_id', upload_id)
+                if not match:
+                    with server.lock:
+                        server.completed[public_id] = chunk
+                    return self._reply(200, {'public_id': public_id, 'bytes': len(chunk)})
+
+                total = int(match.group(3))
+                with server.lock:
+                    upload = server.uploads.setdefault(upload_id, _Upload(total))
+                    upload.chunks[offset] = chunk
+                    if upload.received < total:
+                        # Like Cloudinary, partial responses already name the asset.
+                        return self._reply(200, {'public_id': public_id, 'done': False, 'upload_id': upload_id})
+                    server.completed[public_id] = upload.assemble()
+                    del server.uploads[upload_id]
+                return self._reply(200, {
+                    'public_id': public_id,
+                    'bytes': total,
+                    'resource_type': self.path.rstrip('/').split('/')[-2],
+                    'done': True,
+                })
+
+        return Handler
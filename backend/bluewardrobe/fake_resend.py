@@ -0,0 +1,156 @@
+"""
+A local stand-in for Resend's batch email endpoint.
+
+Accepts POST /emails/batch with a bearer API key and a JSON list of up to
+100 emails, and answers like Resend: ``{"data": [{"id": ...}, ...]}`` in
+request order. A repeated Idempotency-Key gets the first response back
+without sending again. Used by the tests and benchmarks/bench_newsletter.py:
+
+    with FakeResendServer() as server:
+        with override_settings(RESEND_API_URL=server.url, RESEND_API_KEY=server.api_key):
+            ...
+
+``rate_limit`` answers 429 once that many requests arrived within ``window``
+seconds, with a ``retry-after`` of the time until the window frees up.
+``fail_requests`` makes that many requests fail with HTTP 500, and
+``lose_responses`` makes that many send the emails and then fail anyway, like
+a response lost on the way back. ``latency`` delays every response.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeResendServer:
+    def __init__(
+        self,
+        *,
+        api_key='re_test_key',
+        rate_limit=None,
+        window=1.0,
+        fail_requests=0,
+        lose_responses=0,
+        latency=0.0,
+    ):
+        self.api_key = api_key
+        self.rate_limit = rate_limit
+        self.window = window
+        self.fail_requests = fail_requests
+        self.lose_responses = lose_responses
+        self.latency = latency
+        # Every email accepted, and how many times each address was emailed.
+        self.sent: list[dict] = []
+        self.deliveries: Counter = Counter()
+        self.requests = 0
+        self.throttled = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._window: deque = deque()
+        self._idempotent: dict[str, dict] = {}
+        self.lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _retry_after(self):
+        """Seconds until this request fits under the rate limit; 0 admits it (called under the lock)."""
+        if not self.rate_limit:
+            return 0
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= self.window:
+            self._window.popleft()
+        if len(self._window) >= self.rate_limit:
+            return self.window - (now - self._window[0])
+        self._window.append(now)
+        return 0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with server.lock:
+                    server.requests += 1
+                    server._in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server._in_flight)
+                try:
+                    status, payload, headers = self._handle(raw)
+                finally:
+                    with server.lock:
+                        server._in_flight -= 1
+                self._reply(status, payload, headers)
+
+            def _handle(self, raw):
+                if server.latency:
+                    time.sleep(server.latency)
+                if self.path.rstrip('/') != '/emails/batch':
+                    return 404, {'name': 'not_found', 'message': 'Unknown endpoint'}, None
+                if self.headers.get('Authorization') != f'Bearer {server.api_key}':
+                    return 401, {'name': 'missing_api_key', 'message': 'Missing API key'}, None
+                key = self.headers.get('Idempotency-Key', '')
+                with server.lock:
+                    retry_after = server._retry_after()
+                    if retry_after:
+                        server.throttled += 1
+                        return 429, {'name': 'rate_limit_exceeded', 'message': 'Too many requests'}, {
+                            'retry-after': f'{retry_after:.3f}',
+                        }
+                    if server.fail_requests:
+                        server.fail_requests -= 1
+                        return 500, {'name': 'internal_server_error', 'message': 'Injected failure'}, None
+                    if key in server._idempotent:
+                        return 200, server._idempotent[key], None
+
+                emails = json.loads(raw or b'[]')
+                if not isinstance(emails, list) or not 1 <= len(emails) <= 100:
+                    return 422, {'name': 'validation_error', 'message': 'Send between 1 and 100 emails'}, None
+                for email in emails:
+                    if not email.get('to') or not email.get('from') or not email.get('subject'):
+                        return 422, {'name': 'validation_error', 'message': 'Each email needs from, to and subject'}, None
+
+                payload = {'data': [{'id': str(uuid.uuid4())} for _ in emails]}
+                with server.lock:
+                    server.sent.extend(emails)
+                    for email in emails:
+                        server.deliveries.update(email['to'])
+                    if key:
+                        server._idempotent[key] = payload
+                    if server.lose_responses:
+                        server.lose_responses -= 1
+                        return 500, {'name': 'internal_server_error', 'message': 'Response lost'}, None
+                return 200, payload, None
+
+        return Handler
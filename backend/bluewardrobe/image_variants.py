@@ -0,0 +1,222 @@
+"""
+Width-bounded responsive variants (WebP/AVIF) for uploaded images.
+
+On Cloudinary every variant is just a transformation URL (w_<n>,c_limit plus
+f_<format>), so nothing is stored. On FileSystemStorage the variants are
+rendered once by Pillow when the image is saved (see store.signals) and live
+next to the original under a "variants/" folder:
+
+    designs/images/look.jpg -> designs/images/variants/look-w640.webp
+
+Which local variants exist is kept in the shared cache per original, so
+serializing an image does not stat its variant files on every request.
+Generating variants stores the set and deleting them drops it, for every
+worker at once. An original with no variants yet is not put in the shared
+cache: it is checked again until its variants show up. Each worker also keeps
+the sets it read for IMAGE_VARIANTS_LOCAL_TTL seconds (at most
+MEDIA_URL_CACHE_SIZE of them), so a list of images does not read the shared
+cache once per image on every request.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from bluewardrobe.media_urls import absolute_url, is_cloudinary_storage, storage_url
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1024, 1920)
+# Most compact first so <picture> sources are listed in preference order.
+VARIANT_FORMATS = ('avif', 'webp')
+VARIANT_MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+SRCSET_FORMAT = 'webp'
+
+# This worker's copies of variant sets: {cache key: (set, read at)}, least recently used first.
+_local: OrderedDict = OrderedDict()
+_local_lock = threading.Lock()
+
+_ENCODER_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 55, 'speed': 8},
+}
+
+
+def variant_name(name: str, width: int, fmt: str) -> str:
+    folder, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(folder, 'variants', f'{stem}-w{width}.{fmt}').replace('\\', '/')
+
+
+def _cloudinary_transformation(width: int, fmt: str) -> dict[str, Any]:
+    return {'width': width, 'crop': 'limit', 'fetch_format': fmt, 'quality': 'auto'}
+
+
+def _cache_key(storage, name: str) -> str:
+    location = getattr(storage, 'location', '')
+    return 'image-variants:' + hashlib.sha1(f'{location}:{name}'.encode()).hexdigest()
+
+
+def _stored_variants(storage, name: str) -> frozenset[tuple[int, str]]:
+    return frozenset(
+        (width, fmt)
+        for width in VARIANT_WIDTHS
+        for fmt in VARIANT_FORMATS
+        if storage.exists(variant_name(name, width, fmt))
+    )
+
+
+def _remember(key: str, stored: frozenset) -> None:
+    with _local_lock:
+        _local[key] = (stored, time.monotonic())
+        _local.move_to_end(key)
+        while len(_local) > settings.MEDIA_URL_CACHE_SIZE:
+            _local.popitem(last=False)
+
+
+def _recall(key: str) -> Optional[frozenset]:
+    with _local_lock:
+        entry = _local.get(key)
+        if entry is None or time.monotonic() - entry[1] >= settings.IMAGE_VARIANTS_LOCAL_TTL:
+            return None
+        _local.move_to_end(key)
+        return entry[0]
+
+
+def clear_local_variants() -> None:
+    with _local_lock:
+        _local.clear()
+
+
+def local_variants(file_field) -> frozenset[tuple[int, str]]:
+    """(width, format) pairs stored for a local original, from the shared cache when known."""
+    storage = file_field.storage
+    key = _cache_key(storage, file_field.name)
+    stored = _recall(key)
+    if stored is None:
+        stored = cache.get(key)
+    if stored is None:
+        stored = _stored_variants(storage, file_field.name)
+        if stored:
+            cache.set(key, stored, None)
+    _remember(key, stored)
+    return stored
+
+
+def _variant_urls(file_field, fmt: str) -> list[tuple[int, str]]:
+    storage = file_field.storage
+    name = file_field.name
+    if is_cloudinary_storage(storage):
+        return [
+            (width, storage_url(storage, name, _cloudinary_transformation(width, fmt)))
+            for width in VARIANT_WIDTHS
+        ]
+    stored = local_variants(file_field)
+    return [
+        (width, storage_url(storage, variant_name(name, width, fmt)))
+        for width in VARIANT_WIDTHS
+        if (width, fmt) in stored
+    ]
+
+
+def responsive_srcset(request, file_field, fmt: str = SRCSET_FORMAT) -> Optional[str]:
+    """``srcset`` string for one format, or None when no variants are available."""
+    if not file_field:
+        return None
+    try:
+        urls = _variant_urls(file_field, fmt)
+    except Exception:
+        logger.debug('Could not build %s srcset for %s', fmt, file_field, exc_info=True)
+        return None
+    if not urls:
+        return None
+    return ', '.join(f'{absolute_url(request, url)} {width}w' for width, url in urls)
+
+
+def responsive_sources(request, file_field) -> list[dict[str, str]]:
+    """<picture> sources, one per modern format, most compact first."""
+    sources = []
+    for fmt in VARIANT_FORMATS:
+        srcset = responsive_srcset(request, file_field, fmt)
+        if srcset:
+            sources.append({'type': VARIANT_MIME_TYPES[fmt], 'srcset': srcset})
+    return sources
+
+
+def generate_local_variants(file_field) -> list[str]:
+    """
+    Render every variant narrower than the original with Pillow and store it
+    beside the original. Cloudinary storages are skipped: they transform on
+    delivery. Returns the stored variant names.
+    """
+    if not file_field:
+        return []
+    storage = file_field.storage
+    if is_cloudinary_storage(storage):
+        return []
+
+    name = file_field.name
+    with storage.open(name, 'rb') as handle:
+        image = Image.open(handle)
+        image.draft('RGB', (max(VARIANT_WIDTHS), max(VARIANT_WIDTHS)))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    stored = []
+    variants = set()
+    working = image
+    # Largest first so each step downsamples the previous, already smaller, image.
+    for width in sorted(VARIANT_WIDTHS, reverse=True):
+        if width >= image.width:
+            continue
+        height = max(1, round(image.height * width / image.width))
+        working = working.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in VARIANT_FORMATS:
+            buffer = io.BytesIO()
+            working.save(buffer, **_ENCODER_OPTIONS[fmt])
+            target = variant_name(name, width, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+            stored.append(storage.save(target, ContentFile(buffer.getvalue())))
+            variants.add((width, fmt))
+    key = _cache_key(storage, name)
+    if variants:
+        cache.set(key, frozenset(variants), None)
+    else:
+        cache.delete(key)
+    _remember(key, frozenset(variants))
+    return stored
+
+
+def delete_local_variants(file_field) -> None:
+    if not file_field or is_cloudinary_storage(file_field.storage):
+        return
+    storage = file_field.storage
+    for width in VARIANT_WIDTHS:
+        for fmt in VARIANT_FORMATS:
+            target = variant_name(file_field.name, width, fmt)
+            if storage.exists(target):
+                storage.delete(target)
+    key = _cache_key(storage, file_field.name)
+    cache.delete(key)
+    _remember(key, frozenset())
+
+
+def has_local_variants(file_field) -> bool:
+    # Cloudinary transforms on delivery; probing it would be a HEAD per variant.
+    if is_cloudinary_storage(file_field.storage):
+        return False
+    return bool(local_variants(file_field))
@@ -0,0 +1,110 @@
+"""
+Memoized delivery URLs for uploaded media.
+
+FieldFile.url on the Cloudinary storages builds (and signs) the delivery URL
+through cloudinary.utils on every call, so a design list with many images
+repeats thousands of identical string-building calls per request. The URL for
+a given storage, stored name and transformation never changes, so serializers
+resolve URLs through a bounded LRU keyed on exactly that triple.
+"""
+from __future__ import annotations
+
+import functools
+import logging
+from typing import Any, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MEDIA_URL_CACHE_SIZE = int(getattr(settings, 'MEDIA_URL_CACHE_SIZE', 4096))
+
+# Storage instances by cache key so the memoized resolver can stay hashable.
+_storages: dict[tuple, Any] = {}
+
+
+def _storage_key(storage) -> tuple:
+    cls = type(storage)
+    # FileSystemStorage URLs depend on MEDIA_URL; Cloudinary storages have no base_url.
+    return (f'{cls.__module__}.{cls.__qualname__}', getattr(storage, 'base_url', None))
+
+
+def is_cloudinary_storage(storage) -> bool:
+    try:
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+    except Exception:
+        return False
+    return isinstance(storage, MediaCloudinaryStorage)
+
+
+def _transformed_url(storage, name: str, transformation: dict[str, Any]) -> str:
+    if not is_cloudinary_storage(storage):
+        # Local storage cannot transform on the fly; serve the original.
+        return storage.url(name)
+    import cloudinary
+
+    resource = cloudinary.CloudinaryResource(
+        storage._prepend_prefix(name),
+        default_resource_type=storage._get_resource_type(name),
+    )
+    return resource.build_url(**transformation)
+
+
+@functools.lru_cache(maxsize=MEDIA_URL_CACHE_SIZE)
+def _cached_url(storage_key: tuple, name: str, transformation: tuple) -> str:
+    storage = _storages[storage_key]
+    if transformation:
+        return _transformed_url(storage, name, dict(transformation))
+    return storage.url(name)
+
+
+def storage_url(storage, name: str, transformation: Optional[dict[str, Any]] = None) -> str:
+    """Memoized storage.url(name), optionally with a Cloudinary transformation."""
+    key = _storage_key(storage)
+    _storages[key] = storage
+    frozen = tuple(sorted((transformation or {}).items()))
+    return _cached_url(key, name, frozen)
+
+
+def media_url(file_field, transformation: Optional[dict[str, Any]] = None) -> Optional[str]:
+    """
+    Delivery URL for a FieldFile, memoized per (storage class, name, transformation).
+    Returns None for empty fields.
+    """
+    if not file_field:
+        return None
+    name = getattr(file_field, 'name', None)
+    storage = getattr(file_field, 'storage', None)
+    if not name or storage is None:
+        return file_field.url
+    return storage_url(storage, name, transformation)
+
+
+def absolute_url(request, url: Optional[str]) -> Optional[str]:
+    """Make a storage URL absolute; Cloudinary URLs are already absolute."""
+    if not url:
+        return url
+    if url.startswith(('http://', 'https://')):
+        return url
+    if url.startswith('//'):
+        return f'https:{url}'
+    if request:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def media_url_cache_info() -> dict[str, Any]:
+    info = _cached_url.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'size': info.currsize,
+        'max_size': info.maxsize,
+        'hit_ratio': round(info.hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def clear_media_url_cache() -> None:
+    _cached_url.cache_clear()
+    _storages.clear()
@@ -0,0 +1,42 @@
+"""
+An orjson-backed drop-in for DRF's JSONRenderer.
+
+ORJSONRenderer writes the same bytes as rest_framework.renderers.JSONRenderer
+in its default compact, UTF-8 mode: datetimes and decimals still go through
+DRF's JSONEncoder, and U+2028/U+2029 are escaped the same way. Indented
+output (``Accept: application/json; indent=4``), ASCII-only output, and
+anything orjson refuses (integers wider than 64 bits, lone surrogates) are
+handed to the stdlib renderer, as is everything when orjson is not installed.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json only
+    orjson = None
+
+_encode_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_encode_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these so the output stays a JavaScript subset.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
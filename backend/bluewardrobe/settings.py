@@ -1,5 +1,4 @@
 import os
-import importlib.util
 from pathlib import Path
 from dotenv import load_dotenv
 try:
@@ -12,7 +11,6 @@ except ImportError:
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
-HAS_WHITENOISE = importlib.util.find_spec('whitenoise') is not None
 
 CLOUDINARY_STORAGE = {
     'CLOUD_NAME': os.getenv('CLOUDINARY_CLOUD_NAME', ''),
@@ -36,11 +34,6 @@ USE_CLOUDINARY = all([
     CLOUDINARY_STORAGE['API_SECRET']
 ])
 
-# Debug: Log Cloudinary configuration status
-print(f"DEBUG: Cloudinary config - CLOUD_NAME: {'SET' if CLOUDINARY_STORAGE['CLOUD_NAME'] else 'MISSING'}")
-print(f"DEBUG: Cloudinary config - API_KEY: {'SET' if CLOUDINARY_STORAGE['API_KEY'] else 'MISSING'}")
-print(f"DEBUG: Cloudinary config - API_SECRET: {'SET' if CLOUDINARY_STORAGE['API_SECRET'] else 'MISSING'}")
-print(f"DEBUG: USE_CLOUDINARY = {USE_CLOUDINARY}")
 
 SENTRY_DSN = os.getenv('SENTRY_DSN', '')
 if sentry_sdk and DjangoIntegration and SENTRY_DSN:
@@ -93,6 +86,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # WhiteNoise plus the Vite /assets/ alias and immutable caching (see bluewardrobe.static_assets)
+    'bluewardrobe.static_assets.FrontendAssetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -101,8 +96,6 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
-if HAS_WHITENOISE:
-    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')
 
 ROOT_URLCONF = 'bluewardrobe.urls'
 
@@ -156,6 +149,27 @@ else:
         }
     }
 
+# Cache shared by every gunicorn worker, so the share cards and email brand
+# that store.signals drops on save are dropped for all of them, not just the
+# worker that handled the save. REDIS_URL switches to Redis (needs the redis
+# package); otherwise it is a table in the main database, created by
+# `manage.py createcachetable` (start.sh / entrypoint.sh run it after migrate).
+REDIS_URL = os.getenv('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'bluewardrobe_cache',
+        }
+    }
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -184,17 +198,52 @@ if USE_CLOUDINARY:
     # When using Cloudinary, MEDIA_URL is handled by Cloudinary storage backend
     MEDIA_URL = '/media/'  # Keep this for Django admin compatibility
     MEDIA_ROOT = None  # Not used with Cloudinary
-    print(f"DEBUG: Using Cloudinary storage, MEDIA_URL set for compatibility: {MEDIA_URL}")
 else:
     # Fallback to local filesystem
     MEDIA_URL = '/media/'
     MEDIA_ROOT = BASE_DIR / 'media'
-    print(f"DEBUG: Using local media URL: {MEDIA_URL}")
 
 # File upload settings
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 UPLOAD_FILE_MAX_SIZE = 104857600  # 100MB (for Cloudinary)
+# Bounded LRU of resolved media delivery URLs (see bluewardrobe.media_urls)
+MEDIA_URL_CACHE_SIZE = int(os.getenv('MEDIA_URL_CACHE_SIZE', '4096'))
+# Seconds a worker trusts its own copy of which responsive variants an image
+# has before reading the shared cache again (see bluewardrobe.image_variants)
+IMAGE_VARIANTS_LOCAL_TTL = int(os.getenv('IMAGE_VARIANTS_LOCAL_TTL', '5'))
+# Seconds a design/blog share card stays cached; saves rebuild it straight
+# away (see bluewardrobe.share_meta)
+SHARE_META_CACHE_TIMEOUT = int(os.getenv('SHARE_META_CACHE_TIMEOUT', '3600'))
+# Seconds a worker serves a share card from its own memory before checking the
+# shared cache again, i.e. how long another worker's rebuild can take to show
+SHARE_META_LOCAL_TTL = int(os.getenv('SHARE_META_LOCAL_TTL', '5'))
+# Seconds the email brand (logo and site links) stays cached; SiteAsset saves
+# drop it straight away (see store.email_utils)
+EMAIL_BRAND_CACHE_TIMEOUT = int(os.getenv('EMAIL_BRAND_CACHE_TIMEOUT', '3600'))
+# Rendered, compressed SPA shell pages kept in memory (see bluewardrobe.spa_shell)
+SPA_SHELL_CACHE_SIZE = int(os.getenv('SPA_SHELL_CACHE_SIZE', '1024'))
+# Carts untouched for this many days are removed by `manage.py gc_carts`
+CART_IDLE_DAYS = int(os.getenv('CART_IDLE_DAYS', '30'))
+# Seconds a signed checkout quote can be used to start a payment (see store.checkout_quote)
+CHECKOUT_QUOTE_TTL = int(os.getenv('CHECKOUT_QUOTE_TTL', '900'))
+# Rows per page of the owner dashboard's admin lists (see store.admin_api)
+ADMIN_API_PAGE_SIZE = int(os.getenv('ADMIN_API_PAGE_SIZE', '50'))
+ADMIN_API_MAX_PAGE_SIZE = int(os.getenv('ADMIN_API_MAX_PAGE_SIZE', '200'))
+# Rows fetched per round trip by the streaming admin exports (see store.exports)
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+# Seconds a signed export download link stays valid (see store.exports)
+EXPORT_LINK_TTL = int(os.getenv('EXPORT_LINK_TTL', '60'))
+# Hand new admin video uploads to `manage.py process_media_jobs` instead of
+# uploading inside the request (see store.media_jobs). Needs the worker running.
+BACKGROUND_MEDIA_UPLOADS = os.getenv('BACKGROUND_MEDIA_UPLOADS', 'False') == 'True'
+MEDIA_JOB_SPOOL_DIR = os.getenv('MEDIA_JOB_SPOOL_DIR', str(BASE_DIR / 'media_spool'))
+MEDIA_JOB_MAX_ATTEMPTS = int(os.getenv('MEDIA_JOB_MAX_ATTEMPTS', '5'))
+# Chunks sent at once by the parallel Cloudinary uploader (bluewardrobe.chunked_upload)
+CLOUDINARY_UPLOAD_CONCURRENCY = int(os.getenv('CLOUDINARY_UPLOAD_CONCURRENCY', '4'))
+# Answer the public design, collection and blog lists from plain-dict row
+# serializers rendered with orjson instead of DRF serializers (see store.fast_lists)
+FAST_READ_LISTS = os.getenv('FAST_READ_LISTS', 'False') == 'True'
 
 # Cloudinary storage (optional)
 if USE_CLOUDINARY:
@@ -210,18 +259,13 @@ if USE_CLOUDINARY:
             'BACKEND': 'bluewardrobe.storage.LargeVideoCloudinaryStorage',
         },
         'staticfiles': {
-            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage' if HAS_WHITENOISE else 'django.contrib.staticfiles.storage.StaticFilesStorage',
+            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
         },
     }
     
     # Override media URL settings for Cloudinary
     MEDIA_URL = '/media/'
     MEDIA_ROOT = None
-    
-    # Debug: Log storage configuration
-    print(f"DEBUG: Using Cloudinary storage - default backend: {STORAGES['default']['BACKEND']}")
-    print(f"DEBUG: Using Cloudinary storage - video_storage backend: {STORAGES['video_storage']['BACKEND']}")
-    print(f"DEBUG: Cloudinary is active - MEDIA_ROOT set to None")
 else:
     # Use STORAGES setting for local filesystem
     STORAGES = {
@@ -232,13 +276,9 @@ else:
             'BACKEND': 'django.core.files.storage.FileSystemStorage',
         },
         'staticfiles': {
-            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage' if HAS_WHITENOISE else 'django.contrib.staticfiles.storage.StaticFilesStorage',
+            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
         },
     }
-    
-    # Debug: Log storage configuration
-    print(f"DEBUG: Using FileSystem storage - default backend: {STORAGES['default']['BACKEND']}")
-    print(f"DEBUG: Using FileSystem storage - video_storage backend: {STORAGES['video_storage']['BACKEND']}")
 
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -285,11 +325,26 @@ RESEND_FROM_EMAIL = os.getenv(
     'THE BLUE WARDROBE <orders@thebluewardrobe.ng>',
 )
 RESEND_REPLY_TO = os.getenv('RESEND_REPLY_TO', '')
+# Newsletter campaigns (see store.newsletter): emails per batch request (max 100),
+# batch requests in flight, and Resend's account-wide request rate
+RESEND_API_URL = os.getenv('RESEND_API_URL', 'https://api.resend.com')
+NEWSLETTER_BATCH_SIZE = int(os.getenv('NEWSLETTER_BATCH_SIZE', '100'))
+NEWSLETTER_CONCURRENCY = int(os.getenv('NEWSLETTER_CONCURRENCY', '2'))
+NEWSLETTER_REQUESTS_PER_SECOND = float(os.getenv('NEWSLETTER_REQUESTS_PER_SECOND', '2'))
+# Exchange rates (see store.fx): provider class used by `manage.py refresh_fx_rates`,
+# its feed URL, the JSON file read by store.fx.FileFxProvider, and seconds each
+# worker keeps its in-memory rate table before re-reading StoreCurrencySettings
+FX_PROVIDER = os.getenv('FX_PROVIDER', 'store.fx.ExchangeRateApiProvider')
+FX_PROVIDER_URL = os.getenv('FX_PROVIDER_URL', 'https://open.er-api.com/v6/latest/USD')
+FX_RATES_FILE = os.getenv('FX_RATES_FILE', '')
+FX_RATES_TTL = int(os.getenv('FX_RATES_TTL', '60'))
 # Optional absolute URL for logo in emails; otherwise logo_primary from Site Assets or /favicon.ico
 EMAIL_LOGO_URL = os.getenv('EMAIL_LOGO_URL', '')
 SITE_NAME = os.getenv('SITE_NAME', 'THE BLUE WARDROBE')
 PAYSTACK_SECRET = os.getenv('PAYSTACK_SECRET', '')
 FLUTTERWAVE_SECRET_KEY = os.getenv('FLUTTERWAVE_SECRET_KEY', '')
+# "Secret hash" from Flutterwave's webhook settings; signs /api/flutterwave/webhook/ calls
+FLUTTERWAVE_WEBHOOK_HASH = os.getenv('FLUTTERWAVE_WEBHOOK_HASH', '')
 # Public site URL for payment redirects (no trailing slash); e.g. https://www.thebluewardrobe.com
 PUBLIC_SITE_URL = os.getenv('PUBLIC_SITE_URL', 'http://localhost:5173')
 OWNER_EMAIL = os.getenv('OWNER_EMAIL', '')
@@ -297,6 +352,12 @@ OWNER_EMAIL = os.getenv('OWNER_EMAIL', '')
 OWNER_EMAILS = os.getenv('OWNER_EMAILS', '')
 OWNER_NOTIFICATION_WEBHOOK = os.getenv('OWNER_NOTIFICATION_WEBHOOK', '')
 
+# Diagnostic logging switch. Everything under the "bluewardrobe.*" logger
+# hierarchy (storage, serializers, cart, admin) emits its chatty detail at
+# DEBUG level; that detail stays off in production unless explicitly enabled.
+LOG_LEVEL = os.getenv('DJANGO_LOG_LEVEL', 'INFO')
+BLUEWARDROBE_DEBUG_LOGS = os.getenv('BLUEWARDROBE_DEBUG_LOGS', 'True' if DEBUG else 'False') == 'True'
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -307,12 +368,12 @@ LOGGING = {
     },
     'root': {
         'handlers': ['console'],
-        'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+        'level': LOG_LEVEL,
     },
     'loggers': {
         'django': {
             'handlers': ['console'],
-            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+            'level': LOG_LEVEL,
             'propagate': False,
         },
         'django.request': {
@@ -322,7 +383,7 @@ LOGGING = {
         },
         'bluewardrobe': {
             'handlers': ['console'],
-            'level': os.getenv('DJANGO_LOG_LEVEL', 'INFO'),
+            'level': 'DEBUG' if BLUEWARDROBE_DEBUG_LOGS else LOG_LEVEL,
             'propagate': False,
         },
     },
@@ -1,21 +1,46 @@
 """
-Inject Open Graph / Twitter meta tags into the React SPA shell so social apps
+Open Graph / Twitter meta tags for the React SPA shell so social apps
 (WhatsApp, Facebook, X, etc.) can render rich link previews for product pages.
 Crawlers do not execute JavaScript, so tags must be present in the HTML response.
+
+Each design / blog post has a share card cached without host-specific parts
+(the page path and media URL are made absolute per request). The model
+signals in store.signals rebuild the card once a save or delete commits, so
+viral links are served from the cache rather than the database. The cards
+live in the default cache, which settings.CACHES shares between workers, so
+a rebuild reaches every worker. Each worker also keeps the cards it has read
+in memory and trusts them for SHARE_META_LOCAL_TTL seconds, so a hot link
+costs no query at all (not even the cache's, when the cache is the database
+table) and another worker's rebuild shows within those seconds.
+bluewardrobe.spa_shell renders the tags into the precompiled shell, or into a
+minimal document for link-preview crawlers.
 """
 from __future__ import annotations
 
 import html
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
 
 from django.conf import settings
+from django.core.cache import cache
+
+from bluewardrobe.media_urls import media_url
 
 logger = logging.getLogger(__name__)
 
 DESIGN_PATH_RE = re.compile(r'^/designs/(?P<id>\d+)/?$')
 BLOG_PATH_RE = re.compile(r'^/blog/(?P<slug>[-\w]+)/?$')
+SITE_NAME = 'THE BLUE WARDROBE'
+# Cached "no such design/post" marker, so unknown ids do not query on every hit.
+_NOT_FOUND = {}
+# This worker's copies of cards: {(kind, key): (payload, read at)}, least recently used first.
+_LOCAL_CARDS = 1024
+_local: OrderedDict = OrderedDict()
+_local_lock = threading.Lock()
 
 
 def _absolute_url(request, path_or_url: str) -> str:
@@ -45,161 +70,201 @@ def _clean_text(value: Optional[str], fallback: str, limit: int = 280) -> str:
     return text
 
 
-def _media_url(request, file_field) -> Optional[str]:
+def _media_url(file_field) -> Optional[str]:
     if not file_field:
         return None
     try:
-        url = file_field.url
+        return media_url(file_field) or None
     except Exception:
         return None
-    if not url:
+
+
+def _design_share_payload(design_id: str) -> Optional[dict]:
+    from django.db.models import OuterRef, Subquery
+
+    from store.models import Design, DesignImage
+
+    first_image = (
+        DesignImage.objects.filter(design=OuterRef('pk'))
+        .order_by('order', 'created_at')
+        .values('image')[:1]
+    )
+    design = (
+        Design.objects.filter(pk=design_id)
+        .annotate(first_image=Subquery(first_image))
+        .values('id', 'title', 'description', 'first_image')
+        .first()
+    )
+    if not design:
         return None
-    return _absolute_url(request, url)
 
+    image = None
+    if design['first_image']:
+        image = _media_url(DesignImage(image=design['first_image']).image)
 
-def _design_share_payload(request, design_id: str) -> Optional[dict]:
-    try:
-        from store.models import Design
-
-        design = (
-            Design.objects.prefetch_related('images')
-            .filter(pk=design_id)
-            .first()
-        )
-        if not design:
+    title = f"{design['title']} — {SITE_NAME}"
+    description = _clean_text(
+        design['description'],
+        f"Discover {design['title']} from {SITE_NAME} — luxury fashion crafted from rare fabrics.",
+    )
+    return {
+        'title': title,
+        'description': description,
+        'path': f"/designs/{design['id']}",
+        'image': image,
+        'type': 'product',
+    }
+
+
+def _blog_share_payload(slug: str) -> Optional[dict]:
+    from store.models import BlogPost
+
+    post = (
+        BlogPost.objects.filter(slug=slug, is_published=True)
+        .only('slug', 'title', 'excerpt', 'content', 'cover_image')
+        .first()
+    )
+    if not post:
+        return None
+
+    title = f'{post.title} — {SITE_NAME}'
+    description = _clean_text(
+        post.excerpt or post.content,
+        f'Read {post.title} on {SITE_NAME} Journal.',
+    )
+    return {
+        'title': title,
+        'description': description,
+        'path': f'/blog/{post.slug}',
+        'image': _media_url(post.cover_image),
+        'type': 'article',
+    }
+
+
+_BUILDERS = {
+    'design': _design_share_payload,
+    'blog': _blog_share_payload,
+}
+
+
+def _cache_key(kind: str, key) -> str:
+    return f'share-meta:{kind}:{key}'
+
+
+def _remember(kind: str, key, payload: Optional[dict]) -> None:
+    with _local_lock:
+        if payload is None:
+            _local.pop((kind, key), None)
+            return
+        _local[(kind, key)] = (payload, time.monotonic())
+        _local.move_to_end((kind, key))
+        while len(_local) > _LOCAL_CARDS:
+            _local.popitem(last=False)
+
+
+def _recall(kind: str, key) -> Optional[dict]:
+    with _local_lock:
+        entry = _local.get((kind, key))
+        if entry is None or time.monotonic() - entry[1] >= settings.SHARE_META_LOCAL_TTL:
             return None
+        _local.move_to_end((kind, key))
+        return entry[0]
 
-        image = None
-        first_image = design.images.order_by('order', 'created_at').first()
-        if first_image:
-            image = _media_url(request, first_image.image)
-
-        path = f'/designs/{design.id}'
-        title = f'{design.title} — THE BLUE WARDROBE'
-        description = _clean_text(
-            design.description,
-            f'Discover {design.title} from THE BLUE WARDROBE — luxury fashion crafted from rare fabrics.',
-        )
-        return {
-            'title': title,
-            'description': description,
-            'url': _canonical_page_url(request, path),
-            'image': image,
-            'type': 'product',
-        }
-    except Exception:
-        logger.exception('Failed to build share meta for design %s', design_id)
-        return None
 
+def clear_local_cards() -> None:
+    with _local_lock:
+        _local.clear()
 
-def _blog_share_payload(request, slug: str) -> Optional[dict]:
-    try:
-        from store.models import BlogPost
 
-        post = BlogPost.objects.filter(slug=slug, is_published=True).first()
-        if not post:
+def _store(kind: str, key, payload: Optional[dict]) -> None:
+    timeout = getattr(settings, 'SHARE_META_CACHE_TIMEOUT', 3600)
+    value = _NOT_FOUND if payload is None else payload
+    cache.set(_cache_key(kind, key), value, timeout)
+    _remember(kind, key, value)
+
+
+def _cached_payload(kind: str, key: str) -> Optional[dict]:
+    payload = _recall(kind, key)
+    if payload is not None:
+        return payload or None
+    payload = cache.get(_cache_key(kind, key))
+    if payload is not None:
+        _remember(kind, key, payload)
+    else:
+        try:
+            payload = _BUILDERS[kind](key)
+        except Exception:
+            # Not cached: a database hiccup must not pin a page to "no preview".
+            logger.exception('Failed to build share meta for %s %s', kind, key)
             return None
+        _store(kind, key, payload)
+    return payload or None
+
 
-        path = f'/blog/{post.slug}'
-        title = f'{post.title} — THE BLUE WARDROBE'
-        description = _clean_text(
-            getattr(post, 'excerpt', None) or getattr(post, 'content', None),
-            f'Read {post.title} on THE BLUE WARDROBE Journal.',
-        )
-        image = _media_url(request, getattr(post, 'cover_image', None))
-        return {
-            'title': title,
-            'description': description,
-            'url': _canonical_page_url(request, path),
-            'image': image,
-            'type': 'article',
-        }
+def refresh(kind: str, key: str) -> None:
+    try:
+        _store(kind, key, _BUILDERS[kind](key))
     except Exception:
-        logger.exception('Failed to build share meta for blog slug %s', slug)
-        return None
+        logger.exception('Failed to refresh share meta for %s %s', kind, key)
+        cache.delete(_cache_key(kind, key))
+        _remember(kind, key, None)
+
+
+def refresh_design(design_id) -> None:
+    """Rebuild the cached card for a design; called after it or its images change."""
+    refresh('design', str(design_id))
+
+
+def refresh_blog_post(slug: str) -> None:
+    if slug:
+        refresh('blog', slug)
 
 
 def resolve_share_payload(request) -> Optional[dict]:
     path = request.path or '/'
     design_match = DESIGN_PATH_RE.match(path)
     if design_match:
-        return _design_share_payload(request, design_match.group('id'))
+        # Normalise "007" and "7" onto one cache entry.
+        return _cached_payload('design', str(int(design_match.group('id'))))
 
     blog_match = BLOG_PATH_RE.match(path)
     if blog_match:
-        return _blog_share_payload(request, blog_match.group('slug'))
+        return _cached_payload('blog', blog_match.group('slug'))
 
     return None
 
 
-def _replace_or_append_meta(html_doc: str, attr: str, key: str, content: str) -> str:
-    safe = html.escape(content, quote=True)
-    pattern = re.compile(
-        rf'<meta[^>]+{attr}=["\']{re.escape(key)}["\'][^>]*>',
-        re.IGNORECASE,
-    )
-    tag = f'<meta {attr}="{key}" content="{safe}" />'
-    if pattern.search(html_doc):
-        return pattern.sub(tag, html_doc, count=1)
-    return re.sub(r'</head>', f'  {tag}\n</head>', html_doc, count=1, flags=re.IGNORECASE)
-
-
-def _replace_title(html_doc: str, title: str) -> str:
-    safe = html.escape(title)
-    if re.search(r'<title>.*?</title>', html_doc, flags=re.IGNORECASE | re.DOTALL):
-        return re.sub(
-            r'<title>.*?</title>',
-            f'<title>{safe}</title>',
-            html_doc,
-            count=1,
-            flags=re.IGNORECASE | re.DOTALL,
-        )
-    return re.sub(r'</head>', f'  <title>{safe}</title>\n</head>', html_doc, count=1, flags=re.IGNORECASE)
-
-
-def inject_share_meta(html_doc: str, request) -> str:
-    """Return HTML with product/article Open Graph tags when the path matches."""
-    payload = resolve_share_payload(request)
-    if not payload:
-        return html_doc
-
+def share_meta_tags(payload: dict, request) -> dict[str, str]:
+    """
+    The head tags for ``payload`` keyed like bluewardrobe.spa_shell.tag_key,
+    e.g. "name:description", "property:og:title", "title", "canonical".
+    """
     title = payload['title']
     description = payload['description']
-    url = payload['url']
-    image = payload.get('image')
+    url = _canonical_page_url(request, payload['path'])
+    image = _absolute_url(request, payload.get('image') or '')
     og_type = payload.get('type') or 'website'
 
-    html_doc = _replace_title(html_doc, title)
-    html_doc = _replace_or_append_meta(html_doc, 'name', 'description', description)
-    html_doc = _replace_or_append_meta(html_doc, 'property', 'og:title', title)
-    html_doc = _replace_or_append_meta(html_doc, 'property', 'og:description', description)
-    html_doc = _replace_or_append_meta(html_doc, 'property', 'og:url', url)
-    html_doc = _replace_or_append_meta(html_doc, 'property', 'og:type', og_type)
-    html_doc = _replace_or_append_meta(html_doc, 'property', 'og:site_name', 'THE BLUE WARDROBE')
-    html_doc = _replace_or_append_meta(
-        html_doc,
-        'name',
-        'twitter:card',
-        'summary_large_image' if image else 'summary',
-    )
-    html_doc = _replace_or_append_meta(html_doc, 'name', 'twitter:title', title)
-    html_doc = _replace_or_append_meta(html_doc, 'name', 'twitter:description', description)
-
+    metas = [
+        ('name', 'description', description),
+        ('property', 'og:title', title),
+        ('property', 'og:description', description),
+        ('property', 'og:url', url),
+        ('property', 'og:type', og_type),
+        ('property', 'og:site_name', SITE_NAME),
+        ('name', 'twitter:card', 'summary_large_image' if image else 'summary'),
+        ('name', 'twitter:title', title),
+        ('name', 'twitter:description', description),
+    ]
     if image:
-        html_doc = _replace_or_append_meta(html_doc, 'property', 'og:image', image)
-        html_doc = _replace_or_append_meta(html_doc, 'property', 'og:image:secure_url', image)
-        html_doc = _replace_or_append_meta(html_doc, 'name', 'twitter:image', image)
-
-    canonical = f'<link rel="canonical" href="{html.escape(url, quote=True)}" />'
-    if re.search(r'<link[^>]+rel=["\']canonical["\']', html_doc, re.IGNORECASE):
-        html_doc = re.sub(
-            r'<link[^>]+rel=["\']canonical["\'][^>]*>',
-            canonical,
-            html_doc,
-            count=1,
-            flags=re.IGNORECASE,
-        )
-    else:
-        html_doc = re.sub(r'</head>', f'  {canonical}\n</head>', html_doc, count=1, flags=re.IGNORECASE)
-
-    return html_doc
+        metas += [
+            ('property', 'og:image', image),
+            ('property', 'og:image:secure_url', image),
+            ('name', 'twitter:image', image),
+        ]
+
+    tags = {'title': f'<title>{html.escape(title)}</title>'}
+    for attr, key, content in metas:
+        tags[f'{attr}:{key}'] = f'<meta {attr}="{key}" content="{html.escape(content, quote=True)}" />'
+    tags['canonical'] = f'<link rel="canonical" href="{html.escape(url, quote=True)}" />'
+    return tags
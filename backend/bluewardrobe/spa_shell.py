@@ -0,0 +1,230 @@
+"""
+The React SPA shell (index.html), compiled once and served from memory.
+
+The shell is read when its file changes (keyed on mtime and size) and split
+at ``</head>``: the head loses the tags share meta may override (title,
+description, og:*, twitter:*, canonical) and keeps them aside as defaults, so
+rendering a page is one string join instead of a dozen regex passes. Each
+rendered document is compressed (gzip, plus brotli when the optional
+``brotli`` package is installed) and kept in a bounded LRU with a strong ETag
+per encoding, so repeat navigations and crawler hits are a dict lookup or a
+304.
+
+Link-preview crawlers (WhatsApp, Facebook, X, Slack...) asking for a design
+or blog page get a minimal document holding just the share tags instead of
+the full shell.
+"""
+from __future__ import annotations
+
+import functools
+import gzip
+import hashlib
+import logging
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+
+from bluewardrobe.share_meta import resolve_share_payload, share_meta_tags
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+SPA_SHELL_CACHE_SIZE = int(getattr(settings, 'SPA_SHELL_CACHE_SIZE', 1024))
+
+_HEAD_END_RE = re.compile(r'</head>', re.IGNORECASE)
+_MANAGED_TAG_RE = re.compile(
+    r'[ \t]*(?:'
+    r'<meta[^>]+(?P<attr>name|property)=["\'](?P<key>description|og:[^"\']+|twitter:[^"\']+)["\'][^>]*>'
+    r'|(?P<title><title>.*?</title>)'
+    r'|(?P<canonical><link[^>]+rel=["\']canonical["\'][^>]*>)'
+    r')[ \t]*\r?\n?',
+    re.IGNORECASE | re.DOTALL,
+)
+# Link-preview bots only read <head>; they never run the SPA.
+CRAWLER_USER_AGENT_RE = re.compile(
+    r'facebookexternalhit|facebookcatalog|meta-externalagent|whatsapp|twitterbot|slackbot'
+    r'|linkedinbot|telegrambot|discordbot|pinterest|redditbot|skypeuripreview|embedly'
+    r'|vkshare|iframely|applebot|google-inspectiontool|bingpreview|snapchat',
+    re.IGNORECASE,
+)
+
+
+def is_link_preview_crawler(request) -> bool:
+    return bool(CRAWLER_USER_AGENT_RE.search(request.META.get('HTTP_USER_AGENT', '')))
+
+
+def tag_key(match: re.Match) -> str:
+    if match.group('attr'):
+        return f"{match.group('attr').lower()}:{match.group('key')}"
+    return 'title' if match.group('title') else 'canonical'
+
+
+# eq=False: templates hash by identity, so they can key the page LRU.
+@dataclass(frozen=True, eq=False)
+class ShellTemplate:
+    document: str
+    # Head without the managed tags, the tags themselves, then "</head>..." onward.
+    head: Optional[str]
+    defaults: dict[str, str]
+    tail: str
+    indent: str = '  '
+
+    @classmethod
+    def compile(cls, document: str) -> 'ShellTemplate':
+        head_end = _HEAD_END_RE.search(document)
+        if not head_end:
+            return cls(document, None, {}, '')
+        head = document[: head_end.start()]
+        defaults = {}
+        for match in _MANAGED_TAG_RE.finditer(head):
+            defaults.setdefault(tag_key(match), match.group(0).strip())
+        stripped = _MANAGED_TAG_RE.sub('', head)
+        # Keep the indentation "</head>" had so injected tags line up with their neighbours.
+        closing_indent = stripped[len(stripped.rstrip(' \t')):]
+        stripped = stripped.rstrip(' \t')
+        tail = closing_indent + document[head_end.start():]
+        return cls(document, stripped, defaults, tail, f'{closing_indent}  ')
+
+    def render(self, tags: Optional[dict[str, str]] = None) -> str:
+        """The document with ``tags`` replacing (or adding to) the default head tags."""
+        if not tags or self.head is None:
+            return self.document
+        merged = {**self.defaults, **tags}
+        block = ''.join(f'{self.indent}{tag}\n' for tag in merged.values())
+        return f'{self.head}{block}{self.tail}'
+
+
+@dataclass(frozen=True)
+class EncodedPage:
+    bodies: dict[str, bytes]
+    etags: dict[str, str]
+
+
+_templates: dict[tuple, ShellTemplate] = {}
+
+
+def _index_candidates() -> list[Path]:
+    return [
+        Path(settings.FRONTEND_BUILD_DIR) / 'index.html',
+        Path(settings.BASE_DIR) / 'templates' / 'index.html',
+    ]
+
+
+def load_shell() -> Optional[ShellTemplate]:
+    """The compiled shell, recompiled only when index.html changes on disk."""
+    for index_file in _index_candidates():
+        try:
+            stat = index_file.stat()
+        except FileNotFoundError:
+            continue
+        except OSError:
+            logger.exception('Failed to stat frontend index %s', index_file)
+            continue
+        key = (str(index_file), stat.st_mtime_ns, stat.st_size)
+        template = _templates.get(key)
+        if template is None:
+            try:
+                template = ShellTemplate.compile(index_file.read_text(encoding='utf-8'))
+            except Exception:
+                logger.exception('Failed to load frontend index from %s', index_file)
+                continue
+            # Only the current build of each file is worth keeping.
+            for stale in [k for k in _templates if k[0] == key[0]]:
+                del _templates[stale]
+            _templates[key] = template
+        return template
+    return None
+
+
+def _encode(document: str) -> EncodedPage:
+    raw = document.encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()[:20]
+    bodies = {'identity': raw, 'gzip': gzip.compress(raw, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(raw, quality=11)
+    etags = {
+        encoding: f'"{digest}"' if encoding == 'identity' else f'"{digest}-{encoding}"'
+        for encoding in bodies
+    }
+    return EncodedPage(bodies, etags)
+
+
+@functools.lru_cache(maxsize=SPA_SHELL_CACHE_SIZE)
+def _encoded_page(template: ShellTemplate, tags: tuple) -> EncodedPage:
+    return _encode(template.render(dict(tags)))
+
+
+@functools.lru_cache(maxsize=SPA_SHELL_CACHE_SIZE)
+def _encoded_card(tags: tuple) -> EncodedPage:
+    head = ''.join(f'    {tag}\n' for _, tag in tags)
+    return _encode(
+        '<!doctype html>\n<html lang="en">\n  <head>\n    <meta charset="utf-8" />\n'
+        f'{head}  </head>\n  <body></body>\n</html>\n'
+    )
+
+
+def _preferred_encoding(accept_encoding: str, available) -> str:
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+    for encoding in ('br', 'gzip'):
+        if encoding in available and accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return 'identity'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def shell_response(request) -> Optional[HttpResponse]:
+    """The shell for ``request.path`` with its share tags, or None if there is no build."""
+    payload = resolve_share_payload(request)
+    tags = tuple(share_meta_tags(payload, request).items()) if payload else ()
+    if tags and is_link_preview_crawler(request):
+        page = _encoded_card(tags)
+    else:
+        template = load_shell()
+        if template is None:
+            return None
+        page = _encoded_page(template, tags)
+
+    encoding = _preferred_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), page.bodies)
+    etag = page.etags[encoding]
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(page.bodies[encoding], content_type='text/html; charset=utf-8')
+        if encoding != 'identity':
+            response['Content-Encoding'] = encoding
+        response['Content-Length'] = str(len(page.bodies[encoding]))
+    response['ETag'] = etag
+    # Share pages answer crawlers with the card instead of the shell.
+    response['Vary'] = 'Accept-Encoding, User-Agent' if tags else 'Accept-Encoding'
+    # Always revalidate: a new build or an edited design must show up at once.
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def clear_shell_cache() -> None:
+    _encoded_page.cache_clear()
+    _encoded_card.cache_clear()
+    _templates.clear()
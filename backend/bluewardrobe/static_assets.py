@@ -0,0 +1,83 @@
+"""
+Static and frontend asset serving.
+
+``collectstatic`` (CompressedManifestStaticFilesStorage, with brotli once the
+``Brotli`` package is installed) writes every file of the Vite build in
+FRONTEND_BUILD_DIR to STATIC_ROOT with a Django-hashed copy plus ``.gz`` and
+``.br`` siblings. FrontendAssetMiddleware is WhiteNoise with two additions:
+
+* ``/assets/*`` (links from shells built before Vite's base became /static/)
+  is answered straight from STATIC_ROOT/assets instead of being redirected.
+* Vite's own ``assets/`` output is content-hashed, so it is cached as
+  immutable like Django's hashed names.
+
+The favicon is tiny and requested on every page view, so it is kept in
+memory per file version and revalidated by ETag.
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
+import mimetypes
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from bluewardrobe.spa_shell import etag_matches
+
+LEGACY_ASSET_PREFIX = '/assets/'
+FAVICON_MAX_AGE = 24 * 60 * 60
+
+
+class FrontendAssetMiddleware(WhiteNoiseMiddleware):
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings=settings)
+        if self.static_root:
+            assets_dir = Path(self.static_root) / 'assets'
+            if self.autorefresh or assets_dir.is_dir():
+                self.add_files(assets_dir, prefix=LEGACY_ASSET_PREFIX)
+
+    def immutable_file_test(self, path, url):
+        if url.startswith((LEGACY_ASSET_PREFIX, f'{self.static_prefix}assets/')):
+            return True
+        return super().immutable_file_test(path, url)
+
+
+@dataclass(frozen=True)
+class CachedFile:
+    body: bytes
+    content_type: str
+    etag: str
+
+
+@functools.lru_cache(maxsize=16)
+def _read(path: str, mtime_ns: int, size: int) -> CachedFile:
+    with open(path, 'rb') as handle:
+        body = handle.read()
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    return CachedFile(body, content_type, f'"{hashlib.sha256(body).hexdigest()[:20]}"')
+
+
+def cached_file(path) -> Optional[CachedFile]:
+    """The file's bytes, read once per (mtime, size); None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return _read(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def cached_file_response(request, cached: CachedFile, max_age: int = FAVICON_MAX_AGE) -> HttpResponse:
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), cached.etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(cached.body, content_type=cached.content_type)
+        response['Content-Length'] = str(len(cached.body))
+    response['ETag'] = cached.etag
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return response
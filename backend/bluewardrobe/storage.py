@@ -5,71 +5,161 @@ django-cloudinary-storage builds delivery URLs by prepending PREFIX (default:
 MEDIA_URL, i.e. "media/") to the stored public_id. Uploads must use the same
 prefixed path or the CDN URL will 404 even though the admin save succeeded.
 """
-import io
 import logging
 import os
+import shutil
+import tempfile
 
 import cloudinary
 import cloudinary.uploader
+import requests
 from cloudinary_storage.storage import MediaCloudinaryStorage
-from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import UploadedFile
 from PIL import Image, ImageOps
 
+from .chunked_upload import ChunkManifest, ChunkUploadError, upload_chunked
+
 logger = logging.getLogger(__name__)
 
 CLOUDINARY_CHUNK_SIZE = 6 * 1024 * 1024
+# Passes over the missing chunks before a chunked upload gives up.
+CHUNK_UPLOAD_PASSES = 3
 LARGE_FILE_THRESHOLD = 10 * 1024 * 1024
 MAX_CLOUDINARY_IMAGE_BYTES = 10 * 1024 * 1024
 TARGET_COMPRESSED_IMAGE_BYTES = int(9.5 * 1024 * 1024)
-
-
-def _read_all_bytes(content):
+MIN_JPEG_QUALITY = 40
+MAX_JPEG_QUALITY = 85
+# Quality search stops once the window is this narrow.
+QUALITY_SEARCH_TOLERANCE = 3
+# Typical photo JPEG size at MIN_JPEG_QUALITY and ~70, relative to MAX_JPEG_QUALITY.
+MIN_QUALITY_SIZE_RATIO = 0.4
+MID_QUALITY_SIZE_RATIO = 0.7
+# A fitting encode this close to the target ends the search.
+CLOSE_ENOUGH_RATIO = 0.9
+# Typical q85 photo JPEG density, used to pick a decode size before any encode.
+ESTIMATED_BYTES_PER_PIXEL = 0.35
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+def _spool_to_tempfile(content):
+    """
+    Copy an upload into an anonymous temp file in fixed-size chunks, so retries
+    and fallbacks can rewind it without holding the whole upload in memory.
+    """
+    spool = tempfile.TemporaryFile()
     if hasattr(content, "seek"):
         content.seek(0)
-    data = content.read()
-    return data if isinstance(data, (bytes, bytearray)) else bytes(data)
-
-
-def _to_content_file(data, name):
-    file_obj = ContentFile(data)
-    file_obj.name = name
-    return file_obj
+    if hasattr(content, "chunks"):
+        for chunk in content.chunks(SPOOL_CHUNK_SIZE):
+            spool.write(chunk)
+    else:
+        shutil.copyfileobj(content, spool, SPOOL_CHUNK_SIZE)
+    spool.seek(0)
+    return spool
+
+
+def _encode_jpeg(image, quality):
+    """Encode into a temp file; returns (file rewound to 0, size in bytes)."""
+    out = tempfile.TemporaryFile()
+    image.save(out, format="JPEG", optimize=True, progressive=True, quality=quality)
+    size = out.tell()
+    out.seek(0)
+    return out, size
+
+
+def _downscale(image, scale):
+    """Shrink by ``scale`` (< 1): integer reduce() first, LANCZOS for the remainder."""
+    width, height = image.size
+    target = (max(1, int(width * scale)), max(1, int(height * scale)))
+    factor = int(1 / scale)
+    if factor >= 2:
+        image = image.reduce(factor)
+    if image.size != target:
+        image = image.resize(target, Image.LANCZOS)
+    return image
+
+
+def _compress_image_for_cloudinary(source, target_bytes=TARGET_COMPRESSED_IMAGE_BYTES):
+    """
+    Re-encode an oversized image as a JPEG of at most ``target_bytes``.
 
+    ``source`` is a seekable file. The decode size is estimated from the pixel
+    count (JPEG draft mode decodes straight to a smaller scale). If a first
+    pass at MAX_JPEG_QUALITY is still too large, the quality is searched
+    between the first-pass size and an estimated floor; if even
+    MIN_JPEG_QUALITY cannot fit, the image is scaled down (reduce() for the
+    integer part) by the measured overshoot and searched again. Every probe
+    is written to a temp file, never to RAM.
 
-def _compress_image_for_cloudinary(data):
-    """
-    Compress oversized images so they can pass Cloudinary 10MB account limits.
+    Returns (file, size), or None if the image cannot be decoded.
     """
     try:
-        image = Image.open(io.BytesIO(data))
+        image = Image.open(source)
+        width, height = image.size
+        pixel_budget = target_bytes / ESTIMATED_BYTES_PER_PIXEL
+        if width * height > pixel_budget:
+            scale = (pixel_budget / (width * height)) ** 0.5
+            image.draft("RGB", (int(width * scale), int(height * scale)))
         image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
     except Exception:
-        return data
-
-    if image.mode not in ("RGB", "L"):
-        image = image.convert("RGB")
+        logger.warning("Could not decode image for compression", exc_info=True)
+        return None
 
-    quality_steps = [85, 75, 65, 55, 45, 35]
-    working = image
-    for quality in quality_steps:
-        buf = io.BytesIO()
-        working.save(buf, format="JPEG", optimize=True, progressive=True, quality=quality)
-        compressed = buf.getvalue()
-        if len(compressed) <= TARGET_COMPRESSED_IMAGE_BYTES:
-            return compressed
-
-    # If still too large, reduce dimensions progressively.
     for _ in range(3):
-        w, h = working.size
-        working = working.resize((max(1, int(w * 0.85)), max(1, int(h * 0.85))), Image.LANCZOS)
-        buf = io.BytesIO()
-        working.save(buf, format="JPEG", optimize=True, progressive=True, quality=45)
-        compressed = buf.getvalue()
-        if len(compressed) <= TARGET_COMPRESSED_IMAGE_BYTES:
-            return compressed
+        first, first_size = _encode_jpeg(image, MAX_JPEG_QUALITY)
+        if first_size <= target_bytes:
+            return first, first_size
+        first.close()
+        if first_size * MIN_QUALITY_SIZE_RATIO <= target_bytes:
+            found = _search_quality(image, target_bytes, first_size)
+            if found is not None:
+                return found
+        # Even the lowest acceptable quality will not fit: trade pixels instead,
+        # aiming for a mid-range quality after the resize.
+        image = _downscale(image, (target_bytes / (first_size * MID_QUALITY_SIZE_RATIO)) ** 0.5)
+    return _encode_jpeg(image, MIN_JPEG_QUALITY)
+
+
+def _search_quality(image, target_bytes, ceiling_size):
+    """
+    Highest quality in [MIN_JPEG_QUALITY, MAX_JPEG_QUALITY) whose encode fits,
+    by interpolation search between the measured (or, for the floor,
+    estimated) sizes. Stops early once a fitting encode is within
+    CLOSE_ENOUGH_RATIO of the target. Returns (file, size) or None.
+    """
+    low_q, low_size = MIN_JPEG_QUALITY, ceiling_size * MIN_QUALITY_SIZE_RATIO
+    high_q, high_size = MAX_JPEG_QUALITY, ceiling_size
+    best = None
+    low_verified = False
+    while high_q - low_q > QUALITY_SEARCH_TOLERANCE or not low_verified:
+        fraction = (target_bytes - low_size) / max(1, high_size - low_size)
+        quality = int(low_q + fraction * (high_q - low_q))
+        quality = min(high_q - 1, max(low_q if not low_verified else low_q + 1, quality))
+        candidate, size = _encode_jpeg(image, quality)
+        if size <= target_bytes:
+            if best is not None:
+                best[0].close()
+            best = (candidate, size)
+            low_q, low_size, low_verified = quality, size, True
+            if size >= target_bytes * CLOSE_ENOUGH_RATIO:
+                break
+        else:
+            candidate.close()
+            if quality <= MIN_JPEG_QUALITY:
+                break
+            high_q, high_size = quality, size
+    return best
 
-    return compressed if "compressed" in locals() else data
+
+def _guess_resource_type(name):
+    lower = name.lower()
+    if lower.endswith((".mp4", ".webm", ".mov", ".avi", ".mkv")):
+        return "video"
+    if lower.endswith((".jpg", ".jpeg", ".png", ".gif", ".webp")):
+        return "image"
+    return "auto"
 
 
 class LargeMediaCloudinaryStorage(MediaCloudinaryStorage):
@@ -82,53 +172,32 @@ class LargeMediaCloudinaryStorage(MediaCloudinaryStorage):
         name = self._prepend_prefix(self._normalise_name(name))
         logger.debug("LargeMediaCloudinaryStorage._save name=%s", name)
 
-        lower = name.lower()
-        if lower.endswith((".mp4", ".webm", ".mov", ".avi", ".mkv")):
-            resource_type = "video"
-        elif lower.endswith((".jpg", ".jpeg", ".png", ".gif", ".webp")):
-            resource_type = "image"
-        else:
-            resource_type = "auto"
-
+        resource_type = _guess_resource_type(name)
         size = getattr(content, "size", None)
+        spool = None
 
         try:
             upload_content = content
 
             # Images: Cloudinary account enforces 10MB hard limit for this account.
-            # Read into memory so retries do not depend on a possibly closed stream.
+            # Spool to disk so retries do not depend on a possibly closed stream.
             if resource_type == "image":
-                data = _read_all_bytes(content)
-                if len(data) > MAX_CLOUDINARY_IMAGE_BYTES:
-                    data = _compress_image_for_cloudinary(data)
-                upload_content = _to_content_file(data, name)
-                size = len(data)
+                spool = _spool_to_tempfile(content)
+                if spool.seek(0, os.SEEK_END) > MAX_CLOUDINARY_IMAGE_BYTES:
+                    spool.seek(0)
+                    compressed = _compress_image_for_cloudinary(spool)
+                    if compressed is not None:
+                        spool.close()
+                        spool = compressed[0]
+                spool.seek(0)
                 # Same upload semantics as MediaCloudinaryStorage (folder + tags + resource_type).
-                uf = UploadedFile(upload_content, name)
+                uf = UploadedFile(spool, name)
                 response = MediaCloudinaryStorage._upload(self, name, uf)
                 return response["public_id"]
 
             folder = os.path.dirname(name)
             if size is not None and size > LARGE_FILE_THRESHOLD:
-                options = {
-                    "resource_type": resource_type,
-                    "chunk_size": CLOUDINARY_CHUNK_SIZE,
-                    "timeout": 300,
-                    "use_filename": True,
-                    "unique_filename": False,
-                    "overwrite": True,
-                    "tags": self.TAG,
-                }
-                if folder:
-                    options["folder"] = folder
-                if hasattr(upload_content, "seek"):
-                    upload_content.seek(0)
-                result = cloudinary.uploader.upload_large(
-                    upload_content,
-                    public_id=name,
-                    **options,
-                )
-                return result["public_id"]
+                return self._chunked_upload(name, upload_content, resource_type, timeout=300)
 
             options = {
                 "resource_type": resource_type,
@@ -152,10 +221,9 @@ class LargeMediaCloudinaryStorage(MediaCloudinaryStorage):
             logger.exception("Cloudinary upload failed for %s: %s", name, e)
             # Fallback should use a fresh buffer when possible.
             try:
-                if resource_type == "image":
-                    data = _read_all_bytes(content)
-                    fallback_file = _to_content_file(data, name)
-                    return MediaCloudinaryStorage._save(self, name, fallback_file)
+                if spool is not None:
+                    spool.seek(0)
+                    return MediaCloudinaryStorage._save(self, name, spool)
 
                 if hasattr(content, "seek"):
                     content.seek(0)
@@ -163,6 +231,68 @@ class LargeMediaCloudinaryStorage(MediaCloudinaryStorage):
             except (OSError, ValueError) as seek_err:
                 logger.error("Cannot rewind file for fallback upload: %s", seek_err)
                 raise
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def _chunked_upload(self, name, fileobj, resource_type, *, timeout, manifest_path=None, on_progress=None):
+        """
+        Parallel chunked upload of an already prefixed ``name``. A failed pass
+        is retried CHUNK_UPLOAD_PASSES times, resending only the chunks the
+        manifest is missing. Returns the stored public_id.
+        """
+        options = {
+            "resource_type": resource_type,
+            "public_id": name,
+            "timeout": timeout,
+            "use_filename": True,
+            "unique_filename": False,
+            "overwrite": True,
+            "tags": self.TAG,
+        }
+        folder = os.path.dirname(name)
+        if folder:
+            options["folder"] = folder
+
+        total = fileobj.seek(0, os.SEEK_END)
+        manifest = ChunkManifest.load(manifest_path, total, CLOUDINARY_CHUNK_SIZE)
+        resumed = len(manifest.done)
+        for attempt in range(1, CHUNK_UPLOAD_PASSES + 1):
+            try:
+                report = upload_chunked(fileobj, options, manifest=manifest, on_progress=on_progress)
+                break
+            except (ChunkUploadError, requests.RequestException) as exc:
+                if attempt == CHUNK_UPLOAD_PASSES:
+                    raise
+                logger.warning(
+                    "Chunked upload of %s: pass %s failed, retrying %s missing chunk(s): %s",
+                    name, attempt, len(manifest.missing()), exc,
+                )
+        logger.info(
+            "Uploaded %s: %.1fMB sent in %.1fs (%.2f MB/s), %s chunk(s) resumed",
+            name, report.bytes_sent / (1024 * 1024), report.seconds, report.megabytes_per_second, resumed,
+        )
+        return report.public_id
+
+    def upload_resumable(self, name, fileobj, manifest_path=None, on_progress=None):
+        """
+        Chunked upload that can pick up where an earlier attempt (or process)
+        stopped: progress is kept in the JSON manifest at ``manifest_path`` and
+        ``on_progress`` receives the ChunkManifest after every chunk. Returns
+        the stored public_id.
+        """
+        name = self._prepend_prefix(self._normalise_name(name))
+        return self._chunked_upload(
+            name,
+            fileobj,
+            self._upload_resource_type(name),
+            timeout=600,
+            manifest_path=manifest_path,
+            on_progress=on_progress,
+        )
+
+    def _upload_resource_type(self, name):
+        return _guess_resource_type(name)
 
     def url(self, name):
         if not name:
@@ -198,54 +328,14 @@ class LargeVideoCloudinaryStorage(LargeMediaCloudinaryStorage):
     def _save(self, name, content):
         name = self._prepend_prefix(self._normalise_name(name))
         logger.debug("LargeVideoCloudinaryStorage._save name=%s", name)
-
-        folder = os.path.dirname(name)
-
-        options = {
-            "resource_type": "video",
-            "chunk_size": CLOUDINARY_CHUNK_SIZE,
-            "timeout": 600,
-            "use_filename": True,
-            "unique_filename": False,
-            "overwrite": True,
-            "tags": self.TAG,
-        }
-        if folder:
-            options["folder"] = folder
-
         try:
-            if hasattr(content, "seek"):
-                content.seek(0)
-        except (OSError, ValueError):
-            pass
-
-        try:
-            result = cloudinary.uploader.upload_large(
-                content,
-                public_id=name,
-                **options,
-            )
-            return result["public_id"]
+            return self._chunked_upload(name, content, "video", timeout=600)
         except Exception as e:
-            logger.exception("Cloudinary video upload_large failed for %s: %s", name, e)
-            try:
-                if hasattr(content, "seek"):
-                    content.seek(0)
-            except (OSError, ValueError) as seek_err:
-                logger.error("Cannot rewind video file after failed chunked upload: %s", seek_err)
-                raise
+            logger.exception("Cloudinary chunked video upload failed for %s: %s", name, e)
+            raise
 
-            fallback_opts = {
-                "resource_type": "video",
-                "use_filename": True,
-                "unique_filename": False,
-                "overwrite": True,
-                "tags": self.TAG,
-            }
-            if folder:
-                fallback_opts["folder"] = folder
-            result = cloudinary.uploader.upload(content, public_id=name, **fallback_opts)
-            return result["public_id"]
+    def _upload_resource_type(self, name):
+        return "video"
 
     def url(self, name):
         if not name:
@@ -17,24 +17,20 @@ def service_unavailable(detail):
 
 
 def frontend_app(request):
-    from bluewardrobe.share_meta import inject_share_meta
+    from bluewardrobe.spa_shell import shell_response
 
-    index_candidates = [
-        settings.FRONTEND_BUILD_DIR / 'index.html',
-        settings.BASE_DIR / 'templates' / 'index.html',
-    ]
-    for index_file in index_candidates:
-        try:
-            if index_file.exists():
-                html_doc = index_file.read_text(encoding='utf-8')
-                html_doc = inject_share_meta(html_doc, request)
-                return HttpResponse(html_doc, content_type='text/html')
-        except Exception as exc:
-            logger.exception('Failed to serve frontend index from %s: %s', index_file, exc)
+    try:
+        response = shell_response(request)
+        if response is not None:
+            return response
+    except Exception as exc:
+        logger.exception('Failed to serve frontend index: %s', exc)
     return HttpResponse('Frontend build is not available.', status=503, content_type='text/plain')
 
 
 def favicon(request):
+    from bluewardrobe.static_assets import cached_file, cached_file_response
+
     favicon_candidates = [
         settings.FRONTEND_BUILD_DIR / 'favicon.ico',
         settings.FRONTEND_BUILD_DIR / 'favicon.svg',
@@ -43,9 +39,9 @@ def favicon(request):
     ]
     for icon_file in favicon_candidates:
         try:
-            if icon_file.exists():
-                content_type = 'image/svg+xml' if icon_file.suffix == '.svg' else 'image/x-icon'
-                return HttpResponse(icon_file.read_bytes(), content_type=content_type)
+            cached = cached_file(icon_file)
+            if cached is not None:
+                return cached_file_response(request, cached)
         except Exception as exc:
             logger.exception('Failed to serve favicon file from %s: %s', icon_file, exc)
 
@@ -76,6 +72,8 @@ def favicon(request):
 
 
 def legacy_asset_redirect(request, asset_path):
+    # FrontendAssetMiddleware answers /assets/* from STATIC_ROOT; this only
+    # catches files collectstatic has not seen (e.g. a fresh dev checkout).
     return HttpResponseRedirect(f"{settings.STATIC_URL}assets/{asset_path}")
 
 
@@ -134,9 +132,13 @@ except Exception as exc:
 # Only serve from local filesystem if not using Cloudinary
 if not getattr(settings, 'USE_CLOUDINARY', False) and settings.MEDIA_ROOT:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    print(f"DEBUG: Serving media files from local filesystem at {settings.MEDIA_ROOT}")
+    logger.debug('Serving media files from local filesystem at %s', settings.MEDIA_ROOT)
 else:
-    print(f"DEBUG: Cloudinary is active, not serving media files from local filesystem")
+    logger.debug(
+        'Cloudinary is active (default=%s, video=%s); not serving media from local filesystem',
+        settings.STORAGES['default']['BACKEND'],
+        settings.STORAGES['video_storage']['BACKEND'],
+    )
 
 # Serve React app for all non-API routes (must be last)
 # This allows React Router to handle client-side routing
@@ -76,6 +76,10 @@ mkdir -p /app/media
 echo "Running migrations..."
 python manage.py migrate --noinput
 
+echo "Creating cache table..."
+# The shared cache's table when REDIS_URL is unset (a no-op otherwise).
+python manage.py createcachetable
+
 echo "Fixing production media paths..."
 python comprehensive_fix.py
 
@@ -83,6 +87,26 @@ echo "Collecting static files..."
 # Avoid --clear here to prevent removing previously-built frontend assets unexpectedly.
 python manage.py collectstatic --noinput
 
+if [ "${BACKGROUND_MEDIA_UPLOADS:-False}" = "True" ]; then
+	echo "Starting media upload worker..."
+	python manage.py process_media_jobs &
+fi
+
+if [ "${NEWSLETTER_SENDER:-False}" = "True" ]; then
+	echo "Starting newsletter sender..."
+	python manage.py send_newsletters &
+fi
+
+if [ "${CART_GC_INTERVAL:-0}" != "0" ]; then
+	# Deletes idle carts in small batches every CART_GC_INTERVAL seconds.
+	python manage.py gc_carts --every "${CART_GC_INTERVAL}" &
+fi
+
+if [ "${FX_REFRESH_INTERVAL:-0}" != "0" ]; then
+	# Fetches exchange rates into StoreCurrencySettings every FX_REFRESH_INTERVAL seconds.
+	python manage.py refresh_fx_rates --every "${FX_REFRESH_INTERVAL}" &
+fi
+
 # Start gunicorn using PORT env var (Railway/Heroku-style)
 : ${PORT:=8080}
 echo "Starting gunicorn on 0.0.0.0:${PORT} (WSGI=${WSGI_MODULE}:application)"
@@ -3,7 +3,7 @@ import os
 bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
 workers = int(os.getenv('GUNICORN_WORKERS', '1'))
 worker_class = 'sync'
-timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))  # 5 minutes for large file uploads
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))  # 5 minutes for in-request uploads; BACKGROUND_MEDIA_UPLOADS=True moves videos to the worker
 forwarded_allow_ips = os.getenv('FORWARDED_ALLOW_IPS', '*')
 proxy_allow_ips = os.getenv('PROXY_ALLOW_IPS', '*')
 secure_scheme_headers = {
@@ -2,5 +2,27 @@
 set -eu
 
 python manage.py migrate --noinput
+# The shared cache's table when REDIS_URL is unset (a no-op otherwise).
+python manage.py createcachetable
+
+if [ "${BACKGROUND_MEDIA_UPLOADS:-False}" = "True" ]; then
+  # Shares the container disk with gunicorn, where uploads are spooled.
+  python manage.py process_media_jobs &
+fi
+
+if [ "${NEWSLETTER_SENDER:-False}" = "True" ]; then
+  # Sends campaigns queued from the Django admin.
+  python manage.py send_newsletters &
+fi
+
+if [ "${CART_GC_INTERVAL:-0}" != "0" ]; then
+  # Deletes idle carts in small batches every CART_GC_INTERVAL seconds.
+  python manage.py gc_carts --every "${CART_GC_INTERVAL}" &
+fi
+
+if [ "${FX_REFRESH_INTERVAL:-0}" != "0" ]; then
+  # Fetches exchange rates into StoreCurrencySettings every FX_REFRESH_INTERVAL seconds.
+  python manage.py refresh_fx_rates --every "${FX_REFRESH_INTERVAL}" &
+fi
 
 exec gunicorn bluewardrobe.wsgi:application --bind 0.0.0.0:${PORT:-8080}
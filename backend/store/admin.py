@@ -1,16 +1,22 @@
+import logging
 import os
 from django.contrib import admin
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, When
+from django.db.models.functions import Coalesce
 from django.utils.html import format_html
 from django import forms
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from .newsletter import queue_campaign
 from .models import (
     Material, Collection, Design, DesignImage, SizeMeasurement, SizeInventory, Cart, CartItem, SiteAsset, Customer, Order, OrderItem,
-    ContactMessage, Subscriber, PaymentLog, Video, VideoComment, VideoLike, VideoCommentLike, InfoCard,
+    ContactMessage, Subscriber, NewsletterCampaign, CampaignRecipient, PaymentIdempotencyKey, PaymentLog, Video, VideoComment, VideoLike, VideoCommentLike, InfoCard,
     BusinessProfile, BlogPost, BlogPostMedia, BlogComment, BlogPostLike, BlogCommentLike, DesignReview,
-    HomeHeroCopy, HeroMarqueeSlide, AtelierStorySlide, StoreCurrencySettings,
+    HomeHeroCopy, HeroMarqueeSlide, AtelierStorySlide, StoreCurrencySettings, FxRate,
 )
 
+logger = logging.getLogger('bluewardrobe.store.admin')
+
 
 @admin.register(Material)
 class MaterialAdmin(admin.ModelAdmin):
@@ -77,6 +83,7 @@ class SizeMeasurementAdmin(admin.ModelAdmin):
     list_filter = ('size', 'is_active', 'stock')
     search_fields = ('design__title',)
     list_editable = ('stock', 'is_active')
+    list_select_related = ('design',)
     ordering = ('design', 'size')
 
 
@@ -100,11 +107,11 @@ class DesignAdminForm(forms.ModelForm):
             
         # Handle different types of video field values
         try:
-            print(f"DEBUG: Admin clean_video called with video type: {type(video)}")
+            logger.debug("Admin clean_video called with video type: %s", type(video))
             
             # Case 1: New file upload (has file attribute)
             if hasattr(video, 'file') and hasattr(video, 'size'):
-                print(f"DEBUG: New file upload detected, size: {video.size}")
+                logger.debug("New video upload detected, size: %s", video.size)
                 if video.size > 104857600:  # 100MB limit
                     raise ValidationError(
                         f'Video file is too large. Maximum size is 100MB. '
@@ -114,14 +121,14 @@ class DesignAdminForm(forms.ModelForm):
                 
             # Case 2: Existing FieldFile (Django file field)
             elif hasattr(video, 'name') and hasattr(video, 'url'):
-                print(f"DEBUG: Existing FieldFile detected, name: {video.name}")
+                logger.debug("Existing video FieldFile detected, name: %s", video.name)
                 # Don't try to access the file - just return it
                 # This prevents FileNotFoundError for missing files
                 return video
                 
             # Case 3: String path (shouldn't happen but handle it)
             elif isinstance(video, str):
-                print(f"DEBUG: String path detected: {video}")
+                logger.debug("Video string path detected: %s", video)
                 # Remove 'media/' prefix if present to prevent duplicates
                 if video.startswith('media/'):
                     video = video[6:]  # Remove 'media/' prefix
@@ -131,12 +138,12 @@ class DesignAdminForm(forms.ModelForm):
                 
             # Case 4: Anything else - return None to be safe
             else:
-                print(f"DEBUG: Unknown video type, returning None")
+                logger.debug("Unknown video type, returning None")
                 return None
                 
         except Exception as e:
             # If anything goes wrong, log it and return None
-            print(f"Admin video validation error: {e}")
+            logger.warning("Admin video validation error: %s", e)
             return None
     
     def save(self, commit=True):
@@ -188,6 +195,7 @@ class DesignAdmin(admin.ModelAdmin):
     search_fields = ('sku', 'title')
     list_filter = ('collection', 'is_featured', 'is_preorder', 'created_at')
     list_editable = ('is_featured', 'is_preorder')
+    list_select_related = ('collection',)
     ordering = ('-created_at', '-id')
     readonly_fields = ('created_at', 'updated_at')
     inlines = [DesignImageInline, SizeMeasurementInline, SizeInventoryInline]
@@ -231,10 +239,14 @@ class DesignAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            total_stock=Coalesce(Sum('size_measurements__stock'), 0),
+        )
+
+    @admin.display(description='Total Stock', ordering='total_stock')
     def get_total_stock(self, obj):
-        total = sum(measurement.stock for measurement in obj.size_measurements.all())
-        return total
-    get_total_stock.short_description = 'Total Stock'
+        return obj.total_stock
 
     @admin.action(description='Start 14-day Atelier Reserve for selected')
     def start_14_day_preorder(self, request, queryset):
@@ -285,7 +297,7 @@ class DesignAdmin(admin.ModelAdmin):
         if obj.video:
             # Check if video is a string (invalid for FileField)
             if isinstance(obj.video, str):
-                print(f"Admin Warning: Video field for design {obj.id} contains string data. Setting to None.")
+                logger.warning("Video field for design %s contains string data. Setting to None.", obj.id)
                 obj.video = None
             # Check if video is a FileField but has issues
             elif hasattr(obj.video, 'name'):
@@ -295,7 +307,7 @@ class DesignAdmin(admin.ModelAdmin):
                     if hasattr(obj.video, 'size'):
                         _ = obj.video.size
                 except (AttributeError, ValueError, OSError) as e:
-                    print(f"Admin Warning: Invalid video file for design {obj.id}: {e}. Setting to None.")
+                    logger.warning("Invalid video file for design %s: %s. Setting to None.", obj.id, e)
                     obj.video = None
 
 
@@ -305,6 +317,7 @@ class DesignImageAdmin(admin.ModelAdmin):
     list_filter = ('design', 'created_at')
     search_fields = ('design__title', 'alt_text')
     list_editable = ('order',)
+    list_select_related = ('design',)
 
 
 @admin.register(SizeInventory)
@@ -313,6 +326,7 @@ class SizeInventoryAdmin(admin.ModelAdmin):
     list_filter = ('size', 'is_active', 'created_at')
     search_fields = ('design__title',)
     list_editable = ('stock', 'is_active')
+    list_select_related = ('design',)
     
     def availability_status(self, obj):
         return obj.availability_status
@@ -324,19 +338,43 @@ class CartAdmin(admin.ModelAdmin):
     list_display = ('session_id', 'customer_email', 'total_items', 'total_amount', 'created_at')
     search_fields = ('session_id', 'customer_email')
     readonly_fields = ('created_at', 'updated_at')
-    
+
+    def get_queryset(self, request):
+        # Same rule as Design.effective_price, summed in SQL instead of per line.
+        unit_price = Case(
+            When(items__design__discount_price__lt=F('items__design__price'), then=F('items__design__discount_price')),
+            default=F('items__design__price'),
+        )
+        return super().get_queryset(request).annotate(
+            item_count=Coalesce(Sum('items__quantity'), 0),
+            amount=Coalesce(
+                Sum(F('items__quantity') * unit_price, output_field=DecimalField(max_digits=12, decimal_places=2)),
+                0,
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+    @admin.display(ordering='item_count')
     def total_items(self, obj):
-        return obj.total_items
-    
+        return obj.item_count
+
+    @admin.display(ordering='amount')
     def total_amount(self, obj):
-        return obj.total_amount
+        return obj.amount
 
 
 @admin.register(CartItem)
 class CartItemAdmin(admin.ModelAdmin):
-    list_display = ('cart', 'design', 'size_measurement', 'quantity', 'unit_price', 'subtotal', 'is_available')
+    list_display = ('cart_session', 'design', 'size_measurement', 'quantity', 'unit_price', 'subtotal', 'is_available')
     list_filter = ('size_measurement__size', 'created_at')
     search_fields = ('design__title', 'cart__session_id')
+    list_select_related = ('cart', 'design', 'size_measurement__design')
+    raw_id_fields = ('cart', 'design', 'size_measurement')
+
+    @admin.display(description='Cart', ordering='cart__session_id')
+    def cart_session(self, obj):
+        # Cart.__str__ counts the cart's items; the session id is all this column needs.
+        return obj.cart.session_id
     
     def subtotal(self, obj):
         return obj.subtotal
@@ -407,6 +445,9 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ('design', 'size', 'quantity', 'unit_price')
     can_delete = False
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('design')
+
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
@@ -467,6 +508,7 @@ class OrderAdmin(admin.ModelAdmin):
         'flutterwave_tx_ref',
         'created_at',
     )
+    list_select_related = ('customer',)
     inlines = [OrderItemInline]
 
     def customer_email(self, obj):
@@ -488,12 +530,66 @@ class SubscriberAdmin(admin.ModelAdmin):
     list_display = ('email', 'subscribed_at')
 
 
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'recipient_total', 'sent_total', 'failed_total', 'queued_at', 'completed_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('status', 'queued_at', 'completed_at', 'updated_at')
+    actions = ['queue_for_sending']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            recipient_total=Count('recipients'),
+            sent_total=Count('recipients', filter=Q(recipients__status=CampaignRecipient.STATUS_SENT)),
+            failed_total=Count('recipients', filter=Q(recipients__status=CampaignRecipient.STATUS_FAILED)),
+        )
+
+    @admin.display(description='Recipients', ordering='recipient_total')
+    def recipient_total(self, obj):
+        return obj.recipient_total
+
+    @admin.display(description='Sent', ordering='sent_total')
+    def sent_total(self, obj):
+        return obj.sent_total
+
+    @admin.display(description='Failed', ordering='failed_total')
+    def failed_total(self, obj):
+        return obj.failed_total
+
+    @admin.action(description='Queue selected drafts for sending (manage.py send_newsletters)')
+    def queue_for_sending(self, request, queryset):
+        drafts = list(queryset.filter(status=NewsletterCampaign.STATUS_DRAFT))
+        for campaign in drafts:
+            queue_campaign(campaign)
+        self.message_user(request, f'Queued {len(drafts)} campaign(s).')
+
+
+@admin.register(CampaignRecipient)
+class CampaignRecipientAdmin(admin.ModelAdmin):
+    list_display = ('email', 'campaign', 'status', 'sent_at')
+    list_filter = ('status', 'campaign')
+    list_select_related = ('campaign',)
+    search_fields = ('email',)
+    raw_id_fields = ('campaign', 'subscriber')
+    readonly_fields = ('batch_key', 'provider_id', 'error', 'sent_at')
+
+
 @admin.register(PaymentLog)
 class PaymentLogAdmin(admin.ModelAdmin):
     list_display = ('reference', 'status', 'amount', 'currency', 'paid_at', 'created_at')
     search_fields = ('reference',)
 
 
+@admin.register(PaymentIdempotencyKey)
+class PaymentIdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('reference', 'gateway', 'order', 'created_at')
+    list_filter = ('gateway',)
+    list_select_related = ('order',)
+    search_fields = ('reference',)
+    readonly_fields = ('gateway', 'reference', 'order', 'created_at')
+
+
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
     list_display = ('title', 'video_type', 'views', 'likes_count', 'comments_count', 'is_featured', 'order', 'created_at')
@@ -521,6 +617,20 @@ class VideoAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            like_total=Count('video_likes', distinct=True),
+            active_comment_total=Count('comments', filter=Q(comments__is_active=True), distinct=True),
+        )
+
+    @admin.display(description='Likes count', ordering='like_total')
+    def likes_count(self, obj):
+        return obj.like_total
+
+    @admin.display(description='Comments count', ordering='active_comment_total')
+    def comments_count(self, obj):
+        return obj.active_comment_total
     
     def save_model(self, request, obj, form, change):
         # Ensure only one video source is used
@@ -544,9 +654,17 @@ class VideoCommentAdmin(admin.ModelAdmin):
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_preview.short_description = 'Content'
+
+    @admin.display(description='Likes count', ordering='like_total')
+    def likes_count(self, obj):
+        return obj.like_total
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('video', 'parent')
+        return (
+            super().get_queryset(request)
+            .select_related('video', 'parent__video')
+            .annotate(like_total=Count('comment_likes'))
+        )
 
 
 @admin.register(VideoLike)
@@ -572,7 +690,7 @@ class VideoCommentLikeAdmin(admin.ModelAdmin):
     comment_author.short_description = 'Comment Author'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('comment')
+        return super().get_queryset(request).select_related('comment__video')
 
 
 @admin.register(InfoCard)
@@ -613,11 +731,19 @@ class BlogPostAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('title',)}
     inlines = [BlogPostMediaInline, BlogCommentInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            like_total=Count('likes', distinct=True),
+            comment_total=Count('comments', distinct=True),
+        )
+
+    @admin.display(ordering='like_total')
     def likes_count(self, obj):
-        return obj.likes.count()
+        return obj.like_total
 
+    @admin.display(ordering='comment_total')
     def comments_count(self, obj):
-        return obj.comments.count()
+        return obj.comment_total
 
 
 @admin.register(BlogPostMedia)
@@ -626,6 +752,7 @@ class BlogPostMediaAdmin(admin.ModelAdmin):
     list_filter = ('media_type', 'created_at')
     search_fields = ('post__title', 'caption', 'alt_text')
     list_editable = ('order',)
+    list_select_related = ('post',)
 
 
 @admin.register(BlogComment)
@@ -635,8 +762,16 @@ class BlogCommentAdmin(admin.ModelAdmin):
     search_fields = ('author_name', 'author_email', 'body', 'post__title')
     list_editable = ('is_approved',)
 
+    def get_queryset(self, request):
+        return (
+            super().get_queryset(request)
+            .select_related('post', 'parent__post')
+            .annotate(like_total=Count('likes'))
+        )
+
+    @admin.display(ordering='like_total')
     def likes_count(self, obj):
-        return obj.likes.count()
+        return obj.like_total
 
 
 @admin.register(BlogPostLike)
@@ -644,6 +779,7 @@ class BlogPostLikeAdmin(admin.ModelAdmin):
     list_display = ('post', 'visitor_name', 'visitor_email', 'visitor_id', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('post__title', 'visitor_name', 'visitor_email', 'visitor_id')
+    list_select_related = ('post',)
 
 
 @admin.register(BlogCommentLike)
@@ -651,6 +787,7 @@ class BlogCommentLikeAdmin(admin.ModelAdmin):
     list_display = ('comment', 'visitor_name', 'visitor_email', 'visitor_id', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('comment__body', 'comment__post__title', 'visitor_name', 'visitor_email', 'visitor_id')
+    list_select_related = ('comment__post',)
 
 
 @admin.register(DesignReview)
@@ -742,3 +879,14 @@ class StoreCurrencySettingsAdmin(admin.ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return False
+
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    list_display = ('currency', 'ngn_per_unit', 'source', 'fetched_at')
+    list_filter = ('currency', 'source')
+    date_hierarchy = 'fetched_at'
+    readonly_fields = ('currency', 'ngn_per_unit', 'source', 'fetched_at')
+
+    def has_add_permission(self, request):
+        return False
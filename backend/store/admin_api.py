@@ -0,0 +1,77 @@
+"""
+Listing for the owner dashboard's admin endpoints.
+
+Lists are cursor-paginated on (timestamp, id), which the models index, so a
+page costs the same however much history builds up: no COUNT(*), no OFFSET.
+Responses are ``{"next", "previous", "results"}``; follow ``next`` for more.
+Filters are query parameters:
+
+    ?status=confirmed&currency=USD         matches from ``filter_params``
+    ?created_after=2026-01-01              inclusive, date or ISO datetime
+    ?created_before=2026-02-01             exclusive
+    ?search=ada                            icontains over ``search_fields``
+    ?ordering=created_at                   oldest first; one of ``ordering_fields``
+    ?page_size=100                         up to ADMIN_API_MAX_PAGE_SIZE
+"""
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
+from rest_framework.pagination import CursorPagination
+
+
+class AdminCursorPagination(CursorPagination):
+    page_size = settings.ADMIN_API_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = settings.ADMIN_API_MAX_PAGE_SIZE
+
+
+def parse_moment(param, value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({param: 'Use YYYY-MM-DD or an ISO 8601 datetime.'})
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class AdminListMixin:
+    """
+    Paginated, filterable admin list. Set ``filter_params`` ({query param:
+    ORM lookup}) and ``date_field`` (the indexed timestamp the list is
+    ordered and date-filtered by).
+    """
+    pagination_class = AdminCursorPagination
+    filter_backends = [SearchFilter, OrderingFilter]
+    filter_params = {}
+    date_field = 'created_at'
+
+    @property
+    def ordering(self):
+        return (f'-{self.date_field}', '-id')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        params = self.request.query_params
+        for param, lookup in self.filter_params.items():
+            value = params.get(param)
+            if value in (None, ''):
+                continue
+            if value.lower() in ('true', 'false'):
+                value = value.lower() == 'true'
+            try:
+                queryset = queryset.filter(**{lookup: value})
+            except (TypeError, ValueError, DjangoValidationError):
+                raise ValidationError({param: 'Invalid value.'})
+        if params.get('created_after'):
+            queryset = queryset.filter(**{f'{self.date_field}__gte': parse_moment('created_after', params['created_after'])})
+        if params.get('created_before'):
+            queryset = queryset.filter(**{f'{self.date_field}__lt': parse_moment('created_before', params['created_before'])})
+        return queryset
@@ -0,0 +1,82 @@
+"""
+Garbage collection for abandoned carts and expired database sessions.
+
+Rows go in small batches, each deleted in its own short transaction and
+keyed by primary key, so live cart requests never wait behind one long
+DELETE. A cart is only removed if it is still idle when its batch runs.
+``manage.py gc_carts`` runs a pass (or one every ``--every`` seconds).
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Cart, CartItem
+
+logger = logging.getLogger('bluewardrobe.store.cart_gc')
+
+DEFAULT_BATCH_SIZE = 500
+DB_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+def _in_batches(queryset, batch_size, pause, delete_batch):
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        delete_batch(ids)
+        if len(ids) < batch_size:
+            return
+        if pause:
+            time.sleep(pause)
+
+
+def purge_idle_carts(idle_for=None, batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """Delete carts (and their lines) untouched for ``idle_for``. Returns row counts."""
+    if idle_for is None:
+        idle_for = timedelta(days=getattr(settings, 'CART_IDLE_DAYS', 30))
+    cutoff = timezone.now() - idle_for
+    reclaimed = {'carts': 0, 'cart_items': 0}
+
+    def delete_batch(ids):
+        with transaction.atomic():
+            # Re-check idleness: a cart written since the ids were read is kept.
+            _, per_model = Cart.objects.filter(pk__in=ids, updated_at__lt=cutoff).delete()
+        reclaimed['carts'] += per_model.get(Cart._meta.label, 0)
+        reclaimed['cart_items'] += per_model.get(CartItem._meta.label, 0)
+
+    _in_batches(Cart.objects.filter(updated_at__lt=cutoff).order_by('pk'), batch_size, pause, delete_batch)
+    return reclaimed
+
+
+def purge_expired_sessions(batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """Delete expired django_session rows; a no-op for cookie-based session engines."""
+    if settings.SESSION_ENGINE not in DB_SESSION_ENGINES:
+        return 0
+    from django.contrib.sessions.models import Session
+
+    reclaimed = [0]
+
+    def delete_batch(ids):
+        deleted, _ = Session.objects.filter(pk__in=ids).delete()
+        reclaimed[0] += deleted
+
+    _in_batches(Session.objects.filter(expire_date__lt=timezone.now()).order_by('pk'), batch_size, pause, delete_batch)
+    return reclaimed[0]
+
+
+def collect_garbage(idle_for=None, batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    started = time.perf_counter()
+    reclaimed = purge_idle_carts(idle_for, batch_size, pause)
+    reclaimed['sessions'] = purge_expired_sessions(batch_size, pause)
+    logger.info(
+        'Cart GC reclaimed %s carts, %s cart items, %s sessions in %.1fs',
+        reclaimed['carts'], reclaimed['cart_items'], reclaimed['sessions'], time.perf_counter() - started,
+    )
+    return reclaimed
@@ -0,0 +1,264 @@
+"""
+Server-side cart keyed by the client's cart session id.
+
+Reads go through ``load_cart``: every line with its design, size measurement
+and first image comes back from one query (select_related plus a subquery),
+and nothing on the read path touches the Django session or creates rows.
+Writes are single upserts on CartItem's (cart, design, size_measurement) key
+and bump ``Cart.version``; ``apply_batch`` applies many operations in one
+transaction with one stock query and one bulk upsert. The version and the newest design / size timestamp
+of the lines make up the cart's ETag, so a client revalidating an unchanged
+cart gets a 304 after one small aggregate query.
+"""
+import logging
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import Cart, CartItem, DesignImage, SizeMeasurement
+
+logger = logging.getLogger('bluewardrobe.store.cart')
+
+CART_SESSION_KEY = 'tbw_cart_session_id'
+
+
+def cart_session_id(request):
+    """
+    The cart key: the client's X-Session-ID, else one remembered in the Django
+    session. The session is only written when the key changes; SessionMiddleware
+    saves it with the response.
+    """
+    session_id = (
+        request.META.get('HTTP_X_SESSION_ID')
+        or request.session.get(CART_SESSION_KEY)
+        or request.session.session_key
+        or uuid.uuid4().hex
+    )
+    if request.session.get(CART_SESSION_KEY) != session_id:
+        request.session[CART_SESSION_KEY] = session_id
+    return session_id
+
+
+@dataclass
+class CartView:
+    """Read model behind CartSerializer; ``id`` is None until the first write."""
+    session_id: str
+    id: Optional[int] = None
+    customer_email: str = ''
+    version: int = 0
+    created_at: Optional[object] = None
+    updated_at: Optional[object] = None
+    items: list = field(default_factory=list)
+
+    @property
+    def total_items(self):
+        return sum(item.quantity for item in self.items)
+
+    @property
+    def total_amount(self):
+        return sum((item.subtotal for item in self.items), Decimal('0'))
+
+    @property
+    def etag(self):
+        stamps = [
+            stamp.timestamp()
+            for item in self.items
+            for stamp in (item.design.updated_at, item.size_measurement.updated_at if item.size_measurement else None)
+            if stamp
+        ]
+        return _etag(self.id, self.version, max(stamps, default=None))
+
+
+def _etag(cart_id, version, stamp):
+    return f'"cart-{cart_id or 0}-{version}-{int(stamp * 1000000) if stamp else 0}"'
+
+
+def _first_image():
+    return Subquery(
+        DesignImage.objects.filter(design=OuterRef('design_id'))
+        .order_by('order', 'created_at')
+        .values('image')[:1]
+    )
+
+
+def load_cart(session_id):
+    items = list(
+        CartItem.objects.filter(cart__session_id=session_id)
+        .select_related('cart', 'design', 'size_measurement')
+        .annotate(first_image=_first_image())
+        .order_by('created_at', 'id')
+    )
+    if items:
+        cart = items[0].cart
+    else:
+        cart = Cart.objects.filter(session_id=session_id).first()
+        if cart is None:
+            return CartView(session_id=session_id)
+    for item in items:
+        item.design.first_image = item.first_image
+    return CartView(
+        session_id=session_id,
+        id=cart.id,
+        customer_email=cart.customer_email,
+        version=cart.version,
+        created_at=cart.created_at,
+        updated_at=cart.updated_at,
+        items=items,
+    )
+
+
+def current_etag(session_id):
+    """The ETag ``load_cart(session_id)`` would produce, from one aggregate query."""
+    row = (
+        Cart.objects.filter(session_id=session_id)
+        .annotate(design_stamp=Max('items__design__updated_at'), size_stamp=Max('items__size_measurement__updated_at'))
+        .values('id', 'version', 'design_stamp', 'size_stamp')
+        .first()
+    )
+    if row is None:
+        return _etag(None, 0, None)
+    stamps = [stamp.timestamp() for stamp in (row['design_stamp'], row['size_stamp']) if stamp]
+    return _etag(row['id'], row['version'], max(stamps, default=None))
+
+
+def get_or_create_cart_id(session_id):
+    cart_id = Cart.objects.filter(session_id=session_id).values_list('id', flat=True).first()
+    if cart_id is None:
+        cart, created = Cart.objects.get_or_create(session_id=session_id, defaults={'customer_email': ''})
+        logger.debug('Cart %s for session %s (id=%s)', 'created' if created else 'retrieved', session_id, cart.id)
+        cart_id = cart.id
+    return cart_id
+
+
+def bump_version(cart_id):
+    Cart.objects.filter(pk=cart_id).update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def preorder_error(design):
+    """Atelier Reserve: lines can only be added during the open preorder window."""
+    if not design.is_preorder:
+        return None
+    status_label = design.preorder_status
+    if status_label == 'upcoming':
+        return 'This Atelier Reserve dress is not open for preorder yet.'
+    if status_label == 'closed':
+        return 'This Atelier Reserve window has closed.'
+    return None
+
+
+def set_customer_email(cart_id, email):
+    Cart.objects.filter(pk=cart_id).update(
+        customer_email=email, version=F('version') + 1, updated_at=timezone.now(),
+    )
+
+
+def upsert_item(cart_id, design_id, size_measurement_id, quantity):
+    """Insert the line or overwrite its quantity, in one statement."""
+    CartItem.objects.bulk_create(
+        [CartItem(cart_id=cart_id, design_id=design_id, size_measurement_id=size_measurement_id, quantity=quantity)],
+        update_conflicts=True,
+        unique_fields=['cart', 'design', 'size_measurement'],
+        update_fields=['quantity', 'updated_at'],
+    )
+    bump_version(cart_id)
+
+
+def remove_items(cart_id, queryset):
+    deleted, _ = queryset.delete()
+    if deleted:
+        bump_version(cart_id)
+    return deleted
+
+
+BATCH_ADD = 'add'
+BATCH_SET = 'set'
+BATCH_REMOVE = 'remove'
+
+
+class CartBatchError(Exception):
+    """Raised with per-operation errors; nothing in the batch was applied."""
+
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} cart operation(s) rejected')
+        self.errors = errors
+
+
+def apply_batch(session_id, operations):
+    """
+    Apply validated operations ({"op", "design_id", "size_measurement_id",
+    "quantity"}) in order, all or nothing. "add" increases a line, "set"
+    replaces its quantity (0 removes it) and "remove" drops the line, or
+    every line of the design when no size is given.
+    """
+    size_ids = {op['size_measurement_id'] for op in operations if op.get('size_measurement_id')}
+    with transaction.atomic():
+        cart_id = get_or_create_cart_id(session_id)
+        # Serialise concurrent batches on the same cart.
+        Cart.objects.select_for_update().filter(pk=cart_id).values_list('id', flat=True).first()
+        lines = {
+            (design_id, size_id): quantity
+            for design_id, size_id, quantity in CartItem.objects.filter(cart_id=cart_id)
+            .values_list('design_id', 'size_measurement_id', 'quantity')
+        }
+        sizes = {
+            size.id: size
+            for size in SizeMeasurement.objects.select_related('design').filter(id__in=size_ids, is_active=True)
+        }
+
+        final = dict(lines)
+        errors = []
+        for index, op in enumerate(operations):
+            design_id, size_id = op['design_id'], op.get('size_measurement_id')
+            if op['op'] == BATCH_REMOVE:
+                for key in [key for key in final if key[0] == design_id and (not size_id or key[1] == size_id)]:
+                    final[key] = 0
+                continue
+            size = sizes.get(size_id)
+            if size is None or size.design_id != design_id:
+                errors.append({'index': index, 'detail': 'Size measurement not available'})
+                continue
+            quantity = op['quantity']
+            if op['op'] == BATCH_ADD:
+                quantity += final.get((design_id, size_id), 0)
+            if quantity:
+                message = preorder_error(size.design)
+                if message:
+                    errors.append({'index': index, 'detail': message})
+                    continue
+            final[(design_id, size_id)] = quantity
+
+        for (design_id, size_id), quantity in final.items():
+            size = sizes.get(size_id)
+            if quantity and size is not None and size.stock < quantity and quantity != lines.get((design_id, size_id)):
+                errors.append({'design_id': design_id, 'size_measurement_id': size_id, 'detail': 'Insufficient stock'})
+        if errors:
+            raise CartBatchError(errors)
+
+        upserts = [
+            CartItem(cart_id=cart_id, design_id=design_id, size_measurement_id=size_id, quantity=quantity)
+            for (design_id, size_id), quantity in final.items()
+            if quantity and quantity != lines.get((design_id, size_id))
+        ]
+        removed = Q()
+        for design_id, size_id in (key for key, quantity in final.items() if not quantity and key in lines):
+            if size_id is None:
+                removed |= Q(design_id=design_id, size_measurement__isnull=True)
+            else:
+                removed |= Q(design_id=design_id, size_measurement_id=size_id)
+
+        if upserts:
+            CartItem.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['cart', 'design', 'size_measurement'],
+                update_fields=['quantity', 'updated_at'],
+            )
+        if removed:
+            CartItem.objects.filter(removed, cart_id=cart_id).delete()
+        if upserts or removed:
+            bump_version(cart_id)
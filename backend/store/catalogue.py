@@ -0,0 +1,221 @@
+"""
+Storefront filters and facet counts for /api/designs/.
+
+Filters are query parameters, all optional and combinable:
+
+    ?currency=USD&min_price=20&max_price=80    effective price in NGN (default), USD or GBP
+    ?size=8,10                                  any of these sizes in stock
+    ?collection=3,4                             collection ids
+    ?material=2                                 the collection uses any of these materials
+    ?discounted=true                            on sale only
+    ?in_stock=true                              at least one size in stock
+    ?ordering=price | -price | newest           newest first by default
+
+Prices filter and sort on Design's stored, indexed price columns; sizes and
+materials are EXISTS lookups on their (design, size) and (collection,
+material) indexes. ``design_facets`` counts what the sidebar needs, each
+facet without its own filter, in one UNION ALL of grouped queries.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Exists, F, IntegerField, Max, Min, OuterRef, Q, Value
+from django.db.models.functions import Cast, Ceil, Floor
+from rest_framework.exceptions import ValidationError
+
+from .currency_utils import ALLOWED_CHARGE_CURRENCIES
+from .models import Collection, Material, SizeMeasurement
+
+# Currency -> stored effective price column on Design.
+PRICE_COLUMNS = {
+    'NGN': 'effective_price_ngn',
+    'USD': 'effective_price_usd',
+    'GBP': 'effective_price_gbp',
+}
+TRUE_VALUES = {'1', 'true', 'yes'}
+NEWEST = ('-created_at', '-id')
+
+
+def is_true(value):
+    return (value or '').strip().lower() in TRUE_VALUES
+
+
+def _currency(params):
+    currency = (params.get('currency') or 'NGN').strip().upper()
+    if currency not in ALLOWED_CHARGE_CURRENCIES:
+        raise ValidationError({'currency': 'Use one of NGN, USD, GBP.'})
+    return currency
+
+
+def _ints(params, param):
+    """Comma-separated and/or repeated integers: ``?size=8,10`` or ``?size=8&size=10``."""
+    values = []
+    for raw in params.getlist(param):
+        for part in raw.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                values.append(int(part))
+            except ValueError:
+                raise ValidationError({param: 'Use whole numbers separated by commas.'})
+    return values
+
+
+def _price(params, param):
+    raw = (params.get(param) or '').strip()
+    if not raw:
+        return None
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        raise ValidationError({param: 'Use a number.'})
+    if not value.is_finite() or value < 0:
+        raise ValidationError({param: 'Use a number of 0 or more.'})
+    return value
+
+
+def in_stock_sizes():
+    return SizeMeasurement.objects.filter(stock__gt=0, is_active=True)
+
+
+def _conditions(params):
+    """
+    The filters in ``params`` as ``{facet: [filter() arguments]}``, so the
+    facet counts can leave out a facet's own filter.
+    """
+    column = PRICE_COLUMNS[_currency(params)]
+    conditions = {}
+    price = []
+    min_price = _price(params, 'min_price')
+    max_price = _price(params, 'max_price')
+    if min_price is not None:
+        price.append(Q(**{f'{column}__gte': min_price}))
+    if max_price is not None:
+        price.append(Q(**{f'{column}__lte': max_price}))
+    if price:
+        conditions['price'] = price
+
+    sizes = _ints(params, 'size')
+    if sizes:
+        conditions['size'] = [Exists(in_stock_sizes().filter(design=OuterRef('pk'), size__in=sizes))]
+    elif is_true(params.get('in_stock')):
+        conditions['in_stock'] = [Exists(in_stock_sizes().filter(design=OuterRef('pk')))]
+
+    collections = _ints(params, 'collection')
+    if collections:
+        conditions['collection'] = [Q(collection_id__in=collections)]
+    materials = _ints(params, 'material')
+    if materials:
+        conditions['material'] = [Exists(
+            Collection.materials.through.objects.filter(
+                collection_id=OuterRef('collection_id'), material_id__in=materials,
+            )
+        )]
+    if is_true(params.get('discounted')):
+        conditions['discounted'] = [Q(discount_price__isnull=False, discount_price__lt=F('price'))]
+    return conditions
+
+
+def _apply(queryset, conditions, without=None):
+    for facet, facet_conditions in conditions.items():
+        if facet != without:
+            queryset = queryset.filter(*facet_conditions)
+    return queryset
+
+
+def filter_designs(queryset, params):
+    """Apply the storefront filters and ordering in ``params`` to a Design queryset."""
+    column = PRICE_COLUMNS[_currency(params)]
+    queryset = _apply(queryset, _conditions(params))
+
+    ordering = (params.get('ordering') or '').strip().lower()
+    if ordering == 'price':
+        return queryset.order_by(F(column).asc(nulls_last=True), *NEWEST)
+    if ordering == '-price':
+        return queryset.order_by(F(column).desc(nulls_last=True), *NEWEST)
+    if ordering not in ('', 'newest'):
+        raise ValidationError({'ordering': 'Use price, -price or newest.'})
+    return queryset.order_by(*NEWEST)
+
+
+def _total(queryset, name, key):
+    """A whole-queryset row for the facet UNION: (name, key, '', count)."""
+    return (
+        queryset.annotate(facet=Value(name))
+        .values('facet')
+        .annotate(key=key, label=Value(''), n=Count('pk'))
+        .values_list('facet', 'key', 'label', 'n')
+    )
+
+
+def design_facets(queryset, params):
+    """
+    Facet counts for the storefront filters in ``params`` over an unfiltered
+    Design queryset: price bounds (whole units of the currency), in-stock
+    sizes, collections, materials, and how many match (``total``), are
+    discounted or are in stock. Each facet counts with every filter but its
+    own, so picking a size still lists the other sizes on offer. One query.
+    """
+    currency = _currency(params)
+    column = PRICE_COLUMNS[currency]
+    conditions = _conditions(params)
+    base = queryset.prefetch_related(None).order_by()
+    designs = _apply(base, conditions)
+
+    def without(facet):
+        return _apply(base, conditions, without=facet)
+
+    sizes = (
+        in_stock_sizes().filter(design__in=without('size').values('pk')).order_by()
+        .values('size')
+        .annotate(facet=Value('size'), key=F('size'), label=Value(''), n=Count('design', distinct=True))
+        .values_list('facet', 'key', 'label', 'n')
+    )
+    collections = (
+        without('collection').values('collection_id')
+        .annotate(facet=Value('collection'), key=F('collection_id'), label=F('collection__title'), n=Count('pk'))
+        .values_list('facet', 'key', 'label', 'n')
+    )
+    materials = (
+        Material.objects.filter(collection__designs__in=without('material').values('pk')).order_by()
+        .values('pk')
+        .annotate(facet=Value('material'), key=F('pk'), label=F('name'), n=Count('collection__designs', distinct=True))
+        .values_list('facet', 'key', 'label', 'n')
+    )
+    parts = [
+        collections,
+        materials,
+        _total(designs, 'total', Value(0)),
+        _total(without('price'), 'price_min', Cast(Floor(Min(column)), IntegerField())),
+        _total(without('price'), 'price_max', Cast(Ceil(Max(column)), IntegerField())),
+        _total(
+            without('discounted').filter(discount_price__isnull=False, discount_price__lt=F('price')),
+            'discounted', Value(0),
+        ),
+        _total(without('in_stock').filter(Exists(in_stock_sizes().filter(design=OuterRef('pk')))), 'in_stock', Value(0)),
+    ]
+
+    facets = {
+        'price': {'currency': currency, 'min': None, 'max': None},
+        'sizes': [],
+        'collections': [],
+        'materials': [],
+        'total': 0,
+        'discounted': 0,
+        'in_stock': 0,
+    }
+    for facet, key, label, count in sizes.union(*parts, all=True):
+        if facet == 'size':
+            facets['sizes'].append({'size': key, 'count': count})
+        elif facet == 'collection':
+            facets['collections'].append({'id': key, 'title': label, 'count': count})
+        elif facet == 'material':
+            facets['materials'].append({'id': key, 'name': label, 'count': count})
+        elif facet in ('price_min', 'price_max'):
+            facets['price'][facet[6:]] = key
+        else:
+            facets[facet] = count
+    facets['sizes'].sort(key=lambda row: row['size'])
+    facets['collections'].sort(key=lambda row: (-row['count'], row['title']))
+    facets['materials'].sort(key=lambda row: (-row['count'], row['name']))
+    return facets
@@ -0,0 +1,257 @@
+"""
+Server-authoritative checkout quotes.
+
+``build_quote`` prices a cart once: every line's design price and size stock
+come from one query and the FX rates and delivery fees from one
+StoreCurrencySettings read. The quote is signed with Django's signing
+framework and handed to the client as an opaque token. The initiate views
+charge exactly what the token says and carry it through the gateway's
+metadata, so ``finalize_order_from_cart`` books the order from it instead of
+pricing the cart again.
+
+A token is only accepted for a new payment within CHECKOUT_QUOTE_TTL
+seconds. At verify time only its signature is checked: the gateway has
+already charged the quoted amount, however long the customer took to pay.
+"""
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+
+from .currency_utils import ALLOWED_CHARGE_CURRENCIES, ngn_per_unit, resolve_delivery_from_metadata
+from .models import CartItem, SizeMeasurement, StoreCurrencySettings
+
+logger = logging.getLogger('bluewardrobe.store.checkout_quote')
+
+QUOTE_SALT = 'store.checkout_quote'
+CENTS = Decimal('0.01')
+
+
+class QuoteError(Exception):
+    """The cart or checkout details can't be quoted; the message is safe to show."""
+
+
+class QuoteExpired(QuoteError):
+    pass
+
+
+@dataclass(frozen=True)
+class QuoteLine:
+    design_id: int
+    size: int
+    size_measurement_id: int
+    quantity: int
+    unit_price_ngn: Decimal
+
+    @property
+    def total_ngn(self):
+        return self.unit_price_ngn * self.quantity
+
+
+@dataclass(frozen=True)
+class CheckoutQuote:
+    currency: str
+    # NGN per unit of ``currency`` when the quote was made (1 for NGN).
+    rate: Decimal
+    lines: tuple
+    delivery_type: str
+    international_region: str
+    country: str
+    delivery_fee_ngn: Decimal
+
+    @property
+    def merchandise_ngn(self):
+        return sum((line.total_ngn for line in self.lines), Decimal('0')).quantize(CENTS)
+
+    @property
+    def total_ngn(self):
+        return (self.merchandise_ngn + self.delivery_fee_ngn).quantize(CENTS)
+
+    @property
+    def amount(self):
+        """What the gateway charges, in ``currency``."""
+        return self.convert(self.total_ngn)
+
+    @property
+    def is_international(self):
+        return self.delivery_type == 'international'
+
+    def convert(self, amount_ngn):
+        return (Decimal(amount_ngn) / self.rate).quantize(CENTS)
+
+    def cart_metadata(self):
+        """The lines in the [{id, size, qty}] shape gateway metadata has always used."""
+        return [{'id': line.design_id, 'size': line.size, 'qty': line.quantity} for line in self.lines]
+
+    def sign(self):
+        return signing.dumps(
+            {
+                'c': self.currency,
+                'r': str(self.rate),
+                'l': [
+                    [line.design_id, line.size, line.size_measurement_id, line.quantity, str(line.unit_price_ngn)]
+                    for line in self.lines
+                ],
+                'd': [self.delivery_type, self.international_region, self.country, str(self.delivery_fee_ngn)],
+            },
+            salt=QUOTE_SALT,
+            compress=True,
+        )
+
+    @classmethod
+    def unsign(cls, token, max_age=None):
+        try:
+            data = signing.loads(token, salt=QUOTE_SALT, max_age=max_age)
+        except signing.SignatureExpired as exc:
+            raise QuoteExpired('Your checkout quote has expired. Please review your order and try again.') from exc
+        except signing.BadSignature as exc:
+            raise QuoteError('Invalid checkout quote.') from exc
+        delivery_type, region, country, fee = data['d']
+        return cls(
+            currency=data['c'],
+            rate=Decimal(data['r']),
+            lines=tuple(
+                QuoteLine(design_id, size, size_measurement_id, quantity, Decimal(unit_price))
+                for design_id, size, size_measurement_id, quantity, unit_price in data['l']
+            ),
+            delivery_type=delivery_type,
+            international_region=region,
+            country=country,
+            delivery_fee_ngn=Decimal(fee),
+        )
+
+    def as_dict(self):
+        return {
+            'currency': self.currency,
+            'amount': str(self.amount),
+            'merchandise_ngn': str(self.merchandise_ngn),
+            'delivery_fee_ngn': str(self.delivery_fee_ngn),
+            'total_ngn': str(self.total_ngn),
+            'ngn_per_unit': str(self.rate),
+            'delivery_type': self.delivery_type,
+            'international_region': self.international_region,
+            'country': self.country,
+            'items': [
+                {
+                    'design_id': line.design_id,
+                    'size': line.size,
+                    'quantity': line.quantity,
+                    'unit_price_ngn': str(line.unit_price_ngn),
+                    'unit_price': str(self.convert(line.unit_price_ngn)),
+                }
+                for line in self.lines
+            ],
+        }
+
+
+def _quote_line(size_measurement, quantity):
+    return QuoteLine(
+        design_id=size_measurement.design_id,
+        size=size_measurement.size,
+        size_measurement_id=size_measurement.id,
+        quantity=quantity,
+        unit_price_ngn=Decimal(str(size_measurement.design.effective_price)),
+    )
+
+
+def _session_cart_lines(session_id):
+    """(size measurement, quantity) for each line of the server-side cart, in one query."""
+    items = (
+        CartItem.objects.filter(cart__session_id=session_id)
+        .select_related('size_measurement__design')
+        .order_by('created_at', 'id')
+    )
+    return [(item.size_measurement, item.quantity) for item in items]
+
+
+def _metadata_cart_lines(cart):
+    """(size measurement or None, quantity) for [{id, size, qty}] lines, in one query."""
+    wanted = []
+    for entry in cart or []:
+        try:
+            wanted.append((int(entry.get('id')), int(entry.get('size')), int(entry.get('qty') or 1)))
+        except (AttributeError, TypeError, ValueError):
+            wanted.append((None, None, 0))
+    pairs = Q()
+    for design_id, size, _ in wanted:
+        if design_id is not None:
+            pairs |= Q(design_id=design_id, size=size)
+    found = {}
+    if pairs:
+        for size_measurement in SizeMeasurement.objects.filter(pairs, is_active=True).select_related('design'):
+            found[(size_measurement.design_id, size_measurement.size)] = size_measurement
+    return [(found.get((design_id, size)), quantity) for design_id, size, quantity in wanted]
+
+
+def price_lines(lines, *, strict=True):
+    """
+    QuoteLines for (size measurement, quantity) pairs. Strict pricing (a new
+    quote) rejects unavailable or understocked lines; lenient pricing keeps
+    only the lines that can still be sold.
+    """
+    priced = []
+    for size_measurement, quantity in lines:
+        if quantity <= 0:
+            continue
+        available = size_measurement is not None and size_measurement.is_active and size_measurement.stock >= quantity
+        if not available:
+            if strict:
+                raise QuoteError('Some items in your cart are no longer available. Please remove them before proceeding.')
+            continue
+        priced.append(_quote_line(size_measurement, quantity))
+    return tuple(priced)
+
+
+def build_quote(*, currency, metadata, session_id=None, strict=True):
+    """
+    Price the server-side cart for ``session_id`` (or ``metadata['cart']``
+    when that cart is empty) with delivery from ``metadata``, converted with
+    one snapshot of the store's FX settings.
+    """
+    currency = (currency or 'NGN').upper().strip()
+    if currency not in ALLOWED_CHARGE_CURRENCIES:
+        raise QuoteError('currency must be one of: NGN, USD, GBP')
+    metadata = metadata or {}
+    fx = StoreCurrencySettings.get_solo()
+    delivery = resolve_delivery_from_metadata(metadata, fx)
+    if strict and delivery['is_international'] and not delivery['international_region']:
+        raise QuoteError('Please select whether you are in the US, UK, or Canada.')
+
+    lines = _session_cart_lines(session_id) if session_id else []
+    if not lines:
+        lines = _metadata_cart_lines(metadata.get('cart'))
+    priced = price_lines(lines, strict=strict)
+    if strict and not priced:
+        raise QuoteError('Cart is empty or invalid')
+
+    return CheckoutQuote(
+        currency=currency,
+        rate=ngn_per_unit(currency, fx),
+        lines=priced,
+        delivery_type=delivery['delivery_type'],
+        international_region=delivery['international_region'],
+        country=delivery['country'],
+        delivery_fee_ngn=delivery['delivery_fee_ngn'],
+    )
+
+
+def load_quote(token):
+    """A quote presented to start a payment: signed by us and still fresh."""
+    return CheckoutQuote.unsign(token, max_age=settings.CHECKOUT_QUOTE_TTL)
+
+
+def quote_for_payment(metadata, cart, currency) -> CheckoutQuote:
+    """
+    The quote a completed payment was started with. Payments started before
+    quotes existed carry only their cart, which is priced leniently instead.
+    """
+    token = (metadata or {}).get('quote')
+    if token:
+        try:
+            return CheckoutQuote.unsign(token)
+        except QuoteError:
+            logger.warning('Ignoring an invalid checkout quote in payment metadata')
+    return build_quote(currency=currency, metadata={**(metadata or {}), 'cart': cart}, strict=False)
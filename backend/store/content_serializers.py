@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from bluewardrobe.media_urls import media_url
+
 from .models import (
     BlogComment,
     BlogCommentLike,
@@ -8,13 +10,14 @@ from .models import (
     BlogPostMedia,
     BusinessProfile,
 )
+from .serializers import ResponsiveImageMixin
 
 
 def build_file_url(request, field):
     if not field:
         return None
     try:
-        url = field.url
+        url = media_url(field)
     except Exception:
         return str(field)
     if request and not url.startswith(('http://', 'https://')):
@@ -47,16 +50,23 @@ class BusinessProfileSerializer(serializers.ModelSerializer):
         return build_file_url(self.context.get('request'), obj.ceo_photo)
 
 
-class BlogPostMediaSerializer(serializers.ModelSerializer):
+class BlogPostMediaSerializer(ResponsiveImageMixin, serializers.ModelSerializer):
     file = serializers.SerializerMethodField()
+    responsive_image_field = 'file'
 
     class Meta:
         model = BlogPostMedia
-        fields = ['id', 'media_type', 'file', 'caption', 'alt_text', 'order', 'created_at']
+        fields = ['id', 'media_type', 'file', 'srcset', 'sources', 'caption', 'alt_text', 'order', 'created_at']
 
     def get_file(self, obj):
         return build_file_url(self.context.get('request'), obj.file)
 
+    def _responsive_file(self, obj):
+        # Videos share the field but have no image variants.
+        if obj.media_type != 'image':
+            return None
+        return obj.file
+
 
 class BlogCommentLikeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -324,7 +334,9 @@ class AdminBlogCommentSerializer(serializers.ModelSerializer):
         return obj.post.title
 
     def get_likes_count(self, obj):
-        return obj.likes.count()
+        # AdminBlogCommentViewSet annotates the count; single saves fall back to counting.
+        like_total = getattr(obj, 'like_total', None)
+        return like_total if like_total is not None else obj.likes.count()
 
 
 class AdminBlogPostLikeSerializer(serializers.ModelSerializer):
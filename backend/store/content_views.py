@@ -1,12 +1,13 @@
 import hashlib
 
-from django.db.models import Prefetch
+from django.db.models import Count, Prefetch
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
+from .admin_api import AdminListMixin
 from .content_serializers import (
     AdminBlogCommentLikeSerializer,
     AdminBlogCommentSerializer,
@@ -19,6 +20,7 @@ from .content_serializers import (
     BlogPostListSerializer,
     BusinessProfileSerializer,
 )
+from .fast_lists import BlogPostRows, FastListMixin
 from .models import (
     BlogComment,
     BlogCommentLike,
@@ -53,13 +55,14 @@ class BusinessProfileViewSet(viewsets.ReadOnlyModelViewSet):
         return context
 
 
-class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogPostViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = BlogPost.objects.filter(is_published=True).prefetch_related(
         'media_items',
         Prefetch('comments', queryset=BlogComment.objects.select_related('parent').prefetch_related('likes', 'replies__likes')),
         'likes',
     ).select_related('author')
     lookup_field = 'slug'
+    row_serializer_class = BlogPostRows
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -190,19 +193,28 @@ class AdminBlogPostMediaViewSet(viewsets.ModelViewSet):
         return context
 
 
-class AdminBlogCommentViewSet(viewsets.ModelViewSet):
-    queryset = BlogComment.objects.all().select_related('post', 'parent').prefetch_related('likes').order_by('-created_at')
+class AdminBlogCommentViewSet(AdminListMixin, viewsets.ModelViewSet):
+    queryset = BlogComment.objects.all().select_related('post').annotate(like_total=Count('likes'))
     serializer_class = AdminBlogCommentSerializer
     permission_classes = [IsAdminUser]
+    filter_params = {'post': 'post_id', 'is_approved': 'is_approved'}
+    search_fields = ['author_name', 'author_email', 'body']
+    ordering_fields = ['created_at']
 
 
-class AdminBlogPostLikeViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = BlogPostLike.objects.all().select_related('post').order_by('-created_at')
+class AdminBlogPostLikeViewSet(AdminListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = BlogPostLike.objects.all().select_related('post')
     serializer_class = AdminBlogPostLikeSerializer
     permission_classes = [IsAdminUser]
+    filter_params = {'post': 'post_id'}
+    search_fields = ['visitor_name', 'visitor_email', 'visitor_id']
+    ordering_fields = ['created_at']
 
 
-class AdminBlogCommentLikeViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = BlogCommentLike.objects.all().select_related('comment', 'comment__post').order_by('-created_at')
+class AdminBlogCommentLikeViewSet(AdminListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = BlogCommentLike.objects.all().select_related('comment__post')
     serializer_class = AdminBlogCommentLikeSerializer
     permission_classes = [IsAdminUser]
+    filter_params = {'comment': 'comment_id', 'post': 'comment__post_id'}
+    search_fields = ['visitor_name', 'visitor_email', 'visitor_id']
+    ordering_fields = ['created_at']
@@ -1,11 +1,12 @@
 """
 FX conversion for NGN catalogue prices → USD/GBP display and Flutterwave checkout.
-Rates and delivery fees are configured in StoreCurrencySettings (singleton).
+Rates and delivery fees are configured in StoreCurrencySettings (singleton);
+display conversions read the in-memory rate table from store.fx.
 """
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import Any
+from typing import Any, Mapping
 
 ALLOWED_CHARGE_CURRENCIES = frozenset({"NGN", "USD", "GBP"})
 ALLOWED_INTERNATIONAL_REGIONS = frozenset({"US", "UK", "CA"})
@@ -17,15 +18,11 @@ REGION_COUNTRY_LABELS = {
 }
 
 
-def get_fx_for_serializer_context() -> dict[str, float]:
-    from .models import StoreCurrencySettings
+def get_fx_for_serializer_context() -> Mapping[str, float]:
+    """Read-only ``{"ngn_per_usd": ..., ...}`` for DesignSerializer; costs no query while the table is fresh."""
+    from .fx import current_rates
 
-    s = StoreCurrencySettings.get_solo()
-    return {
-        "ngn_per_usd": float(s.ngn_per_usd),
-        "ngn_per_gbp": float(s.ngn_per_gbp),
-        "ngn_per_cad": float(s.ngn_per_cad),
-    }
+    return current_rates().serializer_context
 
 
 def public_fx_dict() -> dict[str, str]:
@@ -41,44 +38,34 @@ def public_fx_dict() -> dict[str, str]:
     }
 
 
-def convert_from_ngn(amount_ngn: Decimal, currency: str) -> Decimal:
+def ngn_per_unit(currency: str, settings_obj=None) -> Decimal:
+    """
+    NGN per 1 unit of ``currency`` (1 for NGN). Pass ``settings_obj`` to use
+    one StoreCurrencySettings snapshot (checkout does); otherwise the
+    in-memory rate table is used.
+    """
     c = (currency or "NGN").upper()
     if c == "NGN":
-        return Decimal(amount_ngn).quantize(Decimal("0.01"))
-    from .models import StoreCurrencySettings
+        return Decimal("1")
+    from .fx import RATE_FIELDS, current_rates
 
-    s = StoreCurrencySettings.get_solo()
-    if c == "USD":
-        divisor = s.ngn_per_usd
-    elif c == "GBP":
-        divisor = s.ngn_per_gbp
-    elif c == "CAD":
-        divisor = s.ngn_per_cad
-    else:
+    if c not in RATE_FIELDS:
         raise ValueError(f"Unsupported currency: {currency}")
+    if settings_obj is not None:
+        divisor = getattr(settings_obj, RATE_FIELDS[c])
+    else:
+        divisor = current_rates().rates[c]
     if divisor <= 0:
         raise ValueError("Invalid FX divisor")
-    return (Decimal(amount_ngn) / Decimal(divisor)).quantize(Decimal("0.01"))
-
+    return Decimal(divisor)
 
-def cart_total_ngn(cart_lines: list[dict[str, Any]]) -> Decimal:
-    """Sum catalogue (NGN) line totals from cart metadata [{id, size, qty}, ...]."""
-    from .models import Design
 
-    total = Decimal("0")
-    for item in cart_lines:
-        design_id = item.get("id")
-        qty = int(item.get("qty") or 1)
-        if not design_id:
-            continue
-        design = Design.objects.filter(id=design_id).first()
-        if not design:
-            continue
-        total += Decimal(str(design.effective_price)) * qty
-    return total.quantize(Decimal("0.01"))
+def convert_from_ngn(amount_ngn: Decimal, currency: str, settings_obj=None) -> Decimal:
+    divisor = ngn_per_unit(currency, settings_obj)
+    return (Decimal(amount_ngn) / divisor).quantize(Decimal("0.01"))
 
 
-def resolve_delivery_from_metadata(metadata: dict[str, Any] | None) -> dict[str, Any]:
+def resolve_delivery_from_metadata(metadata: dict[str, Any] | None, settings_obj=None) -> dict[str, Any]:
     """
     Derive delivery_type, region, country, and NGN delivery fee from checkout metadata
     + StoreCurrencySettings.
@@ -102,7 +89,7 @@ def resolve_delivery_from_metadata(metadata: dict[str, Any] | None) -> dict[str,
     if region not in ALLOWED_INTERNATIONAL_REGIONS:
         region = ""
 
-    settings_obj = StoreCurrencySettings.get_solo()
+    settings_obj = settings_obj or StoreCurrencySettings.get_solo()
     if is_intl:
         fee = Decimal(str(settings_obj.international_delivery_fee)).quantize(Decimal("0.01"))
         country = REGION_COUNTRY_LABELS.get(region, "International")
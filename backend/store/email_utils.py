@@ -1,13 +1,67 @@
 """
 HTML email bodies for Resend (orders and newsletter).
+
+Every template is compiled once, at import, into its literal text and
+``{slot}`` names, so rendering an email is a single join in which only the
+per-order values are escaped and formatted. The shell is compiled again,
+with the logo, site name and links baked in, only when the brand changes.
+The brand itself is cached: the SiteAsset logo lookup runs once, and
+store.signals drops the cached brand whenever a SiteAsset is saved or deleted.
 """
 from __future__ import annotations
 
+import functools
 import html
+import logging
 from decimal import Decimal
+from string import Formatter
 from typing import Any
 
 from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+EMAIL_BRAND_CACHE_KEY = "email-brand"
+
+
+class EmailTemplate:
+    """
+    Markup with ``{slot}`` placeholders, parsed once. ``render`` takes every
+    slot as an already-escaped string; ``fill`` bakes some slots in and
+    returns the smaller template.
+    """
+
+    __slots__ = ("_pieces",)
+
+    def __init__(self, source: str = "", *, pieces: tuple = ()):
+        if source:
+            pieces = []
+            for literal, slot, _, _ in Formatter().parse(source):
+                if literal:
+                    pieces.append((literal, None))
+                if slot is not None:
+                    pieces.append(("", slot))
+        merged: list[tuple[str, str | None]] = []
+        for literal, slot in pieces:
+            if slot is None and merged and merged[-1][1] is None:
+                merged[-1] = (merged[-1][0] + literal, None)
+            else:
+                merged.append((literal, slot))
+        self._pieces = tuple(merged)
+
+    @property
+    def slots(self) -> set[str]:
+        return {slot for _, slot in self._pieces if slot is not None}
+
+    def render(self, **values: str) -> str:
+        return "".join(literal if slot is None else values[slot] for literal, slot in self._pieces)
+
+    def fill(self, **values: str) -> EmailTemplate:
+        return EmailTemplate(pieces=tuple(
+            (values[slot], None) if slot in values else (literal, slot)
+            for literal, slot in self._pieces
+        ))
 
 
 def _fmt_money(amount: Decimal | float, currency: str) -> str:
@@ -16,11 +70,12 @@ def _fmt_money(amount: Decimal | float, currency: str) -> str:
     return f"{cur} {val}"
 
 
-def get_email_brand() -> dict[str, str]:
-    """Logo URL and site links for transactional emails."""
+def _load_email_brand() -> tuple[dict[str, str], bool]:
+    """The brand, and whether it is safe to cache (False when the logo lookup failed)."""
     logo_url = (getattr(settings, "EMAIL_LOGO_URL", None) or "").strip()
     site_url = getattr(settings, "PUBLIC_SITE_URL", "https://www.thebluewardrobe.com").rstrip("/")
     site_name = getattr(settings, "SITE_NAME", "THE BLUE WARDROBE")
+    cacheable = True
 
     if not logo_url:
         try:
@@ -34,91 +89,56 @@ def get_email_brand() -> dict[str, str]:
                 elif isinstance(raw, str) and raw:
                     logo_url = f"{site_url}{raw}" if raw.startswith("/") else f"{site_url}/{raw}"
         except Exception:
+            logger.warning("Email logo lookup failed; using the favicon", exc_info=True)
             logo_url = ""
+            cacheable = False
 
     if not logo_url:
         logo_url = f"{site_url}/favicon.ico"
 
-    return {
+    brand = {
         "logo_url": logo_url,
         "site_url": site_url,
         "site_name": site_name,
     }
+    return brand, cacheable
 
 
-def _line_items_rows(items: list[dict[str, Any]], currency: str) -> str:
-    rows = []
-    for it in items:
-        title = html.escape(str(it.get("title") or "Design"))
-        size = html.escape(str(it.get("size") or ""))
-        qty = int(it.get("quantity") or 1)
-        unit = it.get("unit_price", 0)
-        line_total = it.get("line_total")
-        if line_total is None:
-            line_total = float(unit) * qty
-        rows.append(
-            f"""<tr>
-              <td style="padding:12px 0;border-bottom:1px solid #e8ecf1;font-size:14px;color:#1e293b;">
-                <strong>{title}</strong><br>
-                <span style="color:#64748b;font-size:12px;">Size {size}</span>
-              </td>
-              <td align="center" style="padding:12px 8px;border-bottom:1px solid #e8ecf1;font-size:14px;color:#334155;">{qty}</td>
-              <td align="right" style="padding:12px 0;border-bottom:1px solid #e8ecf1;font-size:14px;color:#1e293b;white-space:nowrap;">
-                {_fmt_money(line_total, currency)}
-              </td>
-            </tr>"""
-        )
-    if not rows:
-        rows.append(
-            '<tr><td colspan="3" style="padding:16px 0;color:#64748b;font-size:14px;">'
-            "Line items will appear in your dashboard.</td></tr>"
-        )
-    return "".join(rows)
+def get_email_brand() -> dict[str, str]:
+    """
+    Logo URL and site links for transactional emails, kept in the shared
+    default cache until a SiteAsset changes (every worker sees the drop).
+    """
+    brand = cache.get(EMAIL_BRAND_CACHE_KEY)
+    if brand is None:
+        brand, cacheable = _load_email_brand()
+        if cacheable:
+            # Not cached otherwise: a database hiccup must not pin every email to the favicon.
+            cache.set(EMAIL_BRAND_CACHE_KEY, brand, getattr(settings, "EMAIL_BRAND_CACHE_TIMEOUT", 3600))
+    return brand
 
 
-def _email_shell(
-    *,
-    preheader: str,
-    headline: str,
-    body_html: str,
-    cta_label: str | None = None,
-    cta_url: str | None = None,
-) -> str:
-    brand = get_email_brand()
-    logo = html.escape(brand["logo_url"])
-    site_name = html.escape(brand["site_name"])
-    site_url = html.escape(brand["site_url"])
-    pre = html.escape(preheader)
-    head = html.escape(headline)
+def invalidate_email_brand() -> None:
+    cache.delete(EMAIL_BRAND_CACHE_KEY)
 
-    cta_block = ""
-    if cta_label and cta_url:
-        cta_block = f"""
-        <tr><td align="center" style="padding:8px 32px 32px;">
-          <a href="{html.escape(cta_url)}"
-             style="display:inline-block;background:#1e3a8a;color:#ffffff;text-decoration:none;
-                    font-size:14px;font-weight:600;letter-spacing:0.04em;padding:14px 28px;border-radius:999px;">
-            {html.escape(cta_label)}
-          </a>
-        </td></tr>"""
 
-    return f"""<!DOCTYPE html>
+_SHELL = EmailTemplate("""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="utf-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <meta name="color-scheme" content="light" />
-  <title>{head}</title>
+  <title>{headline}</title>
 </head>
 <body style="margin:0;padding:0;background:#eef1f6;font-family:Georgia,'Times New Roman',Times,serif;color:#0f172a;">
-  <div style="display:none;max-height:0;overflow:hidden;opacity:0;">{pre}</div>
+  <div style="display:none;max-height:0;overflow:hidden;opacity:0;">{preheader}</div>
   <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="background:linear-gradient(180deg,#eef1f6 0%,#f8fafc 100%);padding:40px 16px;">
     <tr><td align="center">
       <table role="presentation" width="100%" style="max-width:600px;background:#ffffff;border-radius:16px;overflow:hidden;box-shadow:0 12px 40px rgba(15,23,42,0.08);">
         <tr>
           <td style="background:linear-gradient(135deg,#1e3a8a 0%,#312e81 55%,#1e40af 100%);padding:28px 32px;text-align:center;">
             <a href="{site_url}" style="text-decoration:none;">
-              <img src="{logo}" alt="{site_name}" width="88" height="88"
+              <img src="{logo_url}" alt="{site_name}" width="88" height="88"
                    style="display:block;margin:0 auto 14px;border-radius:50%;border:3px solid rgba(255,255,255,0.35);background:#ffffff;object-fit:cover;" />
             </a>
             <p style="margin:0;font-size:11px;letter-spacing:0.28em;text-transform:uppercase;color:rgba(255,255,255,0.85);">{site_name}</p>
@@ -126,7 +146,7 @@ def _email_shell(
         </tr>
         <tr>
           <td style="padding:32px 32px 8px;">
-            <h1 style="margin:0;font-size:26px;font-weight:600;line-height:1.3;color:#0f172a;">{head}</h1>
+            <h1 style="margin:0;font-size:26px;font-weight:600;line-height:1.3;color:#0f172a;">{headline}</h1>
           </td>
         </tr>
         <tr><td style="padding:0 32px 24px;font-size:16px;line-height:1.65;color:#334155;">
@@ -137,7 +157,7 @@ def _email_shell(
           <td style="padding:24px 32px 32px;border-top:1px solid #e8ecf1;text-align:center;">
             <p style="margin:0 0 6px;font-size:12px;color:#94a3b8;letter-spacing:0.06em;text-transform:uppercase;">The Dress Diaries</p>
             <p style="margin:0;font-size:13px;color:#64748b;">
-              <a href="{site_url}" style="color:#1e40af;text-decoration:none;">{site_url.replace('https://','').replace('http://','')}</a>
+              <a href="{site_url}" style="color:#1e40af;text-decoration:none;">{site_host}</a>
             </p>
           </td>
         </tr>
@@ -145,12 +165,174 @@ def _email_shell(
     </td></tr>
   </table>
 </body>
-</html>"""
+</html>""")
+
+_CTA = EmailTemplate("""
+        <tr><td align="center" style="padding:8px 32px 32px;">
+          <a href="{cta_url}"
+             style="display:inline-block;background:#1e3a8a;color:#ffffff;text-decoration:none;
+                    font-size:14px;font-weight:600;letter-spacing:0.04em;padding:14px 28px;border-radius:999px;">
+            {cta_label}
+          </a>
+        </td></tr>""")
+
+_ITEM_ROW = EmailTemplate("""<tr>
+              <td style="padding:12px 0;border-bottom:1px solid #e8ecf1;font-size:14px;color:#1e293b;">
+                <strong>{title}</strong><br>
+                <span style="color:#64748b;font-size:12px;">Size {size}</span>
+              </td>
+              <td align="center" style="padding:12px 8px;border-bottom:1px solid #e8ecf1;font-size:14px;color:#334155;">{qty}</td>
+              <td align="right" style="padding:12px 0;border-bottom:1px solid #e8ecf1;font-size:14px;color:#1e293b;white-space:nowrap;">
+                {line_total}
+              </td>
+            </tr>""")
+
+_NO_ITEMS = (
+    '<tr><td colspan="3" style="padding:16px 0;color:#64748b;font-size:14px;">'
+    "Line items will appear in your dashboard.</td></tr>"
+)
+
+_CUSTOMER_BODY = EmailTemplate("""
+      <p style="margin:0 0 20px;">Dear customer{greeting_name},</p>
+      <p style="margin:0 0 24px;">Thank you for choosing us. Your payment was successful and we are preparing your order with care.</p>
+      <table role="presentation" width="100%" style="background:#f8fafc;border-radius:12px;padding:20px 22px;margin-bottom:8px;">
+        <tr><td>
+          <p style="margin:0 0 6px;font-size:12px;color:#64748b;letter-spacing:0.06em;text-transform:uppercase;">Order number</p>
+          <p style="margin:0 0 16px;font-size:22px;font-weight:700;color:#1e3a8a;">#{order_id}</p>
+          <p style="margin:0 0 6px;font-size:12px;color:#64748b;letter-spacing:0.06em;text-transform:uppercase;">Amount paid</p>
+          <p style="margin:0;font-size:24px;font-weight:700;color:#0f172a;">{total}</p>
+          {subtotal_line}
+        </td></tr>
+      </table>
+      {delivery_block}
+      <p style="margin:28px 0 12px;font-size:13px;color:#64748b;text-transform:uppercase;letter-spacing:0.08em;">Your designs</p>
+      <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="border-top:2px solid #e8ecf1;">
+        <tr>
+          <th align="left" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:0.06em;">Item</th>
+          <th align="center" style="padding:10px 8px;font-size:11px;color:#94a3b8;text-transform:uppercase;">Qty</th>
+          <th align="right" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;">Total</th>
+        </tr>
+        {items_html}
+      </table>
+      <p style="margin:24px 0 0;font-size:14px;color:#64748b;">We will contact you when your order ships. Questions? Reply to this email.</p>
+    """)
+
+_CUSTOMER_DELIVERY = EmailTemplate("""
+        <p style="margin:20px 0 8px;font-size:13px;color:#64748b;text-transform:uppercase;letter-spacing:0.08em;">Delivery</p>
+        <div style="margin:0;padding:14px 16px;background:#f8fafc;border-radius:10px;">
+          {fee_line}
+          {country_line}
+          <p style="margin:12px 0 0;font-size:14px;line-height:1.5;color:#1e293b;white-space:pre-wrap;">{delivery_address}</p>
+        </div>""")
+
+_CUSTOMER_DELIVERY_NO_ADDRESS = EmailTemplate("""
+        <p style="margin:20px 0 8px;font-size:13px;color:#64748b;text-transform:uppercase;letter-spacing:0.08em;">Delivery</p>
+        <div style="margin:0;padding:14px 16px;background:#f8fafc;border-radius:10px;">{fee_line}{country_line}</div>""")
+
+_CUSTOMER_FEE_LINE = EmailTemplate(
+    '<p style="margin:8px 0 0;font-size:14px;color:#1e293b;"><strong>{label}</strong>: {fee}</p>'
+)
+_CUSTOMER_COUNTRY_LINE = EmailTemplate('<p style="margin:4px 0 0;font-size:13px;color:#64748b;">Ship to: {country}</p>')
+_CUSTOMER_SUBTOTAL_LINE = EmailTemplate('<p style="margin:12px 0 0;font-size:13px;color:#64748b;">Merchandise: {subtotal}</p>')
+
+_OWNER_BODY = EmailTemplate("""
+      <p style="margin:0 0 20px;"><strong>New paid order</strong> — action required for fulfillment.</p>
+      <table role="presentation" width="100%" style="background:#fff7ed;border:1px solid #fed7aa;border-radius:12px;padding:18px 20px;margin-bottom:20px;">
+        <tr><td>
+          <p style="margin:0 0 8px;font-size:12px;color:#9a3412;text-transform:uppercase;letter-spacing:0.06em;">Order #{order_id}</p>
+          <p style="margin:0;font-size:22px;font-weight:700;color:#0f172a;">{total}</p>
+          {ngn_note}
+          <p style="margin:12px 0 0;font-size:14px;"><span style="display:inline-block;padding:4px 10px;border-radius:999px;background:{badge_background};color:{badge_color};font-weight:600;">{delivery_type_label}</span></p>
+        </td></tr>
+      </table>
+      <table role="presentation" width="100%" style="margin-bottom:20px;">
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Customer</span><br><strong>{customer_name}</strong></td></tr>
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Email</span><br><a href="mailto:{customer_email_address}" style="color:#1e40af;">{customer_email}</a></td></tr>
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Phone</span><br><strong>{customer_phone}</strong></td></tr>
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Delivery type</span><br><strong>{delivery_type_label}</strong></td></tr>
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Country</span><br><strong>{country}</strong></td></tr>
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">{delivery_fee_label}</span><br><strong>{fee_display}</strong></td></tr>
+        {subtotal_line}
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Payment</span><br><strong>{payment_provider}</strong>
+          {payment_reference}
+        </td></tr>
+        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Delivery address</span><br>
+          <span style="white-space:pre-wrap;">{delivery_address}</span></td></tr>
+      </table>
+      <table role="presentation" width="100%" cellspacing="0" cellpadding="0">
+        <tr>
+          <th align="left" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;">Item</th>
+          <th align="center" style="padding:10px 8px;font-size:11px;color:#94a3b8;text-transform:uppercase;">Qty</th>
+          <th align="right" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;">Total</th>
+        </tr>
+        {items_html}
+      </table>
+    """)
+
+_OWNER_NGN_NOTE = EmailTemplate('<p style="margin:8px 0 0;font-size:13px;color:#64748b;">NGN equivalent: {amount}</p>')
+_OWNER_SUBTOTAL_LINE = EmailTemplate(
+    '<tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Merchandise subtotal</span><br>'
+    '<strong>{subtotal}</strong></td></tr>'
+)
+_OWNER_REFERENCE = EmailTemplate(
+    '<br><span style="font-size:12px;color:#64748b;word-break:break-all;">{reference}</span>'
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _branded_shell(logo_url: str, site_url: str, site_name: str) -> EmailTemplate:
+    site_url = html.escape(site_url)
+    return _SHELL.fill(
+        logo_url=html.escape(logo_url),
+        site_name=html.escape(site_name),
+        site_url=site_url,
+        site_host=site_url.replace("https://", "").replace("http://", ""),
+    )
+
+
+def _email_shell(
+    *,
+    preheader: str,
+    headline: str,
+    body_html: str,
+    cta_label: str | None = None,
+    cta_url: str | None = None,
+) -> str:
+    brand = get_email_brand()
+    shell = _branded_shell(brand["logo_url"], brand["site_url"], brand["site_name"])
+    cta_block = ""
+    if cta_label and cta_url:
+        cta_block = _CTA.render(cta_url=html.escape(cta_url), cta_label=html.escape(cta_label))
+    return shell.render(
+        preheader=html.escape(preheader),
+        headline=html.escape(headline),
+        body_html=body_html,
+        cta_block=cta_block,
+    )
+
+
+def _line_items_rows(items: list[dict[str, Any]], currency: str) -> str:
+    rows = []
+    for it in items:
+        qty = int(it.get("quantity") or 1)
+        line_total = it.get("line_total")
+        if line_total is None:
+            line_total = float(it.get("unit_price", 0)) * qty
+        rows.append(_ITEM_ROW.render(
+            title=html.escape(str(it.get("title") or "Design")),
+            size=html.escape(str(it.get("size") or "")),
+            qty=str(qty),
+            line_total=_fmt_money(line_total, currency),
+        ))
+    return "".join(rows) or _NO_ITEMS
 
 
 def order_items_from_order(order) -> list[dict[str, Any]]:
     items = []
-    for row in order.items.select_related("design").all():
+    rows = order.items.all()
+    if "items" not in getattr(order, "_prefetched_objects_cache", {}):
+        rows = rows.select_related("design")
+    for row in rows:
         qty = row.quantity
         unit = float(row.unit_price)
         items.append(
@@ -182,8 +364,6 @@ def order_confirmation_customer_html(
 ) -> str:
     del site_name  # brand from settings
     cur = (currency or "NGN").upper()
-    name_bit = f", {html.escape(customer_name)}" if customer_name else ""
-    items_html = _line_items_rows(line_items or [], cur)
 
     is_intl = (delivery_type or "local").lower() == "international"
     if is_intl:
@@ -193,60 +373,30 @@ def order_confirmation_customer_html(
         delivery_label = "Delivery (Nigeria)"
 
     fee_val = Decimal(str(delivery_fee or 0))
-    fee_line = (
-        f'<p style="margin:8px 0 0;font-size:14px;color:#1e293b;"><strong>{html.escape(delivery_label)}</strong>: {_fmt_money(fee_val, "NGN")}</p>'
-        if fee_val > 0
-        else f'<p style="margin:8px 0 0;font-size:14px;color:#1e293b;"><strong>{html.escape(delivery_label)}</strong>: FREE</p>'
+    fee_line = _CUSTOMER_FEE_LINE.render(
+        label=html.escape(delivery_label),
+        fee=_fmt_money(fee_val, "NGN") if fee_val > 0 else "FREE",
     )
-    country_line = ""
-    if country:
-        country_line = f'<p style="margin:4px 0 0;font-size:13px;color:#64748b;">Ship to: {html.escape(country)}</p>'
-
-    addr_block = ""
+    country_line = _CUSTOMER_COUNTRY_LINE.render(country=html.escape(country)) if country else ""
     if delivery_address.strip():
-        addr_block = f"""
-        <p style="margin:20px 0 8px;font-size:13px;color:#64748b;text-transform:uppercase;letter-spacing:0.08em;">Delivery</p>
-        <div style="margin:0;padding:14px 16px;background:#f8fafc;border-radius:10px;">
-          {fee_line}
-          {country_line}
-          <p style="margin:12px 0 0;font-size:14px;line-height:1.5;color:#1e293b;white-space:pre-wrap;">{html.escape(delivery_address.strip())}</p>
-        </div>"""
+        delivery_block = _CUSTOMER_DELIVERY.render(
+            fee_line=fee_line, country_line=country_line, delivery_address=html.escape(delivery_address.strip()),
+        )
     else:
-        addr_block = f"""
-        <p style="margin:20px 0 8px;font-size:13px;color:#64748b;text-transform:uppercase;letter-spacing:0.08em;">Delivery</p>
-        <div style="margin:0;padding:14px 16px;background:#f8fafc;border-radius:10px;">{fee_line}{country_line}</div>"""
-
-    subtotal_block = ""
-    if subtotal is not None:
-        subtotal_block = f'<p style="margin:12px 0 0;font-size:13px;color:#64748b;">Merchandise: {_fmt_money(subtotal, cur)}</p>'
-
-    body = f"""
-      <p style="margin:0 0 20px;">Dear customer{name_bit},</p>
-      <p style="margin:0 0 24px;">Thank you for choosing us. Your payment was successful and we are preparing your order with care.</p>
-      <table role="presentation" width="100%" style="background:#f8fafc;border-radius:12px;padding:20px 22px;margin-bottom:8px;">
-        <tr><td>
-          <p style="margin:0 0 6px;font-size:12px;color:#64748b;letter-spacing:0.06em;text-transform:uppercase;">Order number</p>
-          <p style="margin:0 0 16px;font-size:22px;font-weight:700;color:#1e3a8a;">#{order_id}</p>
-          <p style="margin:0 0 6px;font-size:12px;color:#64748b;letter-spacing:0.06em;text-transform:uppercase;">Amount paid</p>
-          <p style="margin:0;font-size:24px;font-weight:700;color:#0f172a;">{_fmt_money(total, cur)}</p>
-          {subtotal_block}
-        </td></tr>
-      </table>
-      {addr_block}
-      <p style="margin:28px 0 12px;font-size:13px;color:#64748b;text-transform:uppercase;letter-spacing:0.08em;">Your designs</p>
-      <table role="presentation" width="100%" cellspacing="0" cellpadding="0" style="border-top:2px solid #e8ecf1;">
-        <tr>
-          <th align="left" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;letter-spacing:0.06em;">Item</th>
-          <th align="center" style="padding:10px 8px;font-size:11px;color:#94a3b8;text-transform:uppercase;">Qty</th>
-          <th align="right" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;">Total</th>
-        </tr>
-        {items_html}
-      </table>
-      <p style="margin:24px 0 0;font-size:14px;color:#64748b;">We will contact you when your order ships. Questions? Reply to this email.</p>
-    """
+        delivery_block = _CUSTOMER_DELIVERY_NO_ADDRESS.render(fee_line=fee_line, country_line=country_line)
+
+    total_display = _fmt_money(total, cur)
+    body = _CUSTOMER_BODY.render(
+        greeting_name=f", {html.escape(customer_name)}" if customer_name else "",
+        order_id=str(order_id),
+        total=total_display,
+        subtotal_line=_CUSTOMER_SUBTOTAL_LINE.render(subtotal=_fmt_money(subtotal, cur)) if subtotal is not None else "",
+        delivery_block=delivery_block,
+        items_html=_line_items_rows(line_items or [], cur),
+    )
     brand = get_email_brand()
     return _email_shell(
-        preheader=f"Order #{order_id} confirmed — {_fmt_money(total, cur)}",
+        preheader=f"Order #{order_id} confirmed — {total_display}",
         headline="Your order is confirmed",
         body_html=body,
         cta_label="Visit our boutique",
@@ -276,10 +426,9 @@ def order_notification_owner_html(
 ) -> str:
     del site_name
     cur = (currency or "NGN").upper()
-    items_html = _line_items_rows(line_items or [], cur)
     ngn_note = ""
     if total_ngn_equivalent is not None and cur != "NGN":
-        ngn_note = f'<p style="margin:8px 0 0;font-size:13px;color:#64748b;">NGN equivalent: {_fmt_money(total_ngn_equivalent, "NGN")}</p>'
+        ngn_note = _OWNER_NGN_NOTE.render(amount=_fmt_money(total_ngn_equivalent, "NGN"))
 
     is_intl = (delivery_type or "local").lower() == "international"
     if is_intl:
@@ -291,44 +440,26 @@ def order_notification_owner_html(
         delivery_fee_label = "Delivery (Nigeria)"
 
     fee_val = Decimal(str(delivery_fee or 0))
-    fee_display = _fmt_money(fee_val, "NGN") if fee_val > 0 else "FREE"
-    subtotal_line = ""
-    if subtotal is not None:
-        subtotal_line = f'<tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Merchandise subtotal</span><br><strong>{_fmt_money(subtotal, cur)}</strong></td></tr>'
-
-    body = f"""
-      <p style="margin:0 0 20px;"><strong>New paid order</strong> — action required for fulfillment.</p>
-      <table role="presentation" width="100%" style="background:#fff7ed;border:1px solid #fed7aa;border-radius:12px;padding:18px 20px;margin-bottom:20px;">
-        <tr><td>
-          <p style="margin:0 0 8px;font-size:12px;color:#9a3412;text-transform:uppercase;letter-spacing:0.06em;">Order #{order_id}</p>
-          <p style="margin:0;font-size:22px;font-weight:700;color:#0f172a;">{_fmt_money(total, cur)}</p>
-          {ngn_note}
-          <p style="margin:12px 0 0;font-size:14px;"><span style="display:inline-block;padding:4px 10px;border-radius:999px;background:{'#dbeafe' if is_intl else '#ecfdf5'};color:{'#1e40af' if is_intl else '#047857'};font-weight:600;">{html.escape(delivery_type_label)}</span></p>
-        </td></tr>
-      </table>
-      <table role="presentation" width="100%" style="margin-bottom:20px;">
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Customer</span><br><strong>{html.escape(customer_name or "—")}</strong></td></tr>
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Email</span><br><a href="mailto:{html.escape(customer_email)}" style="color:#1e40af;">{html.escape(customer_email or "—")}</a></td></tr>
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Phone</span><br><strong>{html.escape(customer_phone or "—")}</strong></td></tr>
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Delivery type</span><br><strong>{html.escape(delivery_type_label)}</strong></td></tr>
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Country</span><br><strong>{html.escape(country or ("International" if is_intl else "Nigeria"))}</strong></td></tr>
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">{html.escape(delivery_fee_label)}</span><br><strong>{fee_display}</strong></td></tr>
-        {subtotal_line}
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Payment</span><br><strong>{html.escape(payment_provider or "—")}</strong>
-          {f'<br><span style="font-size:12px;color:#64748b;word-break:break-all;">{html.escape(payment_reference)}</span>' if payment_reference else ""}
-        </td></tr>
-        <tr><td style="padding:8px 0;font-size:14px;"><span style="color:#64748b;">Delivery address</span><br>
-          <span style="white-space:pre-wrap;">{html.escape(delivery_address.strip() or "Not provided")}</span></td></tr>
-      </table>
-      <table role="presentation" width="100%" cellspacing="0" cellpadding="0">
-        <tr>
-          <th align="left" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;">Item</th>
-          <th align="center" style="padding:10px 8px;font-size:11px;color:#94a3b8;text-transform:uppercase;">Qty</th>
-          <th align="right" style="padding:10px 0;font-size:11px;color:#94a3b8;text-transform:uppercase;">Total</th>
-        </tr>
-        {items_html}
-      </table>
-    """
+    body = _OWNER_BODY.render(
+        order_id=str(order_id),
+        total=_fmt_money(total, cur),
+        ngn_note=ngn_note,
+        badge_background="#dbeafe" if is_intl else "#ecfdf5",
+        badge_color="#1e40af" if is_intl else "#047857",
+        delivery_type_label=html.escape(delivery_type_label),
+        customer_name=html.escape(customer_name or "—"),
+        customer_email_address=html.escape(customer_email),
+        customer_email=html.escape(customer_email or "—"),
+        customer_phone=html.escape(customer_phone or "—"),
+        country=html.escape(country or ("International" if is_intl else "Nigeria")),
+        delivery_fee_label=html.escape(delivery_fee_label),
+        fee_display=_fmt_money(fee_val, "NGN") if fee_val > 0 else "FREE",
+        subtotal_line=_OWNER_SUBTOTAL_LINE.render(subtotal=_fmt_money(subtotal, cur)) if subtotal is not None else "",
+        payment_provider=html.escape(payment_provider or "—"),
+        payment_reference=_OWNER_REFERENCE.render(reference=html.escape(payment_reference)) if payment_reference else "",
+        delivery_address=html.escape(delivery_address.strip() or "Not provided"),
+        items_html=_line_items_rows(line_items or [], cur),
+    )
     brand = get_email_brand()
     owner_url = f"{brand['site_url']}/owner/"
     return _email_shell(
@@ -340,6 +471,43 @@ def order_notification_owner_html(
     )
 
 
+def order_email_kwargs(order, customer_email: str | None = None) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Keyword arguments for order_confirmation_customer_html and
+    order_notification_owner_html, from an order with its customer selected
+    and items (with designs) prefetched.
+    """
+    customer = order.customer
+    customer_name = ""
+    customer_phone = ""
+    if customer:
+        customer_name = f"{customer.first_name} {customer.last_name}".strip()
+        customer_phone = customer.phone or ""
+    shared = {
+        "order_id": order.id,
+        "total": order.total_amount,
+        "currency": (getattr(order, "currency", None) or "NGN").upper(),
+        "site_name": getattr(settings, "SITE_NAME", "THE BLUE WARDROBE"),
+        "customer_name": customer_name,
+        "line_items": order_items_from_order(order),
+        "delivery_address": order.delivery_address or "",
+        "delivery_type": getattr(order, "delivery_type", "local") or "local",
+        "international_region": getattr(order, "international_region", "") or "",
+        "country": getattr(order, "country", "") or "",
+        "delivery_fee": getattr(order, "delivery_fee", None),
+        "subtotal": getattr(order, "subtotal", None),
+    }
+    owner = {
+        **shared,
+        "customer_email": customer_email or (customer.email if customer else ""),
+        "customer_phone": customer_phone,
+        "payment_provider": order.payment_provider or "",
+        "payment_reference": order.flutterwave_tx_ref or order.paystack_reference or "",
+        "total_ngn_equivalent": order.total_ngn_equivalent,
+    }
+    return shared, owner
+
+
 def newsletter_welcome_html(*, site_name: str = "THE BLUE WARDROBE") -> str:
     body = f"""
       <p style="margin:0;">Thank you for subscribing to <strong>{html.escape(site_name)}</strong>.</p>
@@ -353,3 +521,28 @@ def newsletter_welcome_html(*, site_name: str = "THE BLUE WARDROBE") -> str:
         cta_label="Explore collections",
         cta_url=f"{brand['site_url']}/collections",
     )
+
+
+def newsletter_campaign_html(
+    *,
+    headline: str,
+    body: str,
+    preheader: str = "",
+    cta_label: str = "",
+    cta_url: str = "",
+) -> str:
+    """A newsletter campaign; ``body`` is plain text with blank lines between paragraphs."""
+    paragraphs = [p.strip() for p in body.replace("\r\n", "\n").split("\n\n") if p.strip()]
+    rows = []
+    for index, paragraph in enumerate(paragraphs):
+        margin = "0" if index == 0 else "20px 0 0"
+        text = html.escape(paragraph).replace("\n", "<br>")
+        rows.append(f'<p style="margin:{margin};">{text}</p>')
+    body_html = "".join(rows)
+    return _email_shell(
+        preheader=preheader or headline,
+        headline=headline,
+        body_html=body_html,
+        cta_label=cta_label or None,
+        cta_url=cta_url or None,
+    )
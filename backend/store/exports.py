@@ -0,0 +1,177 @@
+"""
+Streaming exports of orders, customers, subscribers and payment logs.
+
+Rows come straight from ``values_list(...).iterator(chunk_size=...)``, so no
+model instances are built and no queryset cache holds the result: memory
+stays flat however many rows the export has (on PostgreSQL the iterator
+reads through a server-side cursor). Each row is encoded and handed to
+``StreamingHttpResponse`` as it arrives, and the CSV header goes out before
+the query runs.
+
+Orders come with their items from a single LEFT JOIN: CSV repeats the
+order's columns on one line per item, NDJSON nests the items under the
+order. ``created_after`` (inclusive) and ``created_before`` (exclusive)
+narrow any export by its timestamp.
+
+The owner dashboard signs in with a token header, which a download link
+cannot carry. It asks for a signed link instead (``sign_link``), good for
+EXPORT_LINK_TTL seconds and one export, and the browser streams the file
+from that; ``SignedLinkAuthentication`` checks it.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import groupby
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import Customer, Order, PaymentLog, Subscriber
+
+LINK_SALT = 'store.exports.link'
+
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    model: type
+    columns: tuple
+    date_field: str = 'created_at'
+    # Columns of the joined OrderItem rows, nested under ``item_key`` in NDJSON.
+    item_columns: tuple = ()
+    item_key: str = ''
+    ordering: tuple = ()
+
+    def queryset(self):
+        return self.model.objects.order_by(*(self.ordering or (self.date_field, 'id')))
+
+
+ORDER_COLUMNS = (
+    'id', 'created_at', 'status', 'customer__email', 'customer__first_name', 'customer__last_name',
+    'customer__phone', 'currency', 'subtotal', 'delivery_fee', 'total_amount', 'total_ngn_equivalent',
+    'delivery_type', 'international_region', 'country', 'delivery_address', 'payment_provider',
+    'paystack_reference', 'flutterwave_tx_ref',
+)
+ORDER_ITEM_COLUMNS = (
+    'items__id', 'items__design_id', 'items__design__sku', 'items__design__title',
+    'items__size', 'items__quantity', 'items__unit_price',
+)
+
+
+EXPORTS = {
+    # One row per item (or one for an order without items), grouped by order.
+    'orders': ExportSpec(
+        model=Order,
+        columns=ORDER_COLUMNS,
+        item_columns=ORDER_ITEM_COLUMNS,
+        item_key='items',
+        ordering=('created_at', 'id', 'items__id'),
+    ),
+    'customers': ExportSpec(
+        model=Customer,
+        columns=('id', 'created_at', 'email', 'first_name', 'last_name', 'phone'),
+    ),
+    'subscribers': ExportSpec(
+        model=Subscriber,
+        columns=('id', 'subscribed_at', 'email'),
+        date_field='subscribed_at',
+    ),
+    'payments': ExportSpec(
+        model=PaymentLog,
+        columns=('id', 'created_at', 'paid_at', 'gateway', 'reference', 'status', 'amount', 'currency', 'order_id'),
+    ),
+}
+
+
+def _header(column):
+    return column.replace('items__', 'item_').replace('__', '_')
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class _Echo:
+    """csv.writer target that hands each encoded line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(spec, *, created_after=None, created_before=None, chunk_size=None):
+    """Tuples of ``spec.columns + spec.item_columns``, oldest first, read in chunks."""
+    queryset = spec.queryset()
+    if created_after is not None:
+        queryset = queryset.filter(**{f'{spec.date_field}__gte': created_after})
+    if created_before is not None:
+        queryset = queryset.filter(**{f'{spec.date_field}__lt': created_before})
+    return queryset.values_list(*spec.columns, *spec.item_columns).iterator(
+        chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE,
+    )
+
+
+def stream_csv(spec, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([_header(column) for column in spec.columns + spec.item_columns])
+    for row in rows:
+        yield writer.writerow([_plain(value) for value in row])
+
+
+def stream_ndjson(spec, rows):
+    columns = [_header(column) for column in spec.columns]
+    if not spec.item_columns:
+        for row in rows:
+            yield json.dumps(dict(zip(columns, map(_plain, row)))) + '\n'
+        return
+    width = len(spec.columns)
+    item_columns = [_header(column[len('items__'):]) for column in spec.item_columns]
+    # Rows arrive ordered by parent id, so each parent's items are consecutive.
+    for _, group in groupby(rows, key=lambda row: row[0]):
+        group = list(group)
+        record = dict(zip(columns, map(_plain, group[0][:width])))
+        record[spec.item_key] = [
+            dict(zip(item_columns, map(_plain, row[width:])))
+            for row in group
+            if row[width] is not None
+        ]
+        yield json.dumps(record) + '\n'
+
+
+def stream_export(spec, fmt, rows):
+    return stream_csv(spec, rows) if fmt == 'csv' else stream_ndjson(spec, rows)
+
+
+def sign_link(user, kind, fmt):
+    """The ``?signature=`` that lets ``user`` download one export without a token header."""
+    return signing.dumps([user.pk, kind, fmt], salt=LINK_SALT)
+
+
+class SignedLinkAuthentication(BaseAuthentication):
+    """Authenticates an export request from a ``sign_link`` signature for that same export."""
+
+    def authenticate(self, request):
+        signature = request.query_params.get('signature')
+        if not signature:
+            return None
+        try:
+            user_id, kind, fmt = signing.loads(signature, salt=LINK_SALT, max_age=settings.EXPORT_LINK_TTL)
+        except signing.BadSignature:
+            raise AuthenticationFailed('Invalid or expired export link.')
+        kwargs = request.parser_context['kwargs']
+        user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+        if user is None or (kind, fmt) != (kwargs.get('kind'), kwargs.get('fmt')):
+            raise AuthenticationFailed('Invalid or expired export link.')
+        return user, None
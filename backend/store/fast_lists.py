@@ -0,0 +1,233 @@
+"""
+Opt-in fast path for the busiest public lists: GET /api/designs/ (and
+/api/designs/atelier-reserve/), /api/collections/ and /api/blog/.
+
+With FAST_READ_LISTS on, those list actions skip DRF's field-by-field
+serialization. A row serializer reads ``values()`` rows and builds the same
+plain dicts as DesignListSerializer, CollectionSerializer or
+BlogPostListSerializer, and ORJSONRenderer renders them. Each row serializer
+compiles its key order and conversions once, from the DRF serializer's own
+fields, so the response bytes match the DRF path. store/tests.py and
+benchmarks/bench_read_endpoints.py compare the two.
+
+Adding a field to one of those serializers means adding it here too; the
+tests fail until the two agree.
+"""
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from bluewardrobe.image_variants import responsive_sources, responsive_srcset
+from bluewardrobe.renderers import ORJSONRenderer
+
+from .content_serializers import BlogPostListSerializer, BlogPostMediaSerializer, build_file_url
+from .models import BlogComment, BlogPost, BlogPostLike, BlogPostMedia, Collection, Design
+from .serializers import CollectionSerializer, DesignListSerializer, card_image, stored_or_converted
+
+# DRF fields whose to_representation reshapes a column value; every other
+# key is emitted as the row holds it.
+CONVERTED_FIELDS = (serializers.DecimalField, serializers.DateTimeField, serializers.DateField)
+
+
+@lru_cache(maxsize=None)
+def compile_fields(serializer_class):
+    """``(key, to_representation or None)`` for each readable field, in output order."""
+    plan = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        convert = field.to_representation if isinstance(field, CONVERTED_FIELDS) else None
+        plan.append((name, convert))
+    return tuple(plan)
+
+
+def _file(model, field_name, name):
+    """A FieldFile for a stored file name, without loading the model instance."""
+    field = model._meta.get_field(field_name)
+    return field.attr_class(None, field, name)
+
+
+class RowSerializer:
+    """
+    Builds ``serializer_class``'s response dicts from ``values()`` rows.
+
+    Subclasses list the ``columns`` to read and fill in the keys that are
+    not plain columns in ``complete(row)``; ``context`` carries the
+    ``request`` and ``fx`` the DRF serializer would get.
+    """
+    serializer_class = None
+    columns = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.request = self.context.get('request')
+        self.plan = compile_fields(self.serializer_class)
+
+    def complete(self, row):
+        pass
+
+    def to_dict(self, row):
+        self.complete(row)
+        data = {}
+        for name, convert in self.plan:
+            value = row[name]
+            if convert is not None and value is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+    def serialize(self, queryset):
+        return [self.to_dict(row) for row in queryset.prefetch_related(None).values(*self.columns)]
+
+
+class DesignCardRows(RowSerializer):
+    """DesignListSerializer cards; querysets come from ``DesignListSerializer.prepare``."""
+    serializer_class = DesignListSerializer
+    columns = (
+        'id', 'collection_id', 'collection__code', 'collection__title', 'sku', 'title',
+        'price', 'discount_price', 'price_usd', 'price_gbp', 'effective_price_usd', 'effective_price_gbp',
+        'is_preorder', 'preorder_start_at', 'preorder_end_at', 'preorder_wait_days', 'is_featured', 'created_at',
+        'list_stock', 'list_reviews', 'list_rating', 'list_image_id', 'list_image_name', 'list_image_alt',
+    )
+
+    def complete(self, row):
+        fx = self.context.get('fx')
+        price, discount_price = row['price'], row['discount_price']
+        # Design.has_discount / effective_price / discount_percentage
+        has_discount = discount_price is not None and discount_price < price
+        effective = discount_price if has_discount else price
+        row['collection'] = f"{row['collection__code']} - {row['collection__title']}"
+        row['has_discount'] = has_discount
+        row['effective_price'] = effective
+        row['discount_percentage'] = int(((price - discount_price) / price) * 100) if has_discount else 0
+        row['price_usd'] = stored_or_converted(row['price_usd'], price, 'USD', fx)
+        row['price_gbp'] = stored_or_converted(row['price_gbp'], price, 'GBP', fx)
+        row['effective_price_usd'] = stored_or_converted(row['effective_price_usd'], effective, 'USD', fx)
+        row['effective_price_gbp'] = stored_or_converted(row['effective_price_gbp'], effective, 'GBP', fx)
+        row['total_stock'] = row['list_stock']
+        row['image'] = (
+            card_image(self.request, row['list_image_id'], row['list_image_name'], row['list_image_alt'])
+            if row['list_image_id'] else None
+        )
+        rating = row['list_rating']
+        row['average_rating'] = round(rating, 1) if rating is not None else 0
+        row['total_reviews'] = row['list_reviews']
+        row['preorder_status'] = Design.preorder_state(
+            row['is_preorder'], row['preorder_start_at'], row['preorder_end_at'],
+        )
+
+
+class CollectionRows(RowSerializer):
+    """CollectionSerializer with its materials and design cards: three queries for any number of collections."""
+    serializer_class = CollectionSerializer
+    columns = ('id', 'code', 'title', 'story', 'featured_image', 'is_featured', 'order', 'created_at')
+
+    def serialize(self, queryset):
+        rows = list(queryset.prefetch_related(None).values(*self.columns))
+        ids = [row['id'] for row in rows]
+        self.materials = defaultdict(list)
+        links = (
+            Collection.materials.through.objects.filter(collection_id__in=ids)
+            .order_by('material_id')
+            .values_list('collection_id', 'material_id', 'material__name', 'material__description')
+        )
+        for collection_id, material_id, name, description in links:
+            self.materials[collection_id].append({'id': material_id, 'name': name, 'description': description})
+        self.designs = defaultdict(list)
+        cards = DesignCardRows(self.context)
+        designs = DesignListSerializer.prepare(
+            Design.objects.filter(collection_id__in=ids).order_by('-created_at', '-id')
+        )
+        for row in designs.values(*cards.columns):
+            self.designs[row['collection_id']].append(cards.to_dict(row))
+        return [self.to_dict(row) for row in rows]
+
+    def complete(self, row):
+        row['materials'] = self.materials.get(row['id'], [])
+        row['designs'] = self.designs.get(row['id'], [])
+        # serializers.ImageField.to_representation
+        if row['featured_image']:
+            url = _file(Collection, 'featured_image', row['featured_image']).url
+            row['featured_image'] = self.request.build_absolute_uri(url) if self.request is not None else url
+        else:
+            row['featured_image'] = None
+
+
+class BlogMediaRows(RowSerializer):
+    serializer_class = BlogPostMediaSerializer
+    columns = ('id', 'media_type', 'file', 'caption', 'alt_text', 'order', 'created_at')
+
+    def complete(self, row):
+        file_field = _file(BlogPostMedia, 'file', row['file'])
+        row['file'] = build_file_url(self.request, file_field)
+        # Videos share the field but have no image variants.
+        image = file_field if row['media_type'] == 'image' else None
+        row['srcset'] = responsive_srcset(self.request, image)
+        row['sources'] = responsive_sources(self.request, image) if image else []
+
+
+class BlogPostRows(RowSerializer):
+    """BlogPostListSerializer: the posts with their counts, then their first media items."""
+    serializer_class = BlogPostListSerializer
+    columns = (
+        'id', 'title', 'slug', 'excerpt', 'cover_image', 'is_featured', 'published_at',
+        'likes_count', 'comments_count', 'first_media_id',
+    )
+
+    def serialize(self, queryset):
+        likes = BlogPostLike.objects.filter(post=OuterRef('pk')).order_by().values('post')
+        comments = BlogComment.objects.filter(post=OuterRef('pk'), is_approved=True).order_by().values('post')
+        first_media = BlogPostMedia.objects.filter(post=OuterRef('pk')).order_by('order', 'created_at')
+        rows = list(
+            queryset.prefetch_related(None).select_related(None).annotate(
+                likes_count=Coalesce(Subquery(likes.annotate(n=Count('pk')).values('n')), 0),
+                comments_count=Coalesce(Subquery(comments.annotate(n=Count('pk')).values('n')), 0),
+                first_media_id=Subquery(first_media.values('pk')[:1]),
+            ).values(*self.columns)
+        )
+        media_ids = [row['first_media_id'] for row in rows if row['first_media_id']]
+        media = BlogMediaRows(self.context)
+        self.media = {
+            row['id']: media.to_dict(row)
+            for row in BlogPostMedia.objects.filter(pk__in=media_ids).values(*media.columns)
+        }
+        return [self.to_dict(row) for row in rows]
+
+    def complete(self, row):
+        row['cover_image'] = build_file_url(self.request, _file(BlogPost, 'cover_image', row['cover_image']))
+        row['media_preview'] = self.media.get(row['first_media_id'])
+
+
+class FastListMixin:
+    """
+    For ReadOnlyModelViewSets: with FAST_READ_LISTS on, ``fast_list_actions``
+    answer from ``row_serializer_class`` and render JSON with orjson. With it
+    off the view behaves as before.
+    """
+    row_serializer_class = None
+    fast_list_actions = ('list',)
+
+    def fast_list(self):
+        return settings.FAST_READ_LISTS and self.action in self.fast_list_actions
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if not self.fast_list():
+            return renderers
+        return [ORJSONRenderer() if type(renderer) is JSONRenderer else renderer for renderer in renderers]
+
+    def serialize_list(self, queryset):
+        if self.fast_list():
+            return self.row_serializer_class(self.get_serializer_context()).serialize(queryset)
+        return self.get_serializer(queryset, many=True).data
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_list():
+            return super().list(request, *args, **kwargs)
+        return Response(self.serialize_list(self.filter_queryset(self.get_queryset())))
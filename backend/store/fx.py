@@ -0,0 +1,259 @@
+"""
+Exchange rates for catalogue price display.
+
+``manage.py refresh_fx_rates`` asks the configured FX_PROVIDER for NGN per
+USD/GBP/CAD, appends the answer to the FxRate history and writes it into
+StoreCurrencySettings, which stays the one place rates live (the owner can
+still edit them by hand).
+
+Readers never talk to the provider. ``current_rates()`` hands out an
+immutable RateTable built from StoreCurrencySettings and kept in memory for
+FX_RATES_TTL seconds; a reload builds a new table and swaps it in with a
+single assignment, and while one thread reloads the others keep serving the
+old table. Saving StoreCurrencySettings marks the table stale and reprices
+every Design's stored USD/GBP columns in the same transaction (see
+store/signals.py).
+
+Providers are classes with a ``name`` and a ``fetch()`` returning
+``{currency: NGN per unit}``; FX_PROVIDER is the dotted path of the one to
+use. FileFxProvider reads a JSON file and stands in for a live feed offline.
+"""
+import json
+import logging
+from abc import ABC, abstractmethod
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
+from typing import Mapping
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Design, FxRate, StoreCurrencySettings
+
+logger = logging.getLogger('bluewardrobe.store.fx')
+
+# Currency -> StoreCurrencySettings field holding NGN per 1 unit of it.
+RATE_FIELDS = {
+    'USD': 'ngn_per_usd',
+    'GBP': 'ngn_per_gbp',
+    'CAD': 'ngn_per_cad',
+}
+RATE_PLACES = Decimal('0.0001')
+REPRICE_BATCH_SIZE = 500
+
+
+class FxError(Exception):
+    """The provider could not supply usable rates."""
+
+
+class FxProvider(ABC):
+    name = 'provider'
+
+    @abstractmethod
+    def fetch(self) -> dict:
+        """Return ``{currency: NGN per 1 unit}`` for some or all of RATE_FIELDS."""
+
+
+class FileFxProvider(FxProvider):
+    """
+    Reads ``{"USD": 1550, "GBP": 1980, "CAD": 1120}`` (optionally under a
+    ``"rates"`` key) from FX_RATES_FILE.
+    """
+    name = 'file'
+
+    def __init__(self, path=None):
+        self.path = path or settings.FX_RATES_FILE
+
+    def fetch(self):
+        if not self.path:
+            raise FxError('FX_RATES_FILE is not set')
+        try:
+            with open(self.path, encoding='utf-8') as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise FxError(f'Could not read {self.path}: {exc}') from exc
+        if isinstance(data, dict) and isinstance(data.get('rates'), dict):
+            data = data['rates']
+        if not isinstance(data, dict):
+            raise FxError(f'{self.path} does not hold a JSON object of rates')
+        return data
+
+
+class ExchangeRateApiProvider(FxProvider):
+    """
+    open.er-api.com's free USD-based feed: ``{"rates": {"NGN": ..., "GBP": ...}}``,
+    so NGN per GBP is ``rates["NGN"] / rates["GBP"]``.
+    """
+    name = 'open.er-api.com'
+
+    def __init__(self, url=None, timeout=10):
+        self.url = url or settings.FX_PROVIDER_URL
+        self.timeout = timeout
+
+    def fetch(self):
+        try:
+            response = requests.get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            rates = response.json().get('rates') or {}
+            ngn = Decimal(str(rates['NGN']))
+            return {
+                currency: ngn / Decimal(str(rates[currency]))
+                for currency in RATE_FIELDS
+                if rates.get(currency)
+            }
+        except (requests.RequestException, ValueError, KeyError, ArithmeticError) as exc:
+            raise FxError(f'{self.url}: {exc}') from exc
+
+
+def get_provider(path=None) -> FxProvider:
+    return import_string(path or settings.FX_PROVIDER)()
+
+
+@dataclass(frozen=True)
+class RateTable:
+    rates: Mapping[str, Decimal]
+    as_of: datetime | None
+    # The float dict DesignSerializer expects in its "fx" context.
+    serializer_context: Mapping[str, float]
+
+    @classmethod
+    def build(cls, rates, as_of=None):
+        return cls(
+            rates=MappingProxyType(dict(rates)),
+            as_of=as_of,
+            serializer_context=MappingProxyType({
+                field: float(rates[currency]) for currency, field in RATE_FIELDS.items()
+            }),
+        )
+
+    @classmethod
+    def from_settings(cls, solo):
+        return cls.build(
+            {currency: Decimal(getattr(solo, field)) for currency, field in RATE_FIELDS.items()},
+            as_of=solo.updated_at,
+        )
+
+
+# (table, time.monotonic() it was loaded); replaced as a whole, never mutated.
+_current: tuple = (None, 0.0)
+_reload_lock = threading.Lock()
+
+
+def _fresh_table():
+    table, loaded_at = _current
+    if table is not None and time.monotonic() - loaded_at < settings.FX_RATES_TTL:
+        return table
+    return None
+
+
+def current_rates() -> RateTable:
+    """The in-memory rate table, reloaded from StoreCurrencySettings once it is FX_RATES_TTL old."""
+    table = _fresh_table()
+    if table is not None:
+        return table
+    stale = _current[0]
+    # Only one thread reloads; the rest keep answering from the old table.
+    if not _reload_lock.acquire(blocking=stale is None):
+        return stale
+    try:
+        table = _fresh_table()
+        if table is not None:
+            return table
+        try:
+            table = RateTable.from_settings(StoreCurrencySettings.get_solo())
+        except Exception:
+            if stale is None:
+                raise
+            logger.warning('Could not reload FX rates; serving the previous table', exc_info=True)
+            table = stale
+        _swap(table)
+        return table
+    finally:
+        _reload_lock.release()
+
+
+def _swap(table):
+    global _current
+    _current = (table, time.monotonic())
+
+
+def invalidate():
+    """Make the next ``current_rates()`` re-read StoreCurrencySettings."""
+    global _current
+    _current = (_current[0], float('-inf'))
+
+
+def _clean(rates):
+    cleaned = {}
+    for currency, value in (rates or {}).items():
+        currency = str(currency).upper()
+        if currency not in RATE_FIELDS:
+            continue
+        try:
+            rate = Decimal(str(value)).quantize(RATE_PLACES)
+        except (InvalidOperation, ValueError) as exc:
+            raise FxError(f'Invalid rate for {currency}: {value!r}') from exc
+        # NGN per unit is stored as max_digits=14, decimal_places=4.
+        if rate <= 0 or rate.adjusted() >= 10:
+            raise FxError(f'Invalid rate for {currency}: {value!r}')
+        cleaned[currency] = rate
+    if not cleaned:
+        raise FxError(f'No rates for {", ".join(RATE_FIELDS)}')
+    return cleaned
+
+
+def refresh_rates(provider=None) -> RateTable:
+    """
+    Fetch rates, record them in FxRate, store them in StoreCurrencySettings and
+    swap them in for this process. Currencies the provider left out keep their
+    current rate. Raises FxError when the provider has nothing usable.
+    """
+    provider = provider or get_provider()
+    rates = _clean(provider.fetch())
+    now = timezone.now()
+    with transaction.atomic():
+        FxRate.objects.bulk_create([
+            FxRate(currency=currency, ngn_per_unit=rate, source=provider.name, fetched_at=now)
+            for currency, rate in rates.items()
+        ])
+        solo = StoreCurrencySettings.get_solo()
+        for currency, rate in rates.items():
+            setattr(solo, RATE_FIELDS[currency], rate)
+        solo.save()
+    table = RateTable.from_settings(solo)
+    _swap(table)
+    logger.info(
+        'FX rates from %s: %s', provider.name,
+        ', '.join(f'{currency} {rate}' for currency, rate in rates.items()),
+    )
+    return table
+
+
+def reprice_designs(fx_settings=None, batch_size=REPRICE_BATCH_SIZE):
+    """
+    Recompute every Design's stored currency prices with ``fx_settings`` (the
+    StoreCurrencySettings row by default), writing only the rows that moved.
+    Returns how many were updated.
+    """
+    fx_settings = fx_settings or StoreCurrencySettings.get_solo()
+    designs = Design.objects.order_by('pk').only('pk', 'price', 'discount_price', *Design.PRICE_COLUMNS)
+    changed = []
+    updated = 0
+    for design in designs.iterator(chunk_size=batch_size):
+        if design.set_price_columns(fx_settings):
+            changed.append(design)
+        if len(changed) >= batch_size:
+            Design.objects.bulk_update(changed, Design.PRICE_COLUMNS)
+            updated += len(changed)
+            changed = []
+    if changed:
+        Design.objects.bulk_update(changed, Design.PRICE_COLUMNS)
+        updated += len(changed)
+    return updated
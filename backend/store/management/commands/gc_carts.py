@@ -0,0 +1,52 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from store.cart_gc import DEFAULT_BATCH_SIZE, collect_garbage
+
+logger = logging.getLogger('bluewardrobe.store.cart_gc')
+
+
+class Command(BaseCommand):
+    help = 'Deletes idle carts and expired database sessions in small batches (see store.cart_gc).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--idle-days', type=float, default=None,
+            help='Delete carts untouched for this many days (default: CART_IDLE_DAYS).',
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per delete.')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches.')
+        parser.add_argument(
+            '--every', type=float, default=None,
+            help='Keep running and collect every N seconds instead of exiting after one pass.',
+        )
+
+    def handle(self, *args, **options):
+        idle_days = options['idle_days'] if options['idle_days'] is not None else settings.CART_IDLE_DAYS
+        while True:
+            # Drop connections the server closed or that outlived CONN_MAX_AGE.
+            close_old_connections()
+            try:
+                reclaimed = collect_garbage(
+                    idle_for=timedelta(days=idle_days),
+                    batch_size=options['batch_size'],
+                    pause=options['pause'],
+                )
+            except DatabaseError:
+                if not options['every']:
+                    raise
+                # A dropped connection must not end the background collector; try again next pass.
+                logger.exception('Cart GC pass failed')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Reclaimed {reclaimed['carts']} cart(s), {reclaimed['cart_items']} cart item(s), "
+                    f"{reclaimed['sessions']} session(s)."
+                ))
+            if not options['every']:
+                return
+            time.sleep(options['every'])
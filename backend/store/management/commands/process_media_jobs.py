@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from store.media_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Uploads spooled admin media (see store.media_jobs) to storage. Runs until stopped unless --once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty.')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to sleep when idle.')
+        parser.add_argument('--max-jobs', type=int, default=None, help='Exit after this many jobs.')
+
+    def handle(self, *args, **options):
+        processed = run_worker(
+            poll_interval=options['poll_interval'],
+            once=options['once'],
+            max_jobs=options['max_jobs'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} media job(s).'))
@@ -0,0 +1,45 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, close_old_connections
+
+from store.fx import FxError, get_provider, refresh_rates
+
+logger = logging.getLogger('bluewardrobe.store.fx')
+
+
+class Command(BaseCommand):
+    help = 'Fetches exchange rates from FX_PROVIDER into StoreCurrencySettings and the FX rate history (see store.fx).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--provider', default=None, help='Dotted path of the provider class (default: FX_PROVIDER).')
+        parser.add_argument(
+            '--every', type=float, default=None,
+            help='Keep running and refresh every N seconds instead of exiting after one fetch.',
+        )
+
+    def handle(self, *args, **options):
+        provider = get_provider(options['provider'])
+        while True:
+            # Drop connections the server closed or that outlived CONN_MAX_AGE.
+            close_old_connections()
+            try:
+                table = refresh_rates(provider)
+            except FxError as exc:
+                if not options['every']:
+                    raise CommandError(f'FX refresh failed: {exc}')
+                # Keep the last good rates and try again next time round.
+                logger.warning('FX refresh failed: %s', exc)
+            except DatabaseError:
+                if not options['every']:
+                    raise
+                # A dropped connection must not end the background refresher either.
+                logger.exception('FX refresh failed')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    'NGN per unit: ' + ', '.join(f'{currency} {rate}' for currency, rate in table.rates.items())
+                ))
+            if not options['every']:
+                return
+            time.sleep(options['every'])
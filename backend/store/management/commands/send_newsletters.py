@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from store.newsletter import run_sender
+
+
+class Command(BaseCommand):
+    help = 'Sends queued newsletter campaigns (see store.newsletter). Runs until stopped unless --once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when no campaign is queued.')
+        parser.add_argument('--poll-interval', type=float, default=30.0, help='Seconds to sleep when idle.')
+
+    def handle(self, *args, **options):
+        finished = run_sender(poll_interval=options['poll_interval'], once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {finished} campaign(s).'))
@@ -0,0 +1,267 @@
+"""
+Background media uploads.
+
+With BACKGROUND_MEDIA_UPLOADS enabled, a new video uploaded through the admin
+API or Django admin is not pushed to storage inside the request. The pre_save
+hook spools it to MEDIA_JOB_SPOOL_DIR and keeps the field at its previous
+value; post_save records a MediaJob. ``manage.py process_media_jobs`` claims
+jobs, uploads them (resumable chunks on Cloudinary, a plain storage.save
+elsewhere) and sets the field once the upload completes.
+"""
+import logging
+import os
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files import File
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import BlogPostMedia, Design, MediaJob, Video
+
+logger = logging.getLogger('bluewardrobe.store.media_jobs')
+
+# Model -> file fields whose new uploads are handed to the worker.
+BACKGROUND_MEDIA_FIELDS = {
+    Video: ('video_file',),
+    Design: ('video',),
+    BlogPostMedia: ('file',),
+}
+# An uploading job whose heartbeat is older than this was abandoned by a dead worker.
+STALE_JOB_AFTER = timedelta(minutes=10)
+RETRY_BASE_DELAY = timedelta(seconds=30)
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+ACTIVE_STATUSES = (MediaJob.STATUS_PENDING, MediaJob.STATUS_UPLOADING)
+
+
+def background_uploads_enabled():
+    return getattr(settings, 'BACKGROUND_MEDIA_UPLOADS', False)
+
+
+def _deferred_fields(instance):
+    if isinstance(instance, BlogPostMedia) and instance.media_type != 'video':
+        # Blog images are small and need their responsive variants right away.
+        return ()
+    return BACKGROUND_MEDIA_FIELDS.get(type(instance), ())
+
+
+def _spool(file):
+    spool_dir = settings.MEDIA_JOB_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f'{uuid.uuid4().hex}-{os.path.basename(file.name)}')
+    size = 0
+    with open(path, 'wb') as out:
+        for chunk in file.chunks(SPOOL_CHUNK_SIZE):
+            out.write(chunk)
+            size += len(chunk)
+    return path, size
+
+
+def _manifest_path(spool_path):
+    # Chunk progress for resumable uploads lives next to the spooled file.
+    return f'{spool_path}.manifest.json'
+
+
+def _remove_spool(path):
+    for leftover in (path, _manifest_path(path)):
+        try:
+            os.remove(leftover)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logger.warning('Could not remove media spool %s', leftover, exc_info=True)
+
+
+def defer_media_uploads(sender, instance, raw=False, **kwargs):
+    """pre_save: spool new uploads and keep the stored field at its previous value."""
+    if raw or not background_uploads_enabled():
+        return
+    pending = []
+    for field_name in _deferred_fields(instance):
+        file = getattr(instance, field_name)
+        if not file or getattr(file, '_committed', True):
+            continue
+        field = instance._meta.get_field(field_name)
+        spool_path, size = _spool(file)
+        pending.append({
+            'field_name': field_name,
+            'original_name': os.path.basename(file.name),
+            'target_name': field.generate_filename(instance, os.path.basename(file.name)),
+            'spool_path': spool_path,
+            'size': size,
+        })
+        previous = None
+        if instance.pk:
+            previous = sender._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+        setattr(instance, field_name, previous or None)
+    if pending:
+        instance._deferred_media = pending
+
+
+def enqueue_deferred_uploads(sender, instance, raw=False, **kwargs):
+    """post_save: record a MediaJob per spooled upload, superseding older ones."""
+    pending = instance.__dict__.pop('_deferred_media', None)
+    if not pending:
+        return
+    content_type = ContentType.objects.get_for_model(instance)
+    for entry in pending:
+        superseded = MediaJob.objects.filter(
+            content_type=content_type,
+            object_id=instance.pk,
+            field_name=entry['field_name'],
+            status__in=ACTIVE_STATUSES,
+        )
+        for spool_path in superseded.values_list('spool_path', flat=True):
+            _remove_spool(spool_path)
+        superseded.update(status=MediaJob.STATUS_CANCELLED, updated_at=timezone.now())
+        job = MediaJob.objects.create(content_type=content_type, object_id=instance.pk, **entry)
+        logger.info('Queued media job %s for %s', job.pk, job)
+
+
+def claim_next_job():
+    """
+    Atomically move the oldest runnable job to "uploading". Runnable means
+    pending and due, or uploading with a stale heartbeat. Returns None when idle.
+    """
+    now = timezone.now()
+    candidates = (
+        MediaJob.objects
+        .filter(
+            Q(status=MediaJob.STATUS_PENDING, available_at__lte=now)
+            | Q(status=MediaJob.STATUS_UPLOADING, updated_at__lt=now - STALE_JOB_AFTER)
+        )
+        .order_by('created_at')
+        .values_list('pk', 'status', 'updated_at')[:10]
+    )
+    for pk, job_status, updated_at in candidates:
+        claimed = MediaJob.objects.filter(pk=pk, status=job_status, updated_at=updated_at).update(
+            status=MediaJob.STATUS_UPLOADING,
+            attempts=F('attempts') + 1,
+            started_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return MediaJob.objects.select_related('content_type').get(pk=pk)
+    return None
+
+
+def _upload(job, storage, handle):
+    if not hasattr(storage, 'upload_resumable'):
+        return storage.save(job.target_name, File(handle, name=job.original_name))
+
+    def persist(manifest):
+        MediaJob.objects.filter(pk=job.pk).update(
+            upload_id=manifest.upload_id,
+            bytes_uploaded=manifest.bytes_done,
+            updated_at=timezone.now(),
+        )
+
+    return storage.upload_resumable(
+        job.target_name, handle, manifest_path=_manifest_path(job.spool_path), on_progress=persist,
+    )
+
+
+def process_job(job):
+    """Upload one claimed job and point the model field at the stored file."""
+    model = job.content_type.model_class()
+    field = model._meta.get_field(job.field_name)
+    if not model._default_manager.filter(pk=job.object_id).exists():
+        MediaJob.objects.filter(pk=job.pk).update(
+            status=MediaJob.STATUS_CANCELLED,
+            error='Object was deleted before the upload finished.',
+            updated_at=timezone.now(),
+        )
+        _remove_spool(job.spool_path)
+        return
+
+    try:
+        with open(job.spool_path, 'rb') as handle:
+            stored_name = _upload(job, field.storage, handle)
+    except Exception as exc:
+        _record_failure(job, exc)
+        return
+
+    now = timezone.now()
+    finished = MediaJob.objects.filter(pk=job.pk, status=MediaJob.STATUS_UPLOADING).update(
+        status=MediaJob.STATUS_DONE,
+        stored_name=stored_name,
+        bytes_uploaded=job.size,
+        error='',
+        completed_at=now,
+        updated_at=now,
+    )
+    if finished:
+        # Queryset update: skips custom field pre_save hooks and does not re-enter the signals.
+        model._default_manager.filter(pk=job.object_id).update(**{job.field_name: stored_name})
+        logger.info('Media job %s stored %s', job.pk, stored_name)
+    else:
+        logger.info('Media job %s was superseded while uploading; discarding %s', job.pk, stored_name)
+    _remove_spool(job.spool_path)
+
+
+def _record_failure(job, exc):
+    max_attempts = getattr(settings, 'MEDIA_JOB_MAX_ATTEMPTS', 5)
+    now = timezone.now()
+    if job.attempts >= max_attempts:
+        logger.error('Media job %s failed after %s attempts: %s', job.pk, job.attempts, exc)
+        MediaJob.objects.filter(pk=job.pk, status=MediaJob.STATUS_UPLOADING).update(
+            status=MediaJob.STATUS_FAILED, error=str(exc), updated_at=now,
+        )
+        return
+    delay = RETRY_BASE_DELAY * (2 ** (job.attempts - 1))
+    logger.warning('Media job %s attempt %s failed, retrying in %s: %s', job.pk, job.attempts, delay, exc)
+    MediaJob.objects.filter(pk=job.pk, status=MediaJob.STATUS_UPLOADING).update(
+        status=MediaJob.STATUS_PENDING,
+        error=str(exc),
+        available_at=now + delay,
+        updated_at=now,
+    )
+
+
+def retry_job(job):
+    """Put a failed job back in the queue; its resume point and spool are kept."""
+    now = timezone.now()
+    return MediaJob.objects.filter(pk=job.pk, status=MediaJob.STATUS_FAILED).update(
+        status=MediaJob.STATUS_PENDING, attempts=0, available_at=now, updated_at=now,
+    )
+
+
+def delete_job(job):
+    _remove_spool(job.spool_path)
+    job.delete()
+
+
+def run_worker(poll_interval=5.0, once=False, max_jobs=None):
+    """
+    Process jobs until idle (``once``) or forever. Returns the number processed.
+
+    Running forever, a database error (a dropped or restarted connection) is
+    logged and retried after ``poll_interval`` rather than ending the worker;
+    a job it interrupted is reclaimed once its heartbeat goes stale.
+    """
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        # Drop connections the server closed or that outlived CONN_MAX_AGE.
+        close_old_connections()
+        try:
+            job = claim_next_job()
+            if job is not None:
+                process_job(job)
+        except DatabaseError:
+            if once:
+                raise
+            logger.exception('Media worker: database error, retrying in %ss', poll_interval)
+            time.sleep(poll_interval)
+            continue
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        processed += 1
+    return processed
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('store', '0032_design_is_featured'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field_name', models.CharField(max_length=50)),
+                ('original_name', models.CharField(max_length=255)),
+                ('target_name', models.CharField(help_text='Storage name from the field upload_to', max_length=255)),
+                ('spool_path', models.CharField(max_length=500)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('bytes_uploaded', models.PositiveBigIntegerField(default=0)),
+                ('upload_id', models.CharField(blank=True, help_text='Chunked-upload session, reused on resume', max_length=64)),
+                ('stored_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('uploading', 'Uploading'), ('done', 'Done'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not retried before this time')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Worker heartbeat')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='store_mediajob_queue_idx'), models.Index(fields=['content_type', 'object_id'], name='store_mediajob_object_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def claim_paid_references(apps, schema_editor):
+    """Give every payment that already has an order its key, so it is never booked twice."""
+    PaymentLog = apps.get_model('store', 'PaymentLog')
+    PaymentIdempotencyKey = apps.get_model('store', 'PaymentIdempotencyKey')
+    keys = {}
+    logs = (
+        PaymentLog.objects.filter(order__isnull=False, status__in=['success', 'successful'])
+        .order_by('created_at')
+        .values_list('gateway', 'order__payment_provider', 'reference', 'order_id')
+    )
+    for gateway, provider, reference, order_id in logs.iterator():
+        keys.setdefault((gateway or provider or '', reference), order_id)
+    PaymentIdempotencyKey.objects.bulk_create(
+        [
+            PaymentIdempotencyKey(gateway=gateway, reference=reference, order_id=order_id)
+            for (gateway, reference), order_id in keys.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0034_cart_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentIdempotencyKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gateway', models.CharField(max_length=20)),
+                ('reference', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payment_keys', to='store.order')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='paymentidempotencykey',
+            constraint=models.UniqueConstraint(fields=('gateway', 'reference'), name='unique_payment_idempotency_key'),
+        ),
+        migrations.RunPython(claim_paid_references, migrations.RunPython.noop),
+    ]
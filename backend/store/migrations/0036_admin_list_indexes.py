@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0035_payment_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(fields=['created_at', 'id'], name='blogcomment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogcomment',
+            index=models.Index(fields=['is_approved', 'created_at'], name='blogcomment_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogcommentlike',
+            index=models.Index(fields=['created_at', 'id'], name='blogcommentlike_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpostlike',
+            index=models.Index(fields=['created_at', 'id'], name='blogpostlike_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactmessage',
+            index=models.Index(fields=['created_at', 'id'], name='contact_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['created_at', 'id'], name='customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['currency', 'created_at'], name='order_currency_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['delivery_type', 'created_at'], name='order_delivery_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscriber',
+            index=models.Index(fields=['subscribed_at', 'id'], name='subscriber_subscribed_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0036_admin_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentlog',
+            index=models.Index(fields=['created_at', 'id'], name='paymentlog_created_idx'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0037_paymentlog_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=200)),
+                ('preheader', models.CharField(blank=True, help_text='Inbox preview text', max_length=200)),
+                ('headline', models.CharField(max_length=200)),
+                ('body', models.TextField(help_text='Plain text; blank lines separate paragraphs')),
+                ('cta_label', models.CharField(blank=True, max_length=80)),
+                ('cta_url', models.URLField(blank=True)),
+                ('status', models.CharField(choices=[('draft', 'Draft'), ('queued', 'Queued'), ('sending', 'Sending'), ('sent', 'Sent')], default='draft', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('queued_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Sender heartbeat')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CampaignRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('batch_key', models.CharField(blank=True, help_text='Idempotency key of the batch request this recipient went out in, reused on resume', max_length=64)),
+                ('provider_id', models.CharField(blank=True, help_text='Resend email id', max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='store.newslettercampaign')),
+                ('subscriber', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.subscriber')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['campaign', 'status', 'id'], name='campaign_recipient_status_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='campaignrecipient',
+            constraint=models.UniqueConstraint(fields=('campaign', 'email'), name='unique_campaign_recipient'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:34
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0038_newsletter_campaigns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FxRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3)),
+                ('ngn_per_unit', models.DecimalField(decimal_places=4, max_digits=14)),
+                ('source', models.CharField(help_text='FX provider that supplied the rate', max_length=100)),
+                ('fetched_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'FX rate',
+                'verbose_name_plural': 'FX rate history',
+                'ordering': ['-fetched_at', 'currency'],
+                'indexes': [models.Index(fields=['currency', 'fetched_at'], name='fxrate_currency_fetched_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-19 14:37
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+CENTS = Decimal('0.01')
+
+
+def fill_price_columns(apps, schema_editor):
+    """Store every design's prices with today's rates (same rules as Design.set_price_columns)."""
+    Design = apps.get_model('store', 'Design')
+    StoreCurrencySettings = apps.get_model('store', 'StoreCurrencySettings')
+    fx = StoreCurrencySettings.objects.filter(pk=1).first()
+    rates = {'USD': fx.ngn_per_usd, 'GBP': fx.ngn_per_gbp} if fx else {'USD': Decimal('1550'), 'GBP': Decimal('1980')}
+
+    def convert(amount, currency):
+        rate = rates[currency]
+        return (Decimal(amount) / rate).quantize(CENTS) if rate > 0 else None
+
+    designs = list(Design.objects.only('pk', 'price', 'discount_price'))
+    for design in designs:
+        has_discount = design.discount_price is not None and design.discount_price < design.price
+        effective = design.discount_price if has_discount else design.price
+        design.effective_price_ngn = Decimal(effective).quantize(CENTS)
+        design.price_usd = convert(design.price, 'USD')
+        design.price_gbp = convert(design.price, 'GBP')
+        design.effective_price_usd = convert(effective, 'USD')
+        design.effective_price_gbp = convert(effective, 'GBP')
+    Design.objects.bulk_update(
+        designs,
+        ['effective_price_ngn', 'price_usd', 'price_gbp', 'effective_price_usd', 'effective_price_gbp'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0039_fx_rate_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='design',
+            name='effective_price_gbp',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='design',
+            name='effective_price_ngn',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='design',
+            name='effective_price_usd',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='design',
+            name='price_gbp',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='design',
+            name='price_usd',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='design',
+            index=models.Index(fields=['effective_price_ngn'], name='design_price_ngn_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='design',
+            index=models.Index(fields=['effective_price_usd'], name='design_price_usd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='design',
+            index=models.Index(fields=['effective_price_gbp'], name='design_price_gbp_idx'),
+        ),
+        migrations.RunPython(fill_price_columns, migrations.RunPython.noop),
+    ]
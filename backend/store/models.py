@@ -1,4 +1,8 @@
+import logging
+
 from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 from django.db.models import Avg
 from django.utils.text import slugify
@@ -6,6 +10,8 @@ from django.utils import timezone
 from django.core.files.storage import default_storage
 from decimal import Decimal
 
+logger = logging.getLogger('bluewardrobe.store.models')
+
 
 class Material(models.Model):
     name = models.CharField(max_length=200)
@@ -44,7 +50,10 @@ class SafeVideoField(models.FileField):
         
         # If value is a string, return None immediately to prevent errors
         if isinstance(value, str):
-            print(f"Warning: SafeVideoField pre_save detected string data for {model_instance.__class__.__name__} {getattr(model_instance, 'id', 'new')}: '{value}'. Returning None.")
+            logger.warning(
+                "SafeVideoField pre_save detected string data for %s %s: %r. Returning None.",
+                model_instance.__class__.__name__, getattr(model_instance, 'id', 'new'), value,
+            )
             setattr(model_instance, self.attname, None)
             return None
         
@@ -56,7 +65,10 @@ class SafeVideoField(models.FileField):
                 if hasattr(value, 'size'):
                     _ = value.size
             except (AttributeError, ValueError, OSError) as e:
-                print(f"Warning: SafeVideoField pre_save detected invalid file for {model_instance.__class__.__name__} {getattr(model_instance, 'id', 'new')}: {e}. Returning None.")
+                logger.warning(
+                    "SafeVideoField pre_save detected invalid file for %s %s: %s. Returning None.",
+                    model_instance.__class__.__name__, getattr(model_instance, 'id', 'new'), e,
+                )
                 setattr(model_instance, self.attname, None)
                 return None
         
@@ -71,7 +83,7 @@ def get_video_storage():
         try:
             from django.conf import settings
             
-            print(f"DEBUG: Getting video storage, USE_CLOUDINARY: {getattr(settings, 'USE_CLOUDINARY', False)}")
+            logger.debug("Getting video storage, USE_CLOUDINARY=%s", getattr(settings, 'USE_CLOUDINARY', False))
             
             # Check if Cloudinary is enabled
             if getattr(settings, 'USE_CLOUDINARY', False):
@@ -79,22 +91,22 @@ def get_video_storage():
                     from django.core.files.storage import storages
                     # Try to get video_storage from STORAGES setting
                     video_storage = storages['video_storage']
-                    print(f"DEBUG: Using video_storage from STORAGES: {type(video_storage)}")
+                    logger.debug("Using video_storage from STORAGES: %s", type(video_storage))
                     return video_storage
                 except Exception as storage_error:
-                    print(f"DEBUG: Failed to get video_storage from STORAGES: {storage_error}")
+                    logger.warning("Failed to get video_storage from STORAGES: %s", storage_error)
                     # Fallback to creating LargeVideoCloudinaryStorage directly
                     from bluewardrobe.storage import LargeVideoCloudinaryStorage
-                    print(f"DEBUG: Creating LargeVideoCloudinaryStorage directly")
+                    logger.debug("Creating LargeVideoCloudinaryStorage directly")
                     return LargeVideoCloudinaryStorage()
             else:
                 # Use FileSystemStorage when Cloudinary is not enabled
-                print(f"DEBUG: Cloudinary not enabled, using FileSystemStorage")
+                logger.debug("Cloudinary not enabled, using FileSystemStorage")
                 from django.core.files.storage import FileSystemStorage
                 return FileSystemStorage()
                     
         except Exception as e:
-            print(f"ERROR: Failed to get video_storage: {e}, falling back to FileSystemStorage")
+            logger.error("Failed to get video_storage: %s, falling back to FileSystemStorage", e)
             from django.core.files.storage import FileSystemStorage
             return FileSystemStorage()
 
@@ -139,13 +151,53 @@ class Design(models.Model):
     )
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+    # Prices in each checkout currency, stored so lists can filter and sort on
+    # them in SQL. Filled on save and by store.fx.reprice_designs when the FX
+    # rates change; null when the rate is unusable.
+    effective_price_ngn = models.DecimalField(max_digits=10, decimal_places=2, null=True, editable=False)
+    price_usd = models.DecimalField(max_digits=10, decimal_places=2, null=True, editable=False)
+    price_gbp = models.DecimalField(max_digits=10, decimal_places=2, null=True, editable=False)
+    effective_price_usd = models.DecimalField(max_digits=10, decimal_places=2, null=True, editable=False)
+    effective_price_gbp = models.DecimalField(max_digits=10, decimal_places=2, null=True, editable=False)
+
+    PRICE_COLUMNS = ('effective_price_ngn', 'price_usd', 'price_gbp', 'effective_price_usd', 'effective_price_gbp')
 
     class Meta:
         ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['effective_price_ngn'], name='design_price_ngn_idx'),
+            models.Index(fields=['effective_price_usd'], name='design_price_usd_idx'),
+            models.Index(fields=['effective_price_gbp'], name='design_price_gbp_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sku} - {self.title}"
 
+    def set_price_columns(self, fx_settings):
+        """Recompute the stored currency prices with ``fx_settings``; True when any of them changed."""
+        from .currency_utils import convert_from_ngn
+
+        def convert(amount, currency):
+            try:
+                return convert_from_ngn(amount, currency, fx_settings)
+            except (ValueError, ArithmeticError):
+                return None
+
+        effective = self.effective_price
+        values = {
+            'effective_price_ngn': Decimal(effective).quantize(Decimal('0.01')),
+            'price_usd': convert(self.price, 'USD'),
+            'price_gbp': convert(self.price, 'GBP'),
+            'effective_price_usd': convert(effective, 'USD'),
+            'effective_price_gbp': convert(effective, 'GBP'),
+        }
+        changed = False
+        for name, value in values.items():
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed = True
+        return changed
+
     def save(self, *args, **kwargs):
         from datetime import timedelta
 
@@ -165,22 +217,30 @@ class Design(models.Model):
             self.preorder_start_at = None
             self.preorder_end_at = None
             # Keep preorder_wait_days for when preorder is re-enabled
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'price', 'discount_price'} & set(update_fields):
+            self.set_price_columns(StoreCurrencySettings.get_solo())
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *self.PRICE_COLUMNS}
         super().save(*args, **kwargs)
 
-    @property
-    def preorder_status(self):
-        """Return 'open', 'upcoming', 'closed', or 'off' for Atelier Reserve."""
-        if not self.is_preorder:
+    @staticmethod
+    def preorder_state(is_preorder, start, end):
+        """preorder_status from the raw column values (store.fast_lists works on rows)."""
+        if not is_preorder:
             return 'off'
         now = timezone.now()
-        start = self.preorder_start_at
-        end = self.preorder_end_at
         if start and now < start:
             return 'upcoming'
         if end and now > end:
             return 'closed'
         return 'open'
 
+    @property
+    def preorder_status(self):
+        """Return 'open', 'upcoming', 'closed', or 'off' for Atelier Reserve."""
+        return self.preorder_state(self.is_preorder, self.preorder_start_at, self.preorder_end_at)
+
     @property
     def is_preorder_purchasable(self):
         return self.preorder_status == 'open'
@@ -307,6 +367,8 @@ class SizeInventory(models.Model):
 class Cart(models.Model):
     session_id = models.CharField(max_length=255, unique=True)
     customer_email = models.EmailField(blank=True)
+    # Bumped on every write to the cart's lines (see store.cart_store); part of its ETag.
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -511,6 +573,30 @@ class StoreCurrencySettings(models.Model):
         return obj
 
 
+class FxRate(models.Model):
+    """
+    One fetched exchange rate (NGN per 1 unit of ``currency``), kept as history
+    by ``manage.py refresh_fx_rates``; the newest rates also land in
+    StoreCurrencySettings.
+    """
+
+    currency = models.CharField(max_length=3)
+    ngn_per_unit = models.DecimalField(max_digits=14, decimal_places=4)
+    source = models.CharField(max_length=100, help_text="FX provider that supplied the rate")
+    fetched_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['-fetched_at', 'currency']
+        verbose_name = "FX rate"
+        verbose_name_plural = "FX rate history"
+        indexes = [
+            models.Index(fields=['currency', 'fetched_at'], name='fxrate_currency_fetched_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.currency} {self.ngn_per_unit} ({self.fetched_at:%Y-%m-%d %H:%M})'
+
+
 class Customer(models.Model):
     email = models.EmailField()
     first_name = models.CharField(max_length=100, blank=True)
@@ -518,6 +604,11 @@ class Customer(models.Model):
     phone = models.CharField(max_length=30, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='customer_created_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -525,6 +616,8 @@ class Customer(models.Model):
 class Order(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
+        # Paid less than, or in another currency than, its checkout quote.
+        ('review', 'Payment review'),
         ('confirmed', 'Confirmed'),
         ('shipped', 'Shipped'),
         ('delivered', 'Delivered'),
@@ -601,6 +694,15 @@ class Order(models.Model):
     flutterwave_tx_ref = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # The owner dashboard pages orders newest first, optionally narrowed to one value of these.
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            models.Index(fields=['currency', 'created_at'], name='order_currency_created_idx'),
+            models.Index(fields=['delivery_type', 'created_at'], name='order_delivery_created_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.status}"
 
@@ -639,17 +741,46 @@ class PaymentLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='paymentlog_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.reference} - {self.status}"
 
 
+class PaymentIdempotencyKey(models.Model):
+    """
+    One row per gateway payment, inserted before the order is built. The
+    unique (gateway, reference) pair makes the insert the claim: concurrent
+    verify calls and webhook deliveries for one payment collapse into the
+    first finalize, and later ones read its order.
+    """
+    gateway = models.CharField(max_length=20)
+    reference = models.CharField(max_length=200)
+    order = models.ForeignKey(Order, related_name='payment_keys', on_delete=models.CASCADE, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['gateway', 'reference'], name='unique_payment_idempotency_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.gateway}:{self.reference}"
+
+
 class ContactMessage(models.Model):
     name = models.CharField(max_length=200)
     email = models.EmailField()
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='contact_created_idx'),
+        ]
+
     def __str__(self):
         return f"Message from {self.name}"
 
@@ -658,10 +789,86 @@ class Subscriber(models.Model):
     email = models.EmailField(unique=True)
     subscribed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['subscribed_at', 'id'], name='subscriber_subscribed_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
 
+class NewsletterCampaign(models.Model):
+    """
+    One email to the subscriber list, sent by ``manage.py send_newsletters``
+    (see store.newsletter). Queuing snapshots the list into CampaignRecipient rows.
+    """
+    STATUS_DRAFT = 'draft'
+    STATUS_QUEUED = 'queued'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_CHOICES = [
+        (STATUS_DRAFT, 'Draft'),
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+    ]
+
+    subject = models.CharField(max_length=200)
+    preheader = models.CharField(max_length=200, blank=True, help_text='Inbox preview text')
+    headline = models.CharField(max_length=200)
+    body = models.TextField(help_text='Plain text; blank lines separate paragraphs')
+    cta_label = models.CharField(max_length=80, blank=True)
+    cta_url = models.URLField(blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_DRAFT)
+    created_at = models.DateTimeField(auto_now_add=True)
+    queued_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now, help_text='Sender heartbeat')
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.subject} ({self.status})'
+
+
+class CampaignRecipient(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    campaign = models.ForeignKey(NewsletterCampaign, related_name='recipients', on_delete=models.CASCADE)
+    subscriber = models.ForeignKey(Subscriber, null=True, blank=True, on_delete=models.SET_NULL)
+    email = models.EmailField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    batch_key = models.CharField(
+        max_length=64, blank=True,
+        help_text='Idempotency key of the batch request this recipient went out in, reused on resume',
+    )
+    provider_id = models.CharField(max_length=100, blank=True, help_text='Resend email id')
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'email'], name='unique_campaign_recipient'),
+        ]
+        indexes = [
+            models.Index(fields=['campaign', 'status', 'id'], name='campaign_recipient_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.email} ({self.status})'
+
+
 class DesignReview(models.Model):
     """Reviews for designs with star ratings and comments"""
     design = models.ForeignKey(Design, on_delete=models.CASCADE, related_name='reviews')
@@ -707,11 +914,14 @@ class Video(models.Model):
             if hasattr(storage, 'generate_filename'):
                 return storage
             else:
-                print(f"WARNING: video_storage {type(storage)} doesn't have generate_filename, falling back to FileSystemStorage")
+                logger.warning(
+                    "video_storage %s doesn't have generate_filename, falling back to FileSystemStorage",
+                    type(storage),
+                )
                 from django.core.files.storage import FileSystemStorage
                 return FileSystemStorage()
         except Exception as e:
-            print(f"ERROR: Failed to get video_storage: {e}, falling back to FileSystemStorage")
+            logger.error("Failed to get video_storage: %s, falling back to FileSystemStorage", e)
             from django.core.files.storage import FileSystemStorage
             return FileSystemStorage()
     
@@ -930,6 +1140,10 @@ class BlogComment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='blogcomment_created_idx'),
+            models.Index(fields=['is_approved', 'created_at'], name='blogcomment_approved_idx'),
+        ]
 
     def __str__(self):
         return f'{self.author_name} on {self.post.title}'
@@ -947,6 +1161,9 @@ class BlogPostLike(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['post', 'visitor_id'], name='unique_post_like_per_visitor'),
         ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='blogpostlike_created_idx'),
+        ]
 
     def __str__(self):
         return self.visitor_name or self.visitor_email or self.visitor_id
@@ -964,6 +1181,9 @@ class BlogCommentLike(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['comment', 'visitor_id'], name='unique_comment_like_per_visitor'),
         ]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='blogcommentlike_created_idx'),
+        ]
 
     def __str__(self):
         return self.visitor_name or self.visitor_email or self.visitor_id
@@ -1000,3 +1220,58 @@ class InfoCard(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class MediaJob(models.Model):
+    """
+    An admin upload spooled to local disk, waiting for the media worker
+    (``manage.py process_media_jobs``) to push it to storage and set the field.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_UPLOADING = 'uploading'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+    field_name = models.CharField(max_length=50)
+    original_name = models.CharField(max_length=255)
+    target_name = models.CharField(max_length=255, help_text='Storage name from the field upload_to')
+    spool_path = models.CharField(max_length=500)
+    size = models.PositiveBigIntegerField(default=0)
+    bytes_uploaded = models.PositiveBigIntegerField(default=0)
+    upload_id = models.CharField(max_length=64, blank=True, help_text='Chunked-upload session, reused on resume')
+    stored_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now, help_text='Not retried before this time')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now, help_text='Worker heartbeat')
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='store_mediajob_queue_idx'),
+            models.Index(fields=['content_type', 'object_id'], name='store_mediajob_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.content_type.model} #{self.object_id} {self.field_name} ({self.status})'
+
+    @property
+    def progress(self):
+        if not self.size:
+            return 0.0
+        return round(100 * self.bytes_uploaded / self.size, 1)
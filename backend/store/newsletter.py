@@ -0,0 +1,312 @@
+"""
+Newsletter campaigns sent through Resend's batch API.
+
+``queue_campaign`` snapshots the subscriber list into CampaignRecipient
+rows; ``manage.py send_newsletters`` claims queued campaigns and sends them.
+The email is rendered once per campaign. Recipients go out in batches of up
+to NEWSLETTER_BATCH_SIZE per POST /emails/batch, with at most
+NEWSLETTER_CONCURRENCY requests in flight and all of them paced to
+NEWSLETTER_REQUESTS_PER_SECOND (Resend's account-wide limit). A 429 pushes
+back every sender thread for its ``retry-after``.
+
+Each batch is claimed before it is sent: its recipients move to "sending"
+and get the batch's Idempotency-Key. A sender that dies or gives up on a
+batch leaves those rows as they are, and the next run re-posts the same
+batch under the same key, which Resend answers from its idempotency cache
+instead of emailing anyone twice.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .email_utils import newsletter_campaign_html
+from .models import CampaignRecipient, NewsletterCampaign, Subscriber
+
+logger = logging.getLogger('bluewardrobe.store.newsletter')
+
+# Resend accepts at most 100 emails per batch request.
+MAX_BATCH_SIZE = 100
+SNAPSHOT_CHUNK_SIZE = 1000
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+# A sending campaign whose heartbeat is older than this was abandoned by a dead sender.
+STALE_CAMPAIGN_AFTER = timedelta(minutes=10)
+
+
+class BatchRejected(Exception):
+    """Resend refused the batch outright (a 4xx other than 429); retrying won't help."""
+
+
+class RateLimiter:
+    """Spaces requests across threads to at most ``per_second``; ``pause`` holds everyone back."""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+@dataclass
+class Batch:
+    key: str
+    recipients: list  # [(id, email)]
+
+
+def queue_campaign(campaign):
+    """Snapshot today's subscribers as the campaign's recipients and queue it. Idempotent."""
+    with transaction.atomic():
+        subscribers = Subscriber.objects.order_by('id').values_list('id', 'email').iterator(chunk_size=SNAPSHOT_CHUNK_SIZE)
+        chunk = []
+        for subscriber_id, email in subscribers:
+            chunk.append(CampaignRecipient(campaign=campaign, subscriber_id=subscriber_id, email=email.strip().lower()))
+            if len(chunk) >= SNAPSHOT_CHUNK_SIZE:
+                CampaignRecipient.objects.bulk_create(chunk, ignore_conflicts=True)
+                chunk = []
+        if chunk:
+            CampaignRecipient.objects.bulk_create(chunk, ignore_conflicts=True)
+        now = timezone.now()
+        NewsletterCampaign.objects.filter(pk=campaign.pk, status=NewsletterCampaign.STATUS_DRAFT).update(
+            status=NewsletterCampaign.STATUS_QUEUED, queued_at=now, updated_at=now,
+        )
+    campaign.refresh_from_db()
+    return campaign
+
+
+def recipient_counts(campaign):
+    return CampaignRecipient.objects.filter(campaign=campaign).aggregate(
+        **{
+            status: Count('id', filter=Q(status=status))
+            for status, _ in CampaignRecipient.STATUS_CHOICES
+        }
+    )
+
+
+def claim_next_campaign():
+    """Move the oldest queued (or abandoned) campaign to "sending"; None when there is nothing to send."""
+    now = timezone.now()
+    candidates = (
+        NewsletterCampaign.objects
+        .filter(
+            Q(status=NewsletterCampaign.STATUS_QUEUED)
+            | Q(status=NewsletterCampaign.STATUS_SENDING, updated_at__lt=now - STALE_CAMPAIGN_AFTER)
+        )
+        .order_by('queued_at', 'id')
+        .values_list('pk', 'status', 'updated_at')[:10]
+    )
+    for pk, campaign_status, updated_at in candidates:
+        claimed = NewsletterCampaign.objects.filter(pk=pk, status=campaign_status, updated_at=updated_at).update(
+            status=NewsletterCampaign.STATUS_SENDING, updated_at=now,
+        )
+        if claimed:
+            return NewsletterCampaign.objects.get(pk=pk)
+    return None
+
+
+def _unfinished_batches(campaign):
+    """Batches a previous run claimed but never recorded, grouped by their idempotency key."""
+    batches = {}
+    rows = (
+        CampaignRecipient.objects
+        .filter(campaign=campaign, status=CampaignRecipient.STATUS_SENDING)
+        .order_by('id')
+        .values_list('batch_key', 'id', 'email')
+    )
+    for key, recipient_id, email in rows:
+        batches.setdefault(key, []).append((recipient_id, email))
+    return [Batch(key, recipients) for key, recipients in batches.items()]
+
+
+def _claim_batch(campaign, batch_size):
+    recipients = list(
+        CampaignRecipient.objects
+        .filter(campaign=campaign, status=CampaignRecipient.STATUS_PENDING)
+        .order_by('id')
+        .values_list('id', 'email')[:batch_size]
+    )
+    if not recipients:
+        return None
+    key = f'campaign-{campaign.pk}-{recipients[0][0]}-{recipients[-1][0]}'
+    CampaignRecipient.objects.filter(
+        pk__in=[recipient_id for recipient_id, _ in recipients], status=CampaignRecipient.STATUS_PENDING,
+    ).update(status=CampaignRecipient.STATUS_SENDING, batch_key=key)
+    return Batch(key, recipients)
+
+
+def _retry_after(response, attempt):
+    try:
+        return max(0.0, float(response.headers.get('retry-after', '')))
+    except ValueError:
+        return RETRY_BASE_DELAY * (2 ** attempt)
+
+
+def post_batch(session, batch, message, limiter):
+    """POST one batch, retrying 429s, 5xx and connection errors. Returns Resend's email ids in order."""
+    url = f"{settings.RESEND_API_URL.rstrip('/')}/emails/batch"
+    headers = {'Authorization': f'Bearer {settings.RESEND_API_KEY}', 'Idempotency-Key': batch.key}
+    payload = [{**message, 'to': [email]} for _, email in batch.recipients]
+    for attempt in range(MAX_ATTEMPTS):
+        limiter.acquire()
+        try:
+            response = session.post(url, json=payload, headers=headers, timeout=30)
+        except requests.RequestException as exc:
+            error = str(exc)
+            time.sleep(RETRY_BASE_DELAY * (2 ** attempt))
+            continue
+        if response.status_code == 429:
+            error = 'Rate limited'
+            limiter.pause(_retry_after(response, attempt))
+            continue
+        if response.status_code >= 500:
+            error = f'HTTP {response.status_code}'
+            time.sleep(RETRY_BASE_DELAY * (2 ** attempt))
+            continue
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get('message') or response.text
+            except ValueError:
+                detail = response.text
+            raise BatchRejected(f'HTTP {response.status_code}: {detail}')
+        return [entry.get('id', '') for entry in response.json().get('data', [])]
+    raise RuntimeError(f'Batch {batch.key} failed after {MAX_ATTEMPTS} attempts: {error}')
+
+
+def _record(batch, ids=None, error=''):
+    now = timezone.now()
+    with transaction.atomic():
+        if error:
+            CampaignRecipient.objects.filter(pk__in=[recipient_id for recipient_id, _ in batch.recipients]).update(
+                status=CampaignRecipient.STATUS_FAILED, error=error,
+            )
+            return
+        ids = list(ids or [])
+        updates = [
+            CampaignRecipient(
+                pk=recipient_id,
+                status=CampaignRecipient.STATUS_SENT,
+                provider_id=ids[index] if index < len(ids) else '',
+                sent_at=now,
+            )
+            for index, (recipient_id, _) in enumerate(batch.recipients)
+        ]
+        CampaignRecipient.objects.bulk_update(updates, ['status', 'provider_id', 'sent_at'])
+
+
+def send_campaign(campaign, *, batch_size=None, concurrency=None, requests_per_second=None):
+    """
+    Send every recipient not yet sent. Returns True when the campaign is
+    finished; False when a batch kept failing, in which case the campaign is
+    queued again and the batch resumes under its key on the next run.
+    """
+    batch_size = min(MAX_BATCH_SIZE, batch_size or settings.NEWSLETTER_BATCH_SIZE)
+    concurrency = max(1, concurrency or settings.NEWSLETTER_CONCURRENCY)
+    limiter = RateLimiter(requests_per_second or settings.NEWSLETTER_REQUESTS_PER_SECOND)
+    message = {
+        'from': settings.RESEND_FROM_EMAIL,
+        'subject': campaign.subject,
+        'html': newsletter_campaign_html(
+            headline=campaign.headline,
+            body=campaign.body,
+            preheader=campaign.preheader,
+            cta_label=campaign.cta_label,
+            cta_url=campaign.cta_url,
+        ),
+    }
+    if settings.RESEND_REPLY_TO:
+        message['reply_to'] = settings.RESEND_REPLY_TO
+
+    resumed = _unfinished_batches(campaign)
+    if resumed:
+        logger.info('Campaign %s: resuming %s unfinished batch(es)', campaign.pk, len(resumed))
+    interrupted = False
+    session = requests.Session()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = {}
+        while True:
+            while not interrupted and len(in_flight) < concurrency:
+                batch = resumed.pop(0) if resumed else _claim_batch(campaign, batch_size)
+                if batch is None:
+                    break
+                in_flight[pool.submit(post_batch, session, batch, message, limiter)] = batch
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    _record(batch, ids=future.result())
+                except BatchRejected as exc:
+                    logger.error('Campaign %s batch %s rejected: %s', campaign.pk, batch.key, exc)
+                    _record(batch, error=str(exc))
+                except Exception as exc:
+                    # Leave the rows "sending" under their key so the next run re-posts this exact batch.
+                    logger.warning('Campaign %s batch %s interrupted: %s', campaign.pk, batch.key, exc)
+                    interrupted = True
+            NewsletterCampaign.objects.filter(pk=campaign.pk).update(updated_at=timezone.now())
+    session.close()
+
+    now = timezone.now()
+    if interrupted:
+        NewsletterCampaign.objects.filter(pk=campaign.pk).update(status=NewsletterCampaign.STATUS_QUEUED, updated_at=now)
+        return False
+    NewsletterCampaign.objects.filter(pk=campaign.pk).update(
+        status=NewsletterCampaign.STATUS_SENT, completed_at=now, updated_at=now,
+    )
+    counts = recipient_counts(campaign)
+    logger.info('Campaign %s sent: %s delivered, %s failed', campaign.pk, counts['sent'], counts['failed'])
+    return True
+
+
+def run_sender(poll_interval=30.0, once=False):
+    """
+    Send queued campaigns until none are left (``once``) or forever. Returns the number finished.
+
+    Running forever, a database error (a dropped or restarted connection) is
+    logged and retried after ``poll_interval`` rather than ending the sender;
+    an interrupted campaign is reclaimed once it goes stale.
+    """
+    finished = 0
+    while True:
+        # Drop connections the server closed or that outlived CONN_MAX_AGE.
+        close_old_connections()
+        try:
+            campaign = claim_next_campaign()
+            sent = campaign is not None and send_campaign(campaign)
+        except DatabaseError:
+            if once:
+                raise
+            logger.exception('Newsletter sender: database error, retrying in %ss', poll_interval)
+            time.sleep(poll_interval)
+            continue
+        if campaign is None:
+            if once:
+                return finished
+            time.sleep(poll_interval)
+            continue
+        if sent:
+            finished += 1
+            continue
+        # Resend is failing; back off instead of spinning on the same batch.
+        if once:
+            return finished
+        time.sleep(poll_interval)
@@ -11,20 +11,20 @@ from typing import Any
 
 import requests
 from django.conf import settings
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
-from .currency_utils import cart_total_ngn, convert_from_ngn, resolve_delivery_from_metadata
+from .checkout_quote import quote_for_payment
 from .email_utils import (
     order_confirmation_customer_html,
-    order_items_from_order,
+    order_email_kwargs,
     order_notification_owner_html,
 )
 from .models import (
     Customer,
-    Design,
     Order,
     OrderItem,
+    PaymentIdempotencyKey,
     PaymentLog,
     SizeMeasurement,
 )
@@ -110,42 +110,14 @@ def send_order_emails(order: Order, customer_email: str | None) -> None:
         .prefetch_related("items__design")
         .get(pk=order.pk)
     )
-    pay_ccy = (getattr(order, "currency", None) or "NGN").upper()
-    line_items = order_items_from_order(order)
-    customer = order.customer
-    customer_name = ""
-    customer_phone = ""
-    if customer:
-        customer_name = f"{customer.first_name} {customer.last_name}".strip()
-        customer_phone = customer.phone or ""
-
-    payment_ref = order.flutterwave_tx_ref or order.paystack_reference or ""
-    delivery = order.delivery_address or ""
-    delivery_type = getattr(order, "delivery_type", "local") or "local"
-    international_region = getattr(order, "international_region", "") or ""
-    country = getattr(order, "country", "") or ""
-    delivery_fee = getattr(order, "delivery_fee", None)
-    subtotal = getattr(order, "subtotal", None)
+    customer_kwargs, owner_kwargs = order_email_kwargs(order, customer_email)
 
     if customer_email:
         params: dict[str, Any] = {
             "from": from_addr,
             "to": [customer_email],
             "subject": f"Your order #{order.id} is confirmed — {site}",
-            "html": order_confirmation_customer_html(
-                order_id=order.id,
-                total=order.total_amount,
-                currency=pay_ccy,
-                site_name=site,
-                customer_name=customer_name,
-                line_items=line_items,
-                delivery_address=delivery,
-                delivery_type=delivery_type,
-                international_region=international_region,
-                country=country,
-                delivery_fee=delivery_fee,
-                subtotal=subtotal,
-            ),
+            "html": order_confirmation_customer_html(**customer_kwargs),
         }
         if reply_to:
             params["reply_to"] = reply_to
@@ -159,25 +131,7 @@ def send_order_emails(order: Order, customer_email: str | None) -> None:
             "from": from_addr,
             "to": owner_recipients,
             "subject": f"New order #{order.id} — {site}",
-            "html": order_notification_owner_html(
-                order_id=order.id,
-                total=order.total_amount,
-                customer_email=customer_email or (customer.email if customer else ""),
-                currency=pay_ccy,
-                site_name=site,
-                customer_name=customer_name,
-                customer_phone=customer_phone,
-                delivery_address=delivery,
-                delivery_type=delivery_type,
-                international_region=international_region,
-                country=country,
-                delivery_fee=delivery_fee,
-                subtotal=subtotal,
-                line_items=line_items,
-                payment_provider=order.payment_provider or "",
-                payment_reference=payment_ref,
-                total_ngn_equivalent=order.total_ngn_equivalent,
-            ),
+            "html": order_notification_owner_html(**owner_kwargs),
         }
         if reply_to:
             owner_params["reply_to"] = reply_to
@@ -201,7 +155,7 @@ def send_order_emails(order: Order, customer_email: str | None) -> None:
                     "type": "order_created",
                     "order_id": order.id,
                     "total": float(order.total_amount),
-                    "currency": pay_ccy,
+                    "currency": customer_kwargs["currency"],
                     "customer_email": customer_email,
                 },
                 timeout=5,
@@ -210,21 +164,17 @@ def send_order_emails(order: Order, customer_email: str | None) -> None:
             logger.warning("Owner notification webhook failed: %s", e)
 
 
-def _existing_success_order(gateway: str, reference: str) -> Order | None:
-    """Match by reference; require gateway match only when the log row has gateway set (older rows may be blank)."""
-    log = (
-        PaymentLog.objects.filter(reference=reference)
-        .select_related("order")
-        .order_by("-created_at")
-        .first()
-    )
-    if not log or not log.order_id:
-        return None
-    if log.status.lower() not in ("success", "successful"):
-        return None
-    if log.gateway and log.gateway != gateway:
-        return None
-    return log.order
+def _claim_payment(gateway: str, reference: str) -> tuple[PaymentIdempotencyKey, bool]:
+    """
+    Insert the payment's idempotency key; (key, True) when this call claimed it.
+    A concurrent claimer's insert waits on the unique index until the first
+    finalize commits, then gets the key (and its order) back with False.
+    """
+    try:
+        with transaction.atomic():
+            return PaymentIdempotencyKey.objects.create(gateway=gateway, reference=reference), True
+    except IntegrityError:
+        return PaymentIdempotencyKey.objects.select_related("order").get(gateway=gateway, reference=reference), False
 
 
 @transaction.atomic
@@ -245,12 +195,15 @@ def finalize_order_from_cart(
 ) -> tuple[Order, bool]:
     """
     Create order + line items, decrement SizeMeasurement stock, log payment.
-    Idempotent per (gateway, reference) when a successful log already exists.
+    A payment short of its quote, or in another currency, is booked with
+    status "review" and leaves stock untouched.
+    Idempotent per (gateway, reference): the first call claims the payment's
+    PaymentIdempotencyKey, every other call gets that order back.
     Returns (order, created_new).
     """
-    existing = _existing_success_order(gateway, reference)
-    if existing:
-        return existing, False
+    key, claimed = _claim_payment(gateway, reference)
+    if not claimed:
+        return key.order, False
 
     phone = _phone_from_meta(metadata, customer_meta)
 
@@ -284,64 +237,68 @@ def finalize_order_from_cart(
     if pay_currency not in ("NGN", "USD", "GBP"):
         pay_currency = "NGN"
 
-    delivery_info = resolve_delivery_from_metadata(metadata)
-    merchandise_ngn = cart_total_ngn(cart)
-    delivery_fee_ngn = delivery_info["delivery_fee_ngn"]
-    total_ngn_equivalent = (merchandise_ngn + delivery_fee_ngn).quantize(Decimal("0.01"))
-
+    # Book the order from the quote the payment was started with; only
+    # payments started before quotes existed get their cart priced here.
+    quote = quote_for_payment(metadata, cart, pay_currency)
     # Prefer gateway-charged amount for total_amount; merchandise subtotal in charge currency.
     # delivery_fee is always persisted as the exact NGN fee configured at purchase time.
     charge_total = Decimal(str(amount)).quantize(Decimal("0.01"))
-    subtotal_charged = convert_from_ngn(merchandise_ngn, pay_currency)
+    # A short or wrong-currency payment is booked for the owner to review:
+    # it is recorded, but takes no stock and sends no confirmation.
+    underpaid = quote.currency != pay_currency or charge_total < quote.amount
+    if quote.currency != pay_currency:
+        logger.warning(
+            "%s %s: charged in %s but quoted in %s.", gateway, reference, pay_currency, quote.currency
+        )
+    elif charge_total != quote.amount:
+        logger.warning(
+            "%s %s: charged %s %s but the quote was %s.", gateway, reference, charge_total, pay_currency, quote.amount
+        )
 
     order = Order.objects.create(
         customer=customer,
         delivery_address=delivery_address,
-        delivery_type=delivery_info["delivery_type"],
-        international_region=delivery_info["international_region"],
-        country=delivery_info["country"],
-        subtotal=subtotal_charged,
-        delivery_fee=delivery_fee_ngn,
-        currency=pay_currency,
+        delivery_type=quote.delivery_type,
+        international_region=quote.international_region,
+        country=quote.country,
+        subtotal=quote.convert(quote.merchandise_ngn),
+        delivery_fee=quote.delivery_fee_ngn,
+        currency=quote.currency,
         total_amount=charge_total,
-        total_ngn_equivalent=total_ngn_equivalent,
-        status="confirmed",
+        total_ngn_equivalent=quote.total_ngn,
+        status="review" if underpaid else "confirmed",
         payment_provider=gateway,
         paystack_reference=paystack_reference or "",
         flutterwave_tx_ref=flutterwave_tx_ref or "",
     )
 
-    for item in cart:
-        design_id = item.get("id")
-        size = item.get("size")
-        qty = int(item.get("qty") or 1)
-        design = Design.objects.filter(id=design_id).select_for_update().first()
-        if not design:
+    # One locking read for every line's stock, then one insert and one update.
+    sizes = SizeMeasurement.objects.select_for_update().in_bulk(
+        [line.size_measurement_id for line in quote.lines]
+    )
+    now = timezone.now()
+    order_items = []
+    for line in quote.lines:
+        size_measurement = sizes.get(line.size_measurement_id)
+        if not size_measurement or not size_measurement.is_active or size_measurement.stock < line.quantity:
             continue
-
-        size_measurement = (
-            SizeMeasurement.objects.filter(
-                design=design, size=size, is_active=True
+        order_items.append(
+            OrderItem(
+                order=order,
+                design_id=line.design_id,
+                size=line.size,
+                quantity=line.quantity,
+                unit_price=quote.convert(line.unit_price_ngn),
             )
-            .select_for_update()
-            .first()
         )
-
-        if not size_measurement or size_measurement.stock < qty:
+        if underpaid:
             continue
-
-        unit_price_ngn = Decimal(str(design.effective_price))
-        unit_price = convert_from_ngn(unit_price_ngn, pay_currency)
-        OrderItem.objects.create(
-            order=order,
-            design=design,
-            size=size,
-            quantity=qty,
-            unit_price=unit_price,
-        )
-
-        size_measurement.stock = max(0, size_measurement.stock - qty)
-        size_measurement.save(update_fields=["stock"])
+        size_measurement.stock = max(0, size_measurement.stock - line.quantity)
+        # bulk_update skips auto_now; cart ETags read this timestamp.
+        size_measurement.updated_at = now
+    OrderItem.objects.bulk_create(order_items)
+    if not underpaid:
+        SizeMeasurement.objects.bulk_update(sizes.values(), ["stock", "updated_at"])
 
     PaymentLog.objects.create(
         order=order,
@@ -349,10 +306,12 @@ def finalize_order_from_cart(
         reference=reference,
         status=status_str,
         amount=order.total_amount,
-        currency=pay_currency,
+        currency=order.currency,
         raw_response=raw_payload,
         paid_at=timezone.now(),
     )
+    key.order = order
+    key.save(update_fields=["order"])
 
     return order, True
 
@@ -398,3 +357,88 @@ def parse_flutterwave_meta(data: dict[str, Any]) -> dict[str, Any]:
                 merged.update(obj)
         return merged
     return {}
+
+
+def paid_order(gateway: str, reference: str) -> Order | None:
+    """The order already finalized for this payment (by webhook or an earlier verify), if any."""
+    if not reference:
+        return None
+    key = (
+        PaymentIdempotencyKey.objects.filter(gateway=gateway, reference=reference, order__isnull=False)
+        .select_related("order")
+        .first()
+    )
+    return key.order if key else None
+
+
+def fetch_flutterwave_transaction(*, tx_ref: str = "", transaction_id: str = "") -> tuple[int, dict[str, Any]]:
+    """Ask Flutterwave for a transaction; returns (HTTP status, JSON body)."""
+    headers = {"Authorization": f"Bearer {settings.FLUTTERWAVE_SECRET_KEY}"}
+    # Prefer tx_ref (our canonical idempotency key); fall back to transaction_id when redirects omit tx_ref.
+    if tx_ref:
+        resp = requests.get(
+            "https://api.flutterwave.com/v3/transactions/verify_by_reference",
+            params={"tx_ref": tx_ref},
+            headers=headers,
+            timeout=60,
+        )
+    else:
+        resp = requests.get(
+            f"https://api.flutterwave.com/v3/transactions/{transaction_id}/verify",
+            headers=headers,
+            timeout=60,
+        )
+    return resp.status_code, (resp.json() if resp.content else {})
+
+
+def complete_paystack_charge(data: dict[str, Any], raw_payload: dict[str, Any]) -> tuple[Order, bool]:
+    """Finalize a successful Paystack charge (verify response or charge.success event ``data``)."""
+    reference = data.get("reference") or ""
+    metadata = data.get("metadata") or {}
+    customer_email = (data.get("customer") or {}).get("email") or metadata.get("email")
+    order, created_new = finalize_order_from_cart(
+        gateway="paystack",
+        reference=reference,
+        amount=(data.get("amount") or 0) / 100,
+        status_str=data.get("status") or "success",
+        raw_payload=raw_payload,
+        customer_email=customer_email,
+        cart=metadata.get("cart") or [],
+        customer_meta=metadata.get("customer") or {},
+        metadata=metadata,
+        paystack_reference=reference,
+        flutterwave_tx_ref="",
+        charge_currency="NGN",
+    )
+    if created_new and order.status == "confirmed":
+        send_order_emails(order, customer_email)
+    return order, created_new
+
+
+def complete_flutterwave_charge(
+    data: dict[str, Any], raw_payload: dict[str, Any], reference: str
+) -> tuple[Order, bool]:
+    """Finalize a successful Flutterwave charge (verify response or charge.completed event ``data``)."""
+    meta = parse_flutterwave_meta(data)
+    # Pass full parsed meta so deliveryAddress and other TBW fields reach finalize_order_from_cart.
+    metadata = dict(meta)
+    charge_currency = (data.get("currency") or metadata.get("payCurrency") or "NGN").upper()[:3]
+    metadata["payCurrency"] = charge_currency
+    customer_email = (data.get("customer") or {}).get("email") or meta.get("email")
+    order, created_new = finalize_order_from_cart(
+        gateway="flutterwave",
+        reference=reference,
+        amount=float(data.get("amount") or 0),
+        status_str="successful",
+        raw_payload=raw_payload,
+        customer_email=customer_email,
+        cart=meta.get("cart") or [],
+        customer_meta=meta.get("customer") or {},
+        metadata=metadata,
+        paystack_reference="",
+        flutterwave_tx_ref=reference,
+        charge_currency=charge_currency,
+    )
+    if created_new and order.status == "confirmed":
+        send_order_emails(order, customer_email)
+    return order, created_new
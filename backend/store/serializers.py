@@ -1,14 +1,22 @@
+import logging
 from decimal import Decimal
 
+from django.db.models import Avg, Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 
+from bluewardrobe.image_variants import responsive_sources, responsive_srcset
+from bluewardrobe.media_urls import absolute_url, media_url
+
 from .currency_utils import convert_from_ngn
 from .models import (
     Collection, Design, DesignImage, SizeMeasurement, SizeInventory, Cart, CartItem, Material, SiteAsset, Order, OrderItem,
     Customer, ContactMessage, Subscriber, Video, VideoComment, VideoLike, VideoCommentLike, InfoCard, DesignReview,
-    HomeHeroCopy, HeroMarqueeSlide, AtelierStorySlide,
+    HomeHeroCopy, HeroMarqueeSlide, AtelierStorySlide, MediaJob,
 )
 
+logger = logging.getLogger('bluewardrobe.store.serializers')
+
 
 class MaterialSerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,65 +28,63 @@ def absolute_media_url(request, file_field):
     if not file_field:
         return None
     try:
-        url = file_field.url
-        if isinstance(url, str) and url.startswith(('http://', 'https://')):
-            return url
-        if isinstance(url, str) and url.startswith('//'):
-            return f'https:{url}'
-        if request:
-            return request.build_absolute_uri(url)
-        return url
+        return absolute_url(request, media_url(file_field))
     except (AttributeError, ValueError, TypeError):
         return None
 
 
-class HeroMarqueeSlideSerializer(serializers.ModelSerializer):
+class ResponsiveImageMixin(serializers.Serializer):
+    """Adds ``srcset`` (WebP) and ``sources`` (AVIF/WebP <picture> sources) for ``responsive_image_field``."""
+    responsive_image_field = 'image'
+
+    srcset = serializers.SerializerMethodField()
+    sources = serializers.SerializerMethodField()
+
+    def _responsive_file(self, obj):
+        return getattr(obj, self.responsive_image_field, None)
+
+    def get_srcset(self, obj):
+        return responsive_srcset(self.context.get('request'), self._responsive_file(obj))
+
+    def get_sources(self, obj):
+        file_field = self._responsive_file(obj)
+        if not file_field:
+            return []
+        return responsive_sources(self.context.get('request'), file_field)
+
+
+class HeroMarqueeSlideSerializer(ResponsiveImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
 
     class Meta:
         model = HeroMarqueeSlide
-        fields = ['id', 'image_url', 'alt_text', 'sort_order']
+        fields = ['id', 'image_url', 'srcset', 'sources', 'alt_text', 'sort_order']
 
     def get_image_url(self, obj):
         return absolute_media_url(self.context.get('request'), obj.image)
 
 
-class AtelierStorySlideSerializer(serializers.ModelSerializer):
+class AtelierStorySlideSerializer(ResponsiveImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
 
     class Meta:
         model = AtelierStorySlide
-        fields = ['id', 'title', 'description', 'image_url', 'icon_key', 'sort_order']
+        fields = ['id', 'title', 'description', 'image_url', 'srcset', 'sources', 'icon_key', 'sort_order']
 
     def get_image_url(self, obj):
         return absolute_media_url(self.context.get('request'), obj.image)
 
 
-class DesignImageSerializer(serializers.ModelSerializer):
+class DesignImageSerializer(ResponsiveImageMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
     
     class Meta:
         model = DesignImage
-        fields = ['id', 'image', 'image_url', 'alt_text', 'order', 'created_at']
+        fields = ['id', 'image', 'image_url', 'srcset', 'sources', 'alt_text', 'order', 'created_at']
     
     def get_image_url(self, obj):
-        if not obj.image:
-            return None
-        try:
-            url = obj.image.url
-            if not url:
-                return None
-            # Cloudinary returns absolute https URLs; do not wrap with API host.
-            if isinstance(url, str) and url.startswith(('http://', 'https://')):
-                return url
-            if isinstance(url, str) and url.startswith('//'):
-                return f'https:{url}'
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(url)
-            return url
-        except (AttributeError, ValueError, TypeError):
-            return None
+        # Cloudinary returns absolute https URLs; do not wrap with API host.
+        return absolute_media_url(self.context.get('request'), obj.image) or None
 
 
 class SizeInventorySerializer(serializers.ModelSerializer):
@@ -99,7 +105,50 @@ class SizeMeasurementSerializer(serializers.ModelSerializer):
         fields = ['id', 'size', 'bust', 'waist', 'hips', 'stock', 'is_active', 'availability_status', 'is_in_stock']
 
 
-class DesignSerializer(serializers.ModelSerializer):
+def to_foreign(amount_ngn, currency: str, fx=None):
+    """``amount_ngn`` in USD or GBP as a float, with the ``fx`` context rates when given."""
+    try:
+        d = Decimal(str(amount_ngn))
+        if fx and currency == "USD":
+            return float((d / Decimal(str(fx["ngn_per_usd"]))).quantize(Decimal("0.01")))
+        if fx and currency == "GBP":
+            return float((d / Decimal(str(fx["ngn_per_gbp"]))).quantize(Decimal("0.01")))
+        return float(convert_from_ngn(d, currency))
+    except Exception:
+        return None
+
+
+def stored_or_converted(stored, amount_ngn, currency: str, fx=None):
+    # The stored columns follow every rate change; convert only rows that have none.
+    if stored is not None:
+        return float(stored)
+    return to_foreign(amount_ngn, currency, fx)
+
+
+class ForeignPriceMixin(serializers.Serializer):
+    """USD/GBP prices from Design's stored columns, converted only for rows that have none."""
+    price_usd = serializers.SerializerMethodField()
+    price_gbp = serializers.SerializerMethodField()
+    effective_price_usd = serializers.SerializerMethodField()
+    effective_price_gbp = serializers.SerializerMethodField()
+
+    def _stored_or_converted(self, stored, amount_ngn, currency: str):
+        return stored_or_converted(stored, amount_ngn, currency, self.context.get("fx"))
+
+    def get_price_usd(self, obj):
+        return self._stored_or_converted(obj.price_usd, obj.price, "USD")
+
+    def get_price_gbp(self, obj):
+        return self._stored_or_converted(obj.price_gbp, obj.price, "GBP")
+
+    def get_effective_price_usd(self, obj):
+        return self._stored_or_converted(obj.effective_price_usd, obj.effective_price, "USD")
+
+    def get_effective_price_gbp(self, obj):
+        return self._stored_or_converted(obj.effective_price_gbp, obj.effective_price, "GBP")
+
+
+class DesignSerializer(ForeignPriceMixin, serializers.ModelSerializer):
     collection_id = serializers.PrimaryKeyRelatedField(queryset=Collection.objects.all(), source='collection', write_only=True)
     collection = serializers.StringRelatedField(read_only=True)
     images = DesignImageSerializer(many=True, read_only=True)
@@ -114,36 +163,8 @@ class DesignSerializer(serializers.ModelSerializer):
     total_reviews = serializers.ReadOnlyField()
     rating_distribution = serializers.ReadOnlyField()
     reviews = serializers.SerializerMethodField()
-    price_usd = serializers.SerializerMethodField()
-    price_gbp = serializers.SerializerMethodField()
-    effective_price_usd = serializers.SerializerMethodField()
-    effective_price_gbp = serializers.SerializerMethodField()
     preorder_status = serializers.ReadOnlyField()
     is_preorder_purchasable = serializers.ReadOnlyField()
-
-    def _to_foreign(self, amount_ngn, currency: str):
-        fx = self.context.get("fx")
-        try:
-            d = Decimal(str(amount_ngn))
-            if fx and currency == "USD":
-                return float((d / Decimal(str(fx["ngn_per_usd"]))).quantize(Decimal("0.01")))
-            if fx and currency == "GBP":
-                return float((d / Decimal(str(fx["ngn_per_gbp"]))).quantize(Decimal("0.01")))
-            return float(convert_from_ngn(d, currency))
-        except Exception:
-            return None
-
-    def get_price_usd(self, obj):
-        return self._to_foreign(obj.price, "USD")
-
-    def get_price_gbp(self, obj):
-        return self._to_foreign(obj.price, "GBP")
-
-    def get_effective_price_usd(self, obj):
-        return self._to_foreign(obj.effective_price, "USD")
-
-    def get_effective_price_gbp(self, obj):
-        return self._to_foreign(obj.effective_price, "GBP")
     
     class Meta:
         model = Design
@@ -162,44 +183,24 @@ class DesignSerializer(serializers.ModelSerializer):
         """
         Return the video URL for FileField
         """
-        print(f"DEBUG: get_video_url called for design {obj.id}: {obj.title}")
-        print(f"DEBUG: Video field value: {obj.video}")
-        print(f"DEBUG: Video field type: {type(obj.video)}")
-        
-        if obj.video:
-            try:
-                # Get the video URL from Cloudinary or local storage
-                video_url = obj.video.url
-                print(f"DEBUG: Raw video URL from storage: {video_url}")
-                print(f"DEBUG: Video URL type: {type(video_url)}")
-                
-                # Check if URL is empty or None
-                if not video_url:
-                    print(f"DEBUG: Video URL is empty or None")
-                    return None
-                
-                # If it's already a full Cloudinary URL, return it as-is
-                if isinstance(video_url, str) and video_url.startswith('http'):
-                    print(f"DEBUG: Returning Cloudinary URL directly: {video_url}")
-                    return video_url
-                
-                # If it's a relative path, build absolute URI
-                request = self.context.get('request')
-                if request:
-                    full_url = request.build_absolute_uri(video_url)
-                    print(f"DEBUG: Built absolute URI: {full_url}")
-                    return full_url
-                
-                return video_url
-            except Exception as e:
-                print(f"DEBUG: Error getting video URL: {e}")
-                print(f"DEBUG: Exception type: {type(e)}")
-                import traceback
-                print(f"DEBUG: Traceback: {traceback.format_exc()}")
-                return None
-        else:
-            print(f"DEBUG: No video file found for design {obj.id}")
-        return None
+        if not obj.video:
+            return None
+        try:
+            # Get the video URL from Cloudinary or local storage
+            video_url = media_url(obj.video)
+        except Exception:
+            logger.debug("Could not resolve video URL for design %s", obj.id, exc_info=True)
+            return None
+        if not video_url:
+            return None
+        # If it's already a full Cloudinary URL, return it as-is
+        if isinstance(video_url, str) and video_url.startswith('http'):
+            return video_url
+        # If it's a relative path, build absolute URI
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(video_url)
+        return video_url
     
     def get_total_stock(self, obj):
         return sum(measurement.stock for measurement in obj.size_measurements.all())
@@ -210,9 +211,89 @@ class DesignSerializer(serializers.ModelSerializer):
         return DesignReviewSerializer(reviews, many=True).data
 
 
+class DesignListSerializer(ForeignPriceMixin, serializers.ModelSerializer):
+    """
+    A design as a catalogue card: prices, the first image, stock and a rating
+    summary. Serialize querysets from ``DesignListSerializer.prepare``, which
+    brings the image, stock and ratings along as annotations so a whole list
+    is one query; DesignSerializer stays the full product page.
+    """
+    collection = serializers.StringRelatedField(read_only=True)
+    has_discount = serializers.ReadOnlyField()
+    effective_price = serializers.ReadOnlyField()
+    discount_percentage = serializers.ReadOnlyField()
+    total_stock = serializers.SerializerMethodField()
+    image = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
+    total_reviews = serializers.SerializerMethodField()
+    preorder_status = serializers.ReadOnlyField()
+
+    class Meta:
+        model = Design
+        fields = [
+            'id', 'collection', 'sku', 'title',
+            'price', 'discount_price', 'has_discount', 'effective_price', 'discount_percentage',
+            'price_usd', 'price_gbp', 'effective_price_usd', 'effective_price_gbp',
+            'total_stock', 'image', 'average_rating', 'total_reviews',
+            'is_preorder', 'preorder_start_at', 'preorder_end_at', 'preorder_wait_days', 'preorder_status',
+            'is_featured', 'created_at',
+        ]
+
+    @staticmethod
+    def prepare(queryset):
+        """Annotate a Design queryset with what the card needs (the collection is left to the caller)."""
+        approved = DesignReview.objects.filter(design=OuterRef('pk'), is_approved=True).order_by().values('design')
+        first_image = DesignImage.objects.filter(design=OuterRef('pk')).order_by('order', 'created_at')
+        stock = SizeMeasurement.objects.filter(design=OuterRef('pk')).order_by().values('design')
+        return queryset.defer('description').annotate(
+            list_stock=Coalesce(Subquery(stock.annotate(total=Sum('stock')).values('total')), 0),
+            list_reviews=Coalesce(Subquery(approved.annotate(n=Count('pk')).values('n')), 0),
+            list_rating=Subquery(approved.annotate(avg=Avg('rating')).values('avg')),
+            list_image_id=Subquery(first_image.values('pk')[:1]),
+            list_image_name=Subquery(first_image.values('image')[:1]),
+            list_image_alt=Subquery(first_image.values('alt_text')[:1]),
+        )
+
+    def get_total_stock(self, obj):
+        if hasattr(obj, 'list_stock'):
+            return obj.list_stock
+        return sum(measurement.stock for measurement in obj.size_measurements.all())
+
+    def get_average_rating(self, obj):
+        if not hasattr(obj, 'list_rating'):
+            return obj.average_rating
+        return round(obj.list_rating, 1) if obj.list_rating is not None else 0
+
+    def get_total_reviews(self, obj):
+        return obj.list_reviews if hasattr(obj, 'list_reviews') else obj.total_reviews
+
+    def get_image(self, obj):
+        if hasattr(obj, 'list_image_id'):
+            if not obj.list_image_id:
+                return None
+            return card_image(self.context.get('request'), obj.list_image_id, obj.list_image_name, obj.list_image_alt)
+        first = obj.images.order_by('order', 'created_at').first()
+        if first is None:
+            return None
+        return card_image(self.context.get('request'), first.pk, first.image, first.alt_text)
+
+
+def card_image(request, image_id, image, alt_text):
+    """A design card's ``image``; ``image`` is a FieldFile or the stored file name."""
+    if isinstance(image, str):
+        image_field = DesignImage._meta.get_field('image')
+        image = image_field.attr_class(None, image_field, image)
+    return {
+        'id': image_id,
+        'image_url': absolute_media_url(request, image) or None,
+        'srcset': responsive_srcset(request, image),
+        'alt_text': alt_text,
+    }
+
+
 class CollectionSerializer(serializers.ModelSerializer):
     materials = MaterialSerializer(many=True, read_only=True)
-    designs = DesignSerializer(many=True, read_only=True)
+    designs = DesignListSerializer(many=True, read_only=True)
     material_ids = serializers.PrimaryKeyRelatedField(many=True, queryset=Material.objects.all(), write_only=True, required=False, source='materials')
 
     class Meta:
@@ -247,16 +328,7 @@ class SiteAssetSerializer(serializers.ModelSerializer):
             # Cloudinary storage returns full URLs automatically
             # But we'll ensure it's properly formatted
             try:
-                url = obj.file.url
-                # If it's already a full URL (starts with http), return as is
-                if url.startswith('http://') or url.startswith('https://'):
-                    return url
-                # Otherwise, build absolute URL if we have request context
-                request = self.context.get('request')
-                if request:
-                    return request.build_absolute_uri(url)
-                # Fallback: return as is (Cloudinary should provide full URL)
-                return url
+                return absolute_url(self.context.get('request'), media_url(obj.file))
             except Exception:
                 # Fallback to string representation
                 return str(obj.file)
@@ -275,26 +347,68 @@ class SubscriberSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'subscribed_at']
 
 
+class CartDesignSerializer(serializers.ModelSerializer):
+    """The slice of a design a cart line needs; ``first_image`` is set by store.cart_store."""
+    effective_price = serializers.ReadOnlyField()
+    images = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Design
+        fields = ['id', 'title', 'sku', 'price', 'discount_price', 'effective_price', 'is_preorder', 'images']
+
+    def get_images(self, obj):
+        name = getattr(obj, 'first_image', None)
+        if not name:
+            return []
+        image = DesignImage(image=name)
+        return [{'image_url': absolute_media_url(self.context.get('request'), image.image)}]
+
+
 class CartItemSerializer(serializers.ModelSerializer):
-    design = DesignSerializer(read_only=True)
+    design = CartDesignSerializer(read_only=True)
     size_measurement = SizeMeasurementSerializer(read_only=True)
+    size = serializers.SerializerMethodField()
     subtotal = serializers.ReadOnlyField()
     unit_price = serializers.ReadOnlyField()
     is_available = serializers.ReadOnlyField()
     
     class Meta:
         model = CartItem
-        fields = ['id', 'design', 'size_measurement', 'quantity', 'unit_price', 'subtotal', 'is_available']
+        fields = ['id', 'design', 'size_measurement', 'size', 'quantity', 'unit_price', 'subtotal', 'is_available']
 
+    def get_size(self, obj):
+        return obj.size_measurement.size if obj.size_measurement else None
 
-class CartSerializer(serializers.ModelSerializer):
+
+class CartSerializer(serializers.Serializer):
+    """Serializes a store.cart_store.CartView."""
+    id = serializers.ReadOnlyField()
+    session_id = serializers.ReadOnlyField()
+    customer_email = serializers.ReadOnlyField()
+    version = serializers.ReadOnlyField()
     items = CartItemSerializer(many=True, read_only=True)
     total_items = serializers.ReadOnlyField()
     total_amount = serializers.ReadOnlyField()
-    
-    class Meta:
-        model = Cart
-        fields = ['id', 'session_id', 'customer_email', 'items', 'total_items', 'total_amount', 'created_at', 'updated_at']
+    created_at = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    design_id = serializers.IntegerField(min_value=1)
+    size_measurement_id = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    quantity = serializers.IntegerField(min_value=0, default=1)
+
+    def validate(self, attrs):
+        if attrs['op'] != 'remove' and not attrs.get('size_measurement_id'):
+            raise serializers.ValidationError({'size_measurement_id': 'Required for add and set.'})
+        if attrs['op'] == 'add' and attrs['quantity'] < 1:
+            raise serializers.ValidationError({'quantity': 'Must be at least 1 for add.'})
+        return attrs
+
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False, max_length=100)
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -338,6 +452,22 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
+class AdminOrderItemSerializer(serializers.ModelSerializer):
+    """Order lines for the dashboard list: the design as a reference, not the full catalogue entry."""
+    design = serializers.SerializerMethodField()
+
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'design', 'size', 'quantity', 'unit_price']
+
+    def get_design(self, obj):
+        return {'id': obj.design_id, 'sku': obj.design.sku, 'title': obj.design.title}
+
+
+class AdminOrderSerializer(OrderSerializer):
+    items = AdminOrderItemSerializer(many=True, read_only=True)
+
+
 class DesignReviewSerializer(serializers.ModelSerializer):
     """Serializer for design reviews"""
     stars_display = serializers.ReadOnlyField()
@@ -388,26 +518,10 @@ class VideoSerializer(serializers.ModelSerializer):
         ]
     
     def get_video_file_url(self, obj):
-        if obj.video_file:
-            try:
-                request = self.context.get('request')
-                if request:
-                    return request.build_absolute_uri(obj.video_file.url)
-                return obj.video_file.url
-            except AttributeError:
-                return None
-        return None
+        return absolute_media_url(self.context.get('request'), obj.video_file)
     
     def get_thumbnail_url(self, obj):
-        if obj.thumbnail:
-            try:
-                request = self.context.get('request')
-                if request:
-                    return request.build_absolute_uri(obj.thumbnail.url)
-                return obj.thumbnail.url
-            except AttributeError:
-                return None
-        return None
+        return absolute_media_url(self.context.get('request'), obj.thumbnail)
     
     def get_comments_count(self, obj):
         return obj.comments_count
@@ -505,3 +619,19 @@ class InfoCardSerializer(serializers.ModelSerializer):
     class Meta:
         model = InfoCard
         fields = ['id', 'title', 'description', 'icon', 'color', 'image', 'link_url', 'link_text', 'is_active', 'order', 'created_at']
+
+
+class MediaJobSerializer(serializers.ModelSerializer):
+    model = serializers.SerializerMethodField()
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = MediaJob
+        fields = [
+            'id', 'model', 'object_id', 'field_name', 'original_name', 'size', 'bytes_uploaded', 'progress',
+            'status', 'attempts', 'error', 'stored_name', 'available_at', 'created_at', 'updated_at', 'completed_at',
+        ]
+        read_only_fields = fields
+
+    def get_model(self, obj):
+        return f'{obj.content_type.app_label}.{obj.content_type.model}'
@@ -0,0 +1,139 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from bluewardrobe import share_meta
+from bluewardrobe.image_variants import (
+    delete_local_variants,
+    generate_local_variants,
+    has_local_variants,
+)
+
+from . import fx
+from .email_utils import invalidate_email_brand
+from .media_jobs import BACKGROUND_MEDIA_FIELDS, defer_media_uploads, enqueue_deferred_uploads
+from .models import (
+    AtelierStorySlide, BlogPost, BlogPostMedia, Design, DesignImage, HeroMarqueeSlide, SiteAsset, StoreCurrencySettings,
+)
+
+logger = logging.getLogger('bluewardrobe.store.signals')
+
+# Model -> name of the image field that gets responsive variants.
+RESPONSIVE_IMAGE_FIELDS = {
+    DesignImage: 'image',
+    HeroMarqueeSlide: 'image',
+    AtelierStorySlide: 'image',
+    BlogPostMedia: 'file',
+}
+
+
+def _responsive_file(instance):
+    if isinstance(instance, BlogPostMedia) and instance.media_type != 'image':
+        return None
+    return getattr(instance, RESPONSIVE_IMAGE_FIELDS[type(instance)], None)
+
+
+def build_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    file_field = _responsive_file(instance)
+    if not file_field:
+        return
+    try:
+        if has_local_variants(file_field):
+            return
+        stored = generate_local_variants(file_field)
+    except FileNotFoundError:
+        logger.debug('Skipping variants for missing file %s', file_field.name)
+        return
+    except Exception:
+        logger.warning('Could not generate image variants for %s', file_field.name, exc_info=True)
+        return
+    if stored:
+        logger.debug('Generated %s variants for %s', len(stored), file_field.name)
+
+
+def remove_image_variants(sender, instance, **kwargs):
+    file_field = _responsive_file(instance)
+    if not file_field:
+        return
+    try:
+        delete_local_variants(file_field)
+    except Exception:
+        logger.warning('Could not delete image variants for %s', file_field.name, exc_info=True)
+
+
+def refresh_design_share_card(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    design_id = instance.pk if isinstance(instance, Design) else instance.design_id
+    transaction.on_commit(lambda: share_meta.refresh_design(design_id))
+
+
+def touch_design(sender, instance, raw=False, **kwargs):
+    # A design's images are part of it: cart ETags and the like key on
+    # Design.updated_at, and a new, removed or reordered image changes the card.
+    if raw:
+        return
+    Design.objects.filter(pk=instance.design_id).update(updated_at=timezone.now())
+
+
+def refresh_previous_blog_share_card(sender, instance, raw=False, **kwargs):
+    # A renamed slug leaves the old path cached; rebuild it (as "not found") too.
+    if raw or not instance.pk:
+        return
+    previous = BlogPost.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+    if previous and previous != instance.slug:
+        transaction.on_commit(lambda: share_meta.refresh_blog_post(previous))
+
+
+def refresh_blog_share_card(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    slug = instance.slug
+    transaction.on_commit(lambda: share_meta.refresh_blog_post(slug))
+
+
+def refresh_email_brand(sender, **kwargs):
+    # The logo in every email comes from the logo_primary SiteAsset.
+    transaction.on_commit(invalidate_email_brand)
+
+
+def refresh_fx_table(sender, instance, raw=False, **kwargs):
+    # Now, so this request converts with the new rates, and again after commit
+    # in case another thread reloaded the old row in between.
+    fx.invalidate()
+    transaction.on_commit(fx.invalidate)
+    if raw:
+        return
+    # In the same transaction, so stored design prices never lag the rates.
+    repriced = fx.reprice_designs(instance)
+    if repriced:
+        logger.info('Repriced %s design(s) for new FX rates', repriced)
+
+
+for _model in RESPONSIVE_IMAGE_FIELDS:
+    post_save.connect(build_image_variants, sender=_model, dispatch_uid=f'store.variants.build.{_model.__name__}')
+    post_delete.connect(remove_image_variants, sender=_model, dispatch_uid=f'store.variants.remove.{_model.__name__}')
+
+for _model in BACKGROUND_MEDIA_FIELDS:
+    pre_save.connect(defer_media_uploads, sender=_model, dispatch_uid=f'store.media_jobs.defer.{_model.__name__}')
+    post_save.connect(enqueue_deferred_uploads, sender=_model, dispatch_uid=f'store.media_jobs.enqueue.{_model.__name__}')
+
+for _model in (Design, DesignImage):
+    post_save.connect(refresh_design_share_card, sender=_model, dispatch_uid=f'store.share_meta.save.{_model.__name__}')
+    post_delete.connect(refresh_design_share_card, sender=_model, dispatch_uid=f'store.share_meta.delete.{_model.__name__}')
+
+post_save.connect(touch_design, sender=DesignImage, dispatch_uid='store.design.touch.save.DesignImage')
+post_delete.connect(touch_design, sender=DesignImage, dispatch_uid='store.design.touch.delete.DesignImage')
+
+pre_save.connect(refresh_previous_blog_share_card, sender=BlogPost, dispatch_uid='store.share_meta.rename.BlogPost')
+post_save.connect(refresh_blog_share_card, sender=BlogPost, dispatch_uid='store.share_meta.save.BlogPost')
+post_delete.connect(refresh_blog_share_card, sender=BlogPost, dispatch_uid='store.share_meta.delete.BlogPost')
+
+post_save.connect(refresh_email_brand, sender=SiteAsset, dispatch_uid='store.email_brand.save.SiteAsset')
+post_delete.connect(refresh_email_brand, sender=SiteAsset, dispatch_uid='store.email_brand.delete.SiteAsset')
+
+post_save.connect(refresh_fx_table, sender=StoreCurrencySettings, dispatch_uid='store.fx.save.StoreCurrencySettings')
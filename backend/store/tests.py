@@ -1,11 +1,63 @@
+import base64
+import gzip
+import hashlib
+import hmac
+import io
+import json
+import threading
+from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
+from unittest import mock
+
+import cloudinary
 from tempfile import TemporaryDirectory
 
+from django.conf import settings
+from django.contrib import admin
 from django.contrib.auth import get_user_model
-from django.test import SimpleTestCase, TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, connection
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import HttpResponse, QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.authtoken.models import Token
 from rest_framework.test import APIClient
 
-from .models import BlogPost, BusinessProfile, Collection
+from bluewardrobe import share_meta
+from bluewardrobe.fake_cloudinary import FakeCloudinaryServer
+from bluewardrobe.fake_resend import FakeResendServer
+from bluewardrobe.image_variants import clear_local_variants, has_local_variants
+from bluewardrobe.media_urls import clear_media_url_cache, media_url, media_url_cache_info
+from bluewardrobe.renderers import ORJSONRenderer
+from bluewardrobe.spa_shell import clear_shell_cache, shell_response
+from bluewardrobe.static_assets import FrontendAssetMiddleware
+from bluewardrobe.storage import LargeVideoCloudinaryStorage, _compress_image_for_cloudinary
+
+from . import fx, newsletter
+from .catalogue import design_facets
+from .checkout_quote import build_quote
+from .email_utils import (
+    EmailTemplate,
+    order_confirmation_customer_html,
+    order_email_kwargs,
+    order_notification_owner_html,
+)
+from .media_jobs import run_worker
+from .models import (
+    BlogComment, BlogCommentLike, BlogPost, BlogPostLike, BlogPostMedia, BusinessProfile, CampaignRecipient, Cart, CartItem, Collection,
+    Customer, Design, DesignImage, DesignReview, FxRate, Material, MediaJob, NewsletterCampaign, Order, OrderItem, PaymentIdempotencyKey, PaymentLog, SizeInventory,
+    SiteAsset, SizeMeasurement, StoreCurrencySettings, Subscriber, Video, VideoComment, VideoCommentLike, VideoLike,
+)
+from .payment_utils import finalize_order_from_cart, parse_flutterwave_meta
+from .serializers import DesignImageSerializer
 
 
 class StoreModelTests(TestCase):
@@ -128,6 +180,938 @@ class StoreApiTests(TestCase):
         self.assertEqual(comment_like_response.data['likes_count'], 1)
 
 
+class CartStoreTests(TestCase):
+    def setUp(self):
+        self.client = APIClient(HTTP_X_SESSION_ID='cart-session-1')
+        collection = Collection.objects.create(code='TBW-030', title='Cart')
+        self.design = Design.objects.create(collection=collection, sku='TBW-030-1', title='Gown', price=1000)
+        DesignImage.objects.bulk_create([DesignImage(design=self.design, image='designs/images/front.jpg')])
+        self.size = SizeMeasurement.objects.create(
+            design=self.design, size=10, bust=34, waist=27, hips=37, stock=3,
+        )
+
+    def _add(self, quantity):
+        return self.client.post(
+            '/api/cart/add/',
+            {'design_id': self.design.pk, 'size_measurement_id': self.size.pk, 'quantity': quantity},
+            format='json',
+        )
+
+    def test_adding_twice_upserts_one_line_and_bumps_the_version(self):
+        self.assertEqual(self._add(1).status_code, 200)
+        response = self._add(2)
+
+        self.assertEqual(response.data['version'], 2)
+        self.assertEqual(len(response.data['items']), 1)
+        line = response.data['items'][0]
+        self.assertEqual((line['quantity'], line['size'], line['subtotal']), (2, 10, 2000))
+        self.assertTrue(line['design']['images'][0]['image_url'].endswith('/media/designs/images/front.jpg'))
+        self.assertEqual(self._add(5).status_code, 400)
+
+    def test_cart_read_is_one_query_and_revalidates_with_etag(self):
+        self._add(1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/cart/')
+        self.assertEqual(response.data['total_items'], 1)
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        SizeMeasurement.objects.filter(pk=self.size.pk).update(stock=0, updated_at=timezone.now())
+        self.assertEqual(self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+        removed = self.client.post('/api/cart/remove/', {'design_id': self.design.pk}, format='json')
+        self.assertEqual(removed.data['items'], [])
+        self.assertEqual(Cart.objects.get(session_id='cart-session-1').version, 2)
+
+    def test_etag_follows_sold_stock_and_image_changes(self):
+        self._add(1)
+        etag = self.client.get('/api/cart/')['ETag']
+        line = [{'id': self.design.pk, 'size': 10, 'qty': 1}]
+        finalize_order_from_cart(
+            gateway='paystack', reference='PSK-035', status_str='success', raw_payload={},
+            amount=build_quote(currency='NGN', metadata={'cart': line}, strict=False).amount,
+            customer_email='ada@example.com', cart=line, customer_meta={}, metadata={},
+        )
+        response = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.data['items'][0]['size_measurement']['stock']), (200, 2))
+
+        etag = response['ETag']
+        DesignImage.objects.create(design=self.design, image='designs/images/new-front.jpg', order=-1)
+        response = self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['items'][0]['design']['images'][0]['image_url'].endswith('new-front.jpg'))
+        self.assertEqual(self.client.get('/api/cart/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_batch_applies_all_operations_in_one_pass(self):
+        other = SizeMeasurement.objects.create(design=self.design, size=12, bust=36, waist=29, hips=39, stock=5)
+        self._add(1)
+        operations = [
+            {'op': 'add', 'design_id': self.design.pk, 'size_measurement_id': self.size.pk, 'quantity': 1},
+            {'op': 'set', 'design_id': self.design.pk, 'size_measurement_id': other.pk, 'quantity': 4},
+            {'op': 'add', 'design_id': self.design.pk, 'size_measurement_id': other.pk, 'quantity': 1},
+        ]
+        response = self.client.post('/api/cart/batch/', {'operations': operations}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(line['size'], line['quantity']) for line in response.data['items']], [(10, 2), (12, 5)])
+        self.assertEqual(response.data['version'], 2)
+
+        rejected = self.client.post('/api/cart/batch/', {'operations': [
+            {'op': 'remove', 'design_id': self.design.pk, 'size_measurement_id': other.pk},
+            {'op': 'add', 'design_id': self.design.pk, 'size_measurement_id': self.size.pk, 'quantity': 2},
+        ]}, format='json')
+        self.assertEqual(rejected.status_code, 400)
+        self.assertEqual(rejected.data['errors'][0]['detail'], 'Insufficient stock')
+        self.assertEqual(self.client.get('/api/cart/').data['total_items'], 7)
+
+    def test_gc_removes_only_idle_carts_in_batches(self):
+        for index in range(3):
+            cart = Cart.objects.create(session_id=f'idle-{index}')
+            CartItem.objects.create(cart=cart, design=self.design, size_measurement=self.size)
+        Cart.objects.update(updated_at=timezone.now() - timedelta(days=45))
+        self._add(1)
+
+        out = io.StringIO()
+        call_command('gc_carts', '--batch-size', '2', '--pause', '0', stdout=out)
+
+        self.assertIn('Reclaimed 3 cart(s), 3 cart item(s), 0 session(s).', out.getvalue())
+        self.assertEqual(list(Cart.objects.values_list('session_id', flat=True)), ['cart-session-1'])
+
+    def test_gc_loop_outlives_a_database_error(self):
+        reclaimed = {'carts': 1, 'cart_items': 0, 'sessions': 0}
+        out = io.StringIO()
+        with mock.patch('store.management.commands.gc_carts.collect_garbage', side_effect=[DatabaseError, reclaimed]), \
+                mock.patch('store.management.commands.gc_carts.close_old_connections') as close, \
+                mock.patch('store.management.commands.gc_carts.time.sleep', side_effect=[None, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('gc_carts', '--every', '60', stdout=out)
+        self.assertEqual(close.call_count, 2)
+        self.assertIn('Reclaimed 1 cart(s)', out.getvalue())
+
+
+        response = self.client.get('/api/cart/')
+        self.assertEqual((response.data['id'], response.data['items']), (None, []))
+        self.assertFalse(Cart.objects.exists())
+
+
+class CheckoutQuoteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient(HTTP_X_SESSION_ID='quote-session-1')
+        StoreCurrencySettings.objects.update_or_create(
+            pk=1, defaults={'ngn_per_usd': 1500, 'local_delivery_fee': 0, 'international_delivery_fee': 30000},
+        )
+        collection = Collection.objects.create(code='TBW-038', title='Quote')
+        self.design = Design.objects.create(collection=collection, sku='TBW-038-1', title='Gown', price=60000)
+        self.size = SizeMeasurement.objects.create(
+            design=self.design, size=12, bust=34, waist=27, hips=37, stock=5,
+        )
+        cart = Cart.objects.create(session_id='quote-session-1')
+        CartItem.objects.create(cart=cart, design=self.design, size_measurement=self.size, quantity=2)
+        self.metadata = {
+            'customer': {'firstName': 'Ada', 'lastName': 'Obi'},
+            'phone': '08030000000',
+            'deliveryAddress': '12 Example Street, Toronto, Ontario',
+            'isInternationalDelivery': True,
+            'internationalRegion': 'CA',
+        }
+
+    def _quote(self, currency='USD'):
+        return self.client.post('/api/checkout/quote/', {'currency': currency, 'metadata': self.metadata}, format='json')
+
+    def test_quote_prices_the_server_cart_in_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self._quote()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_ngn'], '150000.00')
+        self.assertEqual(response.data['amount'], '100.00')
+        self.assertEqual(response.data['country'], 'Canada')
+        self.assertEqual(response.data['items'][0]['unit_price'], '40.00')
+
+        SizeMeasurement.objects.filter(pk=self.size.pk).update(stock=1)
+        self.assertEqual(self._quote().status_code, 400)
+
+    @override_settings(FLUTTERWAVE_SECRET_KEY='flw-test')
+    def test_initiate_charges_the_quote_and_finalize_books_it(self):
+        token = self._quote().data['quote']
+        # Price and FX edits after quoting change neither the charge nor the order.
+        Design.objects.filter(pk=self.design.pk).update(price=90000)
+        StoreCurrencySettings.objects.filter(pk=1).update(ngn_per_usd=1000)
+
+        gateway = mock.Mock(status_code=200, content=b'{}')
+        gateway.json.return_value = {'status': 'success', 'data': {'link': 'https://pay.example/x'}}
+        with mock.patch('store.views.requests.post', return_value=gateway) as post:
+            response = self.client.post(
+                '/api/flutterwave/initiate/',
+                {'email': 'ada@example.com', 'currency': 'USD', 'quote': token, 'metadata': self.metadata},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        charged = post.call_args.kwargs['json']
+        self.assertEqual((charged['amount'], charged['currency']), ('100.00', 'USD'))
+
+        meta = parse_flutterwave_meta({'meta': charged['meta']})
+        order, created = finalize_order_from_cart(
+            gateway='flutterwave', reference='TBW-1', amount=100, status_str='successful',
+            raw_payload={}, customer_email='ada@example.com', cart=meta['cart'],
+            customer_meta=meta['customer'], metadata=meta, flutterwave_tx_ref='TBW-1', charge_currency='USD',
+        )
+        self.assertTrue(created)
+        self.assertEqual((order.subtotal, order.total_ngn_equivalent), (Decimal('80.00'), Decimal('150000.00')))
+        self.assertEqual(order.items.get().unit_price, Decimal('40.00'))
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.stock, 3)
+
+    @override_settings(PAYSTACK_SECRET='sk-test')
+    def test_initiate_rejects_tampered_or_expired_quotes(self):
+        token = self._quote('NGN').data['quote']
+        payload = {'email': 'ada@example.com', 'metadata': self.metadata}
+
+        response = self.client.post('/api/paystack/initiate/', {**payload, 'quote': token[:-2] + 'xx'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        with override_settings(CHECKOUT_QUOTE_TTL=-1):
+            response = self.client.post('/api/paystack/initiate/', {**payload, 'quote': token}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('expired', response.data['detail'])
+
+
+class FxRateTests(TestCase):
+    def setUp(self):
+        StoreCurrencySettings.objects.update_or_create(
+            pk=1, defaults={'ngn_per_usd': 1500, 'ngn_per_gbp': 1900, 'ngn_per_cad': 1100},
+        )
+        fx.invalidate()
+        self.addCleanup(fx.invalidate)
+        collection = Collection.objects.create(code='TBW-046', title='FX')
+        self.design = Design.objects.create(collection=collection, sku='TBW-046-1', title='Kaftan', price=60000)
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.rates_file = Path(temp_dir.name) / 'rates.json'
+
+    def _refresh(self, rates):
+        self.rates_file.write_text(json.dumps(rates))
+        with override_settings(FX_RATES_FILE=str(self.rates_file)):
+            call_command('refresh_fx_rates', provider='store.fx.FileFxProvider', stdout=io.StringIO())
+
+    def _design_prices(self):
+        response = self.client.get(f'/api/designs/{self.design.pk}/')
+        return response.data['price_usd'], response.data['price_gbp']
+
+    def test_refresh_records_history_and_swaps_the_table(self):
+        self.assertEqual(self._design_prices(), (40.0, 31.58))
+
+        self._refresh({'rates': {'USD': 1600, 'GBP': '2000.5', 'EUR': 1700}})
+
+        self.assertEqual(
+            sorted(FxRate.objects.values_list('currency', 'ngn_per_unit', 'source')),
+            [('GBP', Decimal('2000.5000'), 'file'), ('USD', Decimal('1600.0000'), 'file')],
+        )
+        solo = StoreCurrencySettings.get_solo()
+        self.assertEqual((solo.ngn_per_usd, solo.ngn_per_cad), (Decimal('1600'), Decimal('1100')))
+        with self.assertNumQueries(0):
+            table = fx.current_rates()
+        self.assertEqual(table.rates['CAD'], Decimal('1100'))
+        with self.assertRaises(TypeError):
+            table.serializer_context['ngn_per_usd'] = 1
+        self.assertEqual(self._design_prices(), (37.5, 29.99))
+
+    def test_bad_rates_change_nothing(self):
+        with self.assertRaises(CommandError):
+            self._refresh({'USD': -5, 'GBP': 2000})
+        with self.assertRaises(CommandError):
+            self._refresh({'JPY': 10})
+
+        self.assertFalse(FxRate.objects.exists())
+        self.assertEqual(StoreCurrencySettings.get_solo().ngn_per_usd, Decimal('1500'))
+        self.assertEqual(self._design_prices(), (40.0, 31.58))
+
+    def test_refresh_loop_outlives_a_database_error(self):
+        command = 'store.management.commands.refresh_fx_rates'
+        out = io.StringIO()
+        with mock.patch(f'{command}.refresh_rates', side_effect=[DatabaseError, fx.current_rates()]) as refresh, \
+                mock.patch(f'{command}.close_old_connections') as close, \
+                mock.patch(f'{command}.time.sleep', side_effect=[None, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('refresh_fx_rates', provider='store.fx.FileFxProvider', every=60, stdout=out)
+        self.assertEqual((refresh.call_count, close.call_count), (2, 2))
+        self.assertIn('USD 1500', out.getvalue())
+        with self.assertRaises(TypeError):
+            fx.FxProvider()
+
+    def test_edits_are_picked_up_without_making_readers_wait(self):
+        before = fx.current_rates()
+        solo = StoreCurrencySettings.get_solo()
+        solo.ngn_per_usd = Decimal('1200')
+        solo.save()
+
+        # While another thread reloads, readers keep the old table instead of queueing.
+        with fx._reload_lock, self.assertNumQueries(0):
+            self.assertIs(fx.current_rates(), before)
+        self.assertEqual(fx.current_rates().rates['USD'], Decimal('1200'))
+        self.assertEqual(self._design_prices(), (50.0, 31.58))
+
+    def test_design_prices_are_stored_and_follow_rate_changes(self):
+        self.design.discount_price = Decimal('45000')
+        self.design.save()
+        Design.objects.create(collection=self.design.collection, sku='TBW-046-2', title='Wrap', price=19000)
+
+        solo = StoreCurrencySettings.get_solo()
+        solo.ngn_per_gbp = Decimal('1000')
+        solo.save()
+
+        self.assertEqual(
+            list(Design.objects.order_by('effective_price_gbp').values_list(
+                'sku', 'effective_price_ngn', 'price_usd', 'price_gbp', 'effective_price_usd', 'effective_price_gbp',
+            )),
+            [
+                ('TBW-046-2', Decimal('19000'), Decimal('12.67'), Decimal('19'), Decimal('12.67'), Decimal('19')),
+                ('TBW-046-1', Decimal('45000'), Decimal('40'), Decimal('60'), Decimal('30'), Decimal('45')),
+            ],
+        )
+        self.assertEqual(fx.reprice_designs(), 0)
+        self.assertEqual(self._design_prices(), (40.0, 60.0))
+
+
+class CatalogueFilterTests(TestCase):
+    def setUp(self):
+        StoreCurrencySettings.objects.update_or_create(pk=1, defaults={'ngn_per_usd': 1500, 'ngn_per_gbp': 2000})
+        silk = Material.objects.create(name='Silk')
+        cotton = Material.objects.create(name='Cotton')
+        self.signature = Collection.objects.create(code='TBW-048', title='Signature')
+        self.signature.materials.add(silk)
+        self.daywear = Collection.objects.create(code='TBW-049', title='Daywear')
+        self.daywear.materials.add(cotton)
+        self.gown = Design.objects.create(
+            collection=self.signature, sku='TBW-048-1', title='Gown', price=60000, discount_price=45000,
+        )
+        self.slip = Design.objects.create(collection=self.signature, sku='TBW-048-2', title='Slip', price=30000)
+        self.shirt = Design.objects.create(collection=self.daywear, sku='TBW-049-1', title='Shirt', price=90000)
+        for design, size, stock in ((self.gown, 8, 2), (self.gown, 10, 0), (self.slip, 12, 1), (self.shirt, 8, 0)):
+            SizeMeasurement.objects.create(design=design, size=size, bust=34, waist=27, hips=37, stock=stock)
+        self.material_ids = {'silk': silk.pk, 'cotton': cotton.pk}
+
+    def _skus(self, **params):
+        response = self.client.get('/api/designs/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [design['sku'] for design in response.data]
+
+    def test_filters_and_price_ordering_run_in_sql(self):
+        self.assertEqual(self._skus(currency='USD', max_price='30'), ['TBW-048-2', 'TBW-048-1'])
+        self.assertEqual(self._skus(size='8,12'), ['TBW-048-2', 'TBW-048-1'])
+        self.assertEqual(self._skus(size='10'), [])
+        self.assertEqual(self._skus(in_stock='true', discounted='true'), ['TBW-048-1'])
+        self.assertEqual(self._skus(material=self.material_ids['cotton']), ['TBW-049-1'])
+        self.assertEqual(self._skus(collection=self.signature.pk, ordering='price'), ['TBW-048-2', 'TBW-048-1'])
+        self.assertEqual(self._skus(ordering='-price', currency='GBP'), ['TBW-049-1', 'TBW-048-1', 'TBW-048-2'])
+        for bad in ({'size': 'eight'}, {'currency': 'EUR'}, {'min_price': 'cheap'}, {'ordering': 'title'}):
+            self.assertEqual(self.client.get('/api/designs/', bad).status_code, 400)
+
+    def test_facets_come_back_with_the_results_from_one_query(self):
+        response = self.client.get('/api/designs/', {'facets': 'true', 'currency': 'USD', 'in_stock': 'true'})
+
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual([design['sku'] for design in response.data['results']], ['TBW-048-2', 'TBW-048-1'])
+        self.assertEqual(response.data['facets'], {
+            'price': {'currency': 'USD', 'min': 20, 'max': 30},
+            'sizes': [{'size': 8, 'count': 1}, {'size': 12, 'count': 1}],
+            'collections': [{'id': self.signature.pk, 'title': 'Signature', 'count': 2}],
+            'materials': [{'id': self.material_ids['silk'], 'name': 'Silk', 'count': 2}],
+            'discounted': 1,
+            'in_stock': 2,
+        })
+        with self.assertNumQueries(1):
+            facets = design_facets(Design.objects.all(), QueryDict('currency=GBP'))
+        self.assertEqual(facets['price'], {'currency': 'GBP', 'min': 15, 'max': 45})
+        self.assertEqual([row['count'] for row in facets['collections']], [2, 1])
+        self.assertEqual(facets['total'], 3)
+
+    def test_each_facet_counts_without_its_own_filter(self):
+        with self.assertNumQueries(1):
+            facets = design_facets(Design.objects.all(), QueryDict(f'size=8&collection={self.signature.pk}'))
+
+        # The gown matches, but the slip's size 12 stays on offer beside it.
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual(facets['sizes'], [{'size': 8, 'count': 1}, {'size': 12, 'count': 1}])
+        # Daywear's shirt has no size 8 in stock, so only Signature is left to pick.
+        self.assertEqual(facets['collections'], [{'id': self.signature.pk, 'title': 'Signature', 'count': 1}])
+        self.assertEqual(facets['materials'], [{'id': self.material_ids['silk'], 'name': 'Silk', 'count': 1}])
+
+    def test_count_covers_capped_results_and_filters_skip_product_pages(self):
+        Design.objects.bulk_create(
+            Design(collection=self.daywear, sku=f'TBW-049-R{index}', title='Reserve', price=1000, is_preorder=True)
+            for index in range(101)
+        )
+        response = self.client.get('/api/designs/atelier-reserve/', {'facets': 'true'})
+        self.assertEqual((response.data['count'], len(response.data['results'])), (101, 100))
+
+        # A list filter on a product page or its reviews neither hides it nor fails.
+        for path in (f'/api/designs/{self.shirt.pk}/', f'/api/designs/{self.shirt.pk}/reviews/'):
+            self.assertEqual(self.client.get(path, {'in_stock': 'true', 'size': 'eight'}).status_code, 200)
+
+
+class DesignListSerializerTests(TestCase):
+    def setUp(self):
+        self.collection = Collection.objects.create(code='TBW-049', title='Cards')
+        for index in range(3):
+            design = Design.objects.create(
+                collection=self.collection, sku=f'TBW-049-{index}', title=f'Look {index}', price=50000 + index,
+                discount_price=40000 if index == 1 else None,
+            )
+            if index:
+                DesignImage.objects.create(design=design, image=f'designs/images/back-{index}.jpg', order=2)
+                DesignImage.objects.create(design=design, image=f'designs/images/front-{index}.jpg', alt_text='Front', order=1)
+            for size, stock in ((8, index), (10, 2)):
+                SizeMeasurement.objects.create(design=design, size=size, bust=34, waist=27, hips=37, stock=stock)
+            for rating in range(index + 1):
+                DesignReview.objects.create(
+                    design=design, name='Ada', email=f'ada{rating}@example.com', rating=rating + 3, comment='Lovely',
+                )
+        DesignReview.objects.create(
+            design=design, name='Bo', email='bo@example.com', rating=1, comment='Hidden', is_approved=False,
+        )
+        fx.current_rates()
+
+    def test_cards_match_the_full_serializer_in_one_query(self):
+        # The first request reads which variants each image has from the shared cache.
+        self.client.get('/api/designs/')
+        with self.assertNumQueries(1):
+            cards = self.client.get('/api/designs/').data
+
+        self.assertEqual(len(cards), 3)
+        for card in cards:
+            full = self.client.get(f"/api/designs/{card['id']}/").data
+            first_image = full['images'][0] if full['images'] else None
+            self.assertEqual(card['image'], first_image and {
+                key: first_image[key] for key in ('id', 'image_url', 'srcset', 'alt_text')
+            })
+            shared = set(card) - {'image'}
+            self.assertEqual(card, {**{key: full[key] for key in shared}, 'image': card['image']})
+        by_sku = {card['sku']: card for card in cards}
+        self.assertEqual(
+            (by_sku['TBW-049-2']['total_stock'], by_sku['TBW-049-2']['average_rating'], by_sku['TBW-049-2']['total_reviews']),
+            (4, 4.0, 3),
+        )
+        self.assertEqual(by_sku['TBW-049-1']['image']['alt_text'], 'Front')
+        self.assertIsNone(by_sku['TBW-049-0']['image'])
+
+    def test_collections_nest_cards(self):
+        self.client.get('/api/collections/')
+        with self.assertNumQueries(3):
+            collections = self.client.get('/api/collections/').data
+        designs = collections[0]['designs']
+        self.assertEqual([design['sku'] for design in designs], ['TBW-049-2', 'TBW-049-1', 'TBW-049-0'])
+        self.assertNotIn('reviews', designs[0])
+
+
+class FastReadListTests(TestCase):
+    def setUp(self):
+        silk = Material.objects.create(name='Silk', description='Mulberry')
+        lace = Material.objects.create(name='Lace')
+        collection = Collection.objects.create(
+            code='TBW-050', title='Fast \u2028 Lists', featured_image='collections/fast.jpg',
+        )
+        collection.materials.set([lace, silk])
+        Collection.objects.create(code='TBW-050B', title='Empty', is_featured=False)
+        now = timezone.now()
+        for index in range(3):
+            design = Design.objects.create(
+                collection=collection, sku=f'TBW-050-{index}', title=f'Robe élégante {index}',
+                price=Decimal('48500.50') + index, discount_price=Decimal('39999.99') if index == 1 else None,
+                is_preorder=index == 2, preorder_start_at=now + timedelta(days=1) if index == 2 else None,
+            )
+            if index:
+                DesignImage.objects.create(design=design, image=f'designs/images/fast-{index}.jpg', alt_text='Front')
+                SizeMeasurement.objects.create(design=design, size=8, bust=34, waist=27, hips=37, stock=index)
+                DesignReview.objects.create(
+                    design=design, name='Ada', email='ada@example.com', rating=index + 2, comment='Lovely',
+                )
+        Design.objects.filter(sku='TBW-050-0').update(price_usd=None)
+
+        posts = [
+            BlogPost.objects.create(title='Studio notes', content='...', cover_image='blog/covers/studio.jpg'),
+            BlogPost.objects.create(title='Fabric day', content='...', published_at=now - timedelta(days=1)),
+            BlogPost.objects.create(title='Draft', content='...', is_published=False),
+        ]
+        BlogPostMedia.objects.create(post=posts[0], file='blog/media/clip.mp4', media_type='video', order=0)
+        BlogPostMedia.objects.create(post=posts[0], file='blog/media/look.jpg', caption='Look', order=1)
+        BlogPostMedia.objects.create(post=posts[1], file='blog/media/bolt.jpg', alt_text='Bolt', order=0)
+        BlogPostLike.objects.create(post=posts[0], visitor_id='a')
+        BlogPostLike.objects.create(post=posts[0], visitor_id='b')
+        BlogComment.objects.create(post=posts[1], author_name='Bo', author_email='bo@example.com', body='Nice')
+        BlogComment.objects.create(
+            post=posts[1], author_name='Cy', author_email='cy@example.com', body='Spam', is_approved=False,
+        )
+        fx.current_rates()
+
+    def test_fast_lists_return_the_same_bytes(self):
+        paths = [
+            '/api/designs/',
+            '/api/designs/?facets=true&currency=USD&ordering=price',
+            '/api/designs/atelier-reserve/',
+            '/api/collections/',
+            '/api/blog/',
+        ]
+        responses = {}
+        for path in paths:
+            with self.subTest(path=path):
+                with override_settings(FAST_READ_LISTS=False):
+                    slow = self.client.get(path)
+                with override_settings(FAST_READ_LISTS=True):
+                    fast = self.client.get(path)
+                self.assertEqual(fast.status_code, 200)
+                self.assertIsInstance(fast.accepted_renderer, ORJSONRenderer)
+                self.assertNotIsInstance(slow.accepted_renderer, ORJSONRenderer)
+                self.assertEqual(fast['Content-Type'], slow['Content-Type'])
+                self.assertEqual(fast.content, slow.content)
+                responses[path] = fast
+        self.assertIn(b'Fast \\u2028 Lists', responses['/api/collections/'].content)
+        cards = {card['sku']: card for card in responses['/api/designs/'].json()}
+        self.assertEqual(cards['TBW-050-2']['preorder_status'], 'upcoming')
+        self.assertIsNotNone(cards['TBW-050-0']['price_usd'])
+        posts = responses['/api/blog/'].json()
+        self.assertEqual([post['title'] for post in posts], ['Studio notes', 'Fabric day'])
+        self.assertEqual((posts[0]['likes_count'], posts[0]['media_preview']['media_type']), (2, 'video'))
+        self.assertEqual((posts[1]['comments_count'], posts[1]['media_preview']['alt_text']), (1, 'Bolt'))
+
+    @override_settings(FAST_READ_LISTS=True)
+    def test_fast_lists_query_counts(self):
+        for path, queries in (('/api/designs/', 1), ('/api/collections/', 3), ('/api/blog/', 2)):
+            # The first request reads which variants each image has from the shared cache.
+            self.client.get(path)
+            with self.subTest(path=path), self.assertNumQueries(queries):
+                self.client.get(path)
+        # Product pages keep the full serializer.
+        design = Design.objects.get(sku='TBW-050-1')
+        self.assertIn('description', self.client.get(f'/api/designs/{design.pk}/').json())
+
+    def test_renderer_matches_json_renderer(self):
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            'price': Decimal('12.50'), 'at': timezone.now(), 'on': timezone.now().date(),
+            'text': 'na\u00efve \u2029 \U0001f457', 'ratings': {1: 0, 5: 2}, 'items': ('a', None, True, 1.5),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        # Beyond 64 bits orjson gives up and the stdlib renderer answers.
+        self.assertEqual(ORJSONRenderer().render({'n': 2 ** 70}), b'{"n":1180591620717411303424}')
+        self.assertEqual(
+            ORJSONRenderer().render({'a': 1}, 'application/json; indent=2'),
+            JSONRenderer().render({'a': 1}, 'application/json; indent=2'),
+        )
+
+
+@override_settings(PAYSTACK_SECRET='sk-test', FLUTTERWAVE_SECRET_KEY='flw-test', FLUTTERWAVE_WEBHOOK_HASH='flw-hash')
+class PaymentWebhookTests(TestCase):
+    def setUp(self):
+        collection = Collection.objects.create(code='TBW-039', title='Webhooks')
+        design = Design.objects.create(collection=collection, sku='TBW-039-1', title='Gown', price=50000)
+        self.size = SizeMeasurement.objects.create(design=design, size=8, bust=34, waist=27, hips=37, stock=4)
+        self.metadata = {
+            'customer': {'firstName': 'Ada', 'lastName': 'Obi'},
+            'phone': '08030000000',
+            'deliveryAddress': '3 Marina Road, Lagos',
+            'cart': [{'id': design.pk, 'size': 8, 'qty': 1}],
+        }
+        self.metadata['quote'] = build_quote(currency='NGN', metadata=self.metadata).sign()
+        self.client = APIClient()
+
+    def _paystack_event(self, reference='PSK-1'):
+        return json.dumps({
+            'event': 'charge.success',
+            'data': {
+                'reference': reference, 'status': 'success', 'amount': 5000000,
+                'customer': {'email': 'ada@example.com'}, 'metadata': self.metadata,
+            },
+        }).encode()
+
+    def _post(self, path, body, **headers):
+        return self.client.generic('POST', path, body, content_type='application/json', **headers)
+
+    def test_signed_paystack_event_books_once_and_verify_is_a_read(self):
+        body = self._paystack_event()
+        signature = hmac.new(b'sk-test', body, hashlib.sha512).hexdigest()
+
+        self.assertEqual(self._post('/api/paystack/webhook/', body, HTTP_X_PAYSTACK_SIGNATURE='0' * 128).status_code, 401)
+        for _ in range(2):  # gateways retry deliveries
+            self.assertEqual(self._post('/api/paystack/webhook/', body, HTTP_X_PAYSTACK_SIGNATURE=signature).status_code, 200)
+        order = Order.objects.get()
+        self.assertEqual((order.total_amount, order.items.count()), (Decimal('50000.00'), 1))
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.stock, 3)
+
+        with mock.patch('store.views.requests.get') as gateway:
+            response = self.client.post('/api/paystack/verify/', {'reference': 'PSK-1'}, format='json')
+        gateway.assert_not_called()
+        self.assertEqual((response.status_code, response.data['id']), (200, order.id))
+
+    def test_a_claimed_payment_is_never_finalized_twice(self):
+        def finalize():
+            return finalize_order_from_cart(
+                gateway='paystack', reference='PSK-2', amount=50000, status_str='success', raw_payload={},
+                customer_email='ada@example.com', cart=self.metadata['cart'], customer_meta={}, metadata=self.metadata,
+            )
+
+        order, created = finalize()
+        self.assertTrue(created)
+        # A second finalize (a late verify or a webhook retry) loses the insert and reads the claim.
+        again, created = finalize()
+        self.assertEqual((again, created), (order, False))
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(PaymentIdempotencyKey.objects.get().order, order)
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.stock, 3)
+
+    def test_short_or_wrong_currency_payment_is_held_for_review(self):
+        def paystack_event(reference, amount):
+            data = json.loads(self._paystack_event(reference))
+            data['data']['amount'] = amount
+            return json.dumps(data).encode()
+
+        body = paystack_event('PSK-3', 4000000)
+        signature = hmac.new(b'sk-test', body, hashlib.sha512).hexdigest()
+        with mock.patch('store.payment_utils.send_order_emails') as send:
+            response = self._post('/api/paystack/webhook/', body, HTTP_X_PAYSTACK_SIGNATURE=signature)
+            order, created = finalize_order_from_cart(
+                gateway='flutterwave', reference='FLW-3', amount=50000, status_str='successful', raw_payload={},
+                customer_email='ada@example.com', cart=self.metadata['cart'], customer_meta={},
+                metadata=self.metadata, charge_currency='USD',
+            )
+        self.assertEqual(response.status_code, 200)
+        send.assert_not_called()
+        self.assertEqual(
+            list(Order.objects.order_by('id').values_list('status', 'total_amount')),
+            [('review', Decimal('40000.00')), ('review', Decimal('50000.00'))],
+        )
+        self.assertEqual(order.items.count(), 1)
+        self.size.refresh_from_db()
+        self.assertEqual(self.size.stock, 4)
+
+    def test_flutterwave_event_accepts_verif_hash_or_hmac_signature(self):
+        def event(tx_ref):
+            return json.dumps({
+                'event': 'charge.completed',
+                'data': {
+                    'tx_ref': tx_ref, 'status': 'successful', 'amount': 50000, 'currency': 'NGN',
+                    'customer': {'email': 'ada@example.com'},
+                    'meta': {'tbw_metadata': json.dumps(self.metadata)},
+                },
+            }).encode()
+
+        self.assertEqual(self._post('/api/flutterwave/webhook/', event('TBW-a'), HTTP_VERIF_HASH='nope').status_code, 401)
+        self.assertEqual(self._post('/api/flutterwave/webhook/', event('TBW-a'), HTTP_VERIF_HASH='flw-hash').status_code, 200)
+        body = event('TBW-b')
+        signature = base64.b64encode(hmac.new(b'flw-hash', body, hashlib.sha256).digest()).decode()
+        self.assertEqual(self._post('/api/flutterwave/webhook/', body, HTTP_FLUTTERWAVE_SIGNATURE=signature).status_code, 200)
+
+        self.assertEqual(
+            sorted(Order.objects.values_list('flutterwave_tx_ref', flat=True)), ['TBW-a', 'TBW-b'],
+        )
+
+
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class AdminChangelistQueryTests(TestCase):
+    """Every store changelist costs the same queries for a page of 2 rows or 6."""
+
+    MAX_QUERIES = 12
+
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('owner', 'owner@example.com', 'pw'))
+        self.collection = Collection.objects.create(code='TBW-041', title='Admin')
+        self._add_rows(0, 2)
+
+    def _add_rows(self, start, count):
+        for i in range(start, start + count):
+            design = Design.objects.create(collection=self.collection, sku=f'TBW-041-{i}', title=f'Gown {i}', price=1000)
+            DesignImage.objects.bulk_create([DesignImage(design=design, image=f'designs/images/{i}.jpg')])
+            size = SizeMeasurement.objects.create(design=design, size=10, bust=34, waist=27, hips=37, stock=2)
+            SizeInventory.objects.create(design=design, size=10, stock=2)
+            DesignReview.objects.create(design=design, name='Ada', email='ada@example.com', rating=5, comment='Lovely')
+            cart = Cart.objects.create(session_id=f'admin-cart-{i}')
+            CartItem.objects.create(cart=cart, design=design, size_measurement=size, quantity=2)
+            customer = Customer.objects.create(email=f'c{i}@example.com', phone='0803')
+            order = Order.objects.create(customer=customer, total_amount=2000)
+            PaymentIdempotencyKey.objects.create(gateway='paystack', reference=f'PSK-{i}', order=order)
+            video = Video.objects.create(title=f'Video {i}')
+            VideoLike.objects.create(video=video, ip_address='127.0.0.1')
+            comment = VideoComment.objects.create(video=video, name='Ada', email='ada@example.com', content='Nice')
+            reply = VideoComment.objects.create(video=video, parent=comment, name='Obi', email='o@example.com', content='Yes')
+            VideoCommentLike.objects.create(comment=reply, ip_address='127.0.0.1')
+            post = BlogPost.objects.create(title=f'Post {i}', slug=f'post-{i}', content='Body')
+            BlogPostLike.objects.create(post=post, visitor_id=f'v{i}')
+            blog_comment = BlogComment.objects.create(post=post, author_name='Ada', author_email='a@example.com', body='Hi')
+            blog_reply = BlogComment.objects.create(
+                post=post, parent=blog_comment, author_name='Obi', author_email='o@example.com', body='Hello',
+            )
+            BlogCommentLike.objects.create(comment=blog_reply, visitor_id=f'v{i}')
+
+    def _changelist_queries(self):
+        counts = {}
+        for model in admin.site._registry:
+            if model._meta.app_label != 'store':
+                continue
+            url = reverse(f'admin:store_{model._meta.model_name}_changelist')
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            counts[model._meta.model_name] = len(queries)
+        return counts
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        few = self._changelist_queries()
+        self._add_rows(2, 4)
+        many = self._changelist_queries()
+
+        self.assertEqual(many, few)
+        self.assertLessEqual(max(many.values()), self.MAX_QUERIES, many)
+
+
+class AdminListApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('owner', password='pw', is_staff=True))
+        collection = Collection.objects.create(code='TBW-042', title='Orders')
+        self.design = Design.objects.create(collection=collection, sku='TBW-042-1', title='Gown', price=1000)
+        self.start = timezone.now() - timedelta(days=30)
+
+    def _orders(self, count, **fields):
+        for _ in range(count):
+            customer = Customer.objects.create(email=f'c{Customer.objects.count()}@example.com')
+            order = Order.objects.create(customer=customer, total_amount=1000, **fields)
+            OrderItem.objects.create(order=order, design=self.design, size=10, quantity=1, unit_price=1000)
+
+    def test_orders_page_by_cursor_in_constant_queries(self):
+        self._orders(3, status='confirmed')
+        with self.assertNumQueries(2):
+            first = self.client.get('/api/admin/orders/', {'page_size': 2})
+        self.assertEqual(len(first.data['results']), 2)
+        self.assertEqual(first.data['results'][0]['items'][0]['design'], {'id': self.design.pk, 'sku': 'TBW-042-1', 'title': 'Gown'})
+
+        self._orders(5, status='confirmed')
+        with self.assertNumQueries(2):
+            self.client.get('/api/admin/orders/', {'page_size': 2})
+        # New orders don't shift an open cursor: the next page is the oldest of the first three.
+        older = self.client.get(first.data['next'])
+        self.assertEqual([row['id'] for row in older.data['results']], [Order.objects.order_by('id').first().id])
+
+    def test_order_pages_ignore_an_ordering_that_can_tie(self):
+        self._orders(5, status='confirmed', total_ngn_equivalent=1000)
+        seen, url = [], '/api/admin/orders/?page_size=2&ordering=-total_ngn_equivalent'
+        while url:
+            page = self.client.get(url).data
+            seen += [row['id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(seen, list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_orders_filter_by_status_date_and_search(self):
+        self._orders(2, status='confirmed', currency='USD')
+        self._orders(1, status='shipped')
+        Order.objects.filter(status='shipped').update(created_at=self.start)
+
+        def ids(**params):
+            response = self.client.get('/api/admin/orders/', params)
+            self.assertEqual(response.status_code, 200, response.data)
+            return len(response.data['results'])
+
+        self.assertEqual(ids(status='confirmed', currency='USD'), 2)
+        self.assertEqual(ids(created_before=(self.start + timedelta(days=1)).date().isoformat()), 1)
+        self.assertEqual(ids(search='c0@example'), 1)
+        self.assertEqual(self.client.get('/api/admin/orders/', {'created_after': 'last week'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/subscribers/').data['results'], [])
+
+
+class AdminExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user('owner', password='pw', is_staff=True))
+        collection = Collection.objects.create(code='TBW-043', title='Exports')
+        self.design = Design.objects.create(collection=collection, sku='TBW-043-1', title='Gown, long', price=1000)
+        customer = Customer.objects.create(email='ada@example.com', first_name='Ada')
+        self.order = Order.objects.create(customer=customer, total_amount=Decimal('2500.00'), status='confirmed')
+        for size in (10, 12):
+            OrderItem.objects.create(order=self.order, design=self.design, size=size, quantity=1, unit_price=1000)
+        self.empty = Order.objects.create(total_amount=0)
+
+    def _body(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_orders_csv_has_a_line_per_item(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/admin/exports/orders.csv')
+            lines = self._body(response).splitlines()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertTrue(lines[0].startswith('id,created_at,status,customer_email,'))
+        self.assertEqual(len(lines), 4)
+        self.assertIn('ada@example.com', lines[1])
+        self.assertIn('"Gown, long",12,1,1000.00', lines[2])
+
+    def test_orders_ndjson_nests_items_and_filters_by_date(self):
+        records = [json.loads(line) for line in self._body(self.client.get('/api/admin/exports/orders.ndjson')).splitlines()]
+        self.assertEqual([record['id'] for record in records], [self.order.id, self.empty.id])
+        self.assertEqual([item['size'] for item in records[0]['items']], [10, 12])
+        self.assertEqual(records[0]['items'][0]['design_sku'], 'TBW-043-1')
+        self.assertEqual(records[0]['total_amount'], '2500.00')
+        self.assertEqual(records[1]['items'], [])
+
+        Order.objects.filter(pk=self.order.pk).update(created_at=timezone.now() - timedelta(days=10))
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        body = self._body(self.client.get('/api/admin/exports/orders.ndjson', {'created_after': since}))
+        self.assertEqual([json.loads(line)['id'] for line in body.splitlines()], [self.empty.id])
+
+    def test_other_exports(self):
+        Subscriber.objects.create(email='news@example.com')
+        PaymentLog.objects.create(order=self.order, gateway='paystack', reference='ref-1', status='success', amount=25)
+        self.assertIn('news@example.com', self._body(self.client.get('/api/admin/exports/subscribers.csv')))
+        payment = json.loads(self._body(self.client.get('/api/admin/exports/payments.ndjson')))
+        self.assertEqual((payment['reference'], payment['order_id']), ('ref-1', self.order.id))
+        self.assertIn('ada@example.com', self._body(self.client.get('/api/admin/exports/customers.csv')))
+        self.assertEqual(self.client.get('/api/admin/exports/orders.xlsx').status_code, 404)
+        self.assertEqual(self.client.get('/api/admin/exports/orders.csv', {'created_before': 'soon'}).status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get('/api/admin/exports/orders.csv').status_code, (401, 403))
+
+    def test_token_signed_in_owner_downloads_through_a_signed_link(self):
+        owner = get_user_model().objects.get(username='owner')
+        client = APIClient(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=owner).key}')
+        url = client.post('/api/admin/exports/orders.csv/link/').data['url']
+        self.assertEqual(client.post('/api/admin/exports/orders.xlsx/link/').status_code, 404)
+
+        browser = APIClient()
+        self.assertIn('ada@example.com', self._body(browser.get(url)))
+        # A link is for one export only, and only while it is fresh.
+        self.assertEqual(browser.get(url.replace('orders.csv', 'customers.csv')).status_code, 403)
+        with override_settings(EXPORT_LINK_TTL=-1):
+            self.assertEqual(browser.get(url).status_code, 403)
+
+
+def model_queries(captured):
+    """SQL a CaptureQueriesContext saw, less the shared DatabaseCache's own statements."""
+    return [
+        query['sql'] for query in captured.captured_queries
+        if 'bluewardrobe_cache' not in query['sql'] and 'SAVEPOINT' not in query['sql']
+    ]
+
+
+class EmailTemplateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        collection = Collection.objects.create(code='TBW-045', title='Emails')
+        design = Design.objects.create(collection=collection, sku='TBW-045-1', title='Gown <Silk>', price=1000)
+        customer = Customer.objects.create(email='ada@example.com', first_name='Ada')
+        self.order = Order.objects.create(customer=customer, total_amount=Decimal('2500.00'), delivery_address='12 Marina')
+        OrderItem.objects.create(order=self.order, design=design, size=10, quantity=2, unit_price=1000)
+
+    def test_compiled_template_renders_and_fills_slots(self):
+        template = EmailTemplate('<a href="{url}">{label}</a>')
+        self.assertEqual(template.slots, {'url', 'label'})
+        self.assertEqual(template.fill(url='/x').render(label='Go'), '<a href="/x">Go</a>')
+
+    @override_settings(EMAIL_LOGO_URL='')
+    def test_brand_is_cached_until_a_site_asset_changes(self):
+        order = Order.objects.select_related('customer').prefetch_related('items__design').get(pk=self.order.pk)
+        customer_kwargs, owner_kwargs = order_email_kwargs(order)
+        first = order_confirmation_customer_html(**customer_kwargs)
+        self.assertIn('Gown &lt;Silk&gt;', first)
+        self.assertIn('/favicon.ico', first)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(order_confirmation_customer_html(**customer_kwargs), first)
+            order_notification_owner_html(**owner_kwargs)
+        self.assertEqual(model_queries(captured), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SiteAsset.objects.create(name='logo_primary', file='assets/logo.png')
+        self.assertIn('assets/logo.png', order_confirmation_customer_html(**customer_kwargs))
+
+    def test_admin_preview_renders_the_sent_email(self):
+        client = APIClient()
+        self.assertIn(client.get('/api/admin/email-preview/order-confirmation/').status_code, (401, 403))
+        client.force_authenticate(get_user_model().objects.create_user('owner', password='pw', is_staff=True))
+        response = client.get('/api/admin/email-preview/order-confirmation/', {'order': self.order.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertIn(f'#{self.order.pk}', response.content.decode())
+        self.assertEqual(client.get('/api/admin/email-preview/order-notification/', {'order': 'x'}).status_code, 404)
+        self.assertEqual(client.get('/api/admin/email-preview/newsletter-campaign/').status_code, 404)
+        self.assertEqual(client.get('/api/admin/email-preview/receipt/').status_code, 404)
+        self.assertEqual(client.get('/api/admin/email-preview/newsletter-welcome/').status_code, 200)
+
+
+@mock.patch.object(newsletter, 'RETRY_BASE_DELAY', 0)
+class NewsletterCampaignTests(TestCase):
+    def setUp(self):
+        for index in range(5):
+            Subscriber.objects.create(email=f'reader{index}@example.com')
+        self.campaign = newsletter.queue_campaign(NewsletterCampaign.objects.create(
+            subject='The Atelier Edit', headline='New in the atelier', body='First paragraph.\n\nSecond & last.',
+        ))
+
+    def _send(self, server, **options):
+        with override_settings(RESEND_API_URL=server.url, RESEND_API_KEY=server.api_key):
+            return newsletter.send_campaign(self.campaign, **{'batch_size': 2, 'concurrency': 2, 'requests_per_second': 1000, **options})
+
+    def test_sends_in_batches_rendered_once(self):
+        self.assertEqual(self.campaign.status, NewsletterCampaign.STATUS_QUEUED)
+        self.assertEqual(newsletter.claim_next_campaign(), self.campaign)
+        with FakeResendServer() as server, mock.patch.object(
+            newsletter, 'newsletter_campaign_html', wraps=newsletter.newsletter_campaign_html,
+        ) as render:
+            self.assertTrue(self._send(server))
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(server.requests, 3)
+        self.assertLessEqual(server.max_in_flight, 2)
+        self.assertEqual(len(server.sent), 5)
+        self.assertEqual(set(server.deliveries.values()), {1})
+        self.assertIn('Second &amp; last.', server.sent[0]['html'])
+        self.assertEqual(newsletter.recipient_counts(self.campaign)['sent'], 5)
+        self.assertFalse(CampaignRecipient.objects.filter(provider_id='').exists())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, NewsletterCampaign.STATUS_SENT)
+
+    def test_resumes_a_lost_batch_under_its_key_without_resending(self):
+        with mock.patch.object(newsletter, 'MAX_ATTEMPTS', 1), FakeResendServer(lose_responses=1) as server:
+            self.assertFalse(self._send(server, concurrency=1))
+            self.campaign.refresh_from_db()
+            self.assertEqual(self.campaign.status, NewsletterCampaign.STATUS_QUEUED)
+            self.assertEqual(newsletter.recipient_counts(self.campaign)['sending'], 2)
+
+            self.assertTrue(self._send(server, concurrency=1))
+        # The lost batch was replayed from the idempotency cache: nobody got two emails.
+        self.assertEqual(server.deliveries, {f'reader{index}@example.com': 1 for index in range(5)})
+        self.assertEqual(newsletter.recipient_counts(self.campaign)['sent'], 5)
+
+    def test_rate_limits_and_rejections(self):
+        with FakeResendServer(rate_limit=1, window=0.05, fail_requests=1) as server:
+            self.assertTrue(self._send(server))
+        self.assertGreater(server.throttled, 0)
+        self.assertEqual(newsletter.recipient_counts(self.campaign)['sent'], 5)
+
+        campaign = newsletter.queue_campaign(NewsletterCampaign.objects.create(subject='', headline='x', body='y'))
+        self.campaign = campaign
+        with FakeResendServer() as server:
+            self.assertTrue(self._send(server))
+        self.assertEqual(newsletter.recipient_counts(campaign)['failed'], 5)
+        self.assertIn('HTTP 422', CampaignRecipient.objects.filter(campaign=campaign).first().error)
+
+    def test_sender_outlives_a_database_error(self):
+        claims = [DatabaseError('connection lost'), self.campaign]
+        with mock.patch('store.newsletter.claim_next_campaign', side_effect=claims + [None]), \
+                mock.patch('store.newsletter.send_campaign', return_value=True), \
+                mock.patch('store.newsletter.close_old_connections') as close, \
+                mock.patch('store.newsletter.time.sleep', side_effect=[None, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                newsletter.run_sender(poll_interval=7)
+        self.assertEqual(close.call_count, 3)
+        with mock.patch('store.newsletter.claim_next_campaign', side_effect=DatabaseError('connection lost')):
+            with self.assertRaises(DatabaseError):
+                newsletter.run_sender(once=True)
+
+
 class FrontendShellTests(SimpleTestCase):
     def test_root_serves_frontend_shell(self):
         with TemporaryDirectory() as temp_dir:
@@ -137,3 +1121,356 @@ class FrontendShellTests(SimpleTestCase):
                 response = self.client.get('/')
                 self.assertEqual(response.status_code, 200)
                 self.assertIn(b'THE BLUE WARDROBE', response.content)
+
+
+SHELL_HTML = (
+    '<!doctype html><html><head>\n'
+    '    <meta charset="utf-8" />\n'
+    '    <meta property="og:title" content="THE BLUE WARDROBE" />\n'
+    '    <meta name="twitter:card" content="summary_large_image" />\n'
+    '    <title>THE BLUE WARDROBE</title>\n'
+    '  </head><body><div id="root"></div></body></html>'
+)
+
+
+class SpaShellTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        share_meta.clear_local_cards()
+        clear_shell_cache()
+        self.addCleanup(clear_shell_cache)
+        self.factory = RequestFactory()
+
+    def _get(self, build_dir, path, **headers):
+        with self.settings(FRONTEND_BUILD_DIR=build_dir, PUBLIC_SITE_URL='https://shop.test'):
+            return shell_response(self.factory.get(path, **headers))
+
+    def test_compressed_shell_revalidates_with_etag(self):
+        with TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / 'index.html').write_text(SHELL_HTML, encoding='utf-8')
+            response = self._get(temp_dir, '/collections', HTTP_ACCEPT_ENCODING='gzip, deflate')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            self.assertEqual(gzip.decompress(response.content).decode(), SHELL_HTML)
+
+            again = self._get(
+                temp_dir, '/collections',
+                HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+            self.assertEqual(again.status_code, 304)
+            plain = self._get(temp_dir, '/collections')
+            self.assertNotEqual(plain['ETag'], response['ETag'])
+            self.assertEqual(plain.content.decode(), SHELL_HTML)
+
+    def test_design_share_tags_follow_design_edits(self):
+        collection = Collection.objects.create(code='TBW-020', title='Share')
+        design = Design.objects.create(collection=collection, sku='TBW-020-1', title='Gown', price=1000)
+        with TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / 'index.html').write_text(SHELL_HTML, encoding='utf-8')
+            html_doc = self._get(temp_dir, f'/designs/{design.pk}').content.decode()
+            self.assertIn('<title>Gown — THE BLUE WARDROBE</title>', html_doc)
+            self.assertIn(f'<meta property="og:url" content="https://shop.test/designs/{design.pk}" />', html_doc)
+            self.assertEqual(html_doc.count('og:title'), 1)
+            self.assertIn('<meta charset="utf-8" />', html_doc)
+
+            with self.assertNumQueries(0):
+                self._get(temp_dir, f'/designs/{design.pk}')
+
+            design.title = 'Evening Gown'
+            with self.captureOnCommitCallbacks(execute=True):
+                design.save()
+            with self.assertNumQueries(0):
+                html_doc = self._get(temp_dir, f'/designs/{design.pk}').content.decode()
+            self.assertIn('<meta property="og:title" content="Evening Gown — THE BLUE WARDROBE" />', html_doc)
+
+    def test_crawlers_get_a_minimal_share_card(self):
+        collection = Collection.objects.create(code='TBW-021', title='Share')
+        design = Design.objects.create(collection=collection, sku='TBW-021-1', title='Gown', price=1000)
+        DesignImage.objects.bulk_create([
+            DesignImage(design=design, image='designs/images/back.jpg', order=2),
+            DesignImage(design=design, image='designs/images/front.jpg', order=1),
+        ])
+        cache.clear()
+        share_meta.clear_local_cards()
+        with TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / 'index.html').write_text(SHELL_HTML, encoding='utf-8')
+            with CaptureQueriesContext(connection) as captured:
+                response = self._get(
+                    temp_dir, f'/designs/{design.pk}',
+                    HTTP_USER_AGENT='facebookexternalhit/1.1 (+http://www.facebook.com/externalhit_uatext.php)',
+                )
+            self.assertEqual(len(model_queries(captured)), 1)
+            html_doc = response.content.decode()
+            self.assertNotIn('id="root"', html_doc)
+            self.assertIn('content="https://shop.test/media/designs/images/front.jpg"', html_doc)
+            self.assertIn('Accept-Encoding, User-Agent', response['Vary'])
+
+            self.assertIn('id="root"', self._get(temp_dir, f'/designs/{design.pk}').content.decode())
+            self.assertIn('id="root"', self._get(temp_dir, '/', HTTP_USER_AGENT='WhatsApp/2.23').content.decode())
+
+
+class SharedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        share_meta.clear_local_cards()
+
+    def test_share_cards_live_in_the_cache_every_worker_reads(self):
+        self.assertEqual(settings.CACHES['default']['BACKEND'], 'django.core.cache.backends.db.DatabaseCache')
+        collection = Collection.objects.create(code='TBW-032', title='Share')
+        design = Design.objects.create(collection=collection, sku='TBW-032-1', title='Gown', price=1000)
+        share_meta.refresh_design(design.pk)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM bluewardrobe_cache')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        Design.objects.filter(pk=design.pk).update(title='Evening Gown')
+        with self.captureOnCommitCallbacks(execute=True):
+            Design.objects.get(pk=design.pk).save()
+        self.assertEqual(cache.get(f'share-meta:design:{design.pk}')['title'], 'Evening Gown — THE BLUE WARDROBE')
+
+    def test_a_worker_serves_its_own_copy_then_sees_other_workers_rebuilds(self):
+        collection = Collection.objects.create(code='TBW-032', title='Share')
+        design = Design.objects.create(collection=collection, sku='TBW-032-2', title='Gown', price=1000)
+        share_meta.refresh_design(design.pk)
+        # Another worker rebuilds the card: it writes the shared cache, not this worker's memory.
+        cache.set(f'share-meta:design:{design.pk}', {'title': 'Rebuilt', 'description': '', 'path': '/', 'type': 'product'})
+
+        with self.assertNumQueries(0):
+            self.assertEqual(share_meta._cached_payload('design', str(design.pk))['title'], 'Gown — THE BLUE WARDROBE')
+        with override_settings(SHARE_META_LOCAL_TTL=0), self.assertNumQueries(1):
+            self.assertEqual(share_meta._cached_payload('design', str(design.pk))['title'], 'Rebuilt')
+
+
+class StaticAssetTests(SimpleTestCase):
+    def test_legacy_asset_paths_are_served_precompressed_and_immutable(self):
+        with TemporaryDirectory() as temp_dir:
+            assets = Path(temp_dir) / 'assets'
+            assets.mkdir()
+            script = b'console.log("wardrobe");' * 50
+            (assets / 'index-Bx9kQ2aL.js').write_bytes(script)
+            (assets / 'index-Bx9kQ2aL.js.gz').write_bytes(gzip.compress(script))
+            with self.settings(STATIC_ROOT=temp_dir, DEBUG=False):
+                middleware = FrontendAssetMiddleware(lambda request: HttpResponse(status=404))
+                request = RequestFactory().get('/assets/index-Bx9kQ2aL.js', HTTP_ACCEPT_ENCODING='gzip')
+                response = middleware(request)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), script)
+            response.file_to_stream.close()
+
+    def test_favicon_is_revalidated_by_etag(self):
+        with TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / 'favicon.svg').write_text('<svg xmlns="http://www.w3.org/2000/svg"/>', encoding='utf-8')
+            with self.settings(FRONTEND_BUILD_DIR=Path(temp_dir)):
+                response = self.client.get('/favicon.ico')
+                self.assertEqual(response['Content-Type'], 'image/svg+xml')
+                again = self.client.get('/favicon.ico', HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(again.status_code, 304)
+
+
+class MediaUrlCacheTests(SimpleTestCase):
+    def setUp(self):
+        clear_media_url_cache()
+
+    def test_repeated_lookups_hit_the_cache(self):
+        image = DesignImage(image='designs/images/look.jpg')
+        first = media_url(image.image)
+        second = media_url(image.image)
+
+        self.assertEqual(first, '/media/designs/images/look.jpg')
+        self.assertEqual(second, first)
+        info = media_url_cache_info()
+        self.assertEqual((info['hits'], info['misses']), (1, 1))
+
+    def test_media_url_setting_is_part_of_the_key(self):
+        image = DesignImage(image='designs/images/look.jpg')
+        media_url(image.image)
+        with self.settings(MEDIA_URL='/cdn/'):
+            self.assertEqual(media_url(DesignImage(image='designs/images/look.jpg').image), '/cdn/designs/images/look.jpg')
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        clear_media_url_cache()
+        clear_local_variants()
+        cache.clear()
+
+    def test_upload_generates_variants_exposed_as_srcset(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (700, 400), 'navy').save(buffer, format='JPEG')
+        with TemporaryDirectory() as temp_dir, self.settings(MEDIA_ROOT=temp_dir):
+            collection = Collection.objects.create(code='TBW-010', title='Variants')
+            design = Design.objects.create(collection=collection, sku='TBW-010-1', title='Gown', price=1000)
+            image = DesignImage.objects.create(
+                design=design,
+                image=SimpleUploadedFile('look.jpg', buffer.getvalue(), content_type='image/jpeg'),
+            )
+
+            variants = Path(temp_dir) / 'designs' / 'images' / 'variants'
+            self.assertEqual(
+                sorted(path.name for path in variants.iterdir()),
+                ['look-w320.avif', 'look-w320.webp', 'look-w640.avif', 'look-w640.webp'],
+            )
+            data = DesignImageSerializer(image).data
+            self.assertEqual(
+                data['srcset'],
+                '/media/designs/images/variants/look-w320.webp 320w, '
+                '/media/designs/images/variants/look-w640.webp 640w',
+            )
+            self.assertEqual([source['type'] for source in data['sources']], ['image/avif', 'image/webp'])
+
+            image.delete()
+            self.assertEqual(list(variants.iterdir()), [])
+
+    def test_missing_variants_fall_back_to_original_only(self):
+        data = DesignImageSerializer(DesignImage(image='designs/images/absent.jpg')).data
+        self.assertIsNone(data['srcset'])
+        self.assertEqual(data['sources'], [])
+
+    def test_variant_sets_are_shared_and_missing_ones_rechecked(self):
+        absent = DesignImage(image='designs/images/absent.jpg')
+        DesignImageSerializer(absent).data
+        with mock.patch('django.core.files.storage.FileSystemStorage.exists', return_value=False) as exists:
+            DesignImageSerializer(absent).data
+            exists.assert_not_called()
+            # Once this worker's copy is stale, no variants yet is checked again, not shared.
+            with self.settings(IMAGE_VARIANTS_LOCAL_TTL=0):
+                DesignImageSerializer(absent).data
+            exists.assert_called()
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (700, 400), 'navy').save(buffer, format='JPEG')
+        with TemporaryDirectory() as temp_dir, self.settings(MEDIA_ROOT=temp_dir):
+            collection = Collection.objects.create(code='TBW-011', title='Variants')
+            design = Design.objects.create(collection=collection, sku='TBW-011-1', title='Gown', price=1000)
+            image = DesignImage.objects.create(
+                design=design,
+                image=SimpleUploadedFile('look.jpg', buffer.getvalue(), content_type='image/jpeg'),
+            )
+            # Generating stored the set in the shared cache, so no worker stats the files.
+            clear_local_variants()
+            with mock.patch('django.core.files.storage.FileSystemStorage.exists') as exists:
+                srcset = DesignImageSerializer(DesignImage.objects.get(pk=image.pk)).data['srcset']
+                with mock.patch('bluewardrobe.image_variants.is_cloudinary_storage', return_value=True):
+                    self.assertFalse(has_local_variants(image.image))
+            exists.assert_not_called()
+            self.assertTrue(srcset.endswith('/media/designs/images/variants/look-w640.webp 640w'))
+
+            image.delete()
+            self.assertIsNone(DesignImageSerializer(DesignImage(image=image.image.name)).data['srcset'])
+
+
+class ImageCompressionTests(SimpleTestCase):
+    def test_oversized_image_is_reencoded_under_target(self):
+        source = io.BytesIO()
+        Image.effect_noise((1200, 900), 80).convert('RGB').save(source, format='PNG')
+        source.seek(0)
+        target = 150 * 1024
+
+        compressed, size = _compress_image_for_cloudinary(source, target_bytes=target)
+        with compressed:
+            self.assertLessEqual(size, target)
+            self.assertEqual(Image.open(compressed).format, 'JPEG')
+
+    def test_undecodable_upload_is_left_alone(self):
+        self.assertIsNone(_compress_image_for_cloudinary(io.BytesIO(b'not an image')))
+
+
+class BackgroundMediaUploadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser('owner', 'owner@example.com', 'StrongPass123!')
+        )
+
+    def test_video_upload_is_queued_then_stored_by_worker(self):
+        with TemporaryDirectory() as media_root, TemporaryDirectory() as spool_dir, self.settings(
+            MEDIA_ROOT=media_root, MEDIA_JOB_SPOOL_DIR=spool_dir, BACKGROUND_MEDIA_UPLOADS=True,
+        ):
+            response = self.client.post('/api/admin/videos/', {
+                'title': 'Atelier film',
+                'video_file': SimpleUploadedFile('film.mp4', b'\x00' * 4096, content_type='video/mp4'),
+            }, format='multipart')
+            self.assertEqual(response.status_code, 201)
+            video = Video.objects.get(pk=response.data['id'])
+            self.assertFalse(video.video_file)
+
+            jobs = self.client.get('/api/admin/media-jobs/', {'model': 'store.video', 'object_id': video.pk}).data
+            self.assertEqual([(job['status'], job['size']) for job in jobs], [('pending', 4096)])
+            self.assertEqual(self.client.get('/api/admin/media-jobs/', {'object_id': 'abc'}).status_code, 400)
+
+            self.assertEqual(run_worker(once=True), 1)
+
+            video.refresh_from_db()
+            self.assertEqual(video.video_file.name, 'videos/film.mp4')
+            self.assertTrue((Path(media_root) / 'videos' / 'film.mp4').exists())
+            job = MediaJob.objects.get()
+            self.assertEqual((job.status, job.progress), (MediaJob.STATUS_DONE, 100.0))
+            self.assertEqual(list(Path(spool_dir).iterdir()), [])
+
+    def test_worker_outlives_a_database_error(self):
+        job = MediaJob(pk=1)
+        with mock.patch('store.media_jobs.claim_next_job', side_effect=[DatabaseError('connection lost'), None, job]), \
+                mock.patch('store.media_jobs.process_job') as process, \
+                mock.patch('store.media_jobs.close_old_connections') as close, \
+                mock.patch('store.media_jobs.time.sleep') as sleep:
+            self.assertEqual(run_worker(poll_interval=7, max_jobs=1), 1)
+        process.assert_called_once_with(job)
+        self.assertEqual((close.call_count, sleep.call_args_list), (3, [mock.call(7), mock.call(7)]))
+
+
+class ChunkedVideoUploadTests(SimpleTestCase):
+    payload = bytes(range(45))
+
+    def setUp(self):
+        self.addCleanup(cloudinary.reset_config)
+        patcher = mock.patch('bluewardrobe.storage.CLOUDINARY_CHUNK_SIZE', 10)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _configure(self, server):
+        cloudinary.config(upload_prefix=server.url, cloud_name='demo', api_key='key', api_secret='secret')
+
+    def test_failed_chunk_is_resent_without_resending_the_rest(self):
+        with FakeCloudinaryServer(fail_offsets={10}) as server:
+            self._configure(server)
+            public_id = LargeVideoCloudinaryStorage()._save('videos/film.mp4', ContentFile(self.payload))
+
+        self.assertEqual(public_id, 'media/videos/film.mp4')
+        self.assertEqual(server.completed[public_id], self.payload)
+        ranges = [content_range for _, content_range in server.requests]
+        self.assertEqual(ranges.count('bytes 10-19/45'), 2)
+        self.assertEqual(len(ranges), 6)
+        self.assertEqual(ranges[-1], 'bytes 40-44/45')
+        self.assertEqual(len({upload_id for upload_id, _ in server.requests}), 1)
+
+    def test_manifest_resumes_an_interrupted_upload(self):
+        with TemporaryDirectory() as temp_dir, FakeCloudinaryServer(fail_offsets={20}) as server:
+            self._configure(server)
+            manifest_path = str(Path(temp_dir) / 'film.manifest.json')
+            storage = LargeVideoCloudinaryStorage()
+            with mock.patch('bluewardrobe.storage.CHUNK_UPLOAD_PASSES', 1):
+                with self.assertRaises(Exception):
+                    storage.upload_resumable('videos/film.mp4', io.BytesIO(self.payload), manifest_path=manifest_path)
+            first_pass = len(server.requests)
+
+            public_id = storage.upload_resumable('videos/film.mp4', io.BytesIO(self.payload), manifest_path=manifest_path)
+
+        self.assertEqual(server.completed[public_id], self.payload)
+        resumed = [content_range for _, content_range in server.requests[first_pass:]]
+        self.assertEqual(resumed, ['bytes 20-29/45', 'bytes 40-44/45'])
+
+    def test_progress_is_reported_on_the_calling_thread(self):
+        calls = []
+        with FakeCloudinaryServer() as server:
+            self._configure(server)
+            LargeVideoCloudinaryStorage().upload_resumable(
+                'videos/film.mp4', io.BytesIO(self.payload),
+                on_progress=lambda manifest: calls.append((threading.get_ident(), manifest.bytes_done)),
+            )
+
+        self.assertEqual({thread for thread, _ in calls}, {threading.get_ident()})
+        self.assertEqual(len(calls), 5)
+        self.assertEqual(calls[-1][1], len(self.payload))
@@ -22,6 +22,7 @@ from .views import (
     AdminDesignViewSet,
     AdminDesignReviewViewSet,
     AdminVideoViewSet,
+    AdminMediaJobViewSet,
     AdminInfoCardViewSet,
     AdminOrderViewSet,
     AdminContactMessageViewSet,
@@ -30,11 +31,17 @@ from .views import (
     AdminMaterialViewSet,
     subscribe,
     contact,
+    checkout_quote,
     initiate_paystack,
     verify_paystack,
     initiate_flutterwave,
     verify_flutterwave,
+    paystack_webhook,
+    flutterwave_webhook,
     health,
+    admin_email_preview,
+    admin_export,
+    admin_export_link,
     admin_metrics,
     csrf_token,
     homepage_content,
@@ -57,6 +64,7 @@ admin_router.register('collections', AdminCollectionViewSet, basename='admin-col
 admin_router.register('designs', AdminDesignViewSet, basename='admin-designs')
 admin_router.register('design-reviews', AdminDesignReviewViewSet, basename='admin-design-reviews')
 admin_router.register('videos', AdminVideoViewSet, basename='admin-videos')
+admin_router.register('media-jobs', AdminMediaJobViewSet, basename='admin-media-jobs')
 admin_router.register('info-cards', AdminInfoCardViewSet, basename='admin-info-cards')
 admin_router.register('orders', AdminOrderViewSet, basename='admin-orders')
 admin_router.register('contact-messages', AdminContactMessageViewSet, basename='admin-contact-messages')
@@ -79,18 +87,25 @@ urlpatterns = [
     path('cart/add/', CartViewSet.as_view({'post': 'add_item'}), name='cart-add'),
     path('cart/remove/', CartViewSet.as_view({'post': 'remove_item'}), name='cart-remove'),
     path('cart/clear/', CartViewSet.as_view({'post': 'clear_cart'}), name='cart-clear'),
+    path('cart/batch/', CartViewSet.as_view({'post': 'batch'}), name='cart-batch'),
     path('cart/<int:pk>/', CartViewSet.as_view({'get': 'retrieve', 'put': 'update', 'delete': 'destroy'}), name='cart-detail'),
     # Other URLs
     path('subscribe/', subscribe, name='subscribe'),
     path('contact/', contact, name='contact'),
+    path('checkout/quote/', checkout_quote, name='checkout-quote'),
     path('paystack/initiate/', initiate_paystack, name='paystack-initiate'),
     path('paystack/verify/', verify_paystack, name='paystack-verify'),
     path('flutterwave/initiate/', initiate_flutterwave, name='flutterwave-initiate'),
     path('flutterwave/verify/', verify_flutterwave, name='flutterwave-verify'),
+    path('paystack/webhook/', paystack_webhook, name='paystack-webhook'),
+    path('flutterwave/webhook/', flutterwave_webhook, name='flutterwave-webhook'),
     path('currency-fx/', currency_fx_public, name='currency-fx-public'),
     path('admin/store-settings/', admin_store_settings, name='admin-store-settings'),
     path('health/', health, name='health'),
     path('admin/metrics/', admin_metrics, name='admin-metrics'),
+    path('admin/exports/<slug:kind>.<slug:fmt>', admin_export, name='admin-export'),
+    path('admin/exports/<slug:kind>.<slug:fmt>/link/', admin_export_link, name='admin-export-link'),
+    path('admin/email-preview/<slug:template>/', admin_email_preview, name='admin-email-preview'),
     path('csrf-token/', csrf_token, name='csrf-token'),
     path('admin/', include(admin_router.urls)),
 ]
@@ -1,4 +1,5 @@
-from rest_framework import viewsets, status
+from rest_framework import mixins, serializers, viewsets, status
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import api_view, authentication_classes, permission_classes, action
 from rest_framework.permissions import AllowAny, IsAdminUser
@@ -7,6 +8,7 @@ from django.contrib.auth import authenticate
 from django.conf import settings
 from importlib import import_module
 import json
+import logging
 import uuid
 import requests
 from decimal import Decimal
@@ -14,32 +16,66 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
 from django.middleware.csrf import get_token
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils import timezone
 
 from django.db.models import Prefetch
 
+from bluewardrobe.media_urls import media_url_cache_info
+
 from .models import (
     Collection, Design, DesignImage, SizeInventory, SizeMeasurement, Cart, CartItem, SiteAsset, ContactMessage, Subscriber, Order,
     Customer, OrderItem, PaymentLog, Video, VideoComment, VideoLike, VideoCommentLike, InfoCard, Material, DesignReview,
-    HomeHeroCopy, HeroMarqueeSlide, AtelierStorySlide, StoreCurrencySettings,
+    HomeHeroCopy, HeroMarqueeSlide, AtelierStorySlide, StoreCurrencySettings, MediaJob, NewsletterCampaign,
+)
+from .cart_store import (
+    CartBatchError,
+    apply_batch,
+    cart_session_id,
+    current_etag,
+    get_or_create_cart_id,
+    load_cart,
+    preorder_error,
+    remove_items,
+    set_customer_email,
+    upsert_item,
+)
+from .admin_api import AdminListMixin, parse_moment
+from .catalogue import design_facets, filter_designs, is_true
+from .checkout_quote import QuoteError, build_quote, load_quote
+from .fast_lists import CollectionRows, DesignCardRows, FastListMixin
+from .media_jobs import delete_job, retry_job
+from . import exports, payment_webhooks
+from .payment_utils import (
+    complete_flutterwave_charge,
+    complete_paystack_charge,
+    fetch_flutterwave_transaction,
+    paid_order,
 )
-from .payment_utils import finalize_order_from_cart, parse_flutterwave_meta, send_order_emails
 from .currency_utils import (
-    ALLOWED_CHARGE_CURRENCIES,
-    cart_total_ngn,
     convert_from_ngn,
     get_fx_for_serializer_context,
     public_fx_dict,
-    resolve_delivery_from_metadata,
 )
-from .email_utils import newsletter_welcome_html
+from .email_utils import (
+    newsletter_campaign_html,
+    newsletter_welcome_html,
+    order_confirmation_customer_html,
+    order_email_kwargs,
+    order_notification_owner_html,
+)
 from .serializers import (
-    CollectionSerializer, DesignSerializer, SiteAssetSerializer,
-    ContactMessageSerializer, SubscriberSerializer, OrderSerializer,
+    CollectionSerializer, DesignListSerializer, DesignSerializer, SiteAssetSerializer,
+    ContactMessageSerializer, SubscriberSerializer, OrderSerializer, AdminOrderSerializer,
     VideoSerializer, VideoCommentSerializer, InfoCardSerializer, MaterialSerializer, CustomerSerializer,
-    CartSerializer, CartItemSerializer, DesignReviewSerializer,
-    HeroMarqueeSlideSerializer, AtelierStorySlideSerializer,
+    CartSerializer, CartItemSerializer, CartBatchSerializer, DesignReviewSerializer,
+    HeroMarqueeSlideSerializer, AtelierStorySlideSerializer, MediaJobSerializer,
 )
 
+logger = logging.getLogger('bluewardrobe.store.views')
+
 
 def get_resend_client():
     try:
@@ -48,8 +84,9 @@ def get_resend_client():
         return None
 
 
-class CollectionViewSet(viewsets.ReadOnlyModelViewSet):
+class CollectionViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = CollectionSerializer
+    row_serializer_class = CollectionRows
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
@@ -58,8 +95,8 @@ class CollectionViewSet(viewsets.ReadOnlyModelViewSet):
 
     def get_queryset(self):
         queryset = Collection.objects.prefetch_related(
-            'materials',
-            Prefetch('designs', queryset=Design.objects.order_by('-created_at', '-id')),
+            Prefetch('materials', queryset=Material.objects.order_by('pk')),
+            Prefetch('designs', queryset=DesignListSerializer.prepare(Design.objects.order_by('-created_at', '-id'))),
         ).all().order_by('order', 'code', '-created_at')
         featured = (self.request.query_params.get('featured') or '').strip().lower()
         if featured in {'1', 'true', 'yes'}:
@@ -67,19 +104,58 @@ class CollectionViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class DesignViewSet(viewsets.ReadOnlyModelViewSet):
+class DesignViewSet(FastListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Design.objects.prefetch_related(
         'images', 'size_inventory', 'size_measurements', 'reviews'
     ).all().order_by('-created_at', '-id')
     serializer_class = DesignSerializer
+    row_serializer_class = DesignCardRows
+    # Actions answered with catalogue cards rather than full product pages.
+    list_actions = fast_list_actions = ('list', 'atelier_reserve')
+
+    def get_serializer_class(self):
+        if self.action in self.list_actions:
+            return DesignListSerializer
+        return DesignSerializer
 
     def get_serializer_context(self):
         ctx = super().get_serializer_context()
         ctx["fx"] = get_fx_for_serializer_context()
         return ctx
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in self.list_actions:
+            return queryset
+        # Price, size, collection, material and stock filters (see store.catalogue).
+        return filter_designs(queryset, self.request.query_params)
+
+    def _designs_response(self, queryset, limit=None):
+        """
+        The designs in ``queryset`` after the storefront filters, as a list, or
+        with ``?facets=true`` as ``{"count", "results", "facets"}`` so the grid
+        and the filter sidebar render from one request. ``count`` and the
+        facets cover the whole filtered set, even when ``limit`` caps
+        ``results``.
+        """
+        params = self.request.query_params
+        designs = self.serialize_list(self.filter_queryset(queryset)[:limit])
+        if not is_true(params.get('facets')):
+            return Response(designs)
+        facets = design_facets(queryset, params)
+        return Response({
+            'count': facets.pop('total'),
+            'results': designs,
+            'facets': facets,
+        })
+
+    def list(self, request, *args, **kwargs):
+        return self._designs_response(self.get_queryset())
+
     def get_queryset(self):
         qs = super().get_queryset().order_by('-created_at', '-id')
+        if self.action in self.list_actions:
+            qs = DesignListSerializer.prepare(qs.prefetch_related(None).select_related('collection'))
         filter_param = (self.request.query_params.get('filter') or '').strip().lower()
         featured_param = (self.request.query_params.get('featured') or '').strip().lower()
 
@@ -107,15 +183,11 @@ class DesignViewSet(viewsets.ReadOnlyModelViewSet):
 
         now = dj_tz.now()
         qs = (
-            Design.objects.prefetch_related(
-                'images', 'size_inventory', 'size_measurements', 'reviews'
-            )
+            DesignListSerializer.prepare(Design.objects.select_related('collection'))
             .filter(is_preorder=True)
             .filter(Q(preorder_end_at__isnull=True) | Q(preorder_end_at__gt=now))
-            .order_by('-created_at', '-id')[:100]
         )
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        return self._designs_response(qs, limit=100)
 
     @action(detail=True, methods=['get', 'post'])
     def reviews(self, request, pk=None):
@@ -151,109 +223,110 @@ class DesignViewSet(viewsets.ReadOnlyModelViewSet):
 
 
 @method_decorator(csrf_exempt, name='dispatch')
-class CartViewSet(viewsets.ModelViewSet):
-    serializer_class = CartSerializer
-    
-    def get_queryset(self):
-        # Prefer explicit client cart session so cart survives cookie/session drift.
-        session_id = self.request.META.get('HTTP_X_SESSION_ID') or self.request.session.session_key
-        if not session_id:
-            return Cart.objects.none()
-        return Cart.objects.prefetch_related('items__design').filter(session_id=session_id)
-    
-    def get_object(self):
-        # Prefer explicit client cart session so cart survives cookie/session drift.
-        session_id = self.request.META.get('HTTP_X_SESSION_ID') or self.request.session.session_key
-        print(f"Initial session_id: {session_id}")
-        print(f"Session exists: {self.request.session.exists(self.request.session.session_key) if self.request.session.session_key else False}")
-        
-        if not session_id:
-            # Create session if it doesn't exist
-            if not self.request.session.session_key:
-                self.request.session.create()
-                # Ensure session is saved
-                self.request.session.save()
-            session_id = self.request.session.session_key
-            print(f"Created new session_id: {session_id}")
-        
-        # Double-check we have a session_id
-        if not session_id:
-            raise ValueError("Unable to create or retrieve session ID")
-        
-        # Keep Django session and explicit cart session aligned when possible.
-        if self.request.session.session_key != session_id:
-            self.request.session['tbw_cart_session_id'] = session_id
-            self.request.session.save()
-
-        print(f"Final session_id: {session_id}")
-        cart, created = Cart.objects.get_or_create(
-            session_id=session_id,
-            defaults={'customer_email': ''}
-        )
-        print(f"Cart {'created' if created else 'retrieved'} with ID: {cart.id}")
-        return cart
-    
-    def retrieve(self, request, *args, **kwargs):
-        cart = self.get_object()
-        serializer = self.get_serializer(cart)
-        return Response(serializer.data)
-    
+class CartViewSet(viewsets.ViewSet):
+    """
+    The caller's cart, keyed by X-Session-ID (see store.cart_store). Every
+    response carries the cart's ETag; a GET with a matching If-None-Match
+    gets a 304 without the cart being loaded.
+    """
+
+    def _cart_response(self, request, session_id, status_code=status.HTTP_200_OK):
+        cart = load_cart(session_id)
+        response = Response(CartSerializer(cart, context={'request': request}).data, status=status_code)
+        response['ETag'] = cart.etag
+        response['Cache-Control'] = 'private, no-cache'
+        response['Vary'] = 'Cookie, X-Session-ID'
+        return response
+
+    def list(self, request):
+        session_id = cart_session_id(request)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etag = current_etag(session_id)
+            if etag in [tag.strip() for tag in if_none_match.split(',')]:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                response['Vary'] = 'Cookie, X-Session-ID'
+                return response
+        return self._cart_response(request, session_id)
+
+    def retrieve(self, request, pk=None):
+        # The cart is always the caller's own; a pk in the URL is not a way to read someone else's.
+        return self.list(request)
+
+    def create(self, request):
+        session_id = cart_session_id(request)
+        get_or_create_cart_id(session_id)
+        return self._cart_response(request, session_id)
+
+    def update(self, request, pk=None):
+        session_id = cart_session_id(request)
+        email = serializers.EmailField(allow_blank=True).run_validation((request.data.get('customer_email') or '').strip())
+        set_customer_email(get_or_create_cart_id(session_id), email)
+        return self._cart_response(request, session_id)
+
+    def destroy(self, request, pk=None):
+        return self.clear_cart(request)
+
     @action(detail=False, methods=['post'])
     def add_item(self, request):
         """Add item to cart"""
-        cart = self.get_object()
+        session_id = cart_session_id(request)
         design_id = request.data.get('design_id')
         size_measurement_id = request.data.get('size_measurement_id')
-        quantity = request.data.get('quantity', 1)
-        
+
         if not all([design_id, size_measurement_id]):
             return Response({'detail': 'design_id and size_measurement_id are required'}, status=status.HTTP_400_BAD_REQUEST)
-        
         try:
-            design = Design.objects.get(id=design_id)
-
-            # Atelier Reserve: only allow add during open preorder window
-            if design.is_preorder:
-                status_label = design.preorder_status
-                if status_label == 'upcoming':
-                    return Response(
-                        {'detail': 'This Atelier Reserve dress is not open for preorder yet.'},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-                if status_label == 'closed':
-                    return Response(
-                        {'detail': 'This Atelier Reserve window has closed.'},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-            size_measurement = design.size_measurements.get(id=size_measurement_id, is_active=True)
-            
-            if size_measurement.stock < quantity:
-                return Response({'detail': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            cart_item, created = CartItem.objects.update_or_create(
-                cart=cart,
-                design=design,
-                size_measurement=size_measurement,
-                defaults={'quantity': quantity}
-            )
-            
-            if not created and cart_item.quantity != quantity:
-                cart_item.quantity = quantity
-                cart_item.save()
-            
-            serializer = CartSerializer(cart)
-            return Response(serializer.data)
-            
-        except Design.DoesNotExist:
-            return Response({'detail': 'Design not found'}, status=status.HTTP_404_NOT_FOUND)
-        except SizeMeasurement.DoesNotExist:
+            quantity = int(request.data.get('quantity', 1))
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity < 1:
+            return Response({'detail': 'quantity must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        size_measurement = (
+            SizeMeasurement.objects.select_related('design')
+            .filter(id=size_measurement_id, design_id=design_id, is_active=True)
+            .first()
+        )
+        if size_measurement is None:
+            if not Design.objects.filter(id=design_id).exists():
+                return Response({'detail': 'Design not found'}, status=status.HTTP_404_NOT_FOUND)
             return Response({'detail': 'Size measurement not available'}, status=status.HTTP_400_BAD_REQUEST)
+
+        message = preorder_error(size_measurement.design)
+        if message:
+            return Response({'detail': message}, status=status.HTTP_400_BAD_REQUEST)
+
+        if size_measurement.stock < quantity:
+            return Response({'detail': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
+
+        cart_id = get_or_create_cart_id(session_id)
+        upsert_item(cart_id, size_measurement.design_id, size_measurement.id, quantity)
+        return self._cart_response(request, session_id)
     
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Apply a list of add / set / remove operations in one transaction and
+        return the final cart. Either every operation applies or none does.
+        """
+        serializer = CartBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session_id = cart_session_id(request)
+        try:
+            apply_batch(session_id, serializer.validated_data['operations'])
+        except CartBatchError as exc:
+            return Response(
+                {'detail': 'Some cart operations could not be applied.', 'errors': exc.errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self._cart_response(request, session_id)
+
     @action(detail=False, methods=['post'])
     def remove_item(self, request):
         """Remove item from cart"""
-        cart = self.get_object()
+        session_id = cart_session_id(request)
         design_id = request.data.get('design_id')
         size_measurement_id = request.data.get('size_measurement_id')
         size = request.data.get('size')
@@ -265,27 +338,27 @@ class CartViewSet(viewsets.ModelViewSet):
         # 1) Prefer explicit size_measurement_id.
         # 2) Fallback to design + size for older clients.
         # 3) As final fallback, remove latest line for that design.
-        queryset = CartItem.objects.filter(cart=cart, design_id=design_id)
+        queryset = CartItem.objects.filter(cart__session_id=session_id, design_id=design_id)
         if size_measurement_id:
             queryset = queryset.filter(size_measurement_id=size_measurement_id)
         elif size is not None:
             queryset = queryset.filter(size_measurement__size=size)
 
-        cart_item = queryset.order_by('-id').first()
-        if not cart_item:
+        line = queryset.order_by('-id').values('id', 'cart_id').first()
+        if not line:
             return Response({'detail': 'Item not found in cart'}, status=status.HTTP_404_NOT_FOUND)
 
-        cart_item.delete()
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        remove_items(line['cart_id'], CartItem.objects.filter(pk=line['id']))
+        return self._cart_response(request, session_id)
     
     @action(detail=False, methods=['post'])
     def clear_cart(self, request):
         """Clear all items from cart"""
-        cart = self.get_object()
-        cart.items.all().delete()
-        serializer = CartSerializer(cart)
-        return Response(serializer.data)
+        session_id = cart_session_id(request)
+        cart_id = Cart.objects.filter(session_id=session_id).values_list('id', flat=True).first()
+        if cart_id is not None:
+            remove_items(cart_id, CartItem.objects.filter(cart_id=cart_id))
+        return self._cart_response(request, session_id)
 
 
 class SiteAssetViewSet(viewsets.ReadOnlyModelViewSet):
@@ -474,7 +547,10 @@ class InfoCardViewSet(viewsets.ReadOnlyModelViewSet):
 
 # Admin viewsets with full CRUD
 class AdminCollectionViewSet(viewsets.ModelViewSet):
-    queryset = Collection.objects.prefetch_related('materials', 'designs').all().order_by('order', 'code', '-created_at')
+    queryset = Collection.objects.prefetch_related(
+        'materials',
+        Prefetch('designs', queryset=DesignListSerializer.prepare(Design.objects.all())),
+    ).all().order_by('order', 'code', '-created_at')
     serializer_class = CollectionSerializer
     permission_classes = [IsAdminUser]
 
@@ -512,28 +588,90 @@ class AdminVideoViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
 
 
+class AdminMediaJobViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Status of background media uploads; filter with ?status=, ?model=store.video&object_id=."""
+    serializer_class = MediaJobSerializer
+    permission_classes = [IsAdminUser]
+
+    def get_queryset(self):
+        queryset = MediaJob.objects.select_related('content_type').order_by('-created_at')
+        params = self.request.query_params
+        if params.get('status'):
+            queryset = queryset.filter(status=params['status'])
+        if params.get('model'):
+            app_label, _, model = params['model'].lower().partition('.')
+            queryset = queryset.filter(content_type__app_label=app_label, content_type__model=model)
+        if params.get('object_id'):
+            try:
+                object_id = int(params['object_id'])
+            except ValueError:
+                raise serializers.ValidationError({'object_id': 'Invalid value.'})
+            queryset = queryset.filter(object_id=object_id)
+        return queryset
+
+    def perform_destroy(self, instance):
+        delete_job(instance)
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        job = self.get_object()
+        if not retry_job(job):
+            return Response({'detail': 'Only failed jobs can be retried.'}, status=status.HTTP_400_BAD_REQUEST)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+
 class AdminInfoCardViewSet(viewsets.ModelViewSet):
     queryset = InfoCard.objects.all().order_by('order', '-created_at')
     serializer_class = InfoCardSerializer
     permission_classes = [IsAdminUser]
 
 
-class AdminOrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.select_related('customer').prefetch_related('items__design').all()
-    serializer_class = OrderSerializer
+class AdminOrderViewSet(AdminListMixin, viewsets.ModelViewSet):
+    """Orders newest first; see store.admin_api for paging and filters."""
+    # Line items are prefetched for the current page only, with just the design's sku and title.
+    queryset = Order.objects.select_related('customer').prefetch_related(
+        Prefetch('items', queryset=OrderItem.objects.select_related('design').only(
+            'id', 'order_id', 'size', 'quantity', 'unit_price', 'design__id', 'design__sku', 'design__title',
+        )),
+    )
+    serializer_class = AdminOrderSerializer
     permission_classes = [IsAdminUser]
+    filter_params = {
+        'status': 'status',
+        'currency': 'currency',
+        'delivery_type': 'delivery_type',
+        'payment_provider': 'payment_provider',
+        'customer': 'customer_id',
+    }
+    search_fields = [
+        'customer__email', 'customer__first_name', 'customer__last_name', 'customer__phone',
+        'paystack_reference', 'flutterwave_tx_ref', 'delivery_address',
+    ]
+    # Cursors need an indexed, near-unique position; totals tie, so they are not offered.
+    ordering_fields = ['created_at']
 
 
-class AdminContactMessageViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ContactMessage.objects.all().order_by('-created_at')
+class AdminContactMessageViewSet(AdminListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
     permission_classes = [IsAdminUser]
+    search_fields = ['name', 'email', 'message']
+    ordering_fields = ['created_at']
 
 
-class AdminSubscriberViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Subscriber.objects.all().order_by('-subscribed_at')
+class AdminSubscriberViewSet(AdminListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Subscriber.objects.all()
     serializer_class = SubscriberSerializer
     permission_classes = [IsAdminUser]
+    date_field = 'subscribed_at'
+    search_fields = ['email']
+    ordering_fields = ['subscribed_at']
 
 
 class AdminMaterialViewSet(viewsets.ModelViewSet):
@@ -542,10 +680,12 @@ class AdminMaterialViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAdminUser]
 
 
-class AdminCustomerViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Customer.objects.all().order_by('-created_at')
+class AdminCustomerViewSet(AdminListMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAdminUser]
+    search_fields = ['email', 'first_name', 'last_name', 'phone']
+    ordering_fields = ['created_at']
 
 
 @api_view(['POST'])
@@ -595,8 +735,7 @@ def subscribe(request):
                     label='newsletter welcome',
                 )
         except Exception as e:
-            import logging
-            logging.getLogger(__name__).warning('Newsletter welcome email failed: %s', e)
+            logger.warning('Newsletter welcome email failed: %s', e)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -610,18 +749,54 @@ def contact(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _checkout_quote(request, currency, metadata):
+    """The signed quote the client presents, or a fresh one for clients that don't send it yet."""
+    token = request.data.get('quote')
+    if token:
+        quote = load_quote(token)
+        if currency and currency.upper().strip() != quote.currency:
+            raise QuoteError('currency does not match the checkout quote')
+        return quote, token
+    quote = build_quote(currency=currency, metadata=metadata, session_id=cart_session_id(request))
+    return quote, quote.sign()
+
+
+@api_view(['POST'])
+def checkout_quote(request):
+    """
+    { currency: NGN|USD|GBP, metadata: { isInternationalDelivery, internationalRegion, cart? } }.
+    Prices the server-side cart (or metadata.cart while that is empty) from catalogue prices,
+    delivery fees and one FX snapshot. Returns the breakdown plus ``quote``, a signed token
+    that paystack/initiate and flutterwave/initiate charge exactly.
+    """
+    metadata = request.data.get('metadata') or {}
+    try:
+        quote = build_quote(
+            currency=request.data.get('currency'),
+            metadata=metadata,
+            session_id=cart_session_id(request),
+        )
+    except QuoteError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'quote': quote.sign(),
+        'expires_in': settings.CHECKOUT_QUOTE_TTL,
+        **quote.as_dict(),
+    })
+
+
 @api_view(['POST'])
 def initiate_paystack(request):
     """
-    Expecting payload: {email, amount, metadata: {cart, customer_info}}
+    Expecting payload: {email, quote, metadata: {customer, phone, deliveryAddress}}
+    Charges the NGN total of the checkout quote (any client ``amount`` is ignored).
     Returns Paystack authorization_url to redirect the user.
     """
     if not settings.PAYSTACK_SECRET:
         return Response({'detail': 'Paystack is not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     data = request.data
     email = data.get('email')
-    amount = int(float(data.get('amount', 0)) * 100)  # in kobo
-    metadata = data.get('metadata', {})
+    metadata = dict(data.get('metadata') or {})
     customer_meta = metadata.get('customer') or {}
     phone = (metadata.get('phone') or customer_meta.get('phone') or '').strip()
     delivery = (metadata.get('deliveryAddress') or '').strip()
@@ -629,6 +804,12 @@ def initiate_paystack(request):
         return Response({'detail': 'Phone number is required'}, status=status.HTTP_400_BAD_REQUEST)
     if not delivery:
         return Response({'detail': 'Delivery address is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        quote, token = _checkout_quote(request, 'NGN', metadata)
+    except QuoteError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    metadata['cart'] = quote.cart_metadata()
+    metadata['quote'] = token
 
     headers = {
         'Authorization': f'Bearer {settings.PAYSTACK_SECRET}',
@@ -636,7 +817,7 @@ def initiate_paystack(request):
     }
     payload = {
         'email': email,
-        'amount': amount,
+        'amount': int(quote.amount * 100),  # in kobo
         'metadata': metadata,
     }
     resp = requests.post('https://api.paystack.co/transaction/initialize', json=payload, headers=headers)
@@ -648,21 +829,15 @@ def initiate_paystack(request):
 @api_view(['POST'])
 def initiate_flutterwave(request):
     """
-    { email, currency: NGN|USD|GBP, metadata: { cart, customer, phone, deliveryAddress,
+    { email, quote, currency: NGN|USD|GBP, metadata: { customer, phone, deliveryAddress,
       isInternationalDelivery, internationalRegion } }.
-    Amount is computed server-side from cart (NGN) + delivery fee, then converted via FX settings.
-    Returns Flutterwave checkout link in data.link.
+    Charges the amount of the checkout quote; clients that send no quote get one priced
+    from the cart here. Returns Flutterwave checkout link in data.link.
     """
     if not settings.FLUTTERWAVE_SECRET_KEY:
         return Response({'detail': 'Flutterwave is not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     data = request.data
     email = (data.get('email') or '').strip()
-    currency = (data.get('currency') or 'NGN').upper().strip()
-    if currency not in ALLOWED_CHARGE_CURRENCIES:
-        return Response(
-            {'detail': 'currency must be one of: NGN, USD, GBP'},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
     metadata = data.get('metadata') or {}
     customer_meta = metadata.get('customer') or {}
     name = f"{customer_meta.get('firstName', '').strip()} {customer_meta.get('lastName', '').strip()}".strip() or email
@@ -672,45 +847,33 @@ def initiate_flutterwave(request):
         return Response({'detail': 'Phone number is required'}, status=status.HTTP_400_BAD_REQUEST)
     if not delivery:
         return Response({'detail': 'Delivery address is required'}, status=status.HTTP_400_BAD_REQUEST)
-
-    delivery_info = resolve_delivery_from_metadata(metadata)
-    if delivery_info['is_international'] and not delivery_info['international_region']:
-        return Response(
-            {'detail': 'Please select whether you are in the US, UK, or Canada.'},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    cart_lines = metadata.get('cart') or []
-    merchandise_ngn = cart_total_ngn(cart_lines)
-    if merchandise_ngn <= 0:
-        return Response({'detail': 'Cart is empty or invalid'}, status=status.HTTP_400_BAD_REQUEST)
-
-    delivery_fee_ngn = delivery_info['delivery_fee_ngn']
-    total_ngn = (merchandise_ngn + delivery_fee_ngn).quantize(Decimal('0.01'))
-    amount_charged = convert_from_ngn(total_ngn, currency)
-    amount_raw = float(amount_charged)
+    try:
+        quote, token = _checkout_quote(request, data.get('currency'), metadata)
+    except QuoteError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
     tx_ref = f"TBW-{uuid.uuid4().hex}"
     redirect_url = f"{settings.PUBLIC_SITE_URL.rstrip('/')}/success"
     tbw_meta = json.dumps({
-        'cart': cart_lines,
+        'cart': quote.cart_metadata(),
         'customer': customer_meta,
         'phone': phone,
         'email': email,
         'deliveryAddress': delivery,
-        'payCurrency': currency,
-        'isInternationalDelivery': delivery_info['is_international'],
-        'internationalRegion': delivery_info['international_region'],
-        'deliveryType': delivery_info['delivery_type'],
-        'country': delivery_info['country'],
-        'deliveryFeeNgn': str(delivery_fee_ngn),
-        'merchandiseNgn': str(merchandise_ngn),
+        'payCurrency': quote.currency,
+        'isInternationalDelivery': quote.is_international,
+        'internationalRegion': quote.international_region,
+        'deliveryType': quote.delivery_type,
+        'country': quote.country,
+        'deliveryFeeNgn': str(quote.delivery_fee_ngn),
+        'merchandiseNgn': str(quote.merchandise_ngn),
+        'quote': token,
     })
 
     payload = {
         'tx_ref': tx_ref,
-        'amount': f'{amount_raw:.2f}',
-        'currency': currency,
+        'amount': f'{quote.amount:.2f}',
+        'currency': quote.currency,
         'redirect_url': redirect_url,
         'payment_options': 'card,account,ussd,mobilemoney',
         'customer': {
@@ -746,11 +909,20 @@ def initiate_flutterwave(request):
 
 @api_view(['POST'])
 def verify_paystack(request):
+    """
+    The order for ``reference``. Usually the charge.success webhook has already
+    created it and this is one lookup; otherwise the charge is verified with
+    Paystack and finalized here.
+    """
     if not settings.PAYSTACK_SECRET:
         return Response({'detail': 'Paystack is not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     reference = request.data.get('reference')
     if not reference:
         return Response({'detail': 'reference required'}, status=status.HTTP_400_BAD_REQUEST)
+    order = paid_order('paystack', reference)
+    if order:
+        return Response(OrderSerializer(order).data)
+
     headers = {'Authorization': f'Bearer {settings.PAYSTACK_SECRET}'}
     resp = requests.get(f'https://api.paystack.co/transaction/verify/{reference}', headers=headers)
     if resp.status_code != 200:
@@ -759,71 +931,41 @@ def verify_paystack(request):
     payload = resp.json()
     data = payload.get('data') or {}
     status_str = data.get('status')
-    amount_kobo = data.get('amount') or 0
-    amount = (amount_kobo or 0) / 100
-    metadata = data.get('metadata') or {}
-    customer_email = (data.get('customer') or {}).get('email') or metadata.get('email')
-    customer_meta = metadata.get('customer') or {}
-    cart = metadata.get('cart') or []
-
     if status_str != 'success':
         PaymentLog.objects.create(
             gateway='paystack',
             reference=reference,
             status=status_str or 'failed',
-            amount=amount,
+            amount=(data.get('amount') or 0) / 100,
             currency='NGN',
             raw_response=payload,
         )
         return Response({'detail': 'payment not successful', 'status': status_str}, status=status.HTTP_400_BAD_REQUEST)
 
-    order, created_new = finalize_order_from_cart(
-        gateway='paystack',
-        reference=reference,
-        amount=amount,
-        status_str=status_str,
-        raw_payload=payload,
-        customer_email=customer_email,
-        cart=cart,
-        customer_meta=customer_meta,
-        metadata=metadata,
-        paystack_reference=reference,
-        flutterwave_tx_ref='',
-        charge_currency='NGN',
-    )
-    if created_new:
-        send_order_emails(order, customer_email)
-
+    order, _ = complete_paystack_charge({**data, 'reference': reference}, payload)
     serializer = OrderSerializer(order)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
 @api_view(['POST'])
 def verify_flutterwave(request):
+    """
+    The order for ``tx_ref``. Usually the charge.completed webhook has already
+    created it and this is one lookup; otherwise the transaction is verified
+    with Flutterwave and finalized here.
+    """
     if not settings.FLUTTERWAVE_SECRET_KEY:
         return Response({'detail': 'Flutterwave is not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     tx_ref = (request.data.get('tx_ref') or '').strip()
     transaction_id = (request.data.get('transaction_id') or '').strip()
     if not tx_ref and not transaction_id:
         return Response({'detail': 'tx_ref or transaction_id required'}, status=status.HTTP_400_BAD_REQUEST)
+    order = paid_order('flutterwave', tx_ref)
+    if order:
+        return Response(OrderSerializer(order).data)
 
-    headers = {'Authorization': f'Bearer {settings.FLUTTERWAVE_SECRET_KEY}'}
-    # Prefer tx_ref (our canonical idempotency key); fall back to transaction_id when redirects omit tx_ref.
-    if tx_ref:
-        resp = requests.get(
-            'https://api.flutterwave.com/v3/transactions/verify_by_reference',
-            params={'tx_ref': tx_ref},
-            headers=headers,
-            timeout=60,
-        )
-    else:
-        resp = requests.get(
-            f'https://api.flutterwave.com/v3/transactions/{transaction_id}/verify',
-            headers=headers,
-            timeout=60,
-        )
-    payload = resp.json() if resp.content else {}
-    if resp.status_code != 200 or payload.get('status') != 'success':
+    status_code, payload = fetch_flutterwave_transaction(tx_ref=tx_ref, transaction_id=transaction_id)
+    if status_code != 200 or payload.get('status') != 'success':
         return Response(
             {'detail': payload.get('message') or 'verification failed'},
             status=status.HTTP_502_BAD_GATEWAY,
@@ -843,37 +985,51 @@ def verify_flutterwave(request):
         )
         return Response({'detail': 'payment not successful', 'status': status_str}, status=status.HTTP_400_BAD_REQUEST)
 
-    meta = parse_flutterwave_meta(data)
-    cart = meta.get('cart') or []
-    customer_meta = meta.get('customer') or {}
-    # Pass full parsed meta so deliveryAddress and other TBW fields reach finalize_order_from_cart.
-    metadata = dict(meta) if isinstance(meta, dict) else {}
-    charge_currency = (data.get('currency') or metadata.get('payCurrency') or 'NGN').upper()[:3]
-    metadata['payCurrency'] = charge_currency
-    customer_email = (data.get('customer') or {}).get('email') or meta.get('email')
-    amount = float(data.get('amount') or 0)
-
-    order, created_new = finalize_order_from_cart(
-        gateway='flutterwave',
-        reference=resolved_tx_ref or transaction_id,
-        amount=amount,
-        status_str='successful',
-        raw_payload=payload,
-        customer_email=customer_email,
-        cart=cart,
-        customer_meta=customer_meta,
-        metadata=metadata,
-        paystack_reference='',
-        flutterwave_tx_ref=resolved_tx_ref or transaction_id,
-        charge_currency=charge_currency,
-    )
-    if created_new:
-        send_order_emails(order, customer_email)
-
+    order, _ = complete_flutterwave_charge(data, payload, resolved_tx_ref or transaction_id)
     serializer = OrderSerializer(order)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def paystack_webhook(request):
+    """Paystack event receiver; the x-paystack-signature HMAC is checked before anything is parsed."""
+    if not settings.PAYSTACK_SECRET:
+        return Response({'detail': 'Paystack is not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    body = request.body
+    if not payment_webhooks.paystack_signature_valid(body, request.META.get('HTTP_X_PAYSTACK_SIGNATURE', '')):
+        return Response({'detail': 'invalid signature'}, status=status.HTTP_401_UNAUTHORIZED)
+    try:
+        event = json.loads(body)
+    except ValueError:
+        return Response({'detail': 'invalid payload'}, status=status.HTTP_400_BAD_REQUEST)
+    payment_webhooks.handle_paystack_event(event)
+    return Response({'status': 'ok'})
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def flutterwave_webhook(request):
+    """Flutterwave event receiver; verif-hash / flutterwave-signature is checked before anything is parsed."""
+    if not settings.FLUTTERWAVE_WEBHOOK_HASH:
+        return Response({'detail': 'Flutterwave webhooks are not configured'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    body = request.body
+    if not payment_webhooks.flutterwave_signature_valid(
+        body,
+        verif_hash=request.META.get('HTTP_VERIF_HASH', ''),
+        signature=request.META.get('HTTP_FLUTTERWAVE_SIGNATURE', ''),
+    ):
+        return Response({'detail': 'invalid signature'}, status=status.HTTP_401_UNAUTHORIZED)
+    try:
+        event = json.loads(body)
+    except ValueError:
+        return Response({'detail': 'invalid payload'}, status=status.HTTP_400_BAD_REQUEST)
+    payment_webhooks.handle_flutterwave_event(event)
+    return Response({'status': 'ok'})
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def currency_fx_public(request):
@@ -1020,10 +1176,101 @@ def admin_metrics(request):
         "total_contact_messages": ContactMessage.objects.count(),
         "total_collections": Collection.objects.count(),
         "total_designs": Design.objects.count(),
+        "media_url_cache": media_url_cache_info(),
+        "media_jobs": dict(MediaJob.objects.values_list('status').annotate(count=Count('id'))),
     }
     return Response(data)
 
 
+@api_view(['GET'])
+@authentication_classes([exports.SignedLinkAuthentication, TokenAuthentication, SessionAuthentication])
+@permission_classes([IsAdminUser])
+def admin_export(request, kind, fmt):
+    """
+    Stream every order (with items), customer, subscriber or payment log as
+    CSV or NDJSON, oldest first. ``created_after`` / ``created_before`` narrow
+    the range; ``signature`` comes from admin_export_link. See store.exports.
+    """
+    spec = exports.EXPORTS.get(kind)
+    if spec is None or fmt not in exports.FORMATS:
+        return Response({'detail': 'Unknown export.'}, status=status.HTTP_404_NOT_FOUND)
+    params = request.query_params
+    rows = exports.export_rows(
+        spec,
+        created_after=parse_moment('created_after', params['created_after']) if params.get('created_after') else None,
+        created_before=parse_moment('created_before', params['created_before']) if params.get('created_before') else None,
+    )
+    response = StreamingHttpResponse(exports.stream_export(spec, fmt, rows), content_type=exports.FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}-{timezone.now():%Y%m%d-%H%M}.{fmt}"'
+    response['Cache-Control'] = 'no-store'
+    # Hint nginx and similar proxies to pass rows on instead of buffering the whole file.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def admin_export_link(request, kind, fmt):
+    """A short-lived URL for one export that a browser can download without the token header."""
+    if kind not in exports.EXPORTS or fmt not in exports.FORMATS:
+        return Response({'detail': 'Unknown export.'}, status=status.HTTP_404_NOT_FOUND)
+    query = urlencode({'signature': exports.sign_link(request.user, kind, fmt)})
+    url = reverse('admin-export', kwargs={'kind': kind, 'fmt': fmt})
+    return Response({'url': request.build_absolute_uri(f'{url}?{query}'), 'expires_in': settings.EXPORT_LINK_TTL})
+
+
+EMAIL_PREVIEWS = ('order-confirmation', 'order-notification', 'newsletter-welcome', 'newsletter-campaign')
+
+
+def _preview_subject(queryset, pk):
+    """The row ``?order=`` / ``?campaign=`` names, else the newest; None when there is none."""
+    if pk:
+        return queryset.filter(pk=pk).first() if pk.isdigit() else None
+    return queryset.first()
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def admin_email_preview(request, template):
+    """
+    Render an email exactly as it would be sent, through the same compiled
+    templates. Order emails use ``?order=<id>`` (default: the newest order);
+    campaigns use ``?campaign=<id>`` (default: the newest campaign).
+    """
+    if template not in EMAIL_PREVIEWS:
+        return Response({'detail': 'Unknown email template.'}, status=status.HTTP_404_NOT_FOUND)
+    if template == 'newsletter-welcome':
+        body = newsletter_welcome_html(site_name=settings.SITE_NAME)
+    elif template == 'newsletter-campaign':
+        campaign = _preview_subject(
+            NewsletterCampaign.objects.order_by('-created_at', '-id'), request.query_params.get('campaign'),
+        )
+        if campaign is None:
+            return Response({'detail': 'Campaign not found.'}, status=status.HTTP_404_NOT_FOUND)
+        body = newsletter_campaign_html(
+            headline=campaign.headline,
+            body=campaign.body,
+            preheader=campaign.preheader,
+            cta_label=campaign.cta_label,
+            cta_url=campaign.cta_url,
+        )
+    else:
+        order = _preview_subject(
+            Order.objects.select_related('customer').prefetch_related('items__design').order_by('-created_at', '-id'),
+            request.query_params.get('order'),
+        )
+        if order is None:
+            return Response({'detail': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
+        customer_kwargs, owner_kwargs = order_email_kwargs(order)
+        if template == 'order-confirmation':
+            body = order_confirmation_customer_html(**customer_kwargs)
+        else:
+            body = order_notification_owner_html(**owner_kwargs)
+    response = HttpResponse(body, content_type='text/html; charset=utf-8')
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
 @api_view(['GET'])
 def health(request):
     return Response({'status': 'ok'})
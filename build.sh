@@ -18,6 +18,7 @@ echo "🐍 Preparing backend..."
 cd backend
 pip install -r requirements.txt
 python manage.py migrate --noinput
+# Hashed copies plus .gz/.br siblings of the Vite build (WhiteNoise + Brotli)
 python manage.py collectstatic --noinput
 
 echo "✅ Build complete!"
@@ -22,7 +22,7 @@ type PreorderDesign = {
   effective_price_gbp?: number | null
   discount_percentage: number
   total_stock: number
-  images: Array<{ id: number; image_url: string; alt_text?: string }>
+  image: { id: number; image_url: string; alt_text?: string } | null
   collection: string
   is_preorder: boolean
   preorder_start_at?: string | null
@@ -182,10 +182,10 @@ export default function AtelierReserveSection() {
                 className="group flex h-full flex-col overflow-hidden rounded-xl border border-gray-100/80 bg-white luxury-shadow transition-all duration-500 hover:luxury-shadow-lg dark:border-slate-700 dark:bg-slate-900 sm:rounded-lg"
               >
                 <div className="relative aspect-[3/4] w-full overflow-hidden bg-gradient-to-br from-blue-50 to-blue-100 dark:from-slate-800 dark:to-slate-700">
-                  {design.images?.[0] ? (
+                  {design.image ? (
                     <img
-                      src={design.images[0].image_url}
-                      alt={design.images[0].alt_text || design.title}
+                      src={design.image.image_url}
+                      alt={design.image.alt_text || design.title}
                       className="h-full w-full object-cover object-top transition-transform duration-700 group-hover:scale-[1.03]"
                     />
                   ) : (
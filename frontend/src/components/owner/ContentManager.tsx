@@ -1,6 +1,8 @@
 import React, { useEffect, useMemo, useState } from 'react'
 import { FaBookOpen, FaBoxOpen, FaCommentDots, FaHeart, FaPencilAlt, FaPlus, FaTrash } from 'react-icons/fa'
 import api from '../../lib/api'
+import { useCursorList } from '../../hooks/useCursorList'
+import LoadMoreButton from './LoadMoreButton'
 
 type BusinessProfile = {
   id: number
@@ -87,9 +89,12 @@ export default function ContentManager({ token }: { token: string }) {
   const [businessProfiles, setBusinessProfiles] = useState<BusinessProfile[]>([])
   const [posts, setPosts] = useState<BlogPost[]>([])
   const [mediaItems, setMediaItems] = useState<BlogMedia[]>([])
-  const [comments, setComments] = useState<BlogComment[]>([])
-  const [postLikes, setPostLikes] = useState<BlogLike[]>([])
-  const [commentLikes, setCommentLikes] = useState<BlogLike[]>([])
+  const commentList = useCursorList<BlogComment>()
+  const postLikeList = useCursorList<BlogLike>()
+  const commentLikeList = useCursorList<BlogLike>()
+  const comments = commentList.rows
+  const postLikes = postLikeList.rows
+  const commentLikes = commentLikeList.rows
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [modal, setModal] = useState<ModalState>(null)
@@ -110,9 +115,9 @@ export default function ContentManager({ token }: { token: string }) {
       setBusinessProfiles(businessRes.data)
       setPosts(postsRes.data)
       setMediaItems(mediaRes.data)
-      setComments(commentsRes.data)
-      setPostLikes(postLikesRes.data)
-      setCommentLikes(commentLikesRes.data)
+      commentList.setFirstPage(commentsRes.data)
+      postLikeList.setFirstPage(postLikesRes.data)
+      commentLikeList.setFirstPage(commentLikesRes.data)
       setError(null)
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Unable to load content management data.')
@@ -179,6 +184,7 @@ export default function ContentManager({ token }: { token: string }) {
     if (!window.confirm('Are you sure you want to delete this item?')) return
     try {
       await api.delete(`/admin/${endpoint}/${id}/`, { headers: authHeaders })
+      if (endpoint === 'blog-comments') commentList.removeRow(id)
       await fetchAll()
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Unable to delete this item.')
@@ -187,7 +193,8 @@ export default function ContentManager({ token }: { token: string }) {
 
   const toggleCommentApproval = async (comment: BlogComment) => {
     try {
-      await api.patch(`/admin/blog-comments/${comment.id}/`, { is_approved: !comment.is_approved }, { headers: authHeaders })
+      const response = await api.patch(`/admin/blog-comments/${comment.id}/`, { is_approved: !comment.is_approved }, { headers: authHeaders })
+      commentList.updateRow(response.data)
       await fetchAll()
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Unable to update comment approval.')
@@ -347,6 +354,7 @@ export default function ContentManager({ token }: { token: string }) {
               </tbody>
             </table>
           </div>
+          <LoadMoreButton list={commentList} headers={authHeaders} onError={setError} />
         </div>
       )}
 
@@ -364,6 +372,7 @@ export default function ContentManager({ token }: { token: string }) {
               ))}
               {postLikes.length === 0 && <p className="text-gray-500">No post likes recorded yet.</p>}
             </div>
+            <LoadMoreButton list={postLikeList} headers={authHeaders} onError={setError} />
           </div>
           <div className="rounded-2xl border border-blue-wardrobe-light/10 bg-white p-6 shadow-md">
             <h2 className="mb-5 text-2xl font-semibold text-blue-wardrobe-dark">Comment Likes</h2>
@@ -378,6 +387,7 @@ export default function ContentManager({ token }: { token: string }) {
               ))}
               {commentLikes.length === 0 && <p className="text-gray-500">No comment likes recorded yet.</p>}
             </div>
+            <LoadMoreButton list={commentLikeList} headers={authHeaders} onError={setError} />
           </div>
         </div>
       )}
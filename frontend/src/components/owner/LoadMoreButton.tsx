@@ -0,0 +1,22 @@
+import type { CursorListState } from '../../hooks/useCursorList'
+
+// "Load more" under a cursor-paged owner list; hidden once the last page is in.
+export default function LoadMoreButton({ list, headers, onError }: {
+  list: Pick<CursorListState<unknown>, 'hasMore' | 'loadingMore' | 'loadMore'>
+  headers: Record<string, string>
+  onError: (message: string) => void
+}) {
+  if (!list.hasMore) return null
+  return (
+    <div className="mt-6 text-center">
+      <button
+        type="button"
+        disabled={list.loadingMore}
+        onClick={() => list.loadMore(headers).catch(() => onError('Failed to load more. Please try again.'))}
+        className="px-4 py-2 text-sm border border-blue-wardrobe-dark text-blue-wardrobe-dark rounded-full hover:bg-blue-wardrobe-dark hover:text-white transition-colors disabled:opacity-50"
+      >
+        {list.loadingMore ? 'Loading…' : 'Load more'}
+      </button>
+    </div>
+  )
+}
@@ -0,0 +1,64 @@
+import { useCallback, useState } from 'react'
+import api, { listResults } from '../lib/api'
+
+type CursorList<T> = { rows: T[]; next: string | null }
+
+export type CursorListState<T> = {
+  rows: T[]
+  hasMore: boolean
+  loadingMore: boolean
+  setFirstPage: (data: any) => void
+  loadMore: (headers: Record<string, string>) => Promise<void>
+  updateRow: (row: T) => void
+  removeRow: (id: number) => void
+  clear: () => void
+}
+
+const nextPage = (data: any): string | null => (typeof data?.next === 'string' ? data.next : null)
+
+/**
+ * An owner-dashboard list read a cursor page at a time ({ next, previous, results }).
+ * setFirstPage takes a fresh first-page response; rows already paged in with
+ * loadMore, and the cursor after them, survive it, so a periodic refresh never
+ * drops them. Edits to those rows go through updateRow and removeRow.
+ */
+export function useCursorList<T extends { id: number }>(): CursorListState<T> {
+  const [list, setList] = useState<CursorList<T>>({ rows: [], next: null })
+  const [loadingMore, setLoadingMore] = useState(false)
+
+  const setFirstPage = useCallback((data: any) => {
+    const rows = listResults<T>(data)
+    setList((current) => {
+      if (current.rows.length <= rows.length) return { rows, next: nextPage(data) }
+      const fresh = new Set(rows.map((row) => row.id))
+      return { rows: [...rows, ...current.rows.filter((row) => !fresh.has(row.id))], next: current.next }
+    })
+  }, [])
+
+  const loadMore = async (headers: Record<string, string>) => {
+    if (!list.next || loadingMore) return
+    setLoadingMore(true)
+    try {
+      const response = await api.get(list.next, { headers })
+      setList((current) => {
+        const seen = new Set(current.rows.map((row) => row.id))
+        const rows = listResults<T>(response.data).filter((row) => !seen.has(row.id))
+        return { rows: [...current.rows, ...rows], next: nextPage(response.data) }
+      })
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
+  const updateRow = useCallback((row: T) => {
+    setList((current) => ({ ...current, rows: current.rows.map((old) => (old.id === row.id ? row : old)) }))
+  }, [])
+
+  const removeRow = useCallback((id: number) => {
+    setList((current) => ({ ...current, rows: current.rows.filter((row) => row.id !== id) }))
+  }, [])
+
+  const clear = useCallback(() => setList({ rows: [], next: null }), [])
+
+  return { rows: list.rows, hasMore: list.next !== null, loadingMore, setFirstPage, loadMore, updateRow, removeRow, clear }
+}
@@ -78,4 +78,19 @@ export const fetchCSRFToken = async () => {
   }
 }
 
+// Admin list endpoints are cursor-paginated ({ next, previous, results }); other lists are plain arrays.
+export const listResults = <T = any>(data: any): T[] =>
+  Array.isArray(data) ? data : Array.isArray(data?.results) ? data.results : []
+
+export type AdminExportKind = 'orders' | 'customers' | 'subscribers' | 'payments'
+
+// Streaming CSV/NDJSON exports. A link can't carry the owner's token header, so fetch a
+// short-lived signed URL and let the browser download from it as rows arrive.
+export const downloadAdminExport = async (kind: AdminExportKind, token: string, format: 'csv' | 'ndjson' = 'csv') => {
+  const response = await api.post(`/admin/exports/${kind}.${format}/link/`, null, {
+    headers: { Authorization: `Token ${token}` },
+  })
+  window.location.assign(response.data.url)
+}
+
 export default api
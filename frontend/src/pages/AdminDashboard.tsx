@@ -6,9 +6,11 @@ import {
   FaBox, FaEdit, FaTrash, FaPlus, FaSignOutAlt, FaSpinner, FaCheckCircle,
   FaTimesCircle, FaEye, FaArrowUp, FaArrowDown, FaTshirt, FaUser, FaStar, FaCog
 } from 'react-icons/fa'
-import api from '../lib/api'
+import api, { downloadAdminExport, type AdminExportKind } from '../lib/api'
+import { useCursorList } from '../hooks/useCursorList'
 import { useLoading } from '../hooks/useLoading'
 import ContentManager from '../components/owner/ContentManager'
+import LoadMoreButton from '../components/owner/LoadMoreButton'
 
 type Metrics = {
   total_sales: number
@@ -171,11 +173,16 @@ export default function AdminDashboard() {
   const [collections, setCollections] = useState<Collection[]>([])
   const [videos, setVideos] = useState<Video[]>([])
   const [infoCards, setInfoCards] = useState<InfoCard[]>([])
-  const [orders, setOrders] = useState<Order[]>([])
-  const [contactMessages, setContactMessages] = useState<ContactMessage[]>([])
-  const [subscribers, setSubscribers] = useState<Subscriber[]>([])
+  // Cursor-paged lists: the first page on each refresh, older rows with "Load more".
+  const orderList = useCursorList<Order>()
+  const messageList = useCursorList<ContactMessage>()
+  const subscriberList = useCursorList<Subscriber>()
+  const customerList = useCursorList<Customer>()
+  const orders = orderList.rows
+  const contactMessages = messageList.rows
+  const subscribers = subscriberList.rows
+  const customers = customerList.rows
   const [designs, setDesigns] = useState<Design[]>([])
-  const [customers, setCustomers] = useState<Customer[]>([])
   const [materials, setMaterials] = useState<Material[]>([])
   const [reviews, setReviews] = useState<DesignReview[]>([])
   const [storeSettings, setStoreSettings] = useState<StoreSettings | null>(null)
@@ -193,6 +200,7 @@ export default function AdminDashboard() {
   const [showModal, setShowModal] = useState<{ type: string; item?: any } | null>(null)
   const [selectedOrder, setSelectedOrder] = useState<Order | null>(null)
   const { setLoading: setGlobalLoading } = useLoading()
+  const authHeaders = { Authorization: `Token ${token}` }
 
   useEffect(() => {
     document.title = 'Owner Dashboard — THE BLUE WARDROBE'
@@ -229,11 +237,11 @@ export default function AdminDashboard() {
       setCollections(collectionsRes.data)
       setVideos(videosRes.data)
       setInfoCards(infoCardsRes.data)
-      setOrders(ordersRes.data)
-      setContactMessages(messagesRes.data)
-      setSubscribers(subscribersRes.data)
+      orderList.setFirstPage(ordersRes.data)
+      messageList.setFirstPage(messagesRes.data)
+      subscriberList.setFirstPage(subscribersRes.data)
       setDesigns(designsRes.data)
-      setCustomers(customersRes.data)
+      customerList.setFirstPage(customersRes.data)
       setMaterials(materialsRes.data)
       setReviews(reviewsRes.data)
       if (settingsRes.data) {
@@ -282,17 +290,19 @@ export default function AdminDashboard() {
     setCollections([])
     setVideos([])
     setInfoCards([])
-    setOrders([])
-    setContactMessages([])
-    setSubscribers([])
+    orderList.clear()
+    messageList.clear()
+    subscriberList.clear()
+    customerList.clear()
   }
 
   const updateOrderStatus = async (orderId: number, newStatus: string) => {
     if (!token) return
     try {
-      await api.patch(`/admin/orders/${orderId}/`, { status: newStatus }, {
+      const response = await api.patch(`/admin/orders/${orderId}/`, { status: newStatus }, {
         headers: { Authorization: `Token ${token}` }
       })
+      orderList.updateRow(response.data)
       await fetchAllData()
     } catch (err) {
       setError('Failed to update order status')
@@ -1021,7 +1031,13 @@ export default function AdminDashboard() {
             animate={{ opacity: 1, y: 0 }}
             className="bg-white rounded-xl shadow-md border border-blue-wardrobe-light/10 p-6"
           >
-            <h2 className="text-2xl font-semibold text-blue-wardrobe-dark mb-6">Orders</h2>
+            <div className="flex items-center justify-between mb-6">
+              <h2 className="text-2xl font-semibold text-blue-wardrobe-dark">Orders</h2>
+              <div className="flex gap-2">
+                <ExportButton kind="orders" label="Export CSV" token={token} onError={setError} />
+                <ExportButton kind="payments" label="Payments CSV" token={token} onError={setError} />
+              </div>
+            </div>
             {orders.length === 0 ? (
               <div className="text-center py-12 border-2 border-dashed border-blue-wardrobe-light/30 rounded-lg">
                 <FaShoppingCart className="mx-auto text-4xl text-blue-wardrobe-light/50 mb-4" />
@@ -1068,6 +1084,7 @@ export default function AdminDashboard() {
                             className="border border-blue-wardrobe-light/20 rounded px-2 py-1 text-sm focus:outline-none focus:ring-2 focus:ring-blue-wardrobe-light transition-all"
                           >
                             <option value="pending">Pending</option>
+                            <option value="review">Payment review</option>
                             <option value="confirmed">Confirmed</option>
                             <option value="shipped">Shipped</option>
                             <option value="delivered">Delivered</option>
@@ -1090,6 +1107,7 @@ export default function AdminDashboard() {
                 </table>
               </div>
             )}
+            <LoadMoreButton list={orderList} headers={authHeaders} onError={setError} />
           </motion.div>
         )}
 
@@ -1128,6 +1146,7 @@ export default function AdminDashboard() {
                 ))}
               </div>
             )}
+            <LoadMoreButton list={messageList} headers={authHeaders} onError={setError} />
           </motion.div>
         )}
 
@@ -1138,7 +1157,12 @@ export default function AdminDashboard() {
             animate={{ opacity: 1, y: 0 }}
             className="bg-white rounded-xl shadow-md border border-blue-wardrobe-light/10 p-6"
           >
-            <h2 className="text-2xl font-semibold text-blue-wardrobe-dark mb-6">Newsletter Subscribers</h2>
+            <div className="flex items-center justify-between mb-6">
+              <h2 className="text-2xl font-semibold text-blue-wardrobe-dark">Newsletter Subscribers</h2>
+              <div className="flex gap-2">
+                <ExportButton kind="subscribers" label="Export CSV" token={token} onError={setError} />
+              </div>
+            </div>
             {subscribers.length === 0 ? (
               <div className="text-center py-12 border-2 border-dashed border-blue-wardrobe-light/30 rounded-lg">
                 <FaUsers className="mx-auto text-4xl text-blue-wardrobe-light/50 mb-4" />
@@ -1170,6 +1194,7 @@ export default function AdminDashboard() {
                 </table>
               </div>
             )}
+            <LoadMoreButton list={subscriberList} headers={authHeaders} onError={setError} />
           </motion.div>
         )}
 
@@ -1180,7 +1205,12 @@ export default function AdminDashboard() {
             animate={{ opacity: 1, y: 0 }}
             className="bg-white rounded-xl shadow-md border border-blue-wardrobe-light/10 p-6"
           >
-            <h2 className="text-2xl font-semibold text-blue-wardrobe-dark mb-6">Customers</h2>
+            <div className="flex items-center justify-between mb-6">
+              <h2 className="text-2xl font-semibold text-blue-wardrobe-dark">Customers</h2>
+              <div className="flex gap-2">
+                <ExportButton kind="customers" label="Export CSV" token={token} onError={setError} />
+              </div>
+            </div>
             {customers.length === 0 ? (
               <div className="text-center py-12 border-2 border-dashed border-blue-wardrobe-light/30 rounded-lg">
                 <FaUser className="mx-auto text-4xl text-blue-wardrobe-light/50 mb-4" />
@@ -1216,6 +1246,7 @@ export default function AdminDashboard() {
                 </table>
               </div>
             )}
+            <LoadMoreButton list={customerList} headers={authHeaders} onError={setError} />
           </motion.div>
         )}
 
@@ -1475,6 +1506,25 @@ export default function AdminDashboard() {
   )
 }
 
+// Export download for the owner's token session (see downloadAdminExport)
+function ExportButton({ kind, label, token, onError }: {
+  kind: AdminExportKind
+  label: string
+  token: string | null
+  onError: (message: string) => void
+}) {
+  return (
+    <button
+      type="button"
+      disabled={!token}
+      onClick={() => token && downloadAdminExport(kind, token).catch(() => onError('Export failed. Please try again.'))}
+      className="px-4 py-2 text-sm border border-blue-wardrobe-dark text-blue-wardrobe-dark rounded-full hover:bg-blue-wardrobe-dark hover:text-white transition-colors"
+    >
+      {label}
+    </button>
+  )
+}
+
 // Modal Component for Add/Edit Forms
 function isoToDatetimeLocal(iso?: string | null): string {
   if (!iso) return ''
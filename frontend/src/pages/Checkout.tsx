@@ -195,8 +195,14 @@ export default function Checkout() {
         },
       }
 
+      // The server prices the order once; initiate charges exactly what the signed quote says.
+      const quoteResp = await api.post('/checkout/quote/', {
+        currency: payCurrency,
+        metadata: payload.metadata,
+      })
+
       const path = '/flutterwave/initiate/'
-      const resp = await api.post(path, payload)
+      const resp = await api.post(path, { ...payload, quote: quoteResp.data.quote })
 
       const authUrl = resp.data?.data?.link
 
@@ -23,15 +23,14 @@ type Design = {
   discount_percentage: number
   total_stock: number
   is_preorder?: boolean
-  images: DesignImage[]
+  image: DesignImage | null
 }
 
 type DesignImage = {
   id: number
-  image: string
   image_url: string
-  alt_text: string
-  order: number
+  srcset?: string | null
+  alt_text?: string
 }
 
 type Collection = {
@@ -157,19 +156,23 @@ export default function CollectionDetail() {
                 }}
               >
                 <div className="relative aspect-[3/4] w-full bg-gradient-to-br from-blue-50 to-blue-100 overflow-hidden cursor-pointer group">
-                  {d.images?.length > 0 ? (
+                  {d.image ? (
                     <img
-                      src={d.images[0].image_url}
-                      alt={d.images[0].alt_text || d.title}
+                      src={d.image.image_url}
+                      srcSet={d.image.srcset || undefined}
+                      sizes="(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw"
+                      loading="lazy"
+                      alt={d.image.alt_text || d.title}
                       className="h-full w-full object-cover object-top origin-top transform transition-transform duration-500 group-hover:scale-[1.03]"
                       onClick={(e) => {
                         e.stopPropagation();
+                        const image = e.currentTarget;
                         // Create modal for full image viewing
                         const modal = document.createElement('div');
                         modal.className = 'fixed inset-0 bg-black bg-opacity-90 z-50 flex items-center justify-center p-4 overflow-auto';
                         modal.innerHTML = `
                           <div class="relative flex items-center justify-center min-h-full">
-                            <img src="${d.images[0].image_url}" alt="${d.images[0].alt_text || d.title}" class="max-w-full max-h-screen object-contain">
+                            <img src="${image.src}" alt="${image.alt}" class="max-w-full max-h-screen object-contain">
                             <button class="fixed top-4 right-4 text-white bg-black bg-opacity-50 rounded-full w-12 h-12 flex items-center justify-center hover:bg-opacity-75 transition-all text-xl">
                               ✕
                             </button>
@@ -26,11 +26,12 @@ type Design = {
   effective_price_gbp?: number | null
   discount_percentage: number
   total_stock: number
-  images: Array<{
+  image: {
     id: number
     image_url: string
+    srcset?: string | null
     alt_text?: string
-  }>
+  } | null
   collection: string
   average_rating: number
   total_reviews: number
@@ -177,19 +178,23 @@ export default function Home() {
                     className="group luxury-shadow flex h-full flex-col rounded-xl sm:rounded-lg overflow-hidden hover:luxury-shadow-lg transition-all duration-500 bg-white block border border-gray-100/80 dark:border-slate-700"
                   >
                     <div className="relative aspect-[3/4] w-full bg-gradient-to-br from-blue-50 to-blue-100 overflow-hidden cursor-pointer group">
-                      {design.images?.length > 0 ? (
+                      {design.image ? (
                         <img
-                          src={design.images[0].image_url}
-                          alt={design.images[0].alt_text || design.title}
+                          src={design.image.image_url}
+                          srcSet={design.image.srcset || undefined}
+                          sizes="(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw"
+                          loading="lazy"
+                          alt={design.image.alt_text || design.title}
                           className="h-full w-full object-cover object-top origin-top transform transition-transform duration-700 group-hover:scale-[1.03]"
                           onClick={(e) => {
                             e.stopPropagation()
                             // Create modal for full image viewing
+                            const image = e.currentTarget
                             const modal = document.createElement('div')
                             modal.className = 'fixed inset-0 bg-black bg-opacity-90 z-50 flex items-center justify-center p-4 overflow-auto'
                             modal.innerHTML = `
                               <div class="relative flex items-center justify-center min-h-full">
-                                <img src="${design.images[0].image_url}" alt="${design.images[0].alt_text || design.title}" class="max-w-full max-h-screen object-contain">
+                                <img src="${image.src}" alt="${image.alt}" class="max-w-full max-h-screen object-contain">
                                 <button class="fixed top-4 right-4 text-white bg-black bg-opacity-50 rounded-full w-12 h-12 flex items-center justify-center hover:bg-opacity-75 transition-all text-xl">
                                   ✕
                                 </button>